@@ -5,99 +5,249 @@ Agent Session Logic
 Core agent interaction functions for running autonomous coding sessions.
 """
 
-import asyncio
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from claude_code_sdk import ClaudeSDKClient
 
+from backoff import SessionSupervisor
 from client import create_client
-from progress import print_session_header, print_progress_summary, is_linear_initialized
-from prompts import get_initializer_prompt, get_coding_prompt, copy_spec_to_project
-
-
-# Configuration
-AUTO_CONTINUE_DELAY_SECONDS = 3
+from context_monitor import (
+    DEFAULT_CONTEXT_WINDOW,
+    DEFAULT_WRAP_UP_THRESHOLD,
+    ContextMonitor,
+    register_context_monitor,
+)
+from devservers import get_dev_server_manager
+from events import (
+    EventPipeline,
+    EventSink,
+    SessionStartEvent,
+    SessionResultEvent,
+    TextEvent,
+    UsageEvent,
+    default_sinks,
+    events_from_message,
+)
+from issue_cache import get_issue_cache, refresh_issue_cache
+from journal import SessionJournal, describe_interruption, find_interrupted_session
+from model_router import BOOKKEEPING, IMPLEMENT, ORIENT, clear_handoff, take_handoff
+from persistent_shell import close_persistent_shell
+from progress import print_session_header, print_progress_summary, is_backlog_complete, is_linear_initialized
+from prompts import (
+    copy_spec_to_project,
+    get_bookkeeping_prompt,
+    get_coding_prompt,
+    get_implement_prompt,
+    get_initializer_prompt,
+    get_orient_prompt,
+    get_resume_prompt,
+)
+from regression import format_verification_targets, plan_verification, record_verification
+from session_context import build_session_context
+from telemetry import TelemetrySink
+
+if TYPE_CHECKING:
+    from mcp_pool import McpServerPool
 
 
 async def run_agent_session(
     client: ClaudeSDKClient,
     message: str,
     project_dir: Path,
+    sinks: Optional[list[EventSink]] = None,
+    context_monitor: Optional[ContextMonitor] = None,
 ) -> tuple[str, str]:
     """
     Run a single agent session using Claude Agent SDK.
 
+    Streamed messages are converted to typed events and fanned out to the
+    sinks through a bounded queue, so slow output never stalls consumption.
+
     Args:
         client: Claude SDK client
         message: The prompt to send
         project_dir: Project directory path
+        sinks: Event sinks (defaults to console output and session stats)
+        context_monitor: Tracks context usage; the agent is asked to wrap up
+            near the limit, and the session is interrupted if it keeps going
 
     Returns:
         (status, response_text) where status is:
         - "continue" if agent should continue working
-        - "error" if an error occurred
+        - "error" if an error occurred or the SDK reported an error result
+          (response_text is then the error message)
     """
     print("Sending prompt to Claude Agent SDK...\n")
 
+    if sinks is None:
+        sinks = default_sinks()
+
+    # Collect response text in a list and join once at the end
+    text_parts: list[str] = []
+    error_result: Optional[SessionResultEvent] = None
+
+    if context_monitor is not None:
+        register_context_monitor(project_dir, context_monitor)
+
     try:
-        # Send the query
-        await client.query(message)
-
-        # Collect response text and show tool use
-        response_text = ""
-        async for msg in client.receive_response():
-            msg_type = type(msg).__name__
-
-            # Handle AssistantMessage (text and tool use)
-            if msg_type == "AssistantMessage" and hasattr(msg, "content"):
-                for block in msg.content:
-                    block_type = type(block).__name__
-
-                    if block_type == "TextBlock" and hasattr(block, "text"):
-                        response_text += block.text
-                        print(block.text, end="", flush=True)
-                    elif block_type == "ToolUseBlock" and hasattr(block, "name"):
-                        print(f"\n[Tool: {block.name}]", flush=True)
-                        if hasattr(block, "input"):
-                            input_str = str(block.input)
-                            if len(input_str) > 200:
-                                print(f"   Input: {input_str[:200]}...", flush=True)
-                            else:
-                                print(f"   Input: {input_str}", flush=True)
-
-            # Handle UserMessage (tool results)
-            elif msg_type == "UserMessage" and hasattr(msg, "content"):
-                for block in msg.content:
-                    block_type = type(block).__name__
-
-                    if block_type == "ToolResultBlock":
-                        result_content = getattr(block, "content", "")
-                        is_error = getattr(block, "is_error", False)
-
-                        # Check if command was blocked by security hook
-                        if "blocked" in str(result_content).lower():
-                            print(f"   [BLOCKED] {result_content}", flush=True)
-                        elif is_error:
-                            # Show errors (truncated)
-                            error_str = str(result_content)[:500]
-                            print(f"   [Error] {error_str}", flush=True)
-                        else:
-                            # Tool succeeded - just show brief confirmation
-                            print("   [Done]", flush=True)
+        async with EventPipeline(sinks) as pipeline:
+            # Send the query
+            await pipeline.publish(SessionStartEvent(prompt_chars=len(message)))
+            await client.query(message)
+
+            async for msg in client.receive_response():
+                for event in events_from_message(msg):
+                    if isinstance(event, TextEvent):
+                        text_parts.append(event.text)
+                    elif isinstance(event, SessionResultEvent) and event.is_error:
+                        error_result = event
+                    elif isinstance(event, UsageEvent) and context_monitor is not None:
+                        context_monitor.observe(event)
+                        if context_monitor.stop_due:
+                            # Asked to wrap up and still going: end it before the window overflows
+                            context_monitor.stopped = True
+                            print(f"\n[Context at {context_monitor.context_tokens:,} tokens - ending the session]")
+                            await client.interrupt()
+                    await pipeline.publish(event)
 
         print("\n" + "-" * 70 + "\n")
-        return "continue", response_text
+        if context_monitor is not None and context_monitor.stopped:
+            print("Session ended by the harness at the context limit")
+            return "continue", "".join(text_parts)
+        if error_result is not None:
+            message = error_result.result or error_result.subtype
+            print(f"Session ended with an error result: {message}")
+            return "error", message
+        return "continue", "".join(text_parts)
 
     except Exception as e:
         print(f"Error during agent session: {e}")
         return "error", str(e)
+    finally:
+        if context_monitor is not None:
+            register_context_monitor(project_dir, None)
+        # The persistent shell (if the agent used it) lives for one session
+        await close_persistent_shell(project_dir)
+
+
+async def wait_for_open_issues(
+    project_dir: Path,
+    poll_seconds: float,
+    sleep: Callable[[float], Awaitable[None]],
+    linear: Any = None,
+) -> None:
+    """Poll Linear with one delta query per interval until an issue is open again."""
+    print(f"\nNo Todo or In Progress issues left - polling Linear every {poll_seconds:.0f}s for new work...")
+    while True:
+        await sleep(poll_seconds)
+        await refresh_issue_cache(project_dir, linear)
+        if not is_backlog_complete(project_dir):
+            return
+
+
+async def run_client_session(
+    project_dir: Path,
+    model: str,
+    prompt: str,
+    label: str,
+    issue_id: Optional[str] = None,
+    mcp_pool: Optional["McpServerPool"] = None,
+    event_log: Optional[Path] = None,
+    client_factory: Callable[..., ClaudeSDKClient] = create_client,
+    context_monitor: Optional[ContextMonitor] = None,
+) -> tuple[str, str]:
+    """
+    Create a client (fresh context, but warm MCP servers if pooled) and run one session on it.
+
+    Startup failures are reported as an "error" status, so they are retried
+    like session errors.
+
+    Args:
+        label: Session label for telemetry and the journal
+        issue_id: Issue the session starts out holding
+    """
+    try:
+        if mcp_pool is not None:
+            await mcp_pool.ensure_healthy()
+            mcp_pool.begin_session()
+        client = client_factory(project_dir, model, mcp_pool)
+
+        async with client:
+            sinks = default_sinks(event_log) + [
+                TelemetrySink(project_dir, model, label),
+                SessionJournal(project_dir, label, issue_id),
+            ]
+            return await run_agent_session(client, prompt, project_dir, sinks, context_monitor)
+    except Exception as e:
+        print(f"Error starting agent session: {e}")
+        return "error", str(e)
+
+
+async def run_routed_session(
+    project_dir: Path,
+    model: str,
+    fast_model: str,
+    run_phase: Callable[[str, str, str, Optional[str]], Awaitable[tuple[str, str]]],
+    session_context: Optional[str] = None,
+    verification_targets: Optional[str] = None,
+    screenshots_governed: bool = False,
+) -> tuple[str, str]:
+    """
+    Run a coding session as orient / implement / bookkeeping phases (see model_router.py).
+
+    Args:
+        project_dir: Project directory
+        model: Model for the implementation phase
+        fast_model: Model for the orientation and bookkeeping phases
+        run_phase: Runs one phase as a session: (phase, model, prompt, issue_id) -> (status, response)
+        session_context: Precomputed context block
+        verification_targets: Features to re-test in STEP 4
+        screenshots_governed: Whether screenshots pass through the ScreenshotGovernor
+
+    Returns:
+        (status, response) of the last phase that ran; a phase that fails
+        ends the session
+    """
+    clear_handoff(project_dir)
+
+    print(f"\n[Phase: {ORIENT} on {fast_model}]\n")
+    status, response = await run_phase(ORIENT, fast_model, get_orient_prompt(session_context), None)
+    if status != "continue":
+        return status, response
+    orientation = take_handoff(project_dir, response)
+    if orientation.issue_id is None:
+        print("Orientation selected no issue - nothing to implement this session")
+        return status, response
+
+    print(f"\n[Phase: {IMPLEMENT} on {model}]\n")
+    prompt = get_implement_prompt(
+        orientation.issue_id, orientation.summary, session_context, verification_targets, screenshots_governed,
+    )
+    status, response = await run_phase(IMPLEMENT, model, prompt, orientation.issue_id)
+    if status != "continue":
+        return status, response
+    implementation = take_handoff(project_dir, response)
+    issue_id = implementation.issue_id or orientation.issue_id
+
+    print(f"\n[Phase: {BOOKKEEPING} on {fast_model}]\n")
+    prompt = get_bookkeeping_prompt(issue_id, implementation.summary, implementation.issue_done, session_context)
+    return await run_phase(BOOKKEEPING, fast_model, prompt, issue_id)
 
 
 async def run_autonomous_agent(
     project_dir: Path,
     model: str,
     max_iterations: Optional[int] = None,
+    mcp_pool: Optional["McpServerPool"] = None,
+    event_log: Optional[Path] = None,
+    client_factory: Callable[..., ClaudeSDKClient] = create_client,
+    supervisor: Optional[SessionSupervisor] = None,
+    idle_poll_seconds: Optional[float] = None,
+    context_window: int = DEFAULT_CONTEXT_WINDOW,
+    wrap_up_threshold: float = DEFAULT_WRAP_UP_THRESHOLD,
+    fast_model: Optional[str] = None,
+    linear: Any = None,
 ) -> None:
     """
     Run the autonomous agent loop.
@@ -106,12 +256,31 @@ async def run_autonomous_agent(
         project_dir: Directory for the project
         model: Claude model to use
         max_iterations: Maximum number of iterations (None for unlimited)
+        mcp_pool: Started MCP server pool shared by all sessions (None to
+            spawn fresh MCP servers per session)
+        event_log: JSONL file to append every session event to (None to disable)
+        client_factory: Creates the client for each session
+        supervisor: Backoff and circuit breaker state between sessions
+        idle_poll_seconds: When every issue is Done, poll Linear at this
+            interval for new work instead of stopping (None to stop)
+        context_window: Model context window in tokens
+        wrap_up_threshold: Share of the context window at which a session is
+            asked to wrap up and hand off
+        fast_model: Model for the orientation and Linear bookkeeping phases of
+            coding sessions (None to run whole sessions on `model`)
+        linear: Harness-side Linear client for the issue cache and the META
+            comment (defaults to one for LINEAR_API_KEY)
     """
+    if supervisor is None:
+        supervisor = SessionSupervisor()
+
     print("\n" + "=" * 70)
     print("  AUTONOMOUS CODING AGENT DEMO")
     print("=" * 70)
     print(f"\nProject directory: {project_dir}")
     print(f"Model: {model}")
+    if fast_model:
+        print(f"Fast model (orientation and Linear bookkeeping): {fast_model}")
     if max_iterations:
         print(f"Max iterations: {max_iterations}")
     else:
@@ -129,7 +298,7 @@ async def run_autonomous_agent(
         print("Fresh start - will use initializer agent")
         print()
         print("=" * 70)
-        print("  NOTE: First session takes 10-20+ minutes!")
+        print("  NOTE: First session takes several minutes!")
         print("  The agent is creating 50 Linear issues and setting up the project.")
         print("  This may appear to hang - it's working. Watch for [Tool: ...] output.")
         print("=" * 70)
@@ -140,50 +309,101 @@ async def run_autonomous_agent(
         print("Continuing existing project (Linear initialized)")
         print_progress_summary(project_dir)
 
-    # Main loop
-    iteration = 0
-
-    while True:
-        iteration += 1
+    # Dev servers from dev_servers.json stay up across sessions
+    dev_servers = get_dev_server_manager(project_dir)
 
-        # Check max iterations
-        if max_iterations and iteration > max_iterations:
-            print(f"\nReached max iterations ({max_iterations})")
-            print("To continue, run the script again without --max-iterations")
-            break
+    # Only the pooled Puppeteer proxy deduplicates and budgets screenshots
+    screenshots_governed = mcp_pool is not None and "puppeteer" in mcp_pool.server_names
 
-        # Print session header
-        print_session_header(iteration, is_first_run)
-
-        # Create client (fresh context)
-        client = create_client(project_dir, model)
-
-        # Choose prompt based on session type
-        if is_first_run:
-            prompt = get_initializer_prompt()
-            is_first_run = False  # Only use initializer once
-        else:
-            prompt = get_coding_prompt()
-
-        # Run session with async context manager
-        async with client:
-            status, response = await run_agent_session(client, prompt, project_dir)
-
-        # Handle status
-        if status == "continue":
-            print(f"\nAgent will auto-continue in {AUTO_CONTINUE_DELAY_SECONDS}s...")
-            print_progress_summary(project_dir)
-            await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
-
-        elif status == "error":
-            print("\nSession encountered an error")
-            print("Will retry with a fresh session...")
-            await asyncio.sleep(AUTO_CONTINUE_DELAY_SECONDS)
-
-        # Small delay between sessions
-        if max_iterations is None or iteration < max_iterations:
-            print("\nPreparing next session...\n")
-            await asyncio.sleep(1)
+    # Main loop; the dev servers' process groups are stopped however it ends
+    try:
+        iteration = 0
+
+        while True:
+            iteration += 1
+
+            # Check max iterations
+            if max_iterations and iteration > max_iterations:
+                print(f"\nReached max iterations ({max_iterations})")
+                print("To continue, run the script again without --max-iterations")
+                break
+
+            if not is_first_run:
+                # One delta query keeps the local issue cache current for the agent
+                # and for the completion check
+                await refresh_issue_cache(project_dir, linear)
+                if is_backlog_complete(project_dir):
+                    if idle_poll_seconds is None:
+                        print("\nAll issues are Done - nothing left in Todo or In Progress")
+                        break
+                    await wait_for_open_issues(project_dir, idle_poll_seconds, supervisor.sleep, linear)
+
+            # Print session header
+            print_session_header(iteration, is_first_run)
+
+            # Choose prompt based on session type
+            resume_issue_id = None
+            verification = None
+            routed = False
+            if is_first_run:
+                prompt = get_initializer_prompt()
+                session_label = "initializer"
+                is_first_run = False  # Only use initializer once
+            else:
+                await dev_servers.ensure_running()
+                session_context = await build_session_context(project_dir, linear)
+                interrupted = find_interrupted_session(project_dir)
+                if interrupted is not None:
+                    # Go straight back to the issue the last session was holding
+                    issue = get_issue_cache(project_dir).get(interrupted.issue_id) or {"id": interrupted.issue_id}
+                    resume_issue_id = issue["id"]
+                    print(f"Resuming {issue.get('identifier', resume_issue_id)} from the interrupted session")
+                    prompt = get_resume_prompt(
+                        issue, describe_interruption(interrupted), session_context, screenshots_governed,
+                    )
+                    session_label = "resume"
+                else:
+                    # Only re-test Done features that share code with recent commits
+                    verification = await plan_verification(project_dir)
+                    verification_targets = format_verification_targets(verification)
+                    prompt = get_coding_prompt(session_context, verification_targets, screenshots_governed)
+                    session_label = "coding"
+                    routed = fast_model is not None
+
+            def run_phase(label: str, phase_model: str, phase_prompt: str, issue_id: Optional[str]):
+                return run_client_session(
+                    project_dir, phase_model, phase_prompt, label, issue_id,
+                    mcp_pool, event_log, client_factory, ContextMonitor(context_window, wrap_up_threshold),
+                )
+
+            if routed:
+                # Routine orientation and Linear updates run on the fast model
+                status, response = await run_routed_session(
+                    project_dir, model, fast_model,
+                    lambda phase, *args: run_phase(f"{session_label}-{phase}", *args),
+                    session_context, verification_targets, screenshots_governed,
+                )
+            else:
+                status, response = await run_phase(session_label, model, prompt, resume_issue_id)
+
+            is_last = max_iterations is not None and iteration >= max_iterations
+
+            # Handle status
+            if status == "continue":
+                # Clean session: start the next one right away
+                supervisor.record_success()
+                if verification is not None:
+                    record_verification(project_dir, verification.head)
+                print_progress_summary(project_dir)
+            elif status == "error" and not is_last:
+                if await supervisor.wait_after_failure(response) is None:
+                    # Persistent failure (e.g. bad credentials): more sessions won't help
+                    break
+
+            if not is_last:
+                print("\nPreparing next session...\n")
+    finally:
+        await dev_servers.close()
 
     # Final summary
     print("\n" + "=" * 70)
@@ -10,6 +10,9 @@ incorporates all the strategies from the long-running agents guide.
 Example Usage:
     python autonomous_agent_demo.py --project-dir ./claude_clone_demo
     python autonomous_agent_demo.py --project-dir ./claude_clone_demo --max-iterations 5
+    python autonomous_agent_demo.py --project-dir ./claude_clone_demo --workers 4
+    python autonomous_agent_demo.py --project-dir ./claude_clone_demo --report
+    python autonomous_agent_demo.py --manifest projects.json
 """
 
 import argparse
@@ -18,6 +21,16 @@ import os
 from pathlib import Path
 
 from agent import run_autonomous_agent
+from client import create_client
+from context_monitor import DEFAULT_CONTEXT_WINDOW, DEFAULT_WRAP_UP_THRESHOLD
+from mcp_pool import McpServerPool
+from orchestrator import ManifestError, generation_dir, load_manifest, run_orchestrator
+from persistent_shell import configure_persistent_shell
+from replay import recording_client_factory
+from scheduler import run_parallel_agents
+from screenshots import ScreenshotGovernor
+from telemetry import format_report
+from tool_output import configure_output_limits, parse_output_limit
 
 
 # Configuration
@@ -39,12 +52,27 @@ Examples:
   # Use a specific model
   python autonomous_agent_demo.py --project-dir ./claude_clone --model claude-sonnet-4-5-20250929
 
+  # Orient and update Linear on a fast model, implement on the default model
+  python autonomous_agent_demo.py --project-dir ./claude_clone --fast-model claude-haiku-4-5-20251001
+
   # Limit iterations for testing
   python autonomous_agent_demo.py --project-dir ./claude_clone --max-iterations 5
 
   # Continue existing project
   python autonomous_agent_demo.py --project-dir ./claude_clone
 
+  # Work on 4 issues at once, each in its own git worktree
+  python autonomous_agent_demo.py --project-dir ./claude_clone --workers 4
+
+  # Show token, cost and tool latency telemetry for past sessions
+  python autonomous_agent_demo.py --project-dir ./claude_clone --report
+
+  # Record every session for offline replay (see replay.py, bench_harness.py)
+  python autonomous_agent_demo.py --project-dir ./claude_clone --record recordings/
+
+  # Run every project in a manifest from one process (see orchestrator.py)
+  python autonomous_agent_demo.py --manifest projects.json
+
 Environment Variables:
   CLAUDE_CODE_OAUTH_TOKEN    Claude Code OAuth token (required)
   LINEAR_API_KEY             Linear API key (required)
@@ -72,13 +100,145 @@ Environment Variables:
         help=f"Claude model to use (default: {DEFAULT_MODEL})",
     )
 
+    parser.add_argument(
+        "--fast-model",
+        type=str,
+        default=None,
+        help="Model for the orientation and Linear bookkeeping phases of coding sessions, e.g. "
+        "claude-haiku-4-5-20251001; --model then only runs the implementation phase (default: one model for everything)",
+    )
+
+    parser.add_argument(
+        "--event-log",
+        type=Path,
+        default=None,
+        help="Append every streamed session event (text, tool calls, results, usage) as JSON lines to this file",
+    )
+
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Record every session's message stream to DIR/session-NNNN.jsonl, for replay with bench_harness.py "
+        "(single-process runs only)",
+    )
+
+    parser.add_argument(
+        "--reuse-mcp-servers",
+        action="store_true",
+        help="Keep one warm Puppeteer/Linear MCP connection across sessions instead of spawning per session",
+    )
+
+    parser.add_argument(
+        "--screenshot-budget",
+        type=int,
+        default=None,
+        help="Screenshots passed to the agent per session; later ones are replaced with a note (implies --reuse-mcp-servers, default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--tool-output-limit",
+        action="append",
+        default=[],
+        metavar="TOOL=MAX_CHARS[:HEAD[:TAIL]]",
+        help="Cut Bash output / Read results larger than MAX_CHARS to HEAD (and TAIL) lines, e.g. Bash=20000:50:50 "
+        "or Read=off; repeat per tool (default: Bash=10000:40:60, Read=60000:600)",
+    )
+
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="Give the agent mcp__harness__shell: read-only commands run in one shell kept open per session, "
+        "skipping per-command shell and sandbox setup (runs outside the OS sandbox, so it refuses node, npm, "
+        "git, scripts and file writes)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of concurrent coding sessions, each in its own git worktree (default: 1)",
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="When every issue is Done, poll Linear every N seconds for new issues instead of exiting (default: exit)",
+    )
+
+    parser.add_argument(
+        "--context-window",
+        type=int,
+        default=DEFAULT_CONTEXT_WINDOW,
+        help=f"Model context window in tokens, for the context pressure monitor (default: {DEFAULT_CONTEXT_WINDOW})",
+    )
+
+    parser.add_argument(
+        "--wrap-up-at",
+        type=float,
+        default=DEFAULT_WRAP_UP_THRESHOLD,
+        help=f"Share of the context window at which the agent is told to wrap up and hand off (default: {DEFAULT_WRAP_UP_THRESHOLD})",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Run every project listed in this JSON manifest from one process, sharing session slots and MCP servers (see orchestrator.py)",
+    )
+
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Print the telemetry report (tokens, cost, session and tool latency) for the project and exit",
+    )
+
     return parser.parse_args()
 
 
+async def run_with_mcp_pool(
+    project_dir: Path,
+    model: str,
+    max_iterations: int | None,
+    event_log: Path | None,
+    idle_poll_seconds: float | None,
+    screenshot_budget: int | None = None,
+    context_window: int = DEFAULT_CONTEXT_WINDOW,
+    wrap_up_threshold: float = DEFAULT_WRAP_UP_THRESHOLD,
+    fast_model: str | None = None,
+    client_factory=create_client,
+) -> None:
+    """Run the agent loop with one MCP server pool that outlives every session."""
+    screenshots = ScreenshotGovernor(screenshot_budget)
+    async with McpServerPool(os.environ.get("LINEAR_API_KEY"), screenshots=screenshots) as mcp_pool:
+        await run_autonomous_agent(
+            project_dir=project_dir,
+            model=model,
+            max_iterations=max_iterations,
+            mcp_pool=mcp_pool,
+            event_log=event_log,
+            idle_poll_seconds=idle_poll_seconds,
+            context_window=context_window,
+            wrap_up_threshold=wrap_up_threshold,
+            fast_model=fast_model,
+            client_factory=client_factory,
+        )
+
+
 def main() -> None:
     """Main entry point."""
     args = parse_args()
 
+    # Automatically place projects in generations/ directory unless already specified
+    project_dir = generation_dir(args.project_dir)
+
+    # Reporting only reads local telemetry, so it needs no credentials
+    if args.report:
+        print(format_report(project_dir))
+        return
+
     # Check for Claude Code OAuth token
     if not os.environ.get("CLAUDE_CODE_OAUTH_TOKEN"):
         print("Error: CLAUDE_CODE_OAUTH_TOKEN environment variable not set")
@@ -95,29 +255,69 @@ def main() -> None:
         print("  export LINEAR_API_KEY='lin_api_xxxxxxxxxxxxx'")
         return
 
-    # Automatically place projects in generations/ directory unless already specified
-    project_dir = args.project_dir
-    if not str(project_dir).startswith("generations/"):
-        # Convert relative paths to be under generations/
-        if project_dir.is_absolute():
-            # If absolute path, use as-is
-            pass
-        else:
-            # Prepend generations/ to relative paths
-            project_dir = Path("generations") / project_dir
+    if not 0 < args.wrap_up_at <= 1:
+        print("Error: --wrap-up-at must be between 0 and 1")
+        return
+
+    try:
+        configure_output_limits(dict(parse_output_limit(spec) for spec in args.tool_output_limit))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    configure_persistent_shell(args.persistent_shell)
+
+    if args.record is not None and (args.manifest is not None or args.workers > 1):
+        print("Error: --record works with single-process runs only (not --workers or --manifest)")
+        return
+    client_factory = create_client if args.record is None else recording_client_factory(args.record, create_client)
 
     # Run the agent
     try:
-        asyncio.run(
-            run_autonomous_agent(
-                project_dir=project_dir,
-                model=args.model,
-                max_iterations=args.max_iterations,
+        if args.manifest is not None:
+            try:
+                manifest = load_manifest(args.manifest, args.model)
+            except ManifestError as e:
+                print(f"Error: {e}")
+                return
+            asyncio.run(run_orchestrator(manifest))
+        elif args.workers > 1:
+            asyncio.run(
+                run_parallel_agents(
+                    project_dir=project_dir,
+                    model=args.model,
+                    workers=args.workers,
+                    max_iterations=args.max_iterations,
+                    context_window=args.context_window,
+                    wrap_up_threshold=args.wrap_up_at,
+                )
+            )
+        elif args.reuse_mcp_servers or args.screenshot_budget is not None:
+            # Screenshot filtering happens in the pooled Puppeteer proxy
+            asyncio.run(
+                run_with_mcp_pool(
+                    project_dir, args.model, args.max_iterations, args.event_log, args.poll_interval,
+                    args.screenshot_budget, args.context_window, args.wrap_up_at, args.fast_model,
+                    client_factory,
+                )
+            )
+        else:
+            asyncio.run(
+                run_autonomous_agent(
+                    project_dir=project_dir,
+                    model=args.model,
+                    max_iterations=args.max_iterations,
+                    event_log=args.event_log,
+                    idle_poll_seconds=args.poll_interval,
+                    context_window=args.context_window,
+                    wrap_up_threshold=args.wrap_up_at,
+                    fast_model=args.fast_model,
+                    client_factory=client_factory,
+                )
             )
-        )
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
-        print("To resume, run the same command again")
+        print("To resume, run the same command again (the interrupted issue is picked up from the session journal)")
     except Exception as e:
         print(f"\nFatal error: {e}")
         raise
@@ -0,0 +1,178 @@
+"""
+Session Backoff and Circuit Breaker
+===================================
+
+Decides how long the agent loop waits before starting the next session.
+
+Clean sessions continue immediately. Failed sessions are classified
+(rate limit, transport, auth, agent fault) and retried with jittered
+exponential backoff per class. Auth failures don't fix themselves, so the
+loop gives up after a few of them in a row. A run of consecutive failures
+trips a circuit breaker that pauses the loop, so an API or Linear outage
+doesn't burn sessions and startup cost in a tight loop.
+"""
+
+import asyncio
+import random
+import re
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+
+# Error classes
+RATE_LIMIT = "rate_limit"
+TRANSPORT = "transport"
+AUTH = "auth"
+AGENT_FAULT = "agent"
+
+# Checked in order; anything unmatched is an agent fault
+ERROR_PATTERNS = [
+    (RATE_LIMIT, re.compile(r"rate.?limit|usage limit|too many requests|overloaded|\b429\b|\b529\b", re.IGNORECASE)),
+    (AUTH, re.compile(r"unauthori[sz]ed|authenticat|forbidden|invalid.*(key|token)|oauth|\b401\b|\b403\b", re.IGNORECASE)),
+    (
+        TRANSPORT,
+        re.compile(
+            r"connect|timed? ?out|network|socket|broken pipe|reset by peer|ECONN|EPIPE"
+            r"|\b50[234]\b|decode json",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+# Circuit breaker: consecutive failures before pausing, and the pause length
+# (doubled each time the breaker re-opens, up to the max)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 300.0
+CIRCUIT_MAX_COOLDOWN_SECONDS = 3600.0
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """
+    Exponential backoff: base * 2^(attempt-1), capped, with equal jitter.
+
+    max_attempts, if set, is the number of consecutive failures of the class
+    after which the loop stops retrying.
+    """
+
+    base: float
+    cap: float
+    max_attempts: Optional[int] = None
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        ceiling = min(self.cap, self.base * 2 ** (attempt - 1))
+        return rng.uniform(ceiling / 2, ceiling)
+
+
+BACKOFF_POLICIES = {
+    RATE_LIMIT: BackoffPolicy(base=30.0, cap=900.0),
+    TRANSPORT: BackoffPolicy(base=5.0, cap=300.0),
+    # A bad key or token stays bad: retry in case it was a blip, then stop
+    AUTH: BackoffPolicy(base=60.0, cap=1800.0, max_attempts=3),
+    AGENT_FAULT: BackoffPolicy(base=3.0, cap=60.0),
+}
+
+
+def classify_error(message: str) -> str:
+    """Classify a session error message into one of the error classes."""
+    for error_class, pattern in ERROR_PATTERNS:
+        if pattern.search(message):
+            return error_class
+    return AGENT_FAULT
+
+
+class SessionSupervisor:
+    """
+    Tracks session outcomes and waits the right amount between sessions.
+
+    Args:
+        policies: Backoff policy per error class
+        failure_threshold: Consecutive failures that open the circuit breaker
+        cooldown: Initial pause while the breaker is open (seconds)
+        max_cooldown: Longest pause while the breaker is open (seconds)
+        sleep: Async sleep function (injectable for tests)
+        rng: Random source for jitter (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        policies: Optional[dict[str, BackoffPolicy]] = None,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+        max_cooldown: float = CIRCUIT_MAX_COOLDOWN_SECONDS,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self.policies = policies or BACKOFF_POLICIES
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+        self.attempts: dict[str, int] = {}
+        self.consecutive_failures = 0
+        self.times_opened = 0
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.consecutive_failures >= self.failure_threshold
+
+    def gave_up(self, error_class: str) -> bool:
+        """True once a class has used up its policy's max_attempts."""
+        max_attempts = self.policies[error_class].max_attempts
+        return max_attempts is not None and self.attempts.get(error_class, 0) >= max_attempts
+
+    def record_success(self) -> None:
+        """A clean session resets all backoff state and closes the breaker."""
+        self.attempts.clear()
+        self.consecutive_failures = 0
+        self.times_opened = 0
+
+    def record_failure(self, message: str) -> tuple[str, float]:
+        """
+        Record a failed session.
+
+        Returns:
+            (error_class, delay_seconds) before the next session should start
+        """
+        error_class = classify_error(message)
+        self.attempts[error_class] = self.attempts.get(error_class, 0) + 1
+        self.consecutive_failures += 1
+
+        delay = self.policies[error_class].delay(self.attempts[error_class], self.rng)
+        if self.circuit_open:
+            # Every failure while open (including the half-open trial session)
+            # re-opens the breaker with a longer pause
+            pause = min(self.max_cooldown, self.cooldown * 2**self.times_opened)
+            self.times_opened += 1
+            delay = max(delay, pause)
+        return error_class, delay
+
+    async def wait_after_failure(self, message: str) -> Optional[float]:
+        """
+        Record a failed session, report it, and sleep until the next attempt.
+
+        Returns:
+            The delay slept, or None if the error class has used up its
+            attempts and the loop should stop
+        """
+        error_class, delay = self.record_failure(message)
+        if self.gave_up(error_class):
+            print(
+                f"\nSession failed ({error_class}) {self.attempts[error_class]} times in a row "
+                f"- stopping. Last error: {message}"
+            )
+            return None
+        if self.circuit_open:
+            print(
+                f"\nCircuit breaker open after {self.consecutive_failures} consecutive failures "
+                f"(last: {error_class}) - pausing {delay:.0f}s before a trial session..."
+            )
+        else:
+            print(
+                f"\nSession failed ({error_class}, attempt {self.attempts[error_class]}) "
+                f"- retrying with a fresh session in {delay:.0f}s..."
+            )
+        await self.sleep(delay)
+        return delay
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Harness Overhead Benchmark
+==========================
+
+Runs the real agent loop (run_autonomous_agent) offline. Sessions are
+replayed from recordings (see replay.py) against an in-memory Linear (see
+fake_linear.py), so scheduling, hooks, event output and state I/O run at
+full speed with no Claude or Linear calls, and the time measured is the
+harness's own overhead.
+
+Without --recordings, every session replays a synthetic coding session:
+claim the next issue, look around with a few Bash commands, mark the issue
+Done and comment on the META issue. The backlog holds one issue per session,
+so the loop stops on its own once every issue is Done.
+
+Run with:
+    python bench_harness.py                          # 200 synthetic sessions
+    python bench_harness.py --sessions 5000
+    python bench_harness.py --recordings recordings/ # replay --record output
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from claude_code_sdk import AssistantMessage, ResultMessage, SystemMessage, TextBlock, ToolResultBlock, ToolUseBlock, UserMessage
+from claude_code_sdk.types import StreamEvent
+
+from agent import run_autonomous_agent
+from fake_linear import FakeLinear
+from linear_config import STATUS_DONE, STATUS_IN_PROGRESS
+from replay import RECORDING_PATTERN, Recording, ReplayClient, load_recording, replay_client_factory
+
+
+DEFAULT_SESSIONS = 200
+
+# Commands a coding session typically runs between claiming and closing an issue
+SYNTHETIC_COMMANDS = [
+    "git status",
+    "ls -la src",
+    "cat package.json",
+    "git diff --stat",
+    "npm run build",
+    "git add . && git commit -m 'Implement feature'",
+    "git log --oneline -5",
+]
+
+
+def synthetic_recording(issue: dict, meta_issue_id: str, model: str = "replay") -> Recording:
+    """A recorded coding session that claims, completes and reports one issue."""
+    messages: list[Any] = [SystemMessage(subtype="init", data={"model": model})]
+    calls = [("mcp__linear__update_issue", {"id": issue["id"], "state": STATUS_IN_PROGRESS})]
+    calls += [("Bash", {"command": command}) for command in SYNTHETIC_COMMANDS]
+    calls += [
+        ("mcp__linear__update_issue", {"id": issue["id"], "state": STATUS_DONE}),
+        ("mcp__linear__create_comment", {"issueId": meta_issue_id, "body": f"Completed {issue['identifier']}"}),
+    ]
+    for n, (name, tool_input) in enumerate(calls):
+        tool_use_id = f"toolu_{issue['id']}_{n}"
+        usage = {"input_tokens": 1_000, "cache_read_input_tokens": 20_000 + 2_000 * n,
+                 "cache_creation_input_tokens": 500, "output_tokens": 200}
+        messages += [
+            StreamEvent(uuid=f"{tool_use_id}_start", session_id="replay",
+                        event={"type": "message_start", "message": {"usage": usage}}),
+            AssistantMessage(
+                content=[TextBlock(text=f"Step {n + 1} for {issue['identifier']}."),
+                         ToolUseBlock(id=tool_use_id, name=name, input=tool_input)],
+                model=model,
+            ),
+            UserMessage(content=[ToolResultBlock(tool_use_id=tool_use_id, content="ok", is_error=False)]),
+        ]
+    messages += [
+        AssistantMessage(content=[TextBlock(text=f"{issue['identifier']} is done.")], model=model),
+        ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False, num_turns=len(calls),
+            session_id="replay", total_cost_usd=0.0, usage={"input_tokens": 1_000, "output_tokens": 200},
+        ),
+    ]
+    return Recording(prompt="", messages=messages)
+
+
+@dataclass
+class SimulationResult:
+    sessions: int = 0
+    wall_seconds: float = 0.0
+    session_seconds: list[float] = field(default_factory=list)
+    issues_done: int = 0
+
+
+class TimedReplayClient:
+    """Measures the time between a session's client opening and closing."""
+
+    def __init__(self, client: ReplayClient, result: SimulationResult):
+        self.client = client
+        self.result = result
+        self.started = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def __aenter__(self):
+        self.started = time.perf_counter()
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.client.__aexit__(*args)
+        self.result.session_seconds.append(time.perf_counter() - self.started)
+        self.result.sessions += 1
+        return False
+
+
+async def run_simulation(
+    project_dir: Path,
+    sessions: int,
+    recordings: Optional[list[Recording]] = None,
+) -> SimulationResult:
+    """
+    Run the agent loop for `sessions` replayed sessions in project_dir.
+
+    Args:
+        project_dir: Empty directory to run the simulated project in
+        sessions: Sessions to run
+        recordings: Sessions to replay in turn (None for synthetic sessions)
+    """
+    linear = FakeLinear()
+    linear.seed_backlog(sessions)
+    linear.write_project_marker(project_dir)
+    if recordings is None:
+        features = [issue for issue in linear.issues.values() if issue["id"] != linear.meta_issue_id]
+        # The agent picks the highest-priority Todo issue first
+        features.sort(key=lambda issue: (issue["priority"], int(issue["id"].split("-")[-1])))
+        recordings = [synthetic_recording(issue, linear.meta_issue_id) for issue in features]
+
+    result = SimulationResult()
+    replay = replay_client_factory(recordings, tools=linear.create_tools())
+    started = time.perf_counter()
+    await run_autonomous_agent(
+        project_dir,
+        "replay",
+        max_iterations=sessions,
+        client_factory=lambda *args: TimedReplayClient(replay(*args), result),
+        linear=linear,
+    )
+    result.wall_seconds = time.perf_counter() - started
+    result.issues_done = sum(1 for issue in linear.issues.values() if issue["state"]["name"] == STATUS_DONE)
+    return result
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_results(result: SimulationResult) -> None:
+    per_session = result.wall_seconds / max(result.sessions, 1)
+    in_sessions = sum(result.session_seconds)
+    print(f"\n  Sessions:                {result.sessions} ({result.issues_done} issues Done)")
+    print(f"  Wall time:               {result.wall_seconds:.2f} s ({result.sessions / result.wall_seconds:.1f} sessions/s)")
+    print(f"  Per session:             {per_session * 1000:.2f} ms")
+    if result.session_seconds:
+        print(f"  Inside a session:        p50 {percentile(result.session_seconds, 50) * 1000:.2f} ms, "
+              f"p99 {percentile(result.session_seconds, 99) * 1000:.2f} ms")
+    between = (result.wall_seconds - in_sessions) / max(result.sessions, 1)
+    print(f"  Between sessions:        {between * 1000:.2f} ms (cache refresh, session context, verification plan)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark harness overhead with replayed sessions")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="Sessions to run")
+    parser.add_argument("--recordings", type=Path, help=f"Directory of recorded sessions ({RECORDING_PATTERN}) to replay")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent loop's console output")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    recordings = None
+    if args.recordings is not None:
+        recordings = [load_recording(path) for path in sorted(args.recordings.glob(RECORDING_PATTERN))]
+        if not recordings:
+            print(f"No recordings ({RECORDING_PATTERN}) in {args.recordings}")
+            return 1
+
+    print("=" * 70)
+    print("  HARNESS OVERHEAD BENCHMARK")
+    print("=" * 70)
+    print(f"\n  Replaying {'%d recorded' % len(recordings) if recordings else 'synthetic'} sessions offline")
+
+    # No live Linear: the fake serves the harness-side queries too
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        with output:
+            result = asyncio.run(run_simulation(Path(tmp), args.sessions, recordings))
+
+    print_results(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Security Hook Benchmarks
+========================
+
+Replays a large corpus of realistic agent commands plus pathological inputs
+through extract_commands, split_command_segments and bash_security_hook,
+reports p50/p99 latency and per-call allocations, and fails when results
+regress against the stored baseline.
+
+The gate compares medians, not p99s, since a p99 over a few repeats is one
+unlucky scheduling hiccup. Timings are also divided by a fixed calibration
+workload timed in the same run, so a slower or busier machine doesn't read
+as a regression. Allocations are deterministic and are gated at p99.
+
+Run with:
+    python bench_security.py                      # compare against baseline
+    python bench_security.py --update-baseline    # record a new baseline
+    python bench_security.py --corpus commands.txt  # replay recorded commands
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from security import bash_security_hook, evaluate_command, extract_commands, parse_command, split_command_segments
+
+
+BASELINE_FILE = Path(__file__).parent / "bench_security_baseline.json"
+
+# Default corpus size and allowed slowdown before a metric counts as a regression
+DEFAULT_CORPUS_SIZE = 5000
+DEFAULT_TOLERANCE = 0.5
+
+# Timed calls per pathological input
+PATHOLOGICAL_REPEATS = 20
+# Timed rounds of the calibration workload
+CALIBRATION_ROUNDS = 200
+
+# Commands agents issue all the time; {placeholders} are filled per command
+REALISTIC_TEMPLATES = [
+    "git status",
+    "git log --oneline -20",
+    "git diff --stat",
+    "git add . && git commit -m '{message}'",
+    'git commit -m "Implement {feature}\n\n- Added {file}\n- Tested with browser automation"',
+    "npm install",
+    "npm install {package}",
+    "npm run dev",
+    "npm run build 2>&1 | tail -{n}",
+    "cd frontend && npm run build",
+    "ls -la",
+    "ls -la src/{dir}",
+    "cat package.json",
+    "cat src/{dir}/{file}",
+    "head -{n} src/{dir}/{file}",
+    "tail -{n} server.log",
+    "grep -rn '{symbol}' src/ | head -{n}",
+    "wc -l src/{dir}/{file}",
+    "mkdir -p src/{dir}/{feature}",
+    "cp src/{dir}/{file} src/{dir}/{feature}.bak",
+    "node server/{file}",
+    "pkill -f 'node server.js'",
+    "pkill vite; sleep 2 && npm run dev &",
+    "chmod +x init.sh && ./init.sh",
+    "./init.sh > init.log 2>&1 &",
+    "lsof -i :{port} | grep LISTEN",
+    "ps aux | grep node",
+    "sleep {n}",
+    "pwd",
+    # Blocked commands agents try regularly
+    "curl http://localhost:{port}/api/{feature}",
+    "rm -rf node_modules && npm install",
+    "python3 -m http.server {port}",
+    "echo '{message}' > notes.txt",
+    "kill -9 {n}",
+    'git status <<< "x"\nrm -rf /',
+    "ls $((1<<2))\nrm -rf /",
+]
+
+FILL_VALUES = {
+    "message": ["Fix sidebar layout", "Add chat persistence", "Wire up auth; add tests", "WIP && more"],
+    "feature": ["sidebar", "chat", "auth", "settings", "artifacts", "search"],
+    "file": ["index.js", "App.jsx", "api.ts", "routes.js", "Sidebar.tsx", "db.js"],
+    "dir": ["components", "pages", "hooks", "lib", "server", "styles"],
+    "package": ["react-markdown", "zustand", "express", "better-sqlite3"],
+    "symbol": ["useState", "fetchMessages", "TODO", "className="],
+    "port": ["3000", "5173", "8080"],
+    "n": ["5", "20", "50", "100"],
+}
+
+
+def build_realistic_corpus(size: int, seed: int = 1234) -> list[str]:
+    """Generate a deterministic corpus with agent-like repetition."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(REALISTIC_TEMPLATES)
+        values = {key: rng.choice(options) for key, options in FILL_VALUES.items()}
+        corpus.append(template.format(**values))
+    return corpus
+
+
+def build_pathological_corpus() -> dict[str, str]:
+    """Inputs that stress the tokenizer: long chains, heredocs, long quotes."""
+    return {
+        "chain_1000_and": " && ".join(["git status"] * 1000),
+        "chain_1000_mixed": " ; ".join(f"ls dir{n} | grep x || pwd" for n in range(1000)),
+        "heredoc_5000_lines": "cat <<'EOF' > notes.md\n" + "\n".join(f"line {n} of notes" for n in range(5000)) + "\nEOF",
+        "quoted_100kb": "git commit -m '" + ("x" * 100_000) + "'",
+        "quoted_100kb_separators": 'git commit -m "' + ("a && b; c | d " * 7000) + '"',
+        "escapes_10k": "ls " + ("\\; " * 10_000),
+        "unclosed_quote_100kb": "cat '" + ("y" * 100_000),
+    }
+
+
+def calibration_workload() -> int:
+    """Fixed pure-Python work (a character scan, like the tokenizer's) timed alongside the benchmarks."""
+    text = "git add . && git commit -m 'Fix sidebar; add tests' | tail -20\n" * 20
+    separators = 0
+    for ch in text:
+        if ch in ";&|\n":
+            separators += 1
+    return separators
+
+
+def run_hook(command: str) -> dict:
+    """
+    Run bash_security_hook synchronously.
+
+    The hook never awaits, so driving the coroutine directly measures the
+    hook itself rather than event loop overhead.
+    """
+    coro = bash_security_hook({"tool_name": "Bash", "tool_input": {"command": command}})
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("bash_security_hook awaited unexpectedly")
+
+
+def clear_caches() -> None:
+    parse_command.cache_clear()
+    evaluate_command.cache_clear()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_calls(fn: Callable[[str], object], commands: list[str], cold: bool) -> list[float]:
+    """Time each call in microseconds (caches cleared before each call if cold)."""
+    samples = []
+    for command in commands:
+        if cold:
+            clear_caches()
+        start = time.perf_counter_ns()
+        fn(command)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    return samples
+
+
+def measure_allocations(fn: Callable[[str], object], commands: list[str]) -> list[int]:
+    """Peak bytes allocated per (cold) call."""
+    samples = []
+    tracemalloc.start()
+    try:
+        for command in commands:
+            clear_caches()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            fn(command)
+            _, peak = tracemalloc.get_traced_memory()
+            samples.append(max(0, peak - baseline))
+    finally:
+        tracemalloc.stop()
+    return samples
+
+
+def summarize(latencies: list[float], allocations: list[int] | None = None) -> dict:
+    summary = {
+        "p50_us": round(percentile(latencies, 50), 2),
+        "p99_us": round(percentile(latencies, 99), 2),
+    }
+    if allocations:
+        summary["alloc_p50_bytes"] = percentile(allocations, 50)
+        summary["alloc_p99_bytes"] = percentile(allocations, 99)
+    return summary
+
+
+def run_benchmarks(corpus: list[str], alloc_sample: int) -> dict[str, dict]:
+    """Run every benchmark and return {name: metrics}."""
+    functions = {
+        "extract_commands": extract_commands,
+        "split_command_segments": split_command_segments,
+        "bash_security_hook": run_hook,
+    }
+    sample = corpus[:alloc_sample]
+    results = {}
+
+    time_calls(lambda _: calibration_workload(), [""] * 20, cold=False)
+    results["calibration"] = summarize(time_calls(lambda _: calibration_workload(), [""] * CALIBRATION_ROUNDS, cold=False))
+
+    for name, fn in functions.items():
+        # Warm up the interpreter before timing
+        time_calls(fn, corpus[:200], cold=True)
+        results[f"{name}/cold"] = summarize(
+            time_calls(fn, corpus, cold=True),
+            measure_allocations(fn, sample),
+        )
+
+    clear_caches()
+    time_calls(run_hook, corpus, cold=False)
+    results["bash_security_hook/warm"] = summarize(time_calls(run_hook, corpus, cold=False))
+
+    for case, command in build_pathological_corpus().items():
+        repeats = [command] * PATHOLOGICAL_REPEATS
+        results[f"bash_security_hook/{case}"] = summarize(
+            time_calls(run_hook, repeats, cold=True),
+            measure_allocations(run_hook, repeats[:3]),
+        )
+
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """
+    Return a description of every metric that regressed beyond tolerance.
+
+    Median latencies are scaled by this run's calibration time relative to
+    the baseline's, and p99 allocations are compared as they are.
+    """
+    scale = 1.0
+    if "calibration" in baseline and "calibration" in results:
+        scale = results["calibration"]["p50_us"] / baseline["calibration"]["p50_us"]
+
+    regressions = []
+    for name, metrics in results.items():
+        if name == "calibration":
+            continue
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected is None or metric not in ("p50_us", "alloc_p99_bytes"):
+                continue
+            if metric == "p50_us":
+                expected = round(expected * scale, 2)
+            # Small absolute floors keep sub-microsecond noise from failing the run
+            floor = 5.0 if metric.endswith("_us") else 1024
+            if value > max(expected * (1 + tolerance), expected + floor):
+                regressions.append(f"{name} {metric}: {value} (baseline {expected} at this machine's speed)")
+    return regressions
+
+
+def print_results(results: dict[str, dict], baseline: dict[str, dict]) -> None:
+    print(f"\n  {'benchmark':<52}{'p50 us':>10}{'p99 us':>11}{'alloc p99':>12}{'base p50':>11}")
+    print("  " + "-" * 94)
+    for name, metrics in results.items():
+        alloc = metrics.get("alloc_p99_bytes", "")
+        base = baseline.get(name, {}).get("p50_us", "")
+        print(f"  {name:<52}{metrics['p50_us']:>10}{metrics['p99_us']:>11}{alloc:>12}{base:>11}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the bash security hook")
+    parser.add_argument("--corpus", type=Path, help="File of recorded commands (one JSON string or plain command per line)")
+    parser.add_argument("--size", type=int, default=DEFAULT_CORPUS_SIZE, help="Generated corpus size")
+    parser.add_argument("--alloc-sample", type=int, default=500, help="Commands sampled for allocation tracking")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed median slowdown (0.5 = 50%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    return parser.parse_args()
+
+
+def load_corpus(path: Path) -> list[str]:
+    commands = []
+    for line in path.read_text().splitlines():
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            value = line
+        if isinstance(value, dict):
+            value = value.get("command", "")
+        if isinstance(value, str) and value:
+            commands.append(value)
+    return commands
+
+
+def main() -> int:
+    args = parse_args()
+
+    print("=" * 70)
+    print("  SECURITY HOOK BENCHMARKS")
+    print("=" * 70)
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_realistic_corpus(args.size)
+    print(f"\n  Corpus: {len(corpus)} commands ({len(set(corpus))} distinct)")
+
+    results = run_benchmarks(corpus, args.alloc_sample)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n  Baseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\n  No baseline found - run with --update-baseline to record one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    print("\n" + "-" * 70)
+    if regressions:
+        print(f"  {len(regressions)} REGRESSION(S):")
+        for regression in regressions:
+            print(f"    {regression}")
+        return 1
+
+    print("  NO REGRESSIONS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Bulk Issue Creation
+===================
+
+Harness-side path for the initializer session's issue creation.
+
+Instead of fifty sequential mcp__linear__create_issue calls (one model turn
+each), the agent passes the whole issue list to the in-process
+create_issues_bulk tool. The harness submits it to Linear in concurrent
+batches, backs off when Linear reports the rate limit, and records the
+created issue IDs in .linear_project.json.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+from linear_client import LinearAPIError, LinearClient, LinearRateLimitError
+from linear_config import LINEAR_PROJECT_MARKER
+from state_store import state_file
+
+
+# Issues per GraphQL request, and requests in flight at once
+BULK_BATCH_SIZE = 10
+BULK_CONCURRENCY = 3
+
+# Stop issuing requests when the remaining budget drops to this reserve
+# (leaves room for the agent's own Linear MCP calls)
+RATE_LIMIT_RESERVE = 10
+
+# Longest the tool waits for a rate limit to reset before giving up on a batch
+MAX_RATE_LIMIT_WAIT_SECONDS = 60.0
+MAX_BATCH_ATTEMPTS = 4
+
+
+def validate_issue_specs(issues: Any) -> tuple[list[dict[str, Any]], list[tuple[Any, str]]]:
+    """
+    Split the agent-provided issue list into valid specs and rejects.
+
+    Returns:
+        (valid, rejected) where rejected is a list of (spec, reason)
+    """
+    if not isinstance(issues, list):
+        return [], [(issues, "issues must be an array")]
+
+    valid: list[dict[str, Any]] = []
+    rejected: list[tuple[Any, str]] = []
+    for spec in issues:
+        if not isinstance(spec, dict) or not isinstance(spec.get("title"), str) or not spec["title"].strip():
+            rejected.append((spec, "missing title"))
+            continue
+        priority = spec.get("priority", 0)
+        if not isinstance(priority, int) or not 0 <= priority <= 4:
+            rejected.append((spec, f"invalid priority {priority!r} (expected 0-4)"))
+            continue
+        description = spec.get("description", "")
+        valid.append({"title": spec["title"].strip(), "description": str(description or ""), "priority": priority})
+    return valid, rejected
+
+
+async def _wait_for_budget(linear: LinearClient) -> None:
+    """Pause while the request budget is down to the reserve."""
+    if linear.requests_remaining is None or linear.requests_remaining > RATE_LIMIT_RESERVE:
+        return
+    delay = linear.seconds_until_reset()
+    if delay is None or delay > MAX_RATE_LIMIT_WAIT_SECONDS:
+        raise LinearRateLimitError("Linear request budget exhausted", linear.requests_reset_at)
+    if delay > 0:
+        print(f"Linear request budget low ({linear.requests_remaining} left) - waiting {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+
+async def create_issues_in_batches(
+    linear: LinearClient,
+    team_id: str,
+    project_id: str,
+    issues: list[dict[str, Any]],
+    batch_size: int = BULK_BATCH_SIZE,
+    concurrency: int = BULK_CONCURRENCY,
+) -> tuple[list[dict[str, Any]], list[tuple[dict[str, Any], str]]]:
+    """
+    Create issues in concurrent batches.
+
+    Batches rejected for rate limiting are retried after the reset time
+    Linear reports (or exponential backoff if it doesn't say).
+
+    Returns:
+        (created, failed): created issues in input order, and (spec, reason)
+        for every issue that was not created
+    """
+    batches = [issues[start : start + batch_size] for start in range(0, len(issues), batch_size)]
+    results: list[Optional[list[Optional[dict[str, Any]]]]] = [None] * len(batches)
+    errors: list[str] = [""] * len(batches)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def submit(index: int) -> None:
+        async with semaphore:
+            for attempt in range(1, MAX_BATCH_ATTEMPTS + 1):
+                try:
+                    await _wait_for_budget(linear)
+                    results[index] = await linear.create_issues(team_id, project_id, batches[index])
+                    return
+                except LinearRateLimitError as e:
+                    delay = linear.seconds_until_reset()
+                    if delay is None:
+                        delay = float(2**attempt)
+                    if attempt == MAX_BATCH_ATTEMPTS or delay > MAX_RATE_LIMIT_WAIT_SECONDS:
+                        errors[index] = str(e)
+                        return
+                    print(f"Linear rate limit hit (batch {index + 1}/{len(batches)}) - retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                except LinearAPIError as e:
+                    errors[index] = str(e)
+                    return
+
+    await asyncio.gather(*(submit(index) for index in range(len(batches))))
+
+    created: list[dict[str, Any]] = []
+    failed: list[tuple[dict[str, Any], str]] = []
+    for batch, batch_results, error in zip(batches, results, errors):
+        for spec, issue in zip(batch, batch_results or [None] * len(batch)):
+            if issue is not None:
+                created.append(issue)
+            else:
+                failed.append((spec, error or "Linear did not create the issue"))
+    return created, failed
+
+
+async def record_created_issues(project_dir: Path, team_id: str, project_id: str, created: list[dict[str, Any]]) -> None:
+    """Merge the team, project and created issue IDs into .linear_project.json."""
+
+    def merge(state: Any) -> dict[str, Any]:
+        state = state if isinstance(state, dict) else {}
+        issue_ids = dict(state.get("issue_ids") or {})
+        issue_ids.update({issue.get("identifier") or issue["id"]: issue["id"] for issue in created})
+        state.update(
+            {
+                "team_id": team_id,
+                "project_id": project_id,
+                "issue_ids": issue_ids,
+                "total_issues": len(issue_ids),
+            }
+        )
+        return state
+
+    await state_file(project_dir / LINEAR_PROJECT_MARKER).update_async(merge)
+
+
+async def bulk_create_issues(
+    project_dir: Path,
+    linear: LinearClient,
+    team_id: str,
+    project_id: str,
+    issues: Any,
+) -> str:
+    """Validate, create and record an issue list; returns the report for the agent."""
+    valid, rejected = validate_issue_specs(issues)
+    created, failed = await create_issues_in_batches(linear, team_id, project_id, valid)
+    if created:
+        await record_created_issues(project_dir, team_id, project_id, created)
+
+    lines = [f"Created {len(created)} of {len(valid) + len(rejected)} issues."]
+    if created:
+        lines.append(f"IDs saved to {LINEAR_PROJECT_MARKER} (team_id, project_id, issue_ids, total_issues).")
+        lines.extend(f"- {issue.get('identifier', issue['id'])} {issue.get('title', '')}" for issue in created)
+
+    not_created = rejected + failed
+    if not_created:
+        lines.append("")
+        lines.append("NOT created (fix and retry these, or create them with mcp__linear__create_issue):")
+        for spec, reason in not_created:
+            title = spec.get("title") if isinstance(spec, dict) else spec
+            lines.append(f"- {title!r}: {reason}")
+    return "\n".join(lines)
+
+
+def create_bulk_issue_tools(project_dir: Path, linear: Optional[LinearClient] = None) -> list[SdkMcpTool]:
+    """
+    Build the in-process MCP tool for bulk issue creation.
+
+    Args:
+        project_dir: Project directory holding .linear_project.json
+        linear: Linear client (defaults to one built from LINEAR_API_KEY)
+    """
+
+    @tool(
+        "create_issues_bulk",
+        "Create many Linear issues in one call. Pass the complete list of issues; the harness "
+        "creates them in concurrent batches and saves the team ID, project ID and issue IDs "
+        "to .linear_project.json. Much faster than calling mcp__linear__create_issue per issue.",
+        {
+            "type": "object",
+            "properties": {
+                "team_id": {"type": "string", "description": "Linear team ID"},
+                "project_id": {"type": "string", "description": "Linear project ID"},
+                "issues": {
+                    "type": "array",
+                    "description": "Issues to create",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "description": {"type": "string", "description": "Markdown description"},
+                            "priority": {"type": "integer", "description": "0-4 (1=urgent, 4=low)"},
+                        },
+                        "required": ["title"],
+                    },
+                },
+            },
+            "required": ["team_id", "project_id", "issues"],
+        },
+    )
+    async def create_issues_bulk(args):
+        client = linear
+        if client is None:
+            api_key = os.environ.get("LINEAR_API_KEY")
+            if not api_key:
+                return {"content": [{"type": "text", "text": "LINEAR_API_KEY is not set - use mcp__linear__create_issue"}]}
+            client = LinearClient(api_key)
+
+        text = await bulk_create_issues(
+            project_dir, client, str(args.get("team_id", "")), str(args.get("project_id", "")), args.get("issues")
+        )
+        return {"content": [{"type": "text", "text": text}]}
+
+    return [create_issues_bulk]
@@ -5,14 +5,28 @@ Claude SDK Client Configuration
 Functions for creating and configuring the Claude Agent SDK client.
 """
 
-import json
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient
+from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient, create_sdk_mcp_server
 from claude_code_sdk.types import HookMatcher
 
+from bulk_issues import create_bulk_issue_tools
+from context_monitor import context_pressure_hook
+from devservers import create_dev_server_tools
+from issue_cache import WRITE_THROUGH_TOOL, create_issue_cache_tools, issue_cache_write_through_hook
+from model_router import create_handoff_tools
+from npm_cache import npm_install_record_hook, npm_install_skip_hook
+from persistent_shell import create_shell_tools, persistent_shell_enabled
+from repo_index import create_repo_tools, repo_index_change_hook
 from security import bash_security_hook
+from spec_index import create_spec_tools
+from state_store import state_file
+from tool_output import tool_output_governor_hook, tool_output_note_hook
+
+if TYPE_CHECKING:
+    from mcp_pool import McpServerPool
 
 
 # Puppeteer MCP tools for browser automation
@@ -54,6 +68,31 @@ LINEAR_TOOLS = [
     "mcp__linear__get_user",
 ]
 
+# Harness MCP tools (in-process, served by the harness itself)
+HARNESS_TOOLS = [
+    # Local Linear issue cache (see issue_cache.py)
+    "mcp__harness__issue_summary",
+    "mcp__harness__list_cached_issues",
+    # Batched issue creation for the initializer (see bulk_issues.py)
+    "mcp__harness__create_issues_bulk",
+    # Section lookup in app_spec.txt (see spec_index.py)
+    "mcp__harness__spec_lookup",
+    # Harness-managed dev servers (see devservers.py)
+    "mcp__harness__dev_server_status",
+    "mcp__harness__restart_dev_server",
+    "mcp__harness__dev_server_logs",
+    # Handoffs between the phases of a routed session (see model_router.py)
+    "mcp__harness__record_handoff",
+    # Read-only git and filesystem queries from a cached index (see repo_index.py)
+    "mcp__harness__git_status",
+    "mcp__harness__git_log",
+    "mcp__harness__git_diff_summary",
+    "mcp__harness__list_tree",
+    "mcp__harness__file_stat",
+    # Commands in a shell held open for the session, with --persistent-shell (see persistent_shell.py)
+    "mcp__harness__shell",
+]
+
 # Built-in tools
 BUILTIN_TOOLS = [
     "Read",
@@ -65,13 +104,45 @@ BUILTIN_TOOLS = [
 ]
 
 
-def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
+# Hooks around every Bash command, also applied by the persistent shell tool
+BASH_PRE_HOOKS = (bash_security_hook, npm_install_skip_hook, tool_output_governor_hook)
+BASH_POST_HOOKS = (npm_install_record_hook,)
+
+
+def create_hooks() -> dict[str, list[HookMatcher]]:
+    """
+    The harness's tool hooks, by hook event.
+
+    Shared by live sessions and replayed ones (see replay.py), so a replay
+    exercises the same hooks.
+    """
+    return {
+        "PreToolUse": [
+            HookMatcher(matcher="Bash", hooks=list(BASH_PRE_HOOKS)),
+            HookMatcher(matcher="Read", hooks=[tool_output_governor_hook]),
+        ],
+        "PostToolUse": [
+            HookMatcher(matcher=WRITE_THROUGH_TOOL, hooks=[issue_cache_write_through_hook]),
+            HookMatcher(matcher="Bash", hooks=list(BASH_POST_HOOKS)),
+            HookMatcher(matcher="Read", hooks=[tool_output_note_hook]),
+            HookMatcher(matcher="*", hooks=[context_pressure_hook, repo_index_change_hook]),
+        ],
+    }
+
+
+def create_client(
+    project_dir: Path,
+    model: str,
+    mcp_pool: Optional["McpServerPool"] = None,
+) -> ClaudeSDKClient:
     """
     Create a Claude Agent SDK client with multi-layered security.
 
     Args:
         project_dir: Directory for the project
         model: Claude model to use
+        mcp_pool: Harness-owned MCP server pool to attach to instead of
+            spawning fresh Puppeteer/Linear MCP servers for this session
 
     Returns:
         Configured ClaudeSDKClient
@@ -117,6 +188,8 @@ def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
                 *PUPPETEER_TOOLS,
                 # Allow Linear MCP tools for project management
                 *LINEAR_TOOLS,
+                # Allow in-process harness tools
+                *HARNESS_TOOLS,
             ],
         },
     }
@@ -124,16 +197,48 @@ def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
     # Ensure project directory exists before creating settings file
     project_dir.mkdir(parents=True, exist_ok=True)
 
-    # Write settings to a file in the project directory
+    # Write settings to a file in the project directory (skipped when unchanged)
     settings_file = project_dir / ".claude_settings.json"
-    with open(settings_file, "w") as f:
-        json.dump(security_settings, f, indent=2)
+    settings_written = state_file(settings_file).write(security_settings)
+
+    mcp_servers = {
+        "puppeteer": {"command": "npx", "args": ["puppeteer-mcp-server"]},
+        # Linear MCP with Streamable HTTP transport (recommended over SSE)
+        # See: https://linear.app/docs/mcp
+        "linear": {
+            "type": "http",
+            "url": "https://mcp.linear.app/mcp",
+            "headers": {
+                "Authorization": f"Bearer {linear_api_key}"
+            }
+        },
+    }
+    if mcp_pool is not None:
+        # Attach to the warm, harness-owned servers instead of spawning new ones
+        mcp_servers.update(mcp_pool.server_configs())
+    # In-process tools backed by harness-side state
+    mcp_servers["harness"] = create_sdk_mcp_server(
+        name="harness",
+        tools=(
+            create_issue_cache_tools(project_dir)
+            + create_bulk_issue_tools(project_dir)
+            + create_spec_tools(project_dir)
+            + create_dev_server_tools(project_dir)
+            + create_handoff_tools(project_dir)
+            + create_repo_tools(project_dir)
+            + (create_shell_tools(project_dir, BASH_PRE_HOOKS, BASH_POST_HOOKS) if persistent_shell_enabled() else [])
+        ),
+    )
 
-    print(f"Created security settings at {settings_file}")
+    print(f"{'Created' if settings_written else 'Reusing'} security settings at {settings_file}")
     print("   - Sandbox enabled (OS-level bash isolation)")
     print(f"   - Filesystem restricted to: {project_dir.resolve()}")
     print("   - Bash commands restricted to allowlist (see security.py)")
-    print("   - MCP servers: puppeteer (browser automation), linear (project management)")
+    if persistent_shell_enabled():
+        print("   - Persistent shell: mcp__harness__shell (read-only commands, outside the sandbox)")
+    print("   - MCP servers: puppeteer (browser automation), linear (project management), harness (local issue cache)")
+    if mcp_pool is not None:
+        print(f"   - Reusing pooled MCP servers: {', '.join(mcp_pool.server_names)}")
     print()
 
     return ClaudeSDKClient(
@@ -144,25 +249,13 @@ def create_client(project_dir: Path, model: str) -> ClaudeSDKClient:
                 *BUILTIN_TOOLS,
                 *PUPPETEER_TOOLS,
                 *LINEAR_TOOLS,
+                *HARNESS_TOOLS,
             ],
-            mcp_servers={
-                "puppeteer": {"command": "npx", "args": ["puppeteer-mcp-server"]},
-                # Linear MCP with Streamable HTTP transport (recommended over SSE)
-                # See: https://linear.app/docs/mcp
-                "linear": {
-                    "type": "http",
-                    "url": "https://mcp.linear.app/mcp",
-                    "headers": {
-                        "Authorization": f"Bearer {linear_api_key}"
-                    }
-                }
-            },
-            hooks={
-                "PreToolUse": [
-                    HookMatcher(matcher="Bash", hooks=[bash_security_hook]),
-                ],
-            },
+            mcp_servers=mcp_servers,
+            hooks=create_hooks(),
             max_turns=1000,
+            # Partial messages carry per-call token usage for the context monitor
+            include_partial_messages=True,
             cwd=str(project_dir.resolve()),
             settings=str(settings_file.resolve()),  # Use absolute path
         )
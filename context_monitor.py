@@ -0,0 +1,106 @@
+"""
+Context Pressure Monitor
+========================
+
+Tracks how full a session's context window is, from the token usage the
+model reports for every call, and hands the session off before it runs out.
+
+- At the wrap-up threshold the agent is told (through a post-tool-use hook,
+  right after its next tool call) to commit, leave notes and stop.
+- If the context keeps growing to the hard limit after that, the harness
+  interrupts the session and ends it cleanly, instead of letting it be
+  truncated mid-edit.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from events import UsageEvent
+from prompts import load_template
+
+
+DEFAULT_CONTEXT_WINDOW = 200_000
+# Share of the context window at which the agent is asked to wrap up
+DEFAULT_WRAP_UP_THRESHOLD = 0.75
+# Share at which a session that was asked to wrap up is interrupted
+HARD_STOP_THRESHOLD = 0.92
+
+
+class ContextMonitor:
+    """
+    Context usage of one session and the handoff state derived from it.
+
+    Args:
+        context_window: Model context window in tokens
+        wrap_up_threshold: Share of the window at which the agent is asked to wrap up
+    """
+
+    def __init__(
+        self,
+        context_window: int = DEFAULT_CONTEXT_WINDOW,
+        wrap_up_threshold: float = DEFAULT_WRAP_UP_THRESHOLD,
+    ):
+        self.context_window = context_window
+        self.wrap_up_tokens = int(context_window * wrap_up_threshold)
+        self.hard_limit_tokens = int(context_window * max(wrap_up_threshold, HARD_STOP_THRESHOLD))
+        self.context_tokens = 0
+        self.wrap_up_sent = False
+        self.stopped = False
+
+    def observe(self, event: UsageEvent) -> None:
+        self.context_tokens = event.context_tokens
+
+    @property
+    def usage_share(self) -> float:
+        return self.context_tokens / self.context_window
+
+    @property
+    def wrap_up_due(self) -> bool:
+        return not self.wrap_up_sent and self.context_tokens >= self.wrap_up_tokens
+
+    @property
+    def stop_due(self) -> bool:
+        return self.wrap_up_sent and not self.stopped and self.context_tokens >= self.hard_limit_tokens
+
+    def take_wrap_up_message(self) -> Optional[str]:
+        """The wrap-up notice, the first time it is due (None otherwise)."""
+        if not self.wrap_up_due:
+            return None
+        self.wrap_up_sent = True
+        return load_template("wrap_up_prompt").safe_substitute(
+            context_tokens=f"{self.context_tokens:,}",
+            context_window=f"{self.context_window:,}",
+            hard_limit=f"{self.hard_limit_tokens:,}",
+        )
+
+
+# Monitors of running sessions, by session working directory (for the hook)
+_monitors: dict[Path, ContextMonitor] = {}
+
+
+def register_context_monitor(project_dir: Path, monitor: Optional[ContextMonitor]) -> None:
+    """Attach a monitor to the session running in project_dir (None to detach)."""
+    key = project_dir.resolve()
+    if monitor is None:
+        _monitors.pop(key, None)
+    else:
+        _monitors[key] = monitor
+
+
+async def context_pressure_hook(input_data, tool_use_id=None, context=None):
+    """
+    Post-tool-use hook that tells the agent to wrap up once its context is nearly full.
+
+    The notice is returned as a block decision, which feeds the reason back
+    to the model after the tool result (the tool call itself has completed).
+    """
+    cwd = input_data.get("cwd")
+    monitor = _monitors.get(Path(cwd).resolve()) if cwd else None
+    if monitor is None:
+        return {}
+
+    message = monitor.take_wrap_up_message()
+    if message is None:
+        return {}
+    print(f"\n[Context {monitor.usage_share:.0%} full ({monitor.context_tokens:,} tokens) - asking the agent to wrap up]")
+    return {"decision": "block", "reason": message}
@@ -0,0 +1,585 @@
+"""
+Dev Server Manager
+==================
+
+Keeps the generated app's dev servers running across sessions, instead of
+every session re-running init.sh (npm install plus a cold dev-server start).
+
+The agent describes the servers in dev_servers.json in the project root:
+
+    {
+      "install": [
+        {"command": "npm install", "inputs": ["package.json", "package-lock.json"]},
+        {"command": "npm install", "cwd": "server", "inputs": ["server/package.json", "server/package-lock.json"]}
+      ],
+      "servers": [
+        {"name": "frontend", "command": "npm run dev", "port": 5173, "restart_on": ["vite.config.js"]},
+        {"name": "backend", "command": "node index.js", "cwd": "server", "port": 3001,
+         "health_path": "/api/health", "restart_on": ["server/index.js", ".env"]}
+      ]
+    }
+
+Before each coding session (and whenever the agent asks for their status)
+the harness:
+
+- re-runs an install step only when the contents of its inputs changed
+- starts servers that are not running, and restarts a server when its
+  restart_on files or its config entry changed, after a reinstall, or when
+  it stopped answering health checks (HTTP health_path, else a TCP connect)
+- leaves healthy, unchanged servers alone, so the next session finds a warm
+  server with its dependencies and build cache in place
+
+Commands are checked against the same allowlist as the agent's Bash commands
+(see security.py). They run outside the OS sandbox, so they don't get the
+harness credentials, and every cwd, inputs and restart_on path must stay in
+the project. Servers run in their own process groups with output in
+.harness/dev_servers/<name>.log, and are stopped when the harness exits.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import re
+import signal
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+from npm_cache import finish_install, parse_npm_install, try_skip_install
+from persistent_shell import SECRET_ENV_VARS
+from security import evaluate_command
+from state_store import HARNESS_DIR, ensure_parent_dir, state_file
+
+
+DEV_SERVERS_CONFIG = "dev_servers.json"
+# Logs and harness-side state (pids, input digests) live in this directory
+DEV_SERVERS_DIR = f"{HARNESS_DIR}/dev_servers"
+DEV_SERVERS_STATE = "state.json"
+
+DEFAULT_STARTUP_TIMEOUT = 60.0
+INSTALL_TIMEOUT = 600.0
+HEALTH_CHECK_TIMEOUT = 2.0
+HEALTH_POLL_INTERVAL = 0.5
+STOP_TIMEOUT = 5.0
+DEFAULT_LOG_LINES = 40
+
+# Server names double as log file names in DEV_SERVERS_DIR
+SERVER_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+INSTALL_LOG_NAME = "install"
+
+
+class DevServerConfigError(Exception):
+    """Raised when dev_servers.json is malformed or uses a disallowed command."""
+
+
+@dataclass
+class InstallStep:
+    command: str
+    cwd: str = "."
+    inputs: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.cwd}:{self.command}"
+
+
+@dataclass
+class ServerSpec:
+    name: str
+    command: str
+    port: int
+    cwd: str = "."
+    health_path: Optional[str] = None
+    restart_on: list[str] = field(default_factory=list)
+    startup_timeout: float = DEFAULT_STARTUP_TIMEOUT
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}{self.health_path or '/'}"
+
+
+@dataclass
+class DevServersConfig:
+    install: list[InstallStep]
+    servers: list[ServerSpec]
+
+
+@dataclass
+class ServerStatus:
+    """One server's state after a check, as reported to the agent."""
+
+    name: str
+    url: str
+    healthy: bool
+    pid: Optional[int] = None
+    action: str = "unchanged"
+    detail: str = ""
+
+
+def _check_command(command: str, where: str) -> str:
+    allowed, reason = evaluate_command(command)
+    if not allowed:
+        raise DevServerConfigError(f"{where}: {reason}")
+    return command
+
+
+def _check_path(project_dir: Path, name: str, where: str) -> str:
+    try:
+        (project_dir / name).resolve().relative_to(project_dir.resolve())
+    except ValueError:
+        raise DevServerConfigError(f"{where}: {name!r} is outside the project directory") from None
+    return name
+
+
+def load_dev_servers_config(project_dir: Path) -> Optional[DevServersConfig]:
+    """
+    Load dev_servers.json (None if the project has none).
+
+    Raises:
+        DevServerConfigError: If the file is malformed, a command isn't allowed
+            or a path is outside the project
+    """
+    data = state_file(project_dir / DEV_SERVERS_CONFIG).read()
+    if data is None:
+        if (project_dir / DEV_SERVERS_CONFIG).exists():
+            raise DevServerConfigError(f"{DEV_SERVERS_CONFIG} is not valid JSON")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("servers"), list):
+        raise DevServerConfigError(f"{DEV_SERVERS_CONFIG} must be an object with a \"servers\" array")
+
+    install = []
+    for index, entry in enumerate(data.get("install") or []):
+        if not isinstance(entry, dict) or not entry.get("command"):
+            raise DevServerConfigError(f"install[{index}]: command is required")
+        where = f"install[{index}]"
+        install.append(InstallStep(
+            command=_check_command(str(entry["command"]), where),
+            cwd=_check_path(project_dir, str(entry.get("cwd", ".")), where),
+            inputs=[_check_path(project_dir, str(name), where) for name in entry.get("inputs", [])],
+        ))
+
+    servers = []
+    for index, entry in enumerate(data["servers"]):
+        if not isinstance(entry, dict) or not entry.get("name") or not entry.get("command"):
+            raise DevServerConfigError(f"servers[{index}]: name and command are required")
+        if not SERVER_NAME.fullmatch(str(entry["name"])) or entry["name"] == INSTALL_LOG_NAME:
+            raise DevServerConfigError(
+                f"servers[{index}]: name must be letters, digits, '.', '_' or '-' (and not \"{INSTALL_LOG_NAME}\")"
+            )
+        if not isinstance(entry.get("port"), int):
+            raise DevServerConfigError(f"servers[{index}]: port must be an integer")
+        where = f"servers[{index}]"
+        servers.append(ServerSpec(
+            name=str(entry["name"]),
+            command=_check_command(str(entry["command"]), where),
+            port=entry["port"],
+            cwd=_check_path(project_dir, str(entry.get("cwd", ".")), where),
+            health_path=entry.get("health_path"),
+            restart_on=[_check_path(project_dir, str(name), where) for name in entry.get("restart_on", [])],
+            startup_timeout=float(entry.get("startup_timeout", DEFAULT_STARTUP_TIMEOUT)),
+        ))
+    return DevServersConfig(install=install, servers=servers)
+
+
+def digest_inputs(project_dir: Path, names: list[str], extra: str = "") -> str:
+    """Digest of the named files' contents (missing files included as missing)."""
+    digest = hashlib.sha256(extra.encode())
+    for name in sorted(names):
+        digest.update(name.encode() + b"\0")
+        try:
+            digest.update((project_dir / name).read_bytes())
+        except OSError:
+            digest.update(b"<missing>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _command_env(**extra: str) -> dict[str, str]:
+    """Environment for install and server commands, without the harness credentials."""
+    env = {name: value for name, value in os.environ.items() if name not in SECRET_ENV_VARS}
+    return {**env, **extra}
+
+
+def _process_started(pid: int) -> Optional[str]:
+    """The process's start time as ps reports it (None if it isn't running)."""
+    try:
+        result = subprocess.run(["ps", "-o", "lstart=", "-p", str(pid)], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _signal_group(pid: int, sig: int) -> bool:
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+def _stop_process_group(pid: int, process: Optional[subprocess.Popen] = None) -> None:
+    """SIGTERM a server's process group, then SIGKILL whatever is left after STOP_TIMEOUT."""
+    if not _signal_group(pid, signal.SIGTERM):
+        return
+    if process is not None:
+        try:
+            process.wait(STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            pass
+    else:
+        deadline = time.monotonic() + STOP_TIMEOUT
+        while time.monotonic() < deadline and _signal_group(pid, 0):
+            time.sleep(0.1)
+    _signal_group(pid, signal.SIGKILL)
+
+
+def _http_ok(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=HEALTH_CHECK_TIMEOUT) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+async def check_health(spec: ServerSpec) -> bool:
+    """HTTP GET of health_path (any non-5xx answer) if set, else a TCP connect to the port."""
+    if spec.health_path:
+        return await asyncio.to_thread(_http_ok, spec.url)
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection("localhost", spec.port), HEALTH_CHECK_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class DevServerManager:
+    """
+    Owns a project's dev-server processes for the life of the harness.
+
+    Args:
+        project_dir: Project whose dev_servers.json describes the servers
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+        self.log_dir = project_dir / DEV_SERVERS_DIR
+        self.state = state_file(self.log_dir / DEV_SERVERS_STATE)
+        self._processes: dict[str, subprocess.Popen] = {}
+        self._lock = asyncio.Lock()
+        self.last_status: list[ServerStatus] = []
+        self.config_error: Optional[str] = None
+        self._stale_checked = False
+
+    def _ensure_log_dir(self) -> None:
+        if not self.log_dir.exists():
+            # .harness/ keeps logs and state out of the agent's "git add ."
+            ensure_parent_dir(self.log_dir)
+            self.log_dir.mkdir(exist_ok=True)
+
+    def _stop_stale(self) -> None:
+        """Stop servers a previous harness process started and never stopped (e.g. after a crash)."""
+        self._ensure_log_dir()
+        data = self.state.read() or {}
+        for name, started in (data.get("pids") or {}).items():
+            if name in self._processes or not isinstance(started, dict):
+                continue
+            # The pid may have been reused since: only stop the process the harness started
+            pid = started.get("pid")
+            if isinstance(pid, int) and _process_started(pid) == started.get("started"):
+                _stop_process_group(pid)
+        self.state.update(lambda data: {**(data or {}), "pids": {}, "servers": {}})
+
+    async def _run_install(self, step: InstallStep) -> tuple[bool, str]:
+        self._ensure_log_dir()
+        npm_install = parse_npm_install(step.command, self.project_dir / step.cwd)
+        with open(self.log_dir / f"{INSTALL_LOG_NAME}.log", "ab") as log:
+            log.write(f"\n$ {step.command}  (in {step.cwd})\n".encode())
+            if npm_install is not None:
+                # Same lockfile as the last install, or cached by another project
+                reason = await asyncio.to_thread(try_skip_install, npm_install)
+                if reason is not None:
+                    log.write(f"skipped: {reason}\n".encode())
+                    return True, reason
+            log.flush()
+            started = time.time()
+            process = await asyncio.create_subprocess_exec(
+                "/bin/sh", "-c", step.command,
+                cwd=self.project_dir / step.cwd,
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+                stdin=asyncio.subprocess.DEVNULL,
+                env=_command_env(),
+            )
+            try:
+                code = await asyncio.wait_for(process.wait(), INSTALL_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return False, f"timed out after {INSTALL_TIMEOUT:.0f}s"
+        if code == 0 and npm_install is not None:
+            await asyncio.to_thread(finish_install, npm_install, started)
+        return code == 0, f"exit code {code}"
+
+    def _start(self, spec: ServerSpec) -> subprocess.Popen:
+        self._ensure_log_dir()
+        with open(self.log_dir / f"{spec.name}.log", "ab") as log:
+            log.write(f"\n=== {time.strftime('%Y-%m-%d %H:%M:%S')} $ {spec.command}\n".encode())
+            log.flush()
+            process = subprocess.Popen(
+                ["/bin/sh", "-c", spec.command],
+                cwd=self.project_dir / spec.cwd,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                env=_command_env(BROWSER="none"),
+                start_new_session=True,
+            )
+        self._processes[spec.name] = process
+        started = {"pid": process.pid, "started": _process_started(process.pid)}
+        self.state.update(lambda data: {
+            **(data or {}), "pids": {**(data or {}).get("pids", {}), spec.name: started},
+        })
+        return process
+
+    def _stop(self, name: str) -> None:
+        process = self._processes.pop(name, None)
+        if process is None:
+            return
+        _stop_process_group(process.pid, process)
+        process.wait()
+        self.state.update(lambda data: {
+            **(data or {}),
+            "pids": {key: pid for key, pid in (data or {}).get("pids", {}).items() if key != name},
+        })
+
+    async def _wait_healthy(self, spec: ServerSpec, process: subprocess.Popen) -> bool:
+        deadline = time.monotonic() + spec.startup_timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            if await check_health(spec):
+                return True
+            await asyncio.sleep(HEALTH_POLL_INTERVAL)
+        return False
+
+    async def ensure_running(self, force_restart: Optional[list[str]] = None) -> list[ServerStatus]:
+        """
+        Reinstall dependencies and (re)start servers as needed.
+
+        Args:
+            force_restart: Server names to restart regardless of their state
+
+        Returns:
+            Status of every configured server (empty if the project has no dev_servers.json)
+        """
+        async with self._lock:
+            try:
+                config = load_dev_servers_config(self.project_dir)
+            except DevServerConfigError as e:
+                self.config_error = str(e)
+                print(f"Dev servers: {e}")
+                return []
+            self.config_error = None
+            if config is None:
+                return []
+
+            if not self._stale_checked:
+                self._stale_checked = True
+                await asyncio.to_thread(self._stop_stale)
+                atexit.register(self.stop_all)
+
+            state = self.state.read() or {}
+            installed = dict(state.get("installed") or {})
+            reinstalled = False
+            install_failure = ""
+            for step in config.install:
+                digest = digest_inputs(self.project_dir, step.inputs, step.command)
+                if installed.get(step.key) == digest:
+                    continue
+                print(f"Dev servers: running `{step.command}` in {step.cwd} (inputs changed)")
+                ok, detail = await self._run_install(step)
+                if ok:
+                    installed[step.key] = digest
+                    reinstalled = True
+                else:
+                    install_failure = f"`{step.command}` failed ({detail}); see {DEV_SERVERS_DIR}/install.log"
+                    print(f"Dev servers: {install_failure}")
+            self.state.update(lambda data: {**(data or {}), "installed": installed})
+
+            fingerprints = dict(state.get("servers") or {})
+            statuses = []
+            for spec in config.servers:
+                fingerprint = digest_inputs(self.project_dir, spec.restart_on, json.dumps(spec.__dict__, sort_keys=True))
+                process = self._processes.get(spec.name)
+                running = process is not None and process.poll() is None
+
+                reason = None
+                if force_restart is not None and spec.name in force_restart:
+                    reason = "restart requested"
+                elif not running:
+                    reason = "started" if process is None else f"restarted (exited with code {process.returncode})"
+                elif fingerprints.get(spec.name) != fingerprint:
+                    reason = "restarted (config changed)"
+                elif reinstalled:
+                    reason = "restarted (dependencies reinstalled)"
+                elif not await check_health(spec):
+                    reason = "restarted (health check failed)"
+
+                if reason is None:
+                    statuses.append(ServerStatus(spec.name, spec.url, True, process.pid))
+                    continue
+
+                if running or process is not None:
+                    await asyncio.to_thread(self._stop, spec.name)
+                elif await check_health(spec):
+                    # Something the harness didn't start (e.g. init.sh) already serves this port
+                    statuses.append(ServerStatus(
+                        spec.name, spec.url, True, action="external",
+                        detail=f"port {spec.port} is served by a process the harness did not start",
+                    ))
+                    continue
+
+                process = self._start(spec)
+                healthy = await self._wait_healthy(spec, process)
+                fingerprints[spec.name] = fingerprint
+                detail = install_failure
+                if not healthy:
+                    detail = (f"not healthy after {spec.startup_timeout:.0f}s; "
+                              f"see {DEV_SERVERS_DIR}/{spec.name}.log") + (f"; {detail}" if detail else "")
+                print(f"Dev servers: {spec.name} {reason} ({'healthy' if healthy else 'unhealthy'})")
+                statuses.append(ServerStatus(spec.name, spec.url, healthy, process.pid, reason, detail))
+
+            self.state.update(lambda data: {**(data or {}), "servers": fingerprints})
+            self.last_status = statuses
+            return statuses
+
+    def stop_all(self) -> None:
+        """Stop every server this manager started."""
+        for name in list(self._processes):
+            self._stop(name)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.stop_all)
+
+    def read_log(self, name: str, lines: int = DEFAULT_LOG_LINES) -> Optional[str]:
+        """
+        Last lines of a server's log, or of the install log for "install".
+
+        Only configured server names are accepted, so the agent-supplied name
+        can't reach files outside DEV_SERVERS_DIR.
+
+        Returns:
+            The lines, or None if the name is unknown or has no log
+        """
+        try:
+            config = load_dev_servers_config(self.project_dir)
+        except DevServerConfigError:
+            config = None
+        names = {INSTALL_LOG_NAME} | {spec.name for spec in (config.servers if config else [])}
+        if name not in names:
+            return None
+        try:
+            text = (self.log_dir / f"{name}.log").read_text(errors="replace")
+        except OSError:
+            return None
+        return "\n".join(text.splitlines()[-lines:])
+
+
+_managers: dict[Path, DevServerManager] = {}
+
+
+def get_dev_server_manager(project_dir: Path) -> DevServerManager:
+    """Return the shared manager for a project (one per project per process)."""
+    key = project_dir.resolve()
+    if key not in _managers:
+        _managers[key] = DevServerManager(project_dir)
+    return _managers[key]
+
+
+def format_dev_server_status(statuses: list[ServerStatus], config_error: Optional[str] = None) -> str:
+    """Render server statuses for the agent (session context and status tool)."""
+    if config_error:
+        return f"{DEV_SERVERS_CONFIG} could not be used: {config_error}"
+    if not statuses:
+        return f"No harness-managed dev servers ({DEV_SERVERS_CONFIG} not found)."
+    lines = []
+    for status in statuses:
+        state = "healthy" if status.healthy else "NOT HEALTHY"
+        pid = f", pid {status.pid}" if status.pid else ""
+        line = f"- {status.name}: {status.url} - {state} ({status.action}{pid})"
+        if status.detail:
+            line += f" - {status.detail}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def create_dev_server_tools(project_dir: Path) -> list[SdkMcpTool]:
+    """Build the in-process MCP tools for the harness-managed dev servers."""
+
+    @tool(
+        "dev_server_status",
+        "Check the harness-managed dev servers (from dev_servers.json): starts any that are down, "
+        "reinstalls dependencies if package files changed, and reports each server's URL and health.",
+        {"type": "object", "properties": {}},
+    )
+    async def dev_server_status(args):
+        manager = get_dev_server_manager(project_dir)
+        statuses = await manager.ensure_running()
+        text = format_dev_server_status(statuses, manager.config_error)
+        return {"content": [{"type": "text", "text": text}]}
+
+    @tool(
+        "restart_dev_server",
+        "Restart a harness-managed dev server (all of them if no name is given), e.g. after "
+        "changing server code that isn't hot-reloaded.",
+        {
+            "type": "object",
+            "properties": {"name": {"type": "string", "description": "Server name from dev_servers.json"}},
+        },
+    )
+    async def restart_dev_server(args):
+        manager = get_dev_server_manager(project_dir)
+        try:
+            config = load_dev_servers_config(project_dir)
+        except DevServerConfigError as e:
+            return {"content": [{"type": "text", "text": str(e)}]}
+        names = [spec.name for spec in config.servers] if config else []
+        if args.get("name"):
+            if args["name"] not in names:
+                return {"content": [{"type": "text", "text": f"Unknown dev server: {args['name']}"}]}
+            names = [args["name"]]
+        statuses = await manager.ensure_running(force_restart=names)
+        return {"content": [{"type": "text", "text": format_dev_server_status(statuses, manager.config_error)}]}
+
+    @tool(
+        "dev_server_logs",
+        "Show the last lines of a harness-managed dev server's output (\"install\" for dependency installs).",
+        {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Server name from dev_servers.json, or \"install\""},
+                "lines": {"type": "integer", "description": f"Lines to show (default {DEFAULT_LOG_LINES})"},
+            },
+            "required": ["name"],
+        },
+    )
+    async def dev_server_logs(args):
+        manager = get_dev_server_manager(project_dir)
+        text = manager.read_log(str(args["name"]), int(args.get("lines") or DEFAULT_LOG_LINES))
+        if text is None:
+            return {"content": [{"type": "text", "text": f"No log for {args['name']!r} (use a server name from "
+                                                         f"{DEV_SERVERS_CONFIG}, or \"{INSTALL_LOG_NAME}\")"}]}
+        return {"content": [{"type": "text", "text": text or "(empty)"}]}
+
+    return [dev_server_status, restart_dev_server, dev_server_logs]
@@ -0,0 +1,345 @@
+"""
+Session Event Pipeline
+======================
+
+Typed events for everything streamed out of an agent session, fanned out to
+pluggable async sinks (console, JSONL file, metrics). Events are timestamped
+when they are created, so sinks can measure latency regardless of queueing.
+
+Each sink has its own bounded queue and consumer task, so a slow sink (for
+example a slow terminal) never stalls consumption of the SDK message stream,
+and memory stays bounded on long sessions. Sinks that write to a stream or
+file do the blocking write and flush in a worker thread (asyncio.to_thread),
+so a stalled terminal or disk can't block the event loop either.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from claude_code_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+from claude_code_sdk.types import StreamEvent
+
+
+# Per-sink queue bound; publishers wait (backpressure) only if a sink falls this far behind
+DEFAULT_QUEUE_SIZE = 1000
+
+
+@dataclass
+class SessionStartEvent:
+    """The prompt is about to be sent."""
+
+    prompt_chars: int
+    kind: str = field(default="start", init=False)
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass
+class TextEvent:
+    """Assistant text output."""
+
+    text: str
+    kind: str = field(default="text", init=False)
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass
+class ToolUseEvent:
+    """The assistant invoked a tool."""
+
+    tool_use_id: str
+    name: str
+    input: dict[str, Any]
+    kind: str = field(default="tool_use", init=False)
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass
+class ToolResultEvent:
+    """A tool returned a result."""
+
+    tool_use_id: str
+    content: Any
+    is_error: bool
+    kind: str = field(default="tool_result", init=False)
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass
+class SessionResultEvent:
+    """Final result of a session, with usage and cost from the SDK."""
+
+    session_id: str
+    subtype: str
+    is_error: bool
+    num_turns: int
+    duration_ms: int
+    duration_api_ms: int
+    total_cost_usd: Optional[float]
+    usage: Optional[dict[str, Any]]
+    result: Optional[str]
+    kind: str = field(default="result", init=False)
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass
+class UsageEvent:
+    """Token usage of one model call, from the stream's message_start event."""
+
+    input_tokens: int
+    cache_read_input_tokens: int
+    cache_creation_input_tokens: int
+    output_tokens: int
+    kind: str = field(default="usage", init=False)
+    ts: float = field(default_factory=time.time)
+
+    @property
+    def context_tokens(self) -> int:
+        """Tokens of context the call was made with (the whole conversation so far)."""
+        return self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens + self.output_tokens
+
+
+SessionEvent = Union[SessionStartEvent, TextEvent, ToolUseEvent, ToolResultEvent, SessionResultEvent, UsageEvent]
+
+
+def events_from_message(msg: Any) -> list[SessionEvent]:
+    """Convert one SDK message into typed session events."""
+    events: list[SessionEvent] = []
+
+    if isinstance(msg, AssistantMessage):
+        for block in msg.content:
+            if isinstance(block, TextBlock):
+                events.append(TextEvent(text=block.text))
+            elif isinstance(block, ToolUseBlock):
+                events.append(ToolUseEvent(tool_use_id=block.id, name=block.name, input=block.input))
+
+    elif isinstance(msg, UserMessage) and isinstance(msg.content, list):
+        for block in msg.content:
+            if isinstance(block, ToolResultBlock):
+                events.append(
+                    ToolResultEvent(
+                        tool_use_id=block.tool_use_id,
+                        content=block.content if block.content is not None else "",
+                        is_error=bool(block.is_error),
+                    )
+                )
+
+    elif isinstance(msg, StreamEvent):
+        # Partial messages are only used for usage; subagent calls have their own context
+        if msg.event.get("type") == "message_start" and msg.parent_tool_use_id is None:
+            usage = (msg.event.get("message") or {}).get("usage") or {}
+            events.append(
+                UsageEvent(
+                    input_tokens=usage.get("input_tokens") or 0,
+                    cache_read_input_tokens=usage.get("cache_read_input_tokens") or 0,
+                    cache_creation_input_tokens=usage.get("cache_creation_input_tokens") or 0,
+                    output_tokens=usage.get("output_tokens") or 0,
+                )
+            )
+
+    elif isinstance(msg, ResultMessage):
+        events.append(
+            SessionResultEvent(
+                session_id=msg.session_id,
+                subtype=msg.subtype,
+                is_error=msg.is_error,
+                num_turns=msg.num_turns,
+                duration_ms=msg.duration_ms,
+                duration_api_ms=msg.duration_api_ms,
+                total_cost_usd=msg.total_cost_usd,
+                usage=msg.usage,
+                result=msg.result,
+            )
+        )
+
+    return events
+
+
+class EventSink:
+    """
+    Base class for event sinks.
+
+    Subclasses override handle() (or handle_batch() to process everything
+    that queued up at once) and optionally close().
+    """
+
+    async def handle(self, event: SessionEvent) -> None:
+        raise NotImplementedError
+
+    async def handle_batch(self, events: list[SessionEvent]) -> None:
+        for event in events:
+            await self.handle(event)
+
+    async def close(self) -> None:
+        pass
+
+
+class ConsoleSink(EventSink):
+    """Prints session output to the terminal in the harness's usual format."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def format(self, event: SessionEvent) -> str:
+        if isinstance(event, TextEvent):
+            return event.text
+
+        if isinstance(event, ToolUseEvent):
+            input_str = str(event.input)
+            if len(input_str) > 200:
+                input_str = input_str[:200] + "..."
+            return f"\n[Tool: {event.name}]\n   Input: {input_str}\n"
+
+        if isinstance(event, ToolResultEvent):
+            # Check if command was blocked by security hook
+            if "blocked" in str(event.content).lower():
+                return f"   [BLOCKED] {event.content}\n"
+            if event.is_error:
+                # Show errors (truncated)
+                return f"   [Error] {str(event.content)[:500]}\n"
+            # Tool succeeded - just show brief confirmation
+            return "   [Done]\n"
+
+        return ""
+
+    async def handle(self, event: SessionEvent) -> None:
+        await self.handle_batch([event])
+
+    async def handle_batch(self, events: list[SessionEvent]) -> None:
+        # One write + flush per batch instead of one per block, off the event loop
+        await asyncio.to_thread(self._write, "".join(self.format(event) for event in events))
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class JsonlSink(EventSink):
+    """Appends every event as a JSON line to a file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    async def handle_batch(self, events: list[SessionEvent]) -> None:
+        lines = [json.dumps(asdict(event), default=str) for event in events]
+        await asyncio.to_thread(self._write, "\n".join(lines) + "\n")
+
+    def _write(self, text: str) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a")
+        self._file.write(text)
+        self._file.flush()
+
+    async def close(self) -> None:
+        if self._file is not None:
+            file, self._file = self._file, None
+            await asyncio.to_thread(file.close)
+
+
+class MetricsSink(EventSink):
+    """Counts tool calls and errors, and prints a one-line summary at session end."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.tool_calls: dict[str, int] = {}
+        self.tool_errors = 0
+        self.text_chars = 0
+
+    async def handle(self, event: SessionEvent) -> None:
+        if isinstance(event, TextEvent):
+            self.text_chars += len(event.text)
+        elif isinstance(event, ToolUseEvent):
+            self.tool_calls[event.name] = self.tool_calls.get(event.name, 0) + 1
+        elif isinstance(event, ToolResultEvent) and event.is_error:
+            self.tool_errors += 1
+
+    async def close(self) -> None:
+        total = sum(self.tool_calls.values())
+        top = sorted(self.tool_calls.items(), key=lambda item: -item[1])[:3]
+        top_str = ", ".join(f"{name} x{count}" for name, count in top)
+        summary = (
+            f"\nSession stats: {total} tool calls"
+            + (f" ({top_str})" if top_str else "")
+            + f", {self.tool_errors} errors, {self.text_chars} chars of text\n"
+        )
+        await asyncio.to_thread(self._write, summary)
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class EventPipeline:
+    """
+    Fans events out to sinks, each drained by its own consumer task.
+
+    Use as an async context manager; leaving the context drains every queue
+    and closes the sinks.
+    """
+
+    def __init__(self, sinks: list[EventSink], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.sinks = sinks
+        self.queue_size = queue_size
+        self._queues: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+
+    async def __aenter__(self) -> "EventPipeline":
+        for sink in self.sinks:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            self._queues.append(queue)
+            self._tasks.append(asyncio.create_task(self._consume(sink, queue)))
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for queue in self._queues:
+            await queue.put(None)
+        await asyncio.gather(*self._tasks)
+        for sink in self.sinks:
+            try:
+                await sink.close()
+            except Exception as e:
+                print(f"Event sink {type(sink).__name__} failed to close: {e}")
+
+    async def publish(self, event: SessionEvent) -> None:
+        for queue in self._queues:
+            await queue.put(event)
+
+    async def _consume(self, sink: EventSink, queue: asyncio.Queue) -> None:
+        failed = False
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            done = batch[-1] is None
+            events = [event for event in batch if event is not None]
+            if events and not failed:
+                try:
+                    await sink.handle_batch(events)
+                except Exception as e:
+                    # A broken sink must not take the session down with it
+                    print(f"Event sink {type(sink).__name__} failed, disabling it: {e}")
+                    failed = True
+            if done:
+                return
+
+
+def default_sinks(event_log: Optional[Path] = None) -> list[EventSink]:
+    """Console output and session stats, plus a JSONL event log if requested."""
+    sinks: list[EventSink] = [ConsoleSink(), MetricsSink()]
+    if event_log is not None:
+        sinks.append(JsonlSink(event_log))
+    return sinks
@@ -0,0 +1,226 @@
+"""
+Fake Linear
+===========
+
+In-memory, deterministic stand-in for Linear, for running the agent loop
+offline (see replay.py and bench_harness.py). It serves both sides the
+harness talks to:
+
+- the agent's Linear MCP tools (list_issues, get_issue, create_issue,
+  update_issue, create_comment, list_comments), as in-process SDK tools
+  that can also be mounted as the "linear" MCP server of a real client
+- the harness-side LinearClient methods used by the issue cache and the
+  session context (list_issues, get_latest_comment, get_state_ids,
+  update_issue_state)
+
+updatedAt timestamps come from a logical clock, so runs are repeatable.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from claude_code_sdk import SdkMcpTool, create_sdk_mcp_server, tool
+
+from linear_config import LINEAR_PROJECT_MARKER, META_ISSUE_TITLE, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from state_store import state_file
+
+
+FAKE_PROJECT_ID = "fake-project"
+FAKE_TEAM_ID = "fake-team"
+WORKFLOW_STATES = (STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE)
+
+# The logical clock starts here and advances one second per change
+CLOCK_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeLinear:
+    """
+    One Linear project held in memory.
+
+    Args:
+        project_id: ID reported for the project
+        team_id: ID reported for the team
+        prefix: Issue identifier prefix (DEMO -> DEMO-1, DEMO-2, ...)
+    """
+
+    def __init__(self, project_id: str = FAKE_PROJECT_ID, team_id: str = FAKE_TEAM_ID, prefix: str = "DEMO"):
+        self.project_id = project_id
+        self.team_id = team_id
+        self.prefix = prefix
+        self.issues: dict[str, dict[str, Any]] = {}
+        self.comments: dict[str, list[dict[str, Any]]] = {}
+        self.ticks = 0
+        self.meta_issue_id: Optional[str] = None
+
+    def _now(self) -> str:
+        self.ticks += 1
+        return (CLOCK_START + timedelta(seconds=self.ticks)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def add_issue(self, title: str, priority: int = 3, description: str = "", status: str = STATUS_TODO) -> dict:
+        number = len(self.issues) + 1
+        issue = {
+            "id": f"issue-{number}",
+            "identifier": f"{self.prefix}-{number}",
+            "title": title,
+            "description": description,
+            "priority": priority,
+            "updatedAt": self._now(),
+            "state": {"name": status},
+        }
+        self.issues[issue["id"]] = issue
+        self.comments[issue["id"]] = []
+        return issue
+
+    def seed_backlog(self, issue_count: int) -> None:
+        """Create the META issue and `issue_count` Todo features, like the initializer would."""
+        self.meta_issue_id = self.add_issue(META_ISSUE_TITLE, priority=4, status=STATUS_IN_PROGRESS)["id"]
+        for n in range(1, issue_count + 1):
+            self.add_issue(f"Feature {n}", priority=1 + (n - 1) % 4, description=f"Implement feature {n}.")
+
+    def write_project_marker(self, project_dir: Path) -> None:
+        """Write .linear_project.json for this project, so the harness treats it as initialized."""
+        state_file(project_dir / LINEAR_PROJECT_MARKER).write({
+            "initialized": True,
+            "project_id": self.project_id,
+            "project_name": "Fake project",
+            "team_id": self.team_id,
+            "meta_issue_id": self.meta_issue_id,
+            "total_issues": len(self.issues),
+        })
+
+    def get(self, issue_ref: str) -> Optional[dict[str, Any]]:
+        """Look an issue up by ID or identifier."""
+        if issue_ref in self.issues:
+            return self.issues[issue_ref]
+        return next((issue for issue in self.issues.values() if issue["identifier"] == issue_ref), None)
+
+    def set_status(self, issue_ref: str, status: str) -> bool:
+        issue = self.get(issue_ref)
+        if issue is None or status not in WORKFLOW_STATES:
+            return False
+        issue["state"] = {"name": status}
+        issue["updatedAt"] = self._now()
+        return True
+
+    def add_comment(self, issue_ref: str, body: str) -> Optional[dict[str, Any]]:
+        issue = self.get(issue_ref)
+        if issue is None:
+            return None
+        comment = {"id": f"comment-{self.ticks + 1}", "body": body, "createdAt": self._now(), "user": {"name": "agent"}}
+        self.comments[issue["id"]].append(comment)
+        return comment
+
+    # Harness-side LinearClient interface
+
+    async def list_issues(
+        self,
+        project_id: str,
+        state_name: Optional[str] = None,
+        updated_after: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        return [
+            {key: issue[key] for key in ("id", "identifier", "title", "priority", "updatedAt", "state")}
+            for issue in self.issues.values()
+            if project_id == self.project_id
+            and (state_name is None or issue["state"]["name"] == state_name)
+            and (updated_after is None or issue["updatedAt"] >= updated_after)
+        ]
+
+    async def get_latest_comment(self, issue_id: str) -> Optional[dict[str, Any]]:
+        comments = self.comments.get(issue_id) or []
+        return dict(comments[-1]) if comments else None
+
+    async def get_state_ids(self, team_id: str) -> dict[str, str]:
+        return {status: f"state-{status.lower().replace(' ', '-')}" for status in WORKFLOW_STATES}
+
+    async def update_issue_state(self, issue_id: str, team_id: str, state_name: str) -> bool:
+        return self.set_status(issue_id, state_name)
+
+    # Agent-side Linear MCP tools
+
+    def create_tools(self) -> list[SdkMcpTool]:
+        """Build in-process tools named like the Linear MCP server's (mcp__linear__<name>)."""
+
+        def reply(payload: Any) -> dict:
+            return {"content": [{"type": "text", "text": json.dumps(payload)}]}
+
+        def not_found(issue_ref: str) -> dict:
+            return {"content": [{"type": "text", "text": f"Issue not found: {issue_ref}"}]}
+
+        @tool("list_issues", "List issues in the project.", {
+            "type": "object",
+            "properties": {"state": {"type": "string"}, "limit": {"type": "integer"}},
+        })
+        async def list_issues(args):
+            issues = [
+                issue for issue in self.issues.values()
+                if not args.get("state") or issue["state"]["name"] == args["state"]
+            ]
+            return reply(issues[: int(args.get("limit") or 50)])
+
+        @tool("get_issue", "Get an issue by ID or identifier.", {
+            "type": "object", "properties": {"id": {"type": "string"}}, "required": ["id"],
+        })
+        async def get_issue(args):
+            issue = self.get(str(args["id"]))
+            return reply(issue) if issue else not_found(args["id"])
+
+        @tool("create_issue", "Create an issue.", {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "description": {"type": "string"},
+                "priority": {"type": "integer"},
+            },
+            "required": ["title"],
+        })
+        async def create_issue(args):
+            issue = self.add_issue(str(args["title"]), int(args.get("priority") or 3), str(args.get("description", "")))
+            return reply(issue)
+
+        @tool("update_issue", "Update an issue's status, priority or title.", {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string"},
+                "state": {"type": "string"},
+                "priority": {"type": "integer"},
+                "title": {"type": "string"},
+            },
+            "required": ["id"],
+        })
+        async def update_issue(args):
+            issue = self.get(str(args["id"]))
+            if issue is None:
+                return not_found(args["id"])
+            status = args.get("state") or args.get("status")
+            if status and not self.set_status(issue["id"], str(status)):
+                return {"content": [{"type": "text", "text": f"Unknown workflow state: {status}"}]}
+            for field in ("priority", "title"):
+                if field in args:
+                    issue[field] = args[field]
+                    issue["updatedAt"] = self._now()
+            return reply(issue)
+
+        @tool("create_comment", "Comment on an issue.", {
+            "type": "object",
+            "properties": {"issueId": {"type": "string"}, "body": {"type": "string"}},
+            "required": ["issueId", "body"],
+        })
+        async def create_comment(args):
+            comment = self.add_comment(str(args["issueId"]), str(args["body"]))
+            return reply(comment) if comment else not_found(args["issueId"])
+
+        @tool("list_comments", "List an issue's comments, oldest first.", {
+            "type": "object", "properties": {"issueId": {"type": "string"}}, "required": ["issueId"],
+        })
+        async def list_comments(args):
+            issue = self.get(str(args["issueId"]))
+            return reply(self.comments[issue["id"]]) if issue else not_found(args["issueId"])
+
+        return [list_issues, get_issue, create_issue, update_issue, create_comment, list_comments]
+
+    def create_mcp_server(self):
+        """The tools as an in-process MCP server config, to mount as mcp_servers["linear"]."""
+        return create_sdk_mcp_server(name="linear", tools=self.create_tools())
@@ -0,0 +1,313 @@
+"""
+Local Linear Issue Cache
+========================
+
+Write-through cache of the project's Linear issues, stored next to
+.linear_project.json and indexed by status and priority.
+
+The harness refreshes it incrementally (only issues whose updatedAt changed
+since the last sync) before each session, and the agent reads it through the
+in-process "harness" MCP tools instead of repeatedly listing the whole project.
+
+The delta query is inclusive of the watermark, so an issue updated in the
+same millisecond as the last one seen isn't skipped; re-fetched issues merge
+by id. Deleted and archived issues never show up in a delta, so every
+FULL_REFRESH_SECONDS the refresh fetches the whole project instead and drops
+cached issues that are no longer in it.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+from linear_client import LinearAPIError, LinearClient
+from linear_config import ISSUE_CACHE_FILE, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from progress import load_linear_project_state
+from state_store import state_file
+
+
+# Seconds between full refreshes, which prune deleted and archived issues
+FULL_REFRESH_SECONDS = 1800
+
+
+# Linear MCP tool whose inputs are mirrored into the cache (write-through)
+WRITE_THROUGH_TOOL = "mcp__linear__update_issue"
+
+
+def priority_sort_key(issue: dict) -> tuple[int, str]:
+    """Sort key: Linear priority 1 (urgent) first, 0 (no priority) last."""
+    priority = issue.get("priority") or 0
+    return (priority if priority > 0 else 5, issue.get("identifier", ""))
+
+
+def issue_status(issue: dict) -> str:
+    """Return the workflow state name of an issue dict."""
+    return (issue.get("state") or {}).get("name", "")
+
+
+class IssueCache:
+    """
+    Issues of one Linear project, persisted as JSON and indexed in memory.
+
+    Args:
+        project_dir: Project directory containing .linear_project.json
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+        self.path = project_dir / ISSUE_CACHE_FILE
+        self.last_synced_at: Optional[str] = None
+        # Wall-clock time of the last full refresh
+        self.last_full_refresh: Optional[float] = None
+        self.issues: dict[str, dict[str, Any]] = {}
+        self._by_status: dict[str, list[dict[str, Any]]] = {}
+        self._by_identifier: dict[str, str] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load the cache file from disk (missing or corrupt files start empty)."""
+        data = state_file(self.path).read()
+        if not isinstance(data, dict):
+            data = {}
+        self.last_synced_at = data.get("last_synced_at")
+        self.last_full_refresh = data.get("last_full_refresh")
+        self.issues = data.get("issues", {})
+        self._reindex()
+
+    def save(self) -> None:
+        """Persist the cache to disk."""
+        state_file(self.path).write({
+            "last_synced_at": self.last_synced_at,
+            "last_full_refresh": self.last_full_refresh,
+            "issues": self.issues,
+        })
+
+    def full_refresh_due(self, now: Optional[float] = None) -> bool:
+        """True if the next refresh should fetch the whole project."""
+        if self.last_synced_at is None or self.last_full_refresh is None:
+            return True
+        return (now if now is not None else time.time()) - self.last_full_refresh >= FULL_REFRESH_SECONDS
+
+    def _reindex(self) -> None:
+        self._by_status = {}
+        self._by_identifier = {}
+        for issue_id, issue in self.issues.items():
+            self._by_status.setdefault(issue_status(issue), []).append(issue)
+            if issue.get("identifier"):
+                self._by_identifier[issue["identifier"]] = issue_id
+        for issues in self._by_status.values():
+            issues.sort(key=priority_sort_key)
+
+    def apply(self, issues: list[dict[str, Any]], complete: bool = False) -> int:
+        """
+        Merge fetched issues into the cache and advance the sync watermark.
+
+        Args:
+            issues: Fetched issues (an issue fetched twice is merged by id)
+            complete: issues is the whole project, so cached issues missing
+                from it were deleted or archived and are dropped
+
+        Returns:
+            Number of issues added, changed or dropped
+        """
+        changed = 0
+        if complete:
+            fetched = {issue["id"] for issue in issues}
+            for issue_id in [issue_id for issue_id in self.issues if issue_id not in fetched]:
+                del self.issues[issue_id]
+                changed += 1
+        for issue in issues:
+            if self.issues.get(issue["id"]) != issue:
+                self.issues[issue["id"]] = issue
+                changed += 1
+            updated_at = issue.get("updatedAt")
+            if updated_at and (self.last_synced_at is None or updated_at > self.last_synced_at):
+                self.last_synced_at = updated_at
+        if changed:
+            self._reindex()
+        return changed
+
+    def get(self, issue_ref: str) -> Optional[dict[str, Any]]:
+        """Look up an issue by ID or identifier (e.g. "DEMO-12")."""
+        issue_id = self._by_identifier.get(issue_ref, issue_ref)
+        return self.issues.get(issue_id)
+
+    def by_status(self, status: str) -> list[dict[str, Any]]:
+        """Return issues in a workflow state, highest priority first."""
+        return list(self._by_status.get(status, []))
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of issues per workflow state."""
+        return {status: len(issues) for status, issues in self._by_status.items()}
+
+    def record_update(self, tool_input: dict[str, Any]) -> bool:
+        """
+        Mirror an mcp__linear__update_issue call into the cache (write-through).
+
+        Returns:
+            True if a cached issue was changed
+        """
+        issue = self.get(str(tool_input.get("id", "")))
+        if issue is None:
+            return False
+
+        state = tool_input.get("state") or tool_input.get("status")
+        if isinstance(state, str) and state:
+            issue["state"] = {"name": state}
+        if isinstance(tool_input.get("priority"), int):
+            issue["priority"] = tool_input["priority"]
+        if isinstance(tool_input.get("title"), str):
+            issue["title"] = tool_input["title"]
+
+        self._reindex()
+        self.save()
+        return True
+
+
+_caches: dict[Path, IssueCache] = {}
+
+
+def get_issue_cache(project_dir: Path) -> IssueCache:
+    """Return the shared IssueCache for a project directory."""
+    key = project_dir.resolve()
+    if key not in _caches:
+        _caches[key] = IssueCache(project_dir)
+    return _caches[key]
+
+
+async def refresh_issue_cache(project_dir: Path, linear: Any = None) -> Optional[IssueCache]:
+    """
+    Pull issues updated since the last sync into the local cache.
+
+    The first call, and one every FULL_REFRESH_SECONDS, fetches the whole
+    project and prunes issues that disappeared; other calls only fetch the
+    updatedAt delta.
+
+    Returns:
+        The refreshed cache, or None if Linear isn't initialized or unreachable
+    """
+    state = load_linear_project_state(project_dir)
+    if state is None or not state.get("project_id"):
+        return None
+
+    if linear is None:
+        api_key = os.environ.get("LINEAR_API_KEY")
+        if not api_key:
+            return None
+        linear = LinearClient(api_key)
+
+    cache = get_issue_cache(project_dir)
+    full = cache.full_refresh_due()
+    try:
+        issues = await linear.list_issues(
+            state["project_id"], updated_after=None if full else cache.last_synced_at
+        )
+    except LinearAPIError as e:
+        print(f"Could not refresh local issue cache: {e}")
+        return None
+
+    changed = cache.apply(issues, complete=full)
+    if full:
+        cache.last_full_refresh = time.time()
+    cache.save()
+    print(f"Local issue cache refreshed ({changed} changed, {len(cache.issues)} total)")
+    return cache
+
+
+async def issue_cache_write_through_hook(input_data, tool_use_id=None, context=None):
+    """
+    Post-tool-use hook that mirrors Linear issue updates into the local cache.
+
+    The next delta refresh reconciles anything this cannot infer from the input.
+    """
+    if input_data.get("tool_name") != WRITE_THROUGH_TOOL:
+        return {}
+
+    cwd = input_data.get("cwd")
+    if not cwd:
+        return {}
+
+    get_issue_cache(Path(cwd)).record_update(input_data.get("tool_input", {}))
+    return {}
+
+
+def _format_issue(issue: dict) -> str:
+    return (
+        f"- {issue.get('identifier', issue['id'])} [P{issue.get('priority') or '-'}] "
+        f"{issue.get('title', '')} (id: {issue['id']})"
+    )
+
+
+def format_issue_summary(cache: IssueCache, meta_issue_id: Optional[str] = None, todo_limit: int = 5) -> str:
+    """Render the orientation summary the agent would otherwise build from list_issues calls."""
+    counts = cache.counts()
+    lines = [
+        f"Issue counts (last synced {cache.last_synced_at or 'never'}):",
+        f"  Done: {counts.get(STATUS_DONE, 0)}",
+        f"  In Progress: {counts.get(STATUS_IN_PROGRESS, 0)}",
+        f"  Todo: {counts.get(STATUS_TODO, 0)}",
+    ]
+    other = {status: n for status, n in counts.items() if status not in (STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO)}
+    for status, n in sorted(other.items()):
+        lines.append(f"  {status or 'Unknown'}: {n}")
+
+    if meta_issue_id:
+        meta = cache.get(meta_issue_id)
+        lines.append("")
+        lines.append("META issue:")
+        lines.append(_format_issue(meta) if meta else f"- {meta_issue_id}")
+
+    in_progress = cache.by_status(STATUS_IN_PROGRESS)
+    lines.append("")
+    lines.append("In Progress:" if in_progress else "In Progress: none")
+    lines.extend(_format_issue(issue) for issue in in_progress)
+
+    todo = cache.by_status(STATUS_TODO)[:todo_limit]
+    lines.append("")
+    lines.append(f"Next Todo by priority (top {todo_limit}):" if todo else "Todo: none")
+    lines.extend(_format_issue(issue) for issue in todo)
+
+    return "\n".join(lines)
+
+
+def create_issue_cache_tools(project_dir: Path) -> list[SdkMcpTool]:
+    """Build the in-process MCP tools that read the local issue cache."""
+
+    @tool(
+        "issue_summary",
+        "Summarize the Linear project from the local issue cache: counts by status, "
+        "the META issue, In Progress issues and the highest-priority Todo issues. "
+        "Use this instead of mcp__linear__list_issues for orientation.",
+        {"type": "object", "properties": {}},
+    )
+    async def issue_summary(args):
+        cache = get_issue_cache(project_dir)
+        state = load_linear_project_state(project_dir) or {}
+        text = format_issue_summary(cache, state.get("meta_issue_id"))
+        return {"content": [{"type": "text", "text": text}]}
+
+    @tool(
+        "list_cached_issues",
+        "List issues from the local issue cache, filtered by status and sorted by priority.",
+        {
+            "type": "object",
+            "properties": {
+                "status": {"type": "string", "description": 'Workflow state, e.g. "Todo" or "Done"'},
+                "limit": {"type": "integer", "description": "Maximum issues to return (default 20)"},
+            },
+        },
+    )
+    async def list_cached_issues(args):
+        cache = get_issue_cache(project_dir)
+        if args.get("status"):
+            issues = cache.by_status(args["status"])
+        else:
+            issues = sorted(cache.issues.values(), key=priority_sort_key)
+        issues = issues[: int(args.get("limit") or 20)]
+        text = "\n".join(f"{_format_issue(issue)} - {issue_status(issue)}" for issue in issues)
+        return {"content": [{"type": "text", "text": text or "No matching issues"}]}
+
+    return [issue_summary, list_cached_issues]
@@ -0,0 +1,220 @@
+"""
+Session Journal
+===============
+
+Append-only, fsync'd record of what each session did: when it started and
+ended, which issue it claimed, the last commit it made, and the tool calls
+that completed. It lives next to .linear_project.json and survives Ctrl+C
+and crashes, because every batch of records is on disk before the next one
+is written.
+
+On restart the harness reads the journal back. If the last session never
+finished cleanly while holding an unfinished issue, the next session resumes
+that issue directly instead of re-orienting and re-verifying from scratch.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from events import (
+    EventSink,
+    SessionEvent,
+    SessionResultEvent,
+    SessionStartEvent,
+    ToolResultEvent,
+    ToolUseEvent,
+)
+from issue_cache import WRITE_THROUGH_TOOL, get_issue_cache, issue_status
+from linear_config import STATUS_DONE, STATUS_IN_PROGRESS
+from state_store import HARNESS_DIR, ensure_parent_dir
+
+
+# Journal file, relative to the project directory
+JOURNAL_FILE = f"{HARNESS_DIR}/journal.jsonl"
+
+# Completed tool calls listed in a resume prompt
+RESUME_RECENT_TOOLS = 10
+
+
+def append_records(path: Path, records: list[dict[str, Any]]) -> None:
+    """Append records as JSON lines and fsync them to disk."""
+    ensure_parent_dir(path)
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(project_dir: Path) -> list[dict[str, Any]]:
+    """Read every journal record (a torn last line from a crash is skipped)."""
+    records = []
+    try:
+        with open(project_dir / JOURNAL_FILE, "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except IOError:
+        return []
+    return records
+
+
+async def head_commit(project_dir: Path) -> Optional[str]:
+    """Return the SHA of HEAD, or None outside a git repo or before the first commit."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", "rev-parse", "HEAD",
+            cwd=project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return None
+    return stdout.decode().strip() or None
+
+
+def _requested_status(tool_input: dict[str, Any]) -> str:
+    state = tool_input.get("state") or tool_input.get("status")
+    return state if isinstance(state, str) else ""
+
+
+class SessionJournal(EventSink):
+    """
+    Event sink that journals one session's progress.
+
+    Args:
+        project_dir: Project directory holding the journal
+        label: Session label (e.g. "coding", "initializer", "resume")
+        issue_id: Issue the session starts out holding (set for resumed sessions)
+    """
+
+    def __init__(self, project_dir: Path, label: str, issue_id: Optional[str] = None):
+        self.path = project_dir / JOURNAL_FILE
+        self.project_dir = project_dir
+        self.label = label
+        self.issue_id = issue_id
+        self.pending: dict[str, ToolUseEvent] = {}
+
+    async def handle_batch(self, events: list[SessionEvent]) -> None:
+        records = []
+        for event in events:
+            records.extend(await self._records_for(event))
+        if records:
+            await asyncio.to_thread(append_records, self.path, records)
+
+    async def _records_for(self, event: SessionEvent) -> list[dict[str, Any]]:
+        if isinstance(event, SessionStartEvent):
+            return [{"type": "session_start", "ts": event.ts, "label": self.label, "issue_id": self.issue_id}]
+
+        if isinstance(event, ToolUseEvent):
+            self.pending[event.tool_use_id] = event
+            return []
+
+        if isinstance(event, ToolResultEvent):
+            use = self.pending.pop(event.tool_use_id, None)
+            if use is None:
+                return []
+            records = [{"type": "tool_call", "ts": event.ts, "name": use.name, "is_error": event.is_error}]
+            if event.is_error:
+                return records
+
+            if use.name == WRITE_THROUGH_TOOL:
+                status = _requested_status(use.input)
+                issue_id = str(use.input.get("id", ""))
+                if status == STATUS_IN_PROGRESS and issue_id:
+                    records.append({"type": "issue_claimed", "ts": event.ts, "issue_id": issue_id})
+                elif status == STATUS_DONE and issue_id:
+                    records.append({"type": "issue_done", "ts": event.ts, "issue_id": issue_id})
+            elif use.name == "Bash" and "git commit" in str(use.input.get("command", "")):
+                sha = await head_commit(self.project_dir)
+                if sha:
+                    records.append({"type": "commit", "ts": event.ts, "sha": sha})
+            return records
+
+        if isinstance(event, SessionResultEvent):
+            status = "error" if event.is_error else "success"
+            return [{"type": "session_end", "ts": event.ts, "status": status}]
+
+        return []
+
+
+@dataclass
+class InterruptedSession:
+    """The last journaled session, which ended without a clean result."""
+
+    label: str
+    started_at: float
+    status: str
+    issue_id: Optional[str] = None
+    last_commit: Optional[str] = None
+    tool_calls: list[str] = field(default_factory=list)
+
+
+def last_session(records: list[dict[str, Any]]) -> Optional[InterruptedSession]:
+    """Replay the records of the most recent session (status "running" if it never ended)."""
+    start = None
+    for index, record in enumerate(records):
+        if record.get("type") == "session_start":
+            start = index
+    if start is None:
+        return None
+
+    first = records[start]
+    session = InterruptedSession(
+        label=first.get("label", ""),
+        started_at=first.get("ts", 0.0),
+        status="running",
+        issue_id=first.get("issue_id"),
+    )
+    for record in records[start + 1 :]:
+        kind = record.get("type")
+        if kind == "issue_claimed":
+            session.issue_id = record["issue_id"]
+        elif kind == "issue_done" and record.get("issue_id") == session.issue_id:
+            session.issue_id = None
+        elif kind == "commit":
+            session.last_commit = record["sha"]
+        elif kind == "tool_call":
+            session.tool_calls.append(record["name"])
+        elif kind == "session_end":
+            session.status = record["status"]
+    return session
+
+
+def find_interrupted_session(project_dir: Path) -> Optional[InterruptedSession]:
+    """
+    Return the last session if it was interrupted or crashed while holding an open issue.
+
+    The issue must not be Done in the local issue cache (issues missing from
+    the cache are assumed open).
+    """
+    session = last_session(read_journal(project_dir))
+    if session is None or session.status == "success" or not session.issue_id:
+        return None
+
+    issue = get_issue_cache(project_dir).get(session.issue_id)
+    if issue is not None and issue_status(issue) == STATUS_DONE:
+        return None
+    return session
+
+
+def describe_interruption(session: InterruptedSession) -> dict[str, str]:
+    """Template values describing an interrupted session for the resume prompt."""
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(session.started_at))
+    recent = session.tool_calls[-RESUME_RECENT_TOOLS:]
+    return {
+        "started_at": started,
+        "ended": "crashed" if session.status == "error" else "was interrupted",
+        "last_commit": session.last_commit or "none (no commit was made during the session)",
+        "tool_calls": str(len(session.tool_calls)),
+        "recent_tools": ", ".join(recent) if recent else "none",
+    }
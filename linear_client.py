@@ -0,0 +1,283 @@
+"""
+Linear GraphQL Client
+=====================
+
+Minimal async client for the Linear GraphQL API, used by the harness itself
+(the agent talks to Linear through the Linear MCP server instead).
+Requests run in a worker thread via urllib so no extra dependencies are needed.
+"""
+
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Optional
+
+from linear_config import LINEAR_API_URL
+
+
+ISSUE_FIELDS = """
+    id
+    identifier
+    title
+    priority
+    updatedAt
+    state { name }
+"""
+
+
+class LinearAPIError(Exception):
+    """Raised when the Linear API returns an error or cannot be reached."""
+
+
+class LinearRateLimitError(LinearAPIError):
+    """
+    Raised when Linear rejects a request for exceeding the rate limit.
+
+    Attributes:
+        reset_at: Epoch seconds when the request budget resets (None if unknown)
+    """
+
+    def __init__(self, message: str, reset_at: Optional[float] = None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+class LinearClient:
+    """
+    Small async wrapper around the Linear GraphQL endpoint.
+
+    Args:
+        api_key: Linear API key (sent as the Authorization header)
+        endpoint: GraphQL endpoint URL (override to point at a local stand-in)
+        timeout: Per-request timeout in seconds
+    """
+
+    def __init__(self, api_key: str, endpoint: str = LINEAR_API_URL, timeout: float = 30.0):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._state_ids: dict[str, dict[str, str]] = {}
+        # Request budget reported by the X-RateLimit-Requests-* response headers
+        self.requests_remaining: Optional[int] = None
+        self.requests_reset_at: Optional[float] = None
+
+    def _record_rate_limit(self, headers: Any) -> None:
+        if headers is None:
+            return
+        remaining = headers.get("X-RateLimit-Requests-Remaining")
+        reset = headers.get("X-RateLimit-Requests-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.requests_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            # Linear reports the reset time in epoch milliseconds
+            self.requests_reset_at = int(reset) / 1000
+
+    def _post(self, payload: bytes) -> dict:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=payload,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.api_key,
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self._record_rate_limit(response.headers)
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            self._record_rate_limit(e.headers)
+            body = e.read()
+            if e.code == 429 or b"RATELIMITED" in body:
+                raise LinearRateLimitError(
+                    f"Linear API rate limit exceeded (HTTP {e.code})", self.requests_reset_at
+                ) from e
+            raise LinearAPIError(f"Linear API returned HTTP {e.code}") from e
+        except (urllib.error.URLError, OSError, json.JSONDecodeError) as e:
+            raise LinearAPIError(f"Could not reach Linear API: {e}") from e
+
+    async def execute(self, query: str, variables: Optional[dict] = None, allow_partial: bool = False) -> dict:
+        """
+        Execute a GraphQL query or mutation.
+
+        Args:
+            query: GraphQL document
+            variables: GraphQL variables
+            allow_partial: Return whatever data came back alongside errors
+                (for documents with several independent mutations)
+
+        Returns:
+            The "data" member of the response
+
+        Raises:
+            LinearRateLimitError: If Linear rejected the request for rate limiting
+            LinearAPIError: On transport errors or GraphQL errors
+        """
+        payload = json.dumps({"query": query, "variables": variables or {}}).encode("utf-8")
+        result = await asyncio.to_thread(self._post, payload)
+
+        errors = result.get("errors") or []
+        if any((err.get("extensions") or {}).get("code") == "RATELIMITED" for err in errors):
+            raise LinearRateLimitError("Linear API rate limit exceeded", self.requests_reset_at)
+        if errors and not (allow_partial and result.get("data")):
+            messages = "; ".join(err.get("message", "unknown error") for err in errors)
+            raise LinearAPIError(f"Linear API error: {messages}")
+
+        return result.get("data") or {}
+
+    async def list_issues(
+        self,
+        project_id: str,
+        state_name: Optional[str] = None,
+        updated_after: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        List all issues in a project.
+
+        Args:
+            project_id: Linear project ID
+            state_name: Only return issues in this workflow state
+            updated_after: ISO timestamp; only return issues updated at or
+                after it (inclusive, so issues sharing the timestamp of the
+                last one seen are not missed)
+
+        Returns:
+            List of issue dicts with id, identifier, title, priority, updatedAt
+            and state.name
+        """
+        issue_filter: dict[str, Any] = {"project": {"id": {"eq": project_id}}}
+        if state_name:
+            issue_filter["state"] = {"name": {"eq": state_name}}
+        if updated_after:
+            issue_filter["updatedAt"] = {"gte": updated_after}
+
+        query = f"""
+            query Issues($filter: IssueFilter, $after: String) {{
+                issues(filter: $filter, first: 100, after: $after) {{
+                    nodes {{ {ISSUE_FIELDS} }}
+                    pageInfo {{ hasNextPage endCursor }}
+                }}
+            }}
+        """
+
+        issues: list[dict[str, Any]] = []
+        after = None
+        while True:
+            data = await self.execute(query, {"filter": issue_filter, "after": after})
+            page = data.get("issues", {})
+            issues.extend(page.get("nodes", []))
+            page_info = page.get("pageInfo", {})
+            if not page_info.get("hasNextPage"):
+                break
+            after = page_info.get("endCursor")
+
+        return issues
+
+    async def get_state_ids(self, team_id: str) -> dict[str, str]:
+        """Return a mapping of workflow state name -> state ID for a team (cached)."""
+        if team_id not in self._state_ids:
+            data = await self.execute(
+                """
+                query States($teamId: ID) {
+                    workflowStates(filter: {team: {id: {eq: $teamId}}}) {
+                        nodes { id name }
+                    }
+                }
+                """,
+                {"teamId": team_id},
+            )
+            nodes = data.get("workflowStates", {}).get("nodes", [])
+            self._state_ids[team_id] = {node["name"]: node["id"] for node in nodes}
+        return self._state_ids[team_id]
+
+    async def update_issue_state(self, issue_id: str, team_id: str, state_name: str) -> bool:
+        """
+        Move an issue to the named workflow state.
+
+        Returns:
+            True if Linear reported success
+        """
+        state_ids = await self.get_state_ids(team_id)
+        if state_name not in state_ids:
+            raise LinearAPIError(f"Unknown workflow state for team {team_id}: {state_name}")
+
+        data = await self.execute(
+            """
+            mutation UpdateIssue($id: String!, $stateId: String!) {
+                issueUpdate(id: $id, input: {stateId: $stateId}) { success }
+            }
+            """,
+            {"id": issue_id, "stateId": state_ids[state_name]},
+        )
+        return bool(data.get("issueUpdate", {}).get("success"))
+
+    async def create_issues(
+        self,
+        team_id: str,
+        project_id: str,
+        issues: list[dict[str, Any]],
+    ) -> list[Optional[dict[str, Any]]]:
+        """
+        Create several issues in one request (one aliased issueCreate per issue).
+
+        Args:
+            team_id: Linear team ID
+            project_id: Linear project ID
+            issues: Dicts with title and optional description and priority
+
+        Returns:
+            The created issue (ISSUE_FIELDS) for each input, in order, or None
+            for issues Linear did not create
+        """
+        definitions = ", ".join(f"$i{n}: IssueCreateInput!" for n in range(len(issues)))
+        mutations = "\n".join(
+            f"i{n}: issueCreate(input: $i{n}) {{ success issue {{ {ISSUE_FIELDS} }} }}"
+            for n in range(len(issues))
+        )
+        variables = {
+            f"i{n}": {
+                "teamId": team_id,
+                "projectId": project_id,
+                "title": issue["title"],
+                "description": issue.get("description", ""),
+                "priority": issue.get("priority", 0),
+            }
+            for n, issue in enumerate(issues)
+        }
+
+        data = await self.execute(
+            f"mutation CreateIssues({definitions}) {{ {mutations} }}", variables, allow_partial=True
+        )
+        return [(data.get(f"i{n}") or {}).get("issue") for n in range(len(issues))]
+
+    async def get_latest_comment(self, issue_id: str) -> Optional[dict[str, Any]]:
+        """
+        Return the most recent comment on an issue.
+
+        Returns:
+            Dict with body, createdAt and user.name, or None if the issue has
+            no comments
+        """
+        data = await self.execute(
+            """
+            query LatestComment($id: String!) {
+                issue(id: $id) {
+                    comments(first: 1, orderBy: createdAt) {
+                        nodes { body createdAt user { name } }
+                    }
+                }
+            }
+            """,
+            {"id": issue_id},
+        )
+        nodes = ((data.get("issue") or {}).get("comments") or {}).get("nodes") or []
+        return max(nodes, key=lambda node: node.get("createdAt", ""), default=None)
+
+    def seconds_until_reset(self) -> Optional[float]:
+        """Seconds until the request budget resets (None if Linear hasn't said)."""
+        if self.requests_reset_at is None:
+            return None
+        return max(0.0, self.requests_reset_at - time.time())
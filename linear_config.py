@@ -33,5 +33,12 @@ PRIORITY_LOW = 4
 # Local marker file to track Linear project initialization
 LINEAR_PROJECT_MARKER = ".linear_project.json"
 
+# Local snapshot of the project's issues, refreshed by the harness
+# (in the self-ignoring .harness/ directory, see state_store.py)
+ISSUE_CACHE_FILE = ".harness/linear_issues.json"
+
 # Meta issue title for project tracking and session handoff
 META_ISSUE_TITLE = "[META] Project Progress Tracker"
+
+# Linear GraphQL API endpoint (used by harness-side queries, not by the agent)
+LINEAR_API_URL = "https://api.linear.app/graphql"
@@ -0,0 +1,228 @@
+"""
+MCP Server Pool
+===============
+
+Long-lived MCP server connections owned by the harness.
+
+Without the pool, every session's ClaudeSDKClient spawns its own
+`npx puppeteer-mcp-server` (and Chromium) and re-handshakes with the Linear
+HTTP MCP server. The pool connects to each upstream server once, keeps the
+connection open across sessions, and hands every new session an in-process
+SDK MCP server that forwards tool calls over the warm connection. Tool names
+are unchanged (e.g. mcp__puppeteer__puppeteer_navigate).
+
+Puppeteer screenshot results pass through a ScreenshotGovernor on the way
+back (see screenshots.py), which drops unchanged and over-budget images.
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Optional
+
+from claude_code_sdk.types import McpSdkServerConfig
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.server import Server
+from mcp.types import Tool
+
+from screenshots import ScreenshotGovernor
+
+
+# Upstream servers (same servers create_client configures per session)
+PUPPETEER_SERVER = StdioServerParameters(command="npx", args=["puppeteer-mcp-server"])
+LINEAR_MCP_URL = "https://mcp.linear.app/mcp"
+
+
+class McpProxyError(Exception):
+    """Raised (and reported to the agent as a tool error) when an upstream call fails."""
+
+
+class McpServerPool:
+    """
+    Warm upstream MCP sessions shared by consecutive agent sessions.
+
+    Use as an async context manager around the session loop. Each upstream
+    server has its own exit stack, so a crashed server can be reconnected
+    without restarting the others.
+
+    Args:
+        linear_api_key: Linear API key for the Linear HTTP MCP server
+            (None to pool only the Puppeteer server)
+        puppeteer: Whether to pool the Puppeteer server
+        screenshots: Deduplication and budget for Puppeteer screenshots
+            (defaults to deduplication with no budget)
+    """
+
+    def __init__(
+        self,
+        linear_api_key: Optional[str] = None,
+        puppeteer: bool = True,
+        screenshots: Optional[ScreenshotGovernor] = None,
+    ):
+        self._transports: dict[str, Callable[[], Any]] = {}
+        if puppeteer:
+            self._transports["puppeteer"] = lambda: stdio_client(PUPPETEER_SERVER)
+        if linear_api_key:
+            self._transports["linear"] = lambda: streamablehttp_client(
+                LINEAR_MCP_URL,
+                headers={"Authorization": f"Bearer {linear_api_key}"},
+            )
+
+        self._stacks: dict[str, AsyncExitStack] = {}
+        self._sessions: dict[str, ClientSession] = {}
+        self._tools: dict[str, list[Tool]] = {}
+        self._proxies: dict[str, Server] = {}
+        # Sessions sharing the pool (orchestrator) must not reconnect the same server twice
+        self._health_lock = asyncio.Lock()
+        self.screenshots = screenshots or ScreenshotGovernor()
+
+    async def __aenter__(self) -> "McpServerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def server_names(self) -> list[str]:
+        return list(self._transports)
+
+    async def start(self) -> None:
+        """Connect to every upstream server."""
+        for name in self._transports:
+            await self._connect(name)
+
+    async def close(self) -> None:
+        """Close all upstream connections (stops the Puppeteer server and browser)."""
+        for name in list(self._stacks):
+            await self._disconnect(name)
+
+    async def _connect(self, name: str) -> None:
+        stack = AsyncExitStack()
+        try:
+            streams = await stack.enter_async_context(self._transports[name]())
+            read_stream, write_stream = streams[0], streams[1]
+            session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+            await session.initialize()
+            tools = (await session.list_tools()).tools
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        self._stacks[name] = stack
+        self._sessions[name] = session
+        self._tools[name] = tools
+        print(f"MCP pool: connected to {name} ({len(tools)} tools)")
+
+    async def _disconnect(self, name: str) -> None:
+        stack = self._stacks.pop(name, None)
+        self._sessions.pop(name, None)
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception as e:
+                print(f"MCP pool: error closing {name}: {e}")
+
+    def begin_session(self) -> None:
+        """Start per-session accounting (screenshot budget and deduplication)."""
+        self.screenshots.begin_session()
+
+    async def ensure_healthy(self) -> None:
+        """Ping each upstream server and reconnect any that stopped responding."""
+        async with self._health_lock:
+            await self._reconnect_unhealthy()
+
+    async def _reconnect_unhealthy(self) -> None:
+        for name in self._transports:
+            session = self._sessions.get(name)
+            try:
+                if session is None:
+                    raise McpProxyError("not connected")
+                await session.send_ping()
+            except Exception as e:
+                print(f"MCP pool: {name} unhealthy ({e}), reconnecting...")
+                await self._disconnect(name)
+                await self._connect(name)
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: dict[str, Any]) -> list[Any]:
+        """
+        Forward a tool call to an upstream server.
+
+        Returns:
+            The upstream result's content blocks (text, images, ...)
+
+        Raises:
+            McpProxyError: If the server is unavailable or reports an error
+        """
+        session = self._sessions.get(server_name)
+        if session is None:
+            raise McpProxyError(f"MCP server '{server_name}' is not connected")
+
+        if server_name == "puppeteer":
+            self.screenshots.note_call(tool_name, arguments)
+        result = await session.call_tool(tool_name, arguments)
+        if result.isError:
+            text = " ".join(getattr(item, "text", "") for item in result.content)
+            raise McpProxyError(text or f"{tool_name} failed")
+        if server_name == "puppeteer":
+            # PNG decoding is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(self.screenshots.filter, tool_name, arguments, list(result.content))
+        return list(result.content)
+
+    def _build_proxy(self, server_name: str) -> Server:
+        proxy = Server(server_name)
+
+        @proxy.list_tools()
+        async def list_tools() -> list[Tool]:
+            return self._tools.get(server_name, [])
+
+        @proxy.call_tool()
+        async def call_tool(name: str, arguments: dict[str, Any]) -> list[Any]:
+            return await self.call_tool(server_name, name, arguments)
+
+        return proxy
+
+    def server_configs(self) -> dict[str, McpSdkServerConfig]:
+        """
+        Return mcp_servers entries that route a session's tool calls through the pool.
+
+        The proxies are built once and reused, so attaching a new session
+        costs nothing beyond the SDK's in-process handshake.
+        """
+        configs: dict[str, McpSdkServerConfig] = {}
+        for name in self._transports:
+            if name not in self._proxies:
+                self._proxies[name] = self._build_proxy(name)
+            configs[name] = McpSdkServerConfig(type="sdk", name=name, instance=self._proxies[name])
+        return configs
+
+
+class McpPoolGroup:
+    """
+    Several pools presented to create_client as one.
+
+    Used by the orchestrator to combine the Linear pool shared by every
+    project with the browser pool of the session slot a session runs in.
+    """
+
+    def __init__(self, *pools: McpServerPool):
+        self.pools = pools
+
+    @property
+    def server_names(self) -> list[str]:
+        return [name for pool in self.pools for name in pool.server_names]
+
+    def begin_session(self) -> None:
+        for pool in self.pools:
+            pool.begin_session()
+
+    async def ensure_healthy(self) -> None:
+        for pool in self.pools:
+            await pool.ensure_healthy()
+
+    def server_configs(self) -> dict[str, McpSdkServerConfig]:
+        configs: dict[str, McpSdkServerConfig] = {}
+        for pool in self.pools:
+            configs.update(pool.server_configs())
+        return configs
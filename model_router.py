@@ -0,0 +1,104 @@
+"""
+Model Router
+============
+
+Runs a coding session as three phases, each on the model suited to it:
+
+- orient (fast model): review the session context, pick the next issue and
+  claim it (STEP 1, 2, 5 and 6 of the coding prompt)
+- implement (configured model): start servers, run the regression pass,
+  implement, verify and commit (STEP 3, 4, 7, 8 and 10)
+- bookkeeping (fast model): the issue comment and status update, and the
+  META issue summary (STEP 9 and 11)
+
+Each phase is a fresh client on its own model, so the routine orientation
+and Linear work never runs on the expensive model. A phase ends by calling
+mcp__harness__record_handoff with a summary for the next phase; if it
+doesn't, the end of its final message is used instead.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+
+ORIENT = "orient"
+IMPLEMENT = "implement"
+BOOKKEEPING = "bookkeeping"
+
+# Characters of a phase's final message used when it recorded no handoff
+MAX_FALLBACK_HANDOFF_CHARS = 4000
+
+
+@dataclass
+class Handoff:
+    """What one phase tells the next."""
+
+    summary: str
+    issue_id: Optional[str] = None
+    issue_done: bool = False
+
+
+# Handoffs recorded by running phases, by project directory
+_handoffs: dict[Path, Handoff] = {}
+
+
+def record_handoff(project_dir: Path, handoff: Handoff) -> None:
+    _handoffs[project_dir.resolve()] = handoff
+
+
+def clear_handoff(project_dir: Path) -> None:
+    _handoffs.pop(project_dir.resolve(), None)
+
+
+def take_handoff(project_dir: Path, response: str) -> Handoff:
+    """
+    The handoff recorded by the phase that just ended.
+
+    Args:
+        project_dir: Project directory of the session
+        response: The phase's response text, used if it recorded no handoff
+    """
+    handoff = _handoffs.pop(project_dir.resolve(), None)
+    if handoff is not None:
+        return handoff
+    print("Phase recorded no handoff - passing on the end of its final message")
+    summary = response.strip()[-MAX_FALLBACK_HANDOFF_CHARS:]
+    return Handoff(summary=summary or "(the previous phase left no summary)")
+
+
+def create_handoff_tools(project_dir: Path) -> list[SdkMcpTool]:
+    """Build the in-process MCP tool that phases use to hand off to the next one."""
+
+    @tool(
+        "record_handoff",
+        "Hand off to the next phase of this session (when the harness runs the session in phases). "
+        "Call it once, as the last thing you do.",
+        {
+            "type": "object",
+            "properties": {
+                "summary": {
+                    "type": "string",
+                    "description": "Everything the next phase needs to know, since it starts with a fresh context",
+                },
+                "issue_id": {"type": "string", "description": "ID of the Linear issue being worked on"},
+                "issue_done": {
+                    "type": "boolean",
+                    "description": "True only if the issue is fully implemented, verified and committed",
+                },
+            },
+            "required": ["summary"],
+        },
+    )
+    async def record_handoff_tool(args):
+        handoff = Handoff(
+            summary=str(args["summary"]).strip(),
+            issue_id=str(args["issue_id"]) if args.get("issue_id") else None,
+            issue_done=bool(args.get("issue_done")),
+        )
+        record_handoff(project_dir, handoff)
+        return {"content": [{"type": "text", "text": "Handoff recorded. End your turn now."}]}
+
+    return [record_handoff_tool]
@@ -0,0 +1,283 @@
+"""
+npm Install Cache
+=================
+
+Skips `npm install` / `npm ci` runs that can't change anything, and seeds
+node_modules from a content-addressed cache shared by every project on the
+machine (parallel generations of the same spec usually resolve to the same
+package-lock.json).
+
+An install is keyed by the sha256 of package.json and package-lock.json.
+After a successful install the key is recorded in .harness/npm_install.json
+(next to package.json), together with the mtime of npm's own
+node_modules/.package-lock.json so an install made outside the harness
+invalidates the record, and a copy of node_modules is stored in the shared
+cache under that key. Files are copied, not hardlinked, both ways: a
+postinstall script, patch-package or an agent editing a dependency changes
+node_modules in place, which must not reach the cache or other projects. When the agent runs a plain
+`npm install` or `npm ci` (no package arguments, not chained with other
+commands):
+
+- if node_modules was installed from the same key, the command is skipped
+- else, if the shared cache holds the key, node_modules is restored from it
+  and the command is skipped
+- otherwise npm runs as usual (and its result is recorded and cached)
+
+Skipped commands are reported to the agent as a blocked tool call whose
+reason says the install is already up to date.
+
+The cache lives in ~/.cache/linear-agent-harness/node_modules unless
+HARNESS_NPM_CACHE_DIR says otherwise ("off" disables the shared cache; the
+skip still applies).
+"""
+
+import asyncio
+import hashlib
+import os
+import shlex
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from security import parse_command
+from state_store import HARNESS_DIR, state_file
+
+
+NPM_CACHE_DIR_ENV = "HARNESS_NPM_CACHE_DIR"
+DEFAULT_NPM_CACHE_DIR = Path.home() / ".cache" / "linear-agent-harness" / "node_modules"
+# Least recently used cache entries beyond this count are removed
+MAX_CACHE_ENTRIES = 20
+
+# Relative to the directory holding package.json
+INSTALL_RECORD = f"{HARNESS_DIR}/npm_install.json"
+# Written by npm at the end of every successful install
+NPM_HIDDEN_LOCKFILE = ".package-lock.json"
+# Project-specific build caches inside node_modules that are not shared
+CACHE_EXCLUDED = frozenset({".cache", ".vite"})
+INSTALL_SUBCOMMANDS = frozenset({"install", "i", "ci"})
+
+# tool_use_id -> (install, start time) for installs the hook let through
+_pending_installs: dict[str, tuple["NpmInstall", float]] = {}
+
+
+@dataclass(frozen=True)
+class NpmInstall:
+    """A plain npm install/ci of a directory's lockfile."""
+
+    directory: Path
+    subcommand: str
+
+
+def parse_npm_install(command: str, cwd: Path) -> Optional["NpmInstall"]:
+    """
+    Recognize a plain `npm install`/`npm i`/`npm ci` (flags and --prefix only).
+
+    Returns None for anything else, including installs of named packages and
+    installs chained with other commands.
+    """
+    segments = parse_command(command.strip()).segments
+    if len(segments) != 1 or segments[0].commands != ("npm",):
+        return None
+    tokens = shlex.split(segments[0].text)
+    if len(tokens) < 2 or tokens[0] != "npm" or tokens[1] not in INSTALL_SUBCOMMANDS:
+        return None
+
+    directory = cwd
+    args = iter(tokens[2:])
+    for token in args:
+        if token == "--prefix":
+            directory = cwd / next(args, ".")
+        elif token.startswith("--prefix="):
+            directory = cwd / token.split("=", 1)[1]
+        elif not token.startswith("-"):
+            return None  # Installing a named package changes package.json
+    return NpmInstall(directory=directory, subcommand=tokens[1])
+
+
+def lock_hash(directory: Path) -> Optional[str]:
+    """Install key for a directory (None without package.json and package-lock.json)."""
+    digest = hashlib.sha256()
+    for name in ("package.json", "package-lock.json"):
+        try:
+            digest.update((directory / name).read_bytes())
+        except OSError:
+            return None
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def shared_cache_dir() -> Optional[Path]:
+    """The shared cache directory (None if disabled)."""
+    configured = os.environ.get(NPM_CACHE_DIR_ENV)
+    if configured is None:
+        return DEFAULT_NPM_CACHE_DIR
+    if configured.strip().lower() in ("", "off"):
+        return None
+    return Path(configured).expanduser()
+
+
+def installed_hash(directory: Path) -> Optional[str]:
+    """Key node_modules was last installed from (None if unknown)."""
+    try:
+        lockfile_mtime_ns = (directory / "node_modules" / NPM_HIDDEN_LOCKFILE).stat().st_mtime_ns
+    except OSError:
+        return None
+    record = state_file(directory / INSTALL_RECORD).read() or {}
+    if record.get("lockfile_mtime_ns") != lockfile_mtime_ns:
+        # node_modules was reinstalled or replaced since the record was written
+        return None
+    return record.get("lock_hash")
+
+
+def record_install(directory: Path, key: str, source: str) -> None:
+    try:
+        lockfile_mtime_ns = (directory / "node_modules" / NPM_HIDDEN_LOCKFILE).stat().st_mtime_ns
+    except OSError:
+        lockfile_mtime_ns = None
+    state_file(directory / INSTALL_RECORD).write({
+        "lock_hash": key,
+        "source": source,
+        "installed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "lockfile_mtime_ns": lockfile_mtime_ns,
+    })
+
+
+def _copy_tree(src: Path, dst: Path) -> None:
+    shutil.copytree(
+        src, dst,
+        symlinks=True,
+        ignore=lambda directory, names: [name for name in names if name in CACHE_EXCLUDED],
+    )
+
+
+def restore_from_cache(directory: Path, key: str) -> bool:
+    """Replace node_modules with the shared cache's copy for this key (False on a miss)."""
+    root = shared_cache_dir()
+    if root is None or not (root / key / "node_modules").is_dir():
+        return False
+
+    staging = Path(tempfile.mkdtemp(dir=directory, prefix=".node_modules."))
+    try:
+        _copy_tree(root / key / "node_modules", staging / "node_modules")
+        shutil.rmtree(directory / "node_modules", ignore_errors=True)
+        os.rename(staging / "node_modules", directory / "node_modules")
+    except OSError as e:
+        print(f"npm cache: could not restore node_modules in {directory}: {e}")
+        return False
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    os.utime(root / key)
+    record_install(directory, key, "cache")
+    return True
+
+
+def store_in_cache(directory: Path, key: str) -> bool:
+    """Add a directory's node_modules to the shared cache (False if already cached or disabled)."""
+    root = shared_cache_dir()
+    if root is None or not (directory / "node_modules").is_dir():
+        return False
+    if (root / key).exists():
+        os.utime(root / key)
+        return False
+
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=root, prefix=".staging."))
+    try:
+        _copy_tree(directory / "node_modules", staging / "node_modules")
+        os.rename(staging, root / key)
+    except OSError as e:
+        # Includes another project storing the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+        if not (root / key).exists():
+            print(f"npm cache: could not store node_modules from {directory}: {e}")
+        return False
+
+    prune_cache(root)
+    return True
+
+
+def prune_cache(root: Path, keep: int = MAX_CACHE_ENTRIES) -> None:
+    """Remove the least recently used entries beyond `keep`."""
+    entries = sorted(
+        (entry for entry in root.iterdir() if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in entries[keep:]:
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def try_skip_install(install: NpmInstall) -> Optional[str]:
+    """
+    Make node_modules current without running npm, if possible.
+
+    Returns:
+        Why npm doesn't need to run, or None if it does
+    """
+    key = lock_hash(install.directory)
+    if key is None:
+        return None
+    if installed_hash(install.directory) == key:
+        return "package.json and package-lock.json are unchanged since the last successful install"
+    if restore_from_cache(install.directory, key):
+        return "node_modules was restored from the shared install cache for this exact package-lock.json"
+    return None
+
+
+def finish_install(install: NpmInstall, started: float) -> bool:
+    """Record and cache a completed install (False if npm didn't finish one)."""
+    hidden_lockfile = install.directory / "node_modules" / NPM_HIDDEN_LOCKFILE
+    try:
+        finished = hidden_lockfile.stat().st_mtime >= started - 1
+    except OSError:
+        return False
+    key = lock_hash(install.directory)
+    if not finished or key is None:
+        return False
+
+    record_install(install.directory, key, "npm")
+    store_in_cache(install.directory, key)
+    return True
+
+
+async def npm_install_skip_hook(input_data, tool_use_id=None, context=None):
+    """
+    Pre-tool-use hook that short-circuits npm installs that can't change anything.
+
+    Returns:
+        Empty dict to run the command, or a block whose reason tells the agent
+        the install is already up to date
+    """
+    if input_data.get("tool_name") != "Bash" or not input_data.get("cwd"):
+        return {}
+
+    command = input_data.get("tool_input", {}).get("command", "")
+    install = parse_npm_install(command, Path(input_data["cwd"]))
+    if install is None:
+        return {}
+
+    reason = await asyncio.to_thread(try_skip_install, install)
+    if reason is None:
+        _pending_installs[tool_use_id or command] = (install, time.time())
+        return {}
+    return {
+        "decision": "block",
+        "reason": f"Skipped `{command.strip()}`: {reason}, so node_modules is up to date. "
+        "This is not an error - continue as if the install succeeded.",
+    }
+
+
+async def npm_install_record_hook(input_data, tool_use_id=None, context=None):
+    """Post-tool-use hook that records successful npm installs and adds them to the shared cache."""
+    if input_data.get("tool_name") != "Bash":
+        return {}
+
+    command = input_data.get("tool_input", {}).get("command", "")
+    pending = _pending_installs.pop(tool_use_id or command, None)
+    if pending is not None:
+        await asyncio.to_thread(finish_install, *pending)
+    return {}
@@ -0,0 +1,317 @@
+"""
+Multi-Project Orchestrator
+==========================
+
+Runs the agent loop for many projects from one process and one event loop,
+instead of one Python process (with its own Puppeteer server and Chromium)
+per project.
+
+Projects are listed in a JSON manifest:
+
+    {
+      "max_concurrent_sessions": 4,
+      "screenshot_budget": 15,
+      "defaults": {"model": "claude-opus-4-5-20251101", "max_iterations": 20},
+      "projects": [
+        {"project_dir": "todo_app"},
+        {"project_dir": "chat_clone", "model": "claude-sonnet-4-5-20250929"}
+      ]
+    }
+
+Every project runs its own session loop (with its own backoff and progress
+tracking), but a session only starts once it holds one of the
+max_concurrent_sessions slots. Free slots go to the waiting project that has
+had the fewest sessions so far, so a project with short sessions can't starve
+the others.
+
+With shared MCP servers, one Linear MCP connection serves every session, and
+each slot owns one warm Puppeteer server that its sessions use one at a time
+(a browser is never shared by two sessions at once). The number of Chromium
+processes is bounded by the slot count instead of the project count. Each
+slot's screenshots are deduplicated and limited to screenshot_budget per
+session (see screenshots.py).
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from agent import run_autonomous_agent
+from client import create_client
+from mcp_pool import McpPoolGroup, McpServerPool
+from progress import print_progress_summary
+from screenshots import ScreenshotGovernor
+
+
+DEFAULT_MAX_CONCURRENT_SESSIONS = 4
+
+# Relative project paths are placed in this directory (as with --project-dir)
+GENERATIONS_DIR = Path("generations")
+
+
+def generation_dir(project_dir: Path) -> Path:
+    """Place relative project paths under generations/ (absolute paths are used as-is)."""
+    if project_dir.is_absolute() or str(project_dir).startswith(f"{GENERATIONS_DIR}/"):
+        return project_dir
+    return GENERATIONS_DIR / project_dir
+
+
+class ManifestError(Exception):
+    """Raised when the project manifest is missing or malformed."""
+
+
+@dataclass
+class ProjectSpec:
+    """One project entry of the manifest."""
+
+    project_dir: Path
+    model: str
+    max_iterations: Optional[int] = None
+    event_log: Optional[Path] = None
+
+    @property
+    def name(self) -> str:
+        return str(self.project_dir)
+
+
+@dataclass
+class Manifest:
+    """Projects to run, the global session cap and the per-session screenshot budget."""
+
+    projects: list[ProjectSpec]
+    max_concurrent_sessions: int = DEFAULT_MAX_CONCURRENT_SESSIONS
+    screenshot_budget: Optional[int] = None
+
+
+def load_manifest(path: Path, default_model: str) -> Manifest:
+    """
+    Load and validate a project manifest.
+
+    Args:
+        path: Manifest JSON file
+        default_model: Model for projects that set none (here or in "defaults")
+
+    Raises:
+        ManifestError: If the file can't be read or an entry is invalid
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        raise ManifestError(f"Could not read manifest {path}: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("projects"), list) or not data["projects"]:
+        raise ManifestError("Manifest must be an object with a non-empty \"projects\" array")
+
+    defaults = data.get("defaults") or {}
+    projects: list[ProjectSpec] = []
+    seen: set[Path] = set()
+    for index, entry in enumerate(data["projects"]):
+        if isinstance(entry, str):
+            entry = {"project_dir": entry}
+        if not isinstance(entry, dict) or not entry.get("project_dir"):
+            raise ManifestError(f"projects[{index}]: project_dir is required")
+
+        settings = {**defaults, **entry}
+        project_dir = generation_dir(Path(settings["project_dir"]))
+        if project_dir.resolve() in seen:
+            raise ManifestError(f"projects[{index}]: {project_dir} is listed twice")
+        seen.add(project_dir.resolve())
+
+        max_iterations = settings.get("max_iterations")
+        if max_iterations is not None and (not isinstance(max_iterations, int) or max_iterations < 1):
+            raise ManifestError(f"projects[{index}]: max_iterations must be a positive integer")
+
+        event_log = settings.get("event_log")
+        projects.append(
+            ProjectSpec(
+                project_dir=project_dir,
+                model=settings.get("model") or default_model,
+                max_iterations=max_iterations,
+                event_log=Path(event_log) if event_log else None,
+            )
+        )
+
+    max_concurrent = data.get("max_concurrent_sessions", DEFAULT_MAX_CONCURRENT_SESSIONS)
+    if not isinstance(max_concurrent, int) or max_concurrent < 1:
+        raise ManifestError("max_concurrent_sessions must be a positive integer")
+
+    screenshot_budget = data.get("screenshot_budget")
+    if screenshot_budget is not None and (not isinstance(screenshot_budget, int) or screenshot_budget < 0):
+        raise ManifestError("screenshot_budget must be a non-negative integer")
+
+    return Manifest(projects=projects, max_concurrent_sessions=max_concurrent, screenshot_budget=screenshot_budget)
+
+
+class FairScheduler:
+    """
+    Hands out a fixed number of session slots across projects.
+
+    A released slot goes to the waiting project with the fewest slots granted
+    so far (ties in arrival order), rather than to whoever asked first.
+
+    Args:
+        slots: Maximum number of sessions running at once
+    """
+
+    def __init__(self, slots: int):
+        self._free = list(range(slots))
+        self._waiting: list[tuple[int, int, str, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self.granted: Counter = Counter()
+
+    async def acquire(self, project: str) -> int:
+        """Wait for a free slot and return its number."""
+        if self._free and not self._waiting:
+            return self._grant(project, self._free.pop(0))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (self.granted[project], next(self._arrivals), project, future))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: pass the slot on
+                self.release(future.result())
+            raise
+
+    def release(self, slot: int) -> None:
+        """Return a slot, waking the least-served waiting project."""
+        while self._waiting:
+            _, _, project, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(self._grant(project, slot))
+                return
+        self._free.append(slot)
+
+    def _grant(self, project: str, slot: int) -> int:
+        self.granted[project] += 1
+        return slot
+
+
+class ScheduledSession:
+    """
+    Client wrapper that holds a scheduler slot for the duration of a session.
+
+    The agent loop enters it like a ClaudeSDKClient; entering waits for a slot,
+    then creates the real client with the slot's MCP servers attached.
+    """
+
+    def __init__(
+        self,
+        scheduler: FairScheduler,
+        project: ProjectSpec,
+        client_factory: Callable[..., Any],
+        slot_pools: Optional[list[Any]] = None,
+    ):
+        self.scheduler = scheduler
+        self.project = project
+        self.client_factory = client_factory
+        self.slot_pools = slot_pools
+        self.slot: Optional[int] = None
+        self.client: Any = None
+
+    async def __aenter__(self) -> "ScheduledSession":
+        self.slot = await self.scheduler.acquire(self.project.name)
+        try:
+            mcp_pool = self.slot_pools[self.slot] if self.slot_pools else None
+            if mcp_pool is not None:
+                await mcp_pool.ensure_healthy()
+                mcp_pool.begin_session()
+            print(f"\n[{self.project.name}] Session starting in slot {self.slot}")
+            self.client = self.client_factory(self.project.project_dir, self.project.model, mcp_pool)
+            await self.client.__aenter__()
+        except BaseException:
+            self.scheduler.release(self.slot)
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.client.__aexit__(*exc_info)
+        finally:
+            self.scheduler.release(self.slot)
+
+    async def query(self, prompt: str) -> None:
+        await self.client.query(prompt)
+
+    def receive_response(self):
+        return self.client.receive_response()
+
+    async def interrupt(self) -> None:
+        await self.client.interrupt()
+
+
+async def run_project(
+    project: ProjectSpec,
+    scheduler: FairScheduler,
+    client_factory: Callable[..., Any],
+    slot_pools: Optional[list[Any]] = None,
+) -> None:
+    """Run one project's agent loop, with every session gated by the scheduler."""
+    try:
+        await run_autonomous_agent(
+            project_dir=project.project_dir,
+            model=project.model,
+            max_iterations=project.max_iterations,
+            event_log=project.event_log,
+            client_factory=lambda *args: ScheduledSession(scheduler, project, client_factory, slot_pools),
+        )
+    except Exception as e:
+        # One broken project must not stop the others
+        print(f"\n[{project.name}] Stopped with an error: {e}")
+
+
+async def run_orchestrator(
+    manifest: Manifest,
+    share_mcp_servers: bool = True,
+    client_factory: Callable[..., Any] = create_client,
+) -> None:
+    """
+    Run every project in the manifest concurrently from this event loop.
+
+    Args:
+        manifest: Projects and global session cap
+        share_mcp_servers: Share one Linear MCP connection across all sessions
+            and keep one warm Puppeteer server per slot (False to spawn fresh
+            servers per session)
+        client_factory: Creates the client for each session
+    """
+    scheduler = FairScheduler(manifest.max_concurrent_sessions)
+
+    print("\n" + "=" * 70)
+    print(f"  ORCHESTRATOR: {len(manifest.projects)} PROJECTS, {manifest.max_concurrent_sessions} SESSION SLOTS")
+    print("=" * 70)
+    for project in manifest.projects:
+        print(f"  - {project.project_dir} ({project.model}, max iterations: {project.max_iterations or 'unlimited'})")
+
+    async with AsyncExitStack() as stack:
+        slot_pools = None
+        if share_mcp_servers:
+            linear_pool = await stack.enter_async_context(
+                McpServerPool(os.environ.get("LINEAR_API_KEY"), puppeteer=False)
+            )
+            slot_pools = []
+            for _ in range(manifest.max_concurrent_sessions):
+                browser_pool = await stack.enter_async_context(
+                    McpServerPool(screenshots=ScreenshotGovernor(manifest.screenshot_budget))
+                )
+                slot_pools.append(McpPoolGroup(linear_pool, browser_pool))
+
+        await asyncio.gather(
+            *(run_project(project, scheduler, client_factory, slot_pools) for project in manifest.projects)
+        )
+
+    print("\n" + "=" * 70)
+    print("  ORCHESTRATOR COMPLETE")
+    print("=" * 70)
+    for project in manifest.projects:
+        print(f"\n{project.project_dir} ({scheduler.granted[project.name]} sessions):")
+        print_progress_summary(project.project_dir)
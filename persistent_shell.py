@@ -0,0 +1,367 @@
+"""
+Persistent Shell
+================
+
+Opt-in (--persistent-shell) harness tool, mcp__harness__shell, that runs
+the agent's short read-only shell commands in one bash process held open for
+the whole session. A built-in Bash call sets up a fresh shell, and the sandbox
+around it, for every `ls`, `cat` or `git status`. A call to the persistent
+shell only writes the command to the already-running bash.
+
+Every command goes through the same pre- and post-tool-use hooks as a
+built-in Bash call, passed in by client.py, before and after it runs. The
+security hook (evaluate_command) is one of them, so the allow and block
+decisions are the same ones Bash gets. The npm install skip and the output
+cap apply the same way.
+
+The shell runs outside the CLI's OS-level sandbox, so on top of the hooks it
+only runs single-line commands that neither execute code nor write files:
+the SHELL_COMMANDS below, called by bare name, with no variable assignments,
+command substitution, heredocs or redirection into files (see
+shell_command_refusal).
+node, npm, git and ./init.sh can run scripts the agent wrote (git through
+hooks and repository config) and stay with the sandboxed Bash tool, as does
+anything else the shell refuses. Each command's output goes to a
+file rather than the shell's pipe, so a job it leaves in the background
+can't write into later results. A command that times out, or that kills
+the shell, gets a fresh shell for the next call. The shell is closed when
+the session ends.
+"""
+
+import asyncio
+import itertools
+import os
+import secrets
+import shlex
+import shutil
+import signal
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+from security import SHELL_KEYWORDS, parse_command
+
+
+DEFAULT_TIMEOUT_SECONDS = 120
+MAX_TIMEOUT_SECONDS = 600
+
+# Harness credentials the agent's commands have no use for
+SECRET_ENV_VARS = ("CLAUDE_CODE_OAUTH_TOKEN", "LINEAR_API_KEY")
+
+# Allowlisted commands the shell runs: they only read files and processes
+SHELL_COMMANDS = frozenset({"ls", "cat", "head", "tail", "wc", "grep", "pwd", "ps", "lsof", "sleep"})
+
+# Expansions that run a command of their own
+COMMAND_EXPANSIONS = ("$(", "`", "<(", ">(")
+
+# Constructs the allowlist parser reads past: each could hide a second command
+# from it on a later line, and none is needed for a one-line read-only command
+UNCHECKED_CONSTRUCTS = ("\n", "\r", "<<", "$((")
+
+# Redirections that write to a file (anything but /dev/null)
+FILE_REDIRECTS = {">", ">>", ">|", "&>", "&>>"}
+
+SHELL_REFUSAL_HINT = "The persistent shell runs outside the sandbox and only runs read-only commands; use Bash for this."
+
+Hook = Callable[..., Awaitable[dict]]
+
+# Whether create_client serves the tool (see configure_persistent_shell)
+_enabled = False
+
+
+def configure_persistent_shell(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def persistent_shell_enabled() -> bool:
+    return _enabled
+
+
+class PersistentShell:
+    """
+    One long-lived bash process running commands in project_dir, one at a time.
+
+    Args:
+        project_dir: Working directory of the shell
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir.resolve()
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.output_dir: Optional[Path] = None
+        self.lock = asyncio.Lock()
+        self.commands_run = 0
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def _start(self) -> None:
+        env = {name: value for name, value in os.environ.items() if name not in SECRET_ENV_VARS}
+        # Relative PATH entries would resolve a bare command name to a file in the project
+        env["PATH"] = os.pathsep.join(
+            entry for entry in env.get("PATH", os.defpath).split(os.pathsep) if os.path.isabs(entry)
+        )
+        self.output_dir = Path(tempfile.mkdtemp(prefix="harness-shell-"))
+        self.process = await asyncio.create_subprocess_exec(
+            "bash", "--noprofile", "--norc",
+            cwd=self.project_dir,
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            # Own process group, so a timeout can stop everything the command started
+            start_new_session=True,
+        )
+
+    async def run(self, command: str, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> tuple[Optional[int], str]:
+        """
+        Run one command and return (exit status, combined stdout and stderr).
+
+        The status is None if the command timed out or the shell died.
+        """
+        async with self.lock:
+            if not self.running:
+                await self.close()
+                await self._start()
+            self.commands_run += 1
+            output_file = self.output_dir / f"{self.commands_run}.out"
+            marker = f"__harness_done_{secrets.token_hex(8)}"
+            script = (
+                f"{{\n{command}\n}} </dev/null >{shlex.quote(str(output_file))} 2>&1\n"
+                f"printf '{marker} %d\\n' $?\n"
+            )
+            shell_output: list[str] = []
+            self.process.stdin.write(script.encode())
+            try:
+                await self.process.stdin.drain()
+                status = await asyncio.wait_for(self._read_status(marker, shell_output), timeout)
+            except asyncio.TimeoutError:
+                status = None
+                shell_output.append(f"[harness: command timed out after {timeout:.0f}s; the shell was restarted]")
+            except ConnectionError:
+                status = None
+
+            output = self._read_output(output_file)
+            if status is None:
+                if not shell_output or not shell_output[-1].startswith("[harness:"):
+                    # The shell exited (a syntax error ends a non-interactive bash)
+                    shell_output.append("[harness: the shell exited; a fresh one will run the next command]")
+                await self.close()
+            else:
+                output_file.unlink(missing_ok=True)
+            return status, "\n".join(filter(None, [output, *shell_output]))
+
+    async def _read_status(self, marker: str, shell_output: list[str]) -> Optional[int]:
+        """
+        Read the shell's own output up to the completion marker and return the exit status.
+
+        Anything else the shell prints (its own error messages) is added to
+        shell_output. Returns None if the shell exits first.
+        """
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                return None
+            text = line.decode(errors="replace").rstrip("\n")
+            if text.startswith(marker):
+                return int(text.rsplit(" ", 1)[1])
+            shell_output.append(text)
+
+    @staticmethod
+    def _read_output(path: Path) -> str:
+        try:
+            return path.read_text(errors="replace").rstrip()
+        except OSError:
+            return ""
+
+    async def close(self) -> None:
+        """Stop the shell and everything it started."""
+        process, self.process = self.process, None
+        if process is not None and process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            await process.wait()
+        if self.output_dir is not None:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+            self.output_dir = None
+
+
+# One shell per project directory, for the current session
+_shells: dict[Path, PersistentShell] = {}
+
+_call_ids = itertools.count(1)
+
+
+def get_persistent_shell(project_dir: Path) -> PersistentShell:
+    key = project_dir.resolve()
+    if key not in _shells:
+        _shells[key] = PersistentShell(project_dir)
+    return _shells[key]
+
+
+async def close_persistent_shell(project_dir: Path) -> None:
+    """Close the project's shell, if one was started (called when a session ends)."""
+    shell = _shells.pop(project_dir.resolve(), None)
+    if shell is not None:
+        await shell.close()
+
+
+def shell_command_refusal(command: str) -> Optional[str]:
+    """
+    Why the persistent shell won't run a command, on top of the Bash hooks.
+
+    Every command must be one of SHELL_COMMANDS, called by bare name (not a
+    path, which could be a script the agent wrote). Multi-line commands,
+    heredocs, arithmetic expansion, variable assignments, command
+    substitution and redirection into files are refused too.
+
+    Returns:
+        The reason, or None if the shell may run the command
+    """
+    if any(construct in command for construct in UNCHECKED_CONSTRUCTS):
+        return (
+            f"Only single-line commands without heredocs or arithmetic are run in the persistent shell. "
+            f"{SHELL_REFUSAL_HINT}"
+        )
+    if any(expansion in command for expansion in COMMAND_EXPANSIONS):
+        return f"Command substitution is not run in the persistent shell. {SHELL_REFUSAL_HINT}"
+
+    parsed = parse_command(command)
+    if not parsed.segments:
+        return f"Could not parse command for security validation: {command}"
+
+    for segment in parsed.segments:
+        lexer = shlex.shlex(segment.text, posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True
+        try:
+            tokens = list(lexer)
+        except ValueError:
+            return f"Could not parse command for security validation: {command}"
+
+        words = [token for token in tokens if token not in SHELL_KEYWORDS]
+        if words:
+            name = words[0]
+            if "=" in name:
+                return f"Variable assignments are not run in the persistent shell. {SHELL_REFUSAL_HINT}"
+            if name not in SHELL_COMMANDS:
+                return f"'{name}' is not run in the persistent shell. {SHELL_REFUSAL_HINT}"
+
+        for operator, target in zip(tokens, tokens[1:] + [""]):
+            writes = operator in FILE_REDIRECTS and target != "/dev/null"
+            if writes or (operator == ">&" and not (target.isdigit() or target == "-")):
+                return f"Redirecting output to a file is not done in the persistent shell. {SHELL_REFUSAL_HINT}"
+
+    return None
+
+
+def _bash_call(project_dir: Path, command: str, event: str) -> dict:
+    """Hook input describing the command as a Bash tool call."""
+    return {
+        "hook_event_name": event,
+        "session_id": "",
+        "cwd": str(project_dir.resolve()),
+        "tool_name": "Bash",
+        "tool_input": {"command": command},
+    }
+
+
+async def prepare_shell_command(
+    project_dir: Path,
+    command: str,
+    pre_hooks: tuple[Hook, ...],
+    tool_use_id: str = "",
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Run the pre-hooks on a command, as for a Bash call, then shell_command_refusal.
+
+    Returns:
+        (reason, None) if a hook blocks the command or the shell refuses it,
+        else (None, command to run with any hook's rewrite applied)
+    """
+    input_data = _bash_call(project_dir, command, "PreToolUse")
+    to_run = command
+    for hook in pre_hooks:
+        output = await hook(input_data, tool_use_id, {"signal": None}) or {}
+        if output.get("decision") == "block":
+            return output.get("reason", "Blocked by hook"), None
+        to_run = (output.get("hookSpecificOutput") or {}).get("updatedInput", {}).get("command", to_run)
+    # Checked on the agent's command: hook rewrites (the output cap's wrapper) are the harness's own
+    refusal = shell_command_refusal(command)
+    if refusal is not None:
+        return refusal, None
+    return None, to_run
+
+
+async def run_shell_command(
+    project_dir: Path,
+    command: str,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    pre_hooks: tuple[Hook, ...] = (),
+    post_hooks: tuple[Hook, ...] = (),
+) -> str:
+    """
+    Run a command in the project's persistent shell, as a Bash call would be run.
+
+    A command a pre-hook blocks doesn't run; the hook's reason is returned
+    instead. Post-hooks see the result, and a reason they give is appended.
+    """
+    tool_use_id = f"shell-{next(_call_ids)}"
+    reason, to_run = await prepare_shell_command(project_dir, command, pre_hooks, tool_use_id)
+    if reason is not None:
+        return reason
+
+    status, text = await get_persistent_shell(project_dir).run(to_run, timeout)
+    if status:
+        text = f"{text}\n[exit status {status}]".lstrip("\n")
+
+    notes = []
+    for hook in post_hooks:
+        input_data = {**_bash_call(project_dir, command, "PostToolUse"), "tool_response": text}
+        output = await hook(input_data, tool_use_id, {"signal": None}) or {}
+        if output.get("decision") == "block":
+            notes.append(output.get("reason", ""))
+    return "\n\n".join([text or "(no output)", *filter(None, notes)])
+
+
+def create_shell_tools(
+    project_dir: Path,
+    pre_hooks: tuple[Hook, ...],
+    post_hooks: tuple[Hook, ...],
+) -> list[SdkMcpTool]:
+    """Build the in-process MCP tool for the persistent shell, guarded by the Bash hooks."""
+
+    @tool(
+        "shell",
+        "Run a short one-line read-only command (ls, cat, head, tail, wc, grep, ps, lsof) in a shell that "
+        "stays open for the session, which is faster than Bash. Pipes and && work; output and exit status are "
+        "returned. Commands that run code or write files (node, npm, git, ./init.sh, > file, $(...), heredocs) "
+        f"are refused: use Bash for those, and for commands that run in the background or need more than "
+        f"{MAX_TIMEOUT_SECONDS}s.",
+        {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "The command to run"},
+                "timeout": {
+                    "type": "number",
+                    "description": f"Seconds before the command is stopped (default {DEFAULT_TIMEOUT_SECONDS}, "
+                    f"max {MAX_TIMEOUT_SECONDS})",
+                },
+            },
+            "required": ["command"],
+        },
+    )
+    async def shell(args):
+        command = str(args.get("command") or "")
+        if not command.strip():
+            return {"content": [{"type": "text", "text": "No command given"}]}
+        timeout = min(float(args.get("timeout") or DEFAULT_TIMEOUT_SECONDS), MAX_TIMEOUT_SECONDS)
+        text = await run_shell_command(project_dir, command, timeout, pre_hooks, post_hooks)
+        return {"content": [{"type": "text", "text": text}]}
+
+    return [shell]
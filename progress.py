@@ -3,13 +3,22 @@ Progress Tracking Utilities
 ===========================
 
 Functions for tracking and displaying progress of the autonomous coding agent.
-Progress is tracked via Linear issues, with local state cached in .linear_project.json.
+Progress is tracked via Linear issues, with local state cached in .linear_project.json
+and issue states in the harness's local snapshot (.harness/linear_issues.json). Both are
+read through the state store, so repeated checks only re-parse changed files.
 """
 
-import json
 from pathlib import Path
 
-from linear_config import LINEAR_PROJECT_MARKER
+from linear_config import (
+    ISSUE_CACHE_FILE,
+    LINEAR_PROJECT_MARKER,
+    META_ISSUE_TITLE,
+    STATUS_DONE,
+    STATUS_IN_PROGRESS,
+    STATUS_TODO,
+)
+from state_store import state_file
 
 
 def load_linear_project_state(project_dir: Path) -> dict | None:
@@ -22,16 +31,8 @@ def load_linear_project_state(project_dir: Path) -> dict | None:
     Returns:
         Project state dict or None if not initialized
     """
-    marker_file = project_dir / LINEAR_PROJECT_MARKER
-
-    if not marker_file.exists():
-        return None
-
-    try:
-        with open(marker_file, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return None
+    state = state_file(project_dir / LINEAR_PROJECT_MARKER).read()
+    return state if isinstance(state, dict) else None
 
 
 def is_linear_initialized(project_dir: Path) -> bool:
@@ -48,6 +49,52 @@ def is_linear_initialized(project_dir: Path) -> bool:
     return state is not None and state.get("initialized", False)
 
 
+def load_issue_counts(project_dir: Path) -> dict[str, int] | None:
+    """
+    Count issues per workflow state from the local issue snapshot.
+
+    The META tracking issue is excluded, since it stays open for the whole
+    project.
+
+    Args:
+        project_dir: Project directory (the snapshot is .harness/linear_issues.json)
+
+    Returns:
+        {state name: count}, or None if no snapshot has been synced yet
+    """
+    snapshot = state_file(project_dir / ISSUE_CACHE_FILE).read()
+    issues = snapshot.get("issues", {}) if isinstance(snapshot, dict) else {}
+    if not issues:
+        return None
+
+    state = load_linear_project_state(project_dir) or {}
+    meta_issue_id = state.get("meta_issue_id")
+
+    counts: dict[str, int] = {}
+    for issue_id, issue in issues.items():
+        if meta_issue_id in (issue_id, issue.get("identifier")) or issue.get("title") == META_ISSUE_TITLE:
+            continue
+        status = (issue.get("state") or {}).get("name", "")
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def count_remaining(counts: dict[str, int]) -> int:
+    """Number of issues still waiting to be worked (Todo or In Progress)."""
+    return counts.get(STATUS_TODO, 0) + counts.get(STATUS_IN_PROGRESS, 0)
+
+
+def is_backlog_complete(project_dir: Path) -> bool:
+    """
+    Check whether the local snapshot has no Todo or In Progress issues left.
+
+    Returns False when there is no snapshot yet, so an unsynced project is
+    never mistaken for a finished one.
+    """
+    counts = load_issue_counts(project_dir)
+    return bool(counts) and count_remaining(counts) == 0
+
+
 def print_session_header(session_num: int, is_initializer: bool) -> None:
     """Print a formatted header for the session."""
     session_type = "INITIALIZER" if is_initializer else "CODING AGENT"
@@ -62,9 +109,8 @@ def print_progress_summary(project_dir: Path) -> None:
     """
     Print a summary of current progress.
 
-    Since actual progress is tracked in Linear, this reads the local
-    state file for cached information. The agent updates Linear directly
-    and reports progress in session comments.
+    Counts come from the harness's local issue snapshot, which is refreshed
+    from Linear before each session and updated as the agent changes issues.
     """
     state = load_linear_project_state(project_dir)
 
@@ -74,8 +120,21 @@ def print_progress_summary(project_dir: Path) -> None:
 
     total = state.get("total_issues", 0)
     meta_issue = state.get("meta_issue_id", "unknown")
+    counts = load_issue_counts(project_dir)
 
     print(f"\nLinear Project Status:")
     print(f"  Total issues created: {total}")
     print(f"  META issue ID: {meta_issue}")
-    print(f"  (Check Linear for current Done/In Progress/Todo counts)")
+    if not counts:
+        print(f"  (Check Linear for current Done/In Progress/Todo counts)")
+        return
+
+    done = counts.get(STATUS_DONE, 0)
+    tracked = sum(counts.values())
+    print(f"  Done: {done}/{tracked} ({done / tracked:.0%})")
+    print(f"  In Progress: {counts.get(STATUS_IN_PROGRESS, 0)}")
+    print(f"  Todo: {counts.get(STATUS_TODO, 0)}")
+    other = {status: n for status, n in counts.items() if status not in (STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO)}
+    for status, n in sorted(other.items()):
+        print(f"  {status or 'Unknown'}: {n}")
+    print(f"  Remaining: {count_remaining(counts)}")
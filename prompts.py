@@ -3,19 +3,53 @@ Prompt Loading Utilities
 ========================
 
 Functions for loading prompt templates from the prompts directory.
+Templates are read and compiled once per process, then filled in with
+per-session values.
 """
 
 import shutil
+from functools import lru_cache
 from pathlib import Path
+from string import Template
+from typing import Optional
 
 
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 
+# Filled into $session_context when the harness did not precompute it
+NO_SESSION_CONTEXT = (
+    "(Not precomputed for this session. Orient yourself with `pwd`, `ls -la`,\n"
+    "`cat .linear_project.json`, `git log --oneline -20` and `mcp__harness__issue_summary`,\n"
+    "and read the latest META issue comment with `mcp__linear__list_comments`.)"
+)
+
+# Filled into $verification_targets when the harness selected no regression targets
+NO_VERIFICATION_TARGETS = (
+    "Use `mcp__harness__list_cached_issues` with status \"Done\" to find 1-2\n"
+    "completed features that are core to the app's functionality."
+)
+
+# Filled into $screenshot_notes when screenshots pass through the ScreenshotGovernor
+SCREENSHOT_NOTES = (
+    "\nThe harness replaces a screenshot that looks identical to your previous\n"
+    "screenshot of the same page with a short note, and may cap screenshots per\n"
+    "session. When a note says the budget is used up, keep interacting through the\n"
+    "UI, but check results by reading page content (e.g.\n"
+    "`mcp__puppeteer__puppeteer_evaluate` returning the text of the elements you\n"
+    "are checking).\n"
+)
+
 
 def load_prompt(name: str) -> str:
     """Load a prompt template from the prompts directory."""
+    return load_template(name).template
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    """Load and compile a prompt template (cached for the life of the process)."""
     prompt_path = PROMPTS_DIR / f"{name}.md"
-    return prompt_path.read_text()
+    return Template(prompt_path.read_text())
 
 
 def get_initializer_prompt() -> str:
@@ -23,9 +57,121 @@ def get_initializer_prompt() -> str:
     return load_prompt("initializer_prompt")
 
 
-def get_coding_prompt() -> str:
-    """Load the coding agent prompt."""
-    return load_prompt("coding_prompt")
+def get_coding_prompt(
+    session_context: Optional[str] = None,
+    verification_targets: Optional[str] = None,
+    screenshots_governed: bool = False,
+) -> str:
+    """
+    Load the coding agent prompt.
+
+    Args:
+        session_context: Precomputed context block (see session_context.py)
+        verification_targets: Features to re-test in STEP 4 (see regression.py)
+        screenshots_governed: Whether screenshots pass through the pooled
+            Puppeteer proxy's ScreenshotGovernor (see screenshots.py)
+    """
+    return load_template("coding_prompt").safe_substitute(
+        session_context=session_context or NO_SESSION_CONTEXT,
+        verification_targets=verification_targets or NO_VERIFICATION_TARGETS,
+        screenshot_notes=SCREENSHOT_NOTES if screenshots_governed else "",
+    )
+
+
+def get_worker_prompt(issue: dict, branch: str, session_context: Optional[str] = None) -> str:
+    """
+    Load the coding agent prompt with a parallel-worker assignment appended.
+
+    Args:
+        issue: Linear issue dict (id, identifier, title) claimed for this worker
+        branch: Git branch of the worker's worktree
+        session_context: Precomputed context block for the worker's worktree
+    """
+    assignment = load_template("worker_prompt").safe_substitute(
+        identifier=issue.get("identifier", issue["id"]),
+        title=issue.get("title", ""),
+        issue_id=issue["id"],
+        branch=branch,
+    )
+    return get_coding_prompt(session_context) + assignment
+
+
+def get_resume_prompt(
+    issue: dict,
+    interruption: dict[str, str],
+    session_context: Optional[str] = None,
+    screenshots_governed: bool = False,
+) -> str:
+    """
+    Load the coding agent prompt with instructions to resume an interrupted issue.
+
+    Args:
+        issue: Linear issue dict (id, and identifier/title if known) being resumed
+        interruption: Values describing the interrupted session (see journal.describe_interruption)
+        session_context: Precomputed context block
+        screenshots_governed: Whether screenshots pass through the ScreenshotGovernor
+    """
+    resume = load_template("resume_prompt").safe_substitute(
+        interruption,
+        identifier=issue.get("identifier", issue["id"]),
+        title=issue.get("title", ""),
+        issue_id=issue["id"],
+    )
+    return get_coding_prompt(session_context, screenshots_governed=screenshots_governed) + resume
+
+
+def get_orient_prompt(session_context: Optional[str] = None) -> str:
+    """
+    Load the prompt for the orientation phase of a routed coding session.
+
+    Args:
+        session_context: Precomputed context block
+    """
+    return load_template("orient_prompt").safe_substitute(session_context=session_context or NO_SESSION_CONTEXT)
+
+
+def get_implement_prompt(
+    issue_id: str,
+    handoff: str,
+    session_context: Optional[str] = None,
+    verification_targets: Optional[str] = None,
+    screenshots_governed: bool = False,
+) -> str:
+    """
+    Load the coding agent prompt with the implementation phase instructions appended.
+
+    Args:
+        issue_id: Issue claimed by the orientation phase
+        handoff: The orientation phase's handoff summary
+        session_context: Precomputed context block
+        verification_targets: Features to re-test in STEP 4
+        screenshots_governed: Whether screenshots pass through the ScreenshotGovernor
+    """
+    phase = load_template("implement_prompt").safe_substitute(issue_id=issue_id, handoff=handoff)
+    return get_coding_prompt(session_context, verification_targets, screenshots_governed) + phase
+
+
+def get_bookkeeping_prompt(
+    issue_id: str,
+    handoff: str,
+    issue_done: bool,
+    session_context: Optional[str] = None,
+) -> str:
+    """
+    Load the prompt for the bookkeeping phase of a routed coding session.
+
+    Args:
+        issue_id: Issue the implementation phase worked on
+        handoff: The implementation phase's handoff summary
+        issue_done: Whether the implementation phase verified the issue complete
+        session_context: Precomputed context block
+    """
+    return load_template("bookkeeping_prompt").safe_substitute(
+        issue_id=issue_id,
+        handoff=handoff,
+        issue_done="yes" if issue_done else "no",
+        session_context=session_context or NO_SESSION_CONTEXT,
+    )
 
 
 def copy_spec_to_project(project_dir: Path) -> None:
@@ -0,0 +1,236 @@
+"""
+Regression Test Selection
+=========================
+
+Chooses which Done features a coding session should re-verify, instead of
+having the agent re-test arbitrary features every session.
+
+The harness maps each issue to the files its commits touched, using the
+issue identifiers the agent already puts in its commit messages
+("Linear issue: DEMO-12"). Before a session it looks at the commits made
+since the last verification pass and selects the Done issues whose files
+were changed by other issues' commits. The map and the last verified commit
+are kept in .harness/feature_map.json and updated incrementally.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from issue_cache import get_issue_cache
+from journal import JOURNAL_FILE, head_commit
+from linear_config import STATUS_DONE
+from state_store import HARNESS_DIR, state_file
+
+
+FEATURE_MAP_FILE = f"{HARNESS_DIR}/feature_map.json"
+
+# Most features injected as verification targets per session
+MAX_VERIFICATION_TARGETS = 3
+# Files touched by more than this share of mapped issues (e.g. App.jsx, package.json)
+# say little about which feature a change affects, so they are ignored
+HUB_FILE_SHARE = 0.5
+IGNORED_FILES = frozenset({
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "init.sh", "app_spec.txt",
+    FEATURE_MAP_FILE, JOURNAL_FILE,
+})
+
+ISSUE_IDENTIFIER = re.compile(r"\b[A-Z][A-Z0-9]*-\d+\b")
+RECORD_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+
+
+@dataclass
+class Commit:
+    sha: str
+    message: str
+    files: list[str]
+
+
+@dataclass
+class VerificationTarget:
+    identifier: str
+    title: str
+    shared_files: list[str]
+    score: float
+
+
+@dataclass
+class VerificationPlan:
+    """Verification targets for one session, and the commit range they cover."""
+
+    head: Optional[str]
+    since: Optional[str] = None
+    targets: list[VerificationTarget] = field(default_factory=list)
+
+
+async def _git(project_dir: Path, *args: str) -> tuple[int, str]:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return 1, ""
+    stdout, _ = await process.communicate()
+    return process.returncode, stdout.decode("utf-8", "replace")
+
+
+async def read_commits(project_dir: Path, since: Optional[str], head: str) -> list[Commit]:
+    """Commits in since..head (all history when since is None), oldest first, with changed files."""
+    revision = f"{since}..{head}" if since else head
+    code, out = await _git(
+        project_dir, "log", "--reverse", "--no-renames", "--name-only",
+        f"--format={RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%B{FIELD_SEPARATOR}", revision,
+    )
+    if code != 0:
+        return []
+
+    commits = []
+    for record in out.split(RECORD_SEPARATOR)[1:]:
+        sha, message, files = record.split(FIELD_SEPARATOR, 2)
+        commits.append(Commit(sha=sha, message=message, files=[name for name in files.splitlines() if name.strip()]))
+    return commits
+
+
+def commit_issues(commit: Commit, known: set[str]) -> set[str]:
+    """Issue identifiers (known to the issue cache) mentioned in a commit message."""
+    return {identifier for identifier in ISSUE_IDENTIFIER.findall(commit.message) if identifier in known}
+
+
+async def update_feature_map(project_dir: Path, head: str) -> dict:
+    """Index commits made since the map was last updated (rebuilding it if history was rewritten)."""
+    store = state_file(project_dir / FEATURE_MAP_FILE)
+    data = store.read() or {}
+    indexed = data.get("indexed_through")
+    if indexed == head:
+        return data
+
+    if indexed:
+        ancestor, _ = await _git(project_dir, "merge-base", "--is-ancestor", indexed, head)
+        if ancestor != 0:
+            indexed = None
+            data = {"verified_through": data.get("verified_through")}
+
+    cache = get_issue_cache(project_dir)
+    known = {issue["identifier"] for issue in cache.issues.values() if issue.get("identifier")}
+    files: dict[str, list[str]] = data.get("files", {})
+    for commit in await read_commits(project_dir, indexed, head):
+        for identifier in commit_issues(commit, known):
+            touched = set(files.get(identifier, []))
+            touched.update(commit.files)
+            files[identifier] = sorted(touched)
+
+    data.update({"indexed_through": head, "files": files})
+    await store.write_async(data)
+    return data
+
+
+def rank_targets(
+    files_by_issue: dict[str, list[str]],
+    changes: list[Commit],
+    done: dict[str, str],
+    known: set[str],
+    limit: int = MAX_VERIFICATION_TARGETS,
+) -> list[VerificationTarget]:
+    """
+    Rank Done issues by how much code they share with the changes.
+
+    A commit only counts against issues it doesn't itself mention (a feature's
+    own commits were tested when it was implemented). Each shared file scores
+    1 / (number of issues touching it), so widely shared files weigh little.
+    """
+    touching: dict[str, int] = {}
+    for issue_files in files_by_issue.values():
+        for name in issue_files:
+            touching[name] = touching.get(name, 0) + 1
+    hub_limit = max(2, HUB_FILE_SHARE * len(files_by_issue))
+
+    targets = []
+    for identifier, title in done.items():
+        feature_files = {
+            name for name in files_by_issue.get(identifier, [])
+            if Path(name).name not in IGNORED_FILES and touching.get(name, 0) <= hub_limit
+        }
+        shared: set[str] = set()
+        for commit in changes:
+            if identifier not in commit_issues(commit, known):
+                shared.update(feature_files.intersection(commit.files))
+        if shared:
+            score = sum(1 / touching[name] for name in shared)
+            targets.append(VerificationTarget(identifier, title, sorted(shared), score))
+
+    targets.sort(key=lambda target: (-target.score, target.identifier))
+    return targets[:limit]
+
+
+async def plan_verification(project_dir: Path, limit: int = MAX_VERIFICATION_TARGETS) -> VerificationPlan:
+    """
+    Select the Done features affected by commits since the last verification.
+
+    Returns a plan with since=None when there is no previous verification to
+    diff against (the prompt then falls back to picking core features).
+    """
+    head = await head_commit(project_dir)
+    if head is None:
+        return VerificationPlan(head=None)
+
+    data = await update_feature_map(project_dir, head)
+    since = data.get("verified_through")
+    if since:
+        ancestor, _ = await _git(project_dir, "merge-base", "--is-ancestor", since, head)
+        if ancestor != 0:
+            since = None
+    if not since or not data.get("files"):
+        return VerificationPlan(head=head)
+
+    cache = get_issue_cache(project_dir)
+    known = {issue["identifier"] for issue in cache.issues.values() if issue.get("identifier")}
+    done = {
+        issue["identifier"]: issue.get("title", "")
+        for issue in cache.by_status(STATUS_DONE)
+        if issue.get("identifier")
+    }
+    changes = await read_commits(project_dir, since, head) if since != head else []
+    targets = rank_targets(data["files"], changes, done, known, limit)
+    return VerificationPlan(head=head, since=since, targets=targets)
+
+
+def record_verification(project_dir: Path, head: Optional[str]) -> None:
+    """Mark everything up to head as verified (called after a clean session)."""
+    if head is None:
+        return
+    state_file(project_dir / FEATURE_MAP_FILE).update(
+        lambda data: {**(data or {}), "verified_through": head}
+    )
+
+
+def format_verification_targets(plan: VerificationPlan) -> Optional[str]:
+    """Render the plan for STEP 4 of the coding prompt (None to use the default instructions)."""
+    if plan.since is None:
+        return None
+
+    commit_range = f"`{plan.since[:8]}..{plan.head[:8]}`"
+    if not plan.targets:
+        return (
+            f"No completed feature shares code with the commits since the last verification "
+            f"({commit_range}). Skip the regression pass: just check that the app loads without "
+            "console errors, then move on."
+        )
+
+    lines = [
+        f"The harness matched the commits since the last verification ({commit_range}) against the",
+        "files each completed issue touched. Re-test these Done features, which share code with",
+        "what changed:",
+        "",
+    ]
+    for target in plan.targets:
+        shown = ", ".join(target.shared_files[:4])
+        more = f" and {len(target.shared_files) - 4} more" if len(target.shared_files) > 4 else ""
+        lines.append(f"- {target.identifier} - {target.title} (shared files: {shown}{more})")
+    lines += ["", "Other Done features don't share code with those commits; don't re-test them."]
+    return "\n".join(lines)
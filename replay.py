@@ -0,0 +1,297 @@
+"""
+Session Recording and Replay
+============================
+
+Records the SDK message stream of live sessions to disk and replays it
+through a client with the ClaudeSDKClient interface, so the agent loop runs
+without Claude (and, with fake_linear.py, without Linear).
+
+A recording is one JSONL file per session: a header line with the prompt,
+then one line per SDK message. Tool results, including MCP tool responses,
+reach the harness as user messages in that stream, so they are recorded
+too.
+
+On replay the client:
+
+- yields the recorded messages as fast as the harness consumes them
+- runs the harness's pre- and post-tool-use hooks (client.create_hooks())
+  around every recorded tool call, as the CLI would
+- executes calls to the tools it was given (e.g. FakeLinear's) instead of
+  replaying their recorded result, so Linear state evolves with the run
+- replaces the result of a call that a pre-tool-use hook blocked with the
+  hook's reason
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+from claude_code_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    SdkMcpTool,
+    SystemMessage,
+    TextBlock,
+    ThinkingBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+from claude_code_sdk.types import HookMatcher, StreamEvent
+
+from client import create_hooks
+
+
+MESSAGE_TYPES = {cls.__name__: cls for cls in (UserMessage, AssistantMessage, SystemMessage, ResultMessage, StreamEvent)}
+BLOCK_TYPES = {cls.__name__: cls for cls in (TextBlock, ThinkingBlock, ToolUseBlock, ToolResultBlock)}
+
+RECORDING_PATTERN = "session-*.jsonl"
+
+
+def message_to_dict(message: Any) -> dict[str, Any]:
+    """Serialize an SDK message (content blocks keep their type)."""
+    data = {"type": type(message).__name__}
+    for field in fields(message):
+        value = getattr(message, field.name)
+        if field.name == "content" and isinstance(value, list):
+            value = [{"type": type(block).__name__, **asdict(block)} for block in value]
+        data[field.name] = value
+    return data
+
+
+def message_from_dict(data: dict[str, Any]) -> Any:
+    """Rebuild an SDK message serialized by message_to_dict."""
+    data = dict(data)
+    cls = MESSAGE_TYPES[data.pop("type")]
+    if isinstance(data.get("content"), list):
+        data["content"] = [
+            BLOCK_TYPES[block["type"]](**{key: value for key, value in block.items() if key != "type"})
+            for block in data["content"]
+        ]
+    return cls(**data)
+
+
+@dataclass
+class Recording:
+    """One recorded session."""
+
+    prompt: str
+    messages: list[Any]
+
+
+def load_recording(path: Path) -> Recording:
+    """Read a recording written by RecordingClient."""
+    with open(path) as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header = lines[0] if lines and lines[0].get("type") == "Prompt" else {}
+    messages = [message_from_dict(line) for line in lines if line.get("type") != "Prompt"]
+    return Recording(prompt=header.get("prompt", ""), messages=messages)
+
+
+def save_recording(path: Path, recording: Recording) -> None:
+    with open(path, "w") as f:
+        f.write(json.dumps({"type": "Prompt", "prompt": recording.prompt}) + "\n")
+        for message in recording.messages:
+            f.write(json.dumps(message_to_dict(message), default=str) + "\n")
+
+
+class RecordingClient:
+    """
+    Wraps a client and writes every message it streams to a recording.
+
+    Args:
+        client: The client to record (usually a live ClaudeSDKClient)
+        path: Recording file to write
+    """
+
+    def __init__(self, client: Any, path: Path):
+        self.client = client
+        self.path = path
+        self.file = None
+
+    async def __aenter__(self):
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return await self.client.__aexit__(*args)
+
+    async def query(self, prompt):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "w")
+        self.file.write(json.dumps({"type": "Prompt", "prompt": prompt}) + "\n")
+        await self.client.query(prompt)
+
+    async def interrupt(self):
+        await self.client.interrupt()
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        async for message in self.client.receive_response():
+            if self.file is not None:
+                # Flushed per message, so a crashed session still leaves its recording
+                self.file.write(json.dumps(message_to_dict(message), default=str) + "\n")
+                self.file.flush()
+            yield message
+
+
+def recording_client_factory(record_dir: Path, client_factory: Callable[..., Any]) -> Callable[..., RecordingClient]:
+    """Wrap a client factory so every session it creates is recorded to record_dir/session-NNNN.jsonl."""
+
+    def create(project_dir: Path, model: str, mcp_pool: Any = None) -> RecordingClient:
+        number = len(list(record_dir.glob(RECORDING_PATTERN))) + 1 if record_dir.is_dir() else 1
+        return RecordingClient(client_factory(project_dir, model, mcp_pool), record_dir / f"session-{number:04d}.jsonl")
+
+    return create
+
+
+def _matches(matcher: Optional[str], tool_name: str) -> bool:
+    return matcher in (None, "", "*") or re.fullmatch(matcher, tool_name) is not None
+
+
+def _blocked_reason(output: dict[str, Any]) -> Optional[str]:
+    if output.get("decision") == "block":
+        return output.get("reason", "Blocked by hook")
+    specific = output.get("hookSpecificOutput") or {}
+    if specific.get("permissionDecision") == "deny":
+        return specific.get("permissionDecisionReason", "Blocked by hook")
+    return None
+
+
+class ReplayClient:
+    """
+    Replays a recorded session through the ClaudeSDKClient interface.
+
+    Args:
+        recording: The session to replay
+        project_dir: Working directory reported to hooks
+        hooks: Hook matchers by event, as in ClaudeCodeOptions (None for no hooks)
+        tools: Tools to execute instead of replaying their results, by full
+            tool name (e.g. "mcp__linear__update_issue")
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        project_dir: Path,
+        hooks: Optional[dict[str, list[HookMatcher]]] = None,
+        tools: Optional[dict[str, SdkMcpTool]] = None,
+    ):
+        self.recording = recording
+        self.cwd = str(project_dir.resolve())
+        self.hooks = hooks or {}
+        self.tools = tools or {}
+        self.prompt: Optional[str] = None
+        self.interrupted = False
+        # tool_use_id -> (tool name, tool input, reason if a hook blocked it)
+        self.pending: dict[str, tuple[str, dict, Optional[str]]] = {}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.disconnect()
+        return False
+
+    async def connect(self, prompt=None) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def query(self, prompt):
+        self.prompt = prompt
+
+    async def interrupt(self):
+        self.interrupted = True
+
+    async def _run_hooks(self, event: str, tool_name: str, tool_use_id: str, extra: dict[str, Any]) -> list[dict]:
+        input_data = {"hook_event_name": event, "session_id": "replay", "cwd": self.cwd, "tool_name": tool_name, **extra}
+        outputs = []
+        for matcher in self.hooks.get(event, []):
+            if _matches(matcher.matcher, tool_name):
+                for hook in matcher.hooks:
+                    outputs.append(await hook(input_data, tool_use_id, {"signal": None}) or {})
+        return outputs
+
+    async def _before_tool(self, block: ToolUseBlock) -> None:
+        tool_input = dict(block.input)
+        reason = None
+        for output in await self._run_hooks("PreToolUse", block.name, block.id, {"tool_input": tool_input}):
+            reason = reason or _blocked_reason(output)
+            tool_input = (output.get("hookSpecificOutput") or {}).get("updatedInput", tool_input)
+        self.pending[block.id] = (block.name, tool_input, reason)
+
+    async def _tool_result(self, block: ToolResultBlock) -> ToolResultBlock:
+        name, tool_input, reason = self.pending.pop(block.tool_use_id, (None, {}, None))
+        if name is None:
+            return block
+        if reason is not None:
+            return replace(block, content=reason, is_error=True)
+        if name in self.tools:
+            result = await self.tools[name].handler(tool_input)
+            block = replace(block, content=result["content"], is_error=bool(result.get("is_error")))
+        await self._run_hooks(
+            "PostToolUse", name, block.tool_use_id, {"tool_input": tool_input, "tool_response": block.content}
+        )
+        return block
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        messages = self.recording.messages
+        for message in messages:
+            if self.interrupted and not isinstance(message, ResultMessage):
+                continue
+            if isinstance(message, AssistantMessage):
+                for block in message.content:
+                    if isinstance(block, ToolUseBlock):
+                        await self._before_tool(block)
+            elif isinstance(message, UserMessage) and isinstance(message.content, list):
+                content = [
+                    await self._tool_result(block) if isinstance(block, ToolResultBlock) else block
+                    for block in message.content
+                ]
+                message = replace(message, content=content)
+            yield message
+            if isinstance(message, ResultMessage):
+                return
+
+    async def receive_messages(self) -> AsyncIterator[Any]:
+        async for message in self.receive_response():
+            yield message
+
+
+def replay_client_factory(
+    recordings: list[Union[Recording, Path]],
+    hooks: Optional[dict[str, list[HookMatcher]]] = None,
+    tools: Optional[list[SdkMcpTool]] = None,
+    tool_prefix: str = "mcp__linear__",
+) -> Callable[..., ReplayClient]:
+    """
+    Client factory that replays the recordings in turn (wrapping around).
+
+    Args:
+        recordings: Recordings, or paths to them
+        hooks: Hooks to run around recorded tool calls (None for client.create_hooks())
+        tools: Tools to execute live, e.g. FakeLinear().create_tools()
+        tool_prefix: Prefix of the full names of `tools`
+    """
+    loaded = [load_recording(r) if isinstance(r, Path) else r for r in recordings]
+    if not loaded:
+        raise ValueError("No recordings to replay")
+    if hooks is None:
+        hooks = create_hooks()
+    tools_by_name = {tool_prefix + t.name: t for t in tools or []}
+    sessions = 0
+
+    def create(project_dir: Path, model: str, mcp_pool: Any = None) -> ReplayClient:
+        nonlocal sessions
+        recording = loaded[sessions % len(loaded)]
+        sessions += 1
+        return ReplayClient(recording, project_dir, hooks, tools_by_name)
+
+    return create
@@ -0,0 +1,519 @@
+"""
+Repository Index
+================
+
+Read-only git and filesystem tools served in-process by the harness:
+git_status, git_log, git_diff_summary, list_tree and file_stat. They answer
+the questions agents otherwise shell out for (`git status`, `git log
+--oneline -20`, `ls -la`, `wc -l`), without a Bash call, a security check
+or a subprocess when nothing has changed, and in a compact form.
+
+Answers come from a per-project index that is updated from change events
+rather than recomputed on every call:
+
+- git results are cached against the stat signature of HEAD, the index
+  and the current branch's ref, so a commit, checkout or `git add` is
+  noticed without running git
+- status and diffs also depend on the working tree. The index marks the
+  working tree changed when the post-tool-use hook sees a tool that writes
+  files: Write, Edit, MultiEdit, NotebookEdit, Bash or the persistent shell
+- directory listings are cached against each directory's mtime, which
+  changes whenever an entry is added, removed or renamed, whoever does it.
+  File sizes are re-read after a write event
+
+Every path must resolve inside the project directory, as with the SDK's own
+file tools.
+"""
+
+import asyncio
+import os
+import stat
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+
+DEFAULT_LOG_LIMIT = 20
+MAX_LOG_LIMIT = 200
+DEFAULT_TREE_DEPTH = 2
+MAX_TREE_DEPTH = 6
+# Entries listed per directory before the rest are summarized
+MAX_TREE_ENTRIES = 40
+MAX_STATUS_FILES = 100
+# Files larger than this are not line-counted by file_stat
+MAX_LINE_COUNT_BYTES = 5_000_000
+
+# Directories shown but never descended into or sized
+OPAQUE_DIRS = frozenset({".git", "node_modules"})
+
+# Tools whose completion means files in the project may have changed
+WRITE_TOOLS = frozenset({"Write", "Edit", "MultiEdit", "NotebookEdit", "Bash", "mcp__harness__shell"})
+
+FIELD_SEPARATOR = "\x1f"
+
+
+@dataclass
+class _Listing:
+    """One directory's entries, valid while the directory's mtime is unchanged."""
+
+    mtime_ns: int
+    # name -> is a directory
+    entries: dict[str, bool]
+
+
+class RepoIndex:
+    """
+    Cached git and filesystem answers for one project directory.
+
+    Args:
+        project_dir: The project directory (and git work tree)
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir.resolve()
+        # Bumped by every write event; cached status and diffs are tagged with it
+        self.generation = 0
+        self.git_dirs: Optional[tuple[Path, Path]] = None
+        self._git_cache: dict[tuple[str, ...], tuple[Any, str]] = {}
+        self._listings: dict[Path, _Listing] = {}
+        self._sizes: dict[Path, int] = {}
+        self.git_runs = 0
+
+    # Change events
+
+    def note_change(self, path: Optional[str] = None) -> None:
+        """
+        Record that files may have changed (a specific file, or anywhere if path is None).
+
+        Listings revalidate themselves against directory mtimes; this
+        invalidates the caches mtimes can't vouch for.
+        """
+        self.generation += 1
+        if path is None:
+            self._sizes.clear()
+        else:
+            self._sizes.pop((self.project_dir / path).resolve(), None)
+
+    # Paths
+
+    def resolve(self, path: Optional[str]) -> Optional[Path]:
+        """Resolve a tool argument to a path inside the project (None if it falls outside)."""
+        resolved = (self.project_dir / (path or ".")).resolve()
+        try:
+            resolved.relative_to(self.project_dir)
+        except ValueError:
+            return None
+        return resolved
+
+    def relative(self, path: Path) -> str:
+        return str(path.relative_to(self.project_dir)) if path != self.project_dir else "."
+
+    # git
+
+    async def _run_git(self, *args: str) -> tuple[int, str]:
+        self.git_runs += 1
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=self.project_dir,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return 1, ""
+        stdout, _ = await process.communicate()
+        return process.returncode, stdout.decode("utf-8", "replace")
+
+    async def _locate_git(self) -> Optional[tuple[Path, Path]]:
+        """The git dir and common dir (they differ in worktrees), looked up once."""
+        if self.git_dirs is None:
+            code, out = await self._run_git("rev-parse", "--absolute-git-dir", "--git-common-dir")
+            lines = out.splitlines()
+            if code != 0 or len(lines) != 2:
+                return None
+            self.git_dirs = (Path(lines[0]), (self.project_dir / lines[1]).resolve())
+        return self.git_dirs
+
+    def _git_signature(self, git_dir: Path, common_dir: Path) -> tuple:
+        """Stat signature of the files a commit, checkout, reset or `git add` rewrites."""
+        paths = [git_dir / "HEAD", git_dir / "index", common_dir / "packed-refs"]
+        try:
+            head = (git_dir / "HEAD").read_text().strip()
+        except OSError:
+            head = ""
+        if head.startswith("ref: "):
+            paths.append(common_dir / head[5:])
+        signature = [head]
+        for path in paths:
+            try:
+                info = path.stat()
+                signature.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    async def git(self, *args: str, working_tree: bool = False) -> Optional[tuple[int, str]]:
+        """
+        Run a read-only git command, or return its cached result if nothing it depends on changed.
+
+        Status must run with --no-optional-locks: otherwise it refreshes the
+        index file, which would invalidate its own cache entry.
+
+        Args:
+            working_tree: The result also depends on the working tree
+                (status, diffs), so write events invalidate it
+
+        Returns:
+            (exit code, stdout), or None outside a git repository
+        """
+        dirs = await self._locate_git()
+        if dirs is None:
+            return None
+        key = tuple(args)
+        signature = (self._git_signature(*dirs), self.generation if working_tree else None)
+        cached = self._git_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return 0, cached[1]
+        code, out = await self._run_git(*args)
+        if code == 0:
+            self._git_cache[key] = (signature, out)
+        return code, out
+
+    # Filesystem
+
+    def listing(self, directory: Path) -> dict[str, bool]:
+        """A directory's entries (name -> is a directory), rescanned only when its mtime changes."""
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            self._listings.pop(directory, None)
+            return {}
+        cached = self._listings.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached.entries
+        entries = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    entries[entry.name] = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            pass
+        self._listings[directory] = _Listing(mtime_ns, entries)
+        return entries
+
+    def size(self, path: Path) -> int:
+        """A file's size, cached until a write event that may have touched it."""
+        if path not in self._sizes:
+            try:
+                self._sizes[path] = path.lstat().st_size
+            except OSError:
+                return 0
+        return self._sizes[path]
+
+    def tree_size(self, directory: Path) -> tuple[int, int]:
+        """(total bytes, file count) under a directory, skipping OPAQUE_DIRS."""
+        total, files = 0, 0
+        for name, is_dir in self.listing(directory).items():
+            if is_dir:
+                if name not in OPAQUE_DIRS:
+                    sub_total, sub_files = self.tree_size(directory / name)
+                    total += sub_total
+                    files += sub_files
+            else:
+                total += self.size(directory / name)
+                files += 1
+        return total, files
+
+
+# One index per project directory, kept across sessions
+_indexes: dict[Path, RepoIndex] = {}
+
+
+def get_repo_index(project_dir: Path) -> RepoIndex:
+    key = project_dir.resolve()
+    if key not in _indexes:
+        _indexes[key] = RepoIndex(project_dir)
+    return _indexes[key]
+
+
+async def repo_index_change_hook(input_data, tool_use_id=None, context=None):
+    """Post-tool-use hook that tells the project's index which files a tool may have changed."""
+    if input_data.get("tool_name") not in WRITE_TOOLS or not input_data.get("cwd"):
+        return {}
+    index = _indexes.get(Path(input_data["cwd"]).resolve())
+    if index is not None:
+        file_path = (input_data.get("tool_input") or {}).get("file_path")
+        index.note_change(file_path if isinstance(file_path, str) and file_path else None)
+    return {}
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_status(porcelain: str) -> str:
+    """Group `git status --porcelain=v1 --branch` output by kind of change."""
+    lines = porcelain.splitlines()
+    branch = lines[0][3:] if lines and lines[0].startswith("## ") else "(unknown)"
+    groups: dict[str, list[str]] = {"Staged": [], "Modified": [], "Untracked": [], "Conflicted": []}
+    for line in lines[1:]:
+        code, name = line[:2], line[3:]
+        if code == "??":
+            groups["Untracked"].append(name)
+        elif "U" in code or code in ("AA", "DD"):
+            groups["Conflicted"].append(name)
+        else:
+            if code[0] != " ":
+                groups["Staged"].append(f"{code[0]} {name}")
+            if code[1] != " ":
+                groups["Modified"].append(f"{code[1]} {name}")
+
+    out = [f"Branch: {branch}"]
+    if not any(groups.values()):
+        out.append("Working tree clean")
+    for title, names in groups.items():
+        if names:
+            out.append(f"{title} ({len(names)}):")
+            out.extend(f"  {name}" for name in names[:MAX_STATUS_FILES])
+            if len(names) > MAX_STATUS_FILES:
+                out.append(f"  ... {len(names) - MAX_STATUS_FILES} more")
+    return "\n".join(out)
+
+
+def format_numstat(numstat: str) -> str:
+    """Summarize `git diff --numstat` output as one line per file plus totals."""
+    rows, added, removed = [], 0, 0
+    for line in numstat.splitlines():
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        if parts[0] == "-":
+            rows.append(f"  binary  {parts[2]}")
+            continue
+        added += int(parts[0])
+        removed += int(parts[1])
+        rows.append(f"  +{parts[0]} -{parts[1]}  {parts[2]}")
+    if not rows:
+        return "No changes"
+    return "\n".join([f"{len(rows)} files changed, +{added} -{removed}:", *rows])
+
+
+def git_state(porcelain: str, relative: str) -> str:
+    """A path's state from `git status --porcelain=v1 --ignored` output (a directory sums up its files)."""
+    codes = set()
+    for line in porcelain.splitlines():
+        code, entry = line[:2], line[3:]
+        if entry.endswith("/") and (relative + "/").startswith(entry):
+            # Inside an untracked or ignored directory
+            codes.add(code)
+        elif relative == "." or entry == relative or entry.startswith(relative + "/"):
+            codes.add(code)
+    if not codes:
+        return "clean"
+    if codes == {"!!"}:
+        return "ignored"
+    if codes == {"??"}:
+        return "untracked"
+    changed = sorted(code.strip() for code in codes if code not in ("??", "!!"))
+    return f"changed ({', '.join(changed)})" if changed else "untracked"
+
+
+def render_tree(index: RepoIndex, directory: Path, depth: int) -> str:
+    """Indented tree with file sizes, and total size and file count for directories."""
+    total, files = index.tree_size(directory)
+    lines = [f"{index.relative(directory)}/ ({format_size(total)}, {files} files)"]
+
+    def walk(current: Path, level: int) -> None:
+        entries = sorted(index.listing(current).items(), key=lambda item: (not item[1], item[0]))
+        indent = "  " * level
+        for name, is_dir in entries[:MAX_TREE_ENTRIES]:
+            path = current / name
+            if not is_dir:
+                lines.append(f"{indent}{name} ({format_size(index.size(path))})")
+            elif name in OPAQUE_DIRS:
+                lines.append(f"{indent}{name}/ (not listed)")
+            else:
+                sub_total, sub_files = index.tree_size(path)
+                lines.append(f"{indent}{name}/ ({format_size(sub_total)}, {sub_files} files)")
+                if level < depth:
+                    walk(path, level + 1)
+        if len(entries) > MAX_TREE_ENTRIES:
+            lines.append(f"{indent}... {len(entries) - MAX_TREE_ENTRIES} more entries")
+
+    walk(directory, 1)
+    return "\n".join(lines)
+
+
+def _count_lines(path: Path) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def create_repo_tools(project_dir: Path) -> list[SdkMcpTool]:
+    """Build the in-process MCP tools for read-only git and filesystem queries."""
+    index = get_repo_index(project_dir)
+
+    def reply(text: str) -> dict:
+        return {"content": [{"type": "text", "text": text}]}
+
+    def outside(path: Any) -> dict:
+        return reply(f"Path is outside the project directory: {path}")
+
+    not_a_repo = reply("The project directory is not a git repository")
+
+    def valid_arg(value: Any) -> bool:
+        # Never let an argument be read as a git option
+        return isinstance(value, str) and bool(value) and not value.startswith("-")
+
+    @tool(
+        "git_status",
+        "Show the branch and changed files, grouped into staged, modified, untracked and conflicted. "
+        "Use instead of `git status`.",
+        {"type": "object", "properties": {}},
+    )
+    async def git_status(args):
+        result = await index.git(
+            "--no-optional-locks", "status", "--porcelain=v1", "--branch", "--untracked-files=all", working_tree=True
+        )
+        if result is None:
+            return not_a_repo
+        code, out = result
+        return reply(format_status(out) if code == 0 else "git status failed")
+
+    @tool(
+        "git_log",
+        "List recent commits, one line each: short hash, date, subject and files changed. "
+        "Use instead of `git log --oneline`.",
+        {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": f"Commits to list (default {DEFAULT_LOG_LIMIT})"},
+                "path": {"type": "string", "description": "Only commits touching this file or directory"},
+            },
+        },
+    )
+    async def git_log(args):
+        limit = max(1, min(int(args.get("limit") or DEFAULT_LOG_LIMIT), MAX_LOG_LIMIT))
+        git_args = ["log", f"-{limit}", "--date=short", f"--format={FIELD_SEPARATOR}%h %ad %s", "--shortstat"]
+        if args.get("path"):
+            path = index.resolve(str(args["path"]))
+            if path is None:
+                return outside(args["path"])
+            git_args += ["--", index.relative(path)]
+        result = await index.git(*git_args)
+        if result is None:
+            return not_a_repo
+        code, out = result
+        if code != 0:
+            return reply("No commits yet")
+        lines = []
+        for record in out.split(FIELD_SEPARATOR)[1:]:
+            subject, _, stats = record.strip().partition("\n")
+            files = stats.strip().split(" ", 1)[0] if stats.strip() else "0"
+            lines.append(f"{subject} ({files} files)")
+        return reply("\n".join(lines) or "No commits yet")
+
+    @tool(
+        "git_diff_summary",
+        "Lines added and removed per file. By default the uncommitted changes (staged and unstaged) "
+        "against HEAD; with `revision`, a commit or range such as HEAD~3..HEAD. "
+        "Use instead of `git diff --stat`, then read only the diffs you need.",
+        {
+            "type": "object",
+            "properties": {
+                "revision": {"type": "string", "description": "Commit or range (default: uncommitted changes)"},
+                "path": {"type": "string", "description": "Only this file or directory"},
+            },
+        },
+    )
+    async def git_diff_summary(args):
+        revision = args.get("revision")
+        if revision is not None and not valid_arg(revision):
+            return reply(f"Invalid revision: {revision!r}")
+        if revision:
+            # A range is diffed; a single commit is shown against its parent
+            if ".." in revision:
+                git_args = ["diff", "--numstat", revision]
+            else:
+                git_args = ["show", "--numstat", "--format=", revision]
+        else:
+            git_args = ["diff", "--numstat", "HEAD"]
+        if args.get("path"):
+            path = index.resolve(str(args["path"]))
+            if path is None:
+                return outside(args["path"])
+            git_args += ["--", index.relative(path)]
+        result = await index.git(*git_args, working_tree=not revision)
+        if result is None:
+            return not_a_repo
+        code, out = result
+        return reply(format_numstat(out) if code == 0 else f"Unknown revision: {revision or 'HEAD'}")
+
+    @tool(
+        "list_tree",
+        "Directory tree with file sizes and each directory's total size and file count "
+        "(node_modules and .git are not listed). Use instead of `ls -la` or `find`.",
+        {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Directory to list (default: the project root)"},
+                "depth": {"type": "integer", "description": f"Levels to expand (default {DEFAULT_TREE_DEPTH})"},
+            },
+        },
+    )
+    async def list_tree(args):
+        directory = index.resolve(args.get("path"))
+        if directory is None:
+            return outside(args.get("path"))
+        if not directory.is_dir():
+            return reply(f"Not a directory: {args.get('path')}")
+        depth = max(1, min(int(args.get("depth") or DEFAULT_TREE_DEPTH), MAX_TREE_DEPTH))
+        return reply(render_tree(index, directory, depth))
+
+    @tool(
+        "file_stat",
+        "Size, line count, modification time and git state of a file or directory. "
+        "Use instead of `ls -l` or `wc -l`.",
+        {
+            "type": "object",
+            "properties": {"path": {"type": "string", "description": "File or directory path"}},
+            "required": ["path"],
+        },
+    )
+    async def file_stat(args):
+        path = index.resolve(str(args.get("path") or ""))
+        if path is None:
+            return outside(args.get("path"))
+        try:
+            info = path.lstat()
+        except OSError:
+            return reply(f"No such file or directory: {args.get('path')}")
+
+        modified = datetime.fromtimestamp(info.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        if stat.S_ISDIR(info.st_mode):
+            total, files = index.tree_size(path)
+            lines = [f"{index.relative(path)}/: directory, {files} files, {format_size(total)}, modified {modified}"]
+        else:
+            kind = "symlink" if stat.S_ISLNK(info.st_mode) else "file"
+            details = [kind, f"{info.st_size} bytes"]
+            if kind == "file" and info.st_size <= MAX_LINE_COUNT_BYTES:
+                details.append(f"{await asyncio.to_thread(_count_lines, path)} lines")
+            if info.st_mode & stat.S_IXUSR:
+                details.append("executable")
+            lines = [f"{index.relative(path)}: {', '.join(details)}, modified {modified}"]
+
+        result = await index.git(
+            "--no-optional-locks", "status", "--porcelain=v1", "--untracked-files=all", "--ignored", working_tree=True
+        )
+        if result is not None and result[0] == 0:
+            lines.append(f"git: {git_state(result[1], index.relative(path))}")
+        return reply("\n".join(lines))
+
+    return [git_status, git_log, git_diff_summary, list_tree, file_stat]
@@ -0,0 +1,341 @@
+"""
+Parallel Worker Scheduler
+=========================
+
+Runs several coding sessions concurrently. Each worker claims a distinct
+open issue from Linear, works on it in its own git worktree of the project
+directory, and merges its branch back into the main checkout when done.
+
+An issue a session leaves In Progress (a context handoff, or a session that
+stopped short of Done) is claimed again by the next free worker. An issue
+whose session failed, or whose branch could not be merged, goes back to
+Todo, so the backlog never shows work as Done that isn't in the main
+checkout.
+"""
+
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from agent import run_agent_session, run_autonomous_agent
+from client import create_client
+from context_monitor import DEFAULT_CONTEXT_WINDOW, DEFAULT_WRAP_UP_THRESHOLD, ContextMonitor
+from events import default_sinks
+from issue_cache import ISSUE_CACHE_FILE, priority_sort_key, refresh_issue_cache
+from linear_client import LinearAPIError, LinearClient
+from linear_config import LINEAR_PROJECT_MARKER, STATUS_IN_PROGRESS, STATUS_TODO
+from progress import is_linear_initialized, load_linear_project_state, print_progress_summary
+from prompts import get_worker_prompt
+from session_context import build_session_context
+from state_store import ensure_parent_dir
+from telemetry import TelemetrySink
+
+
+# Worktrees live inside the project dir (excluded from its git index)
+WORKTREES_DIR = ".worktrees"
+WORKER_BRANCH_PREFIX = "harness/"
+# A branch that could not be merged is kept under this prefix
+UNMERGED_BRANCH_PREFIX = f"{WORKER_BRANCH_PREFIX}unmerged/"
+
+# Untracked harness files each worktree needs a copy of
+WORKTREE_SHARED_FILES = ("app_spec.txt", LINEAR_PROJECT_MARKER)
+# Harness state each worktree needs a copy of (already self-ignored in .harness/)
+WORKTREE_SHARED_STATE = (ISSUE_CACHE_FILE,)
+
+# Times an issue is claimed in one run (failures and handoffs) before it is left alone
+MAX_CLAIM_ATTEMPTS = 3
+
+
+async def run_git(cwd: Path, *args: str) -> tuple[int, str]:
+    """Run a git command asynchronously, returning (returncode, combined output)."""
+    proc = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        cwd=str(cwd),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    out, _ = await proc.communicate()
+    return proc.returncode, out.decode("utf-8", errors="replace").strip()
+
+
+class IssueBoard:
+    """
+    Hands out distinct open issues to workers.
+
+    Claims are serialized with a lock and recorded locally, so two workers
+    never receive the same issue even before Linear reflects the status change.
+    In Progress issues no worker holds (handed off, or left by an earlier run)
+    are claimed before Todo issues. Each issue is claimed at most
+    MAX_CLAIM_ATTEMPTS times per run.
+    """
+
+    def __init__(self, linear: Any, project_id: str, team_id: str):
+        self.linear = linear
+        self.project_id = project_id
+        self.team_id = team_id
+        self.active: set[str] = set()
+        self.attempts: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def claim(self) -> Optional[dict]:
+        """
+        Claim the open issue to work on next and move it to In Progress.
+
+        Returns:
+            The claimed issue dict, or None if no claimable issues remain
+        """
+        async with self._lock:
+            issues = await self.linear.list_issues(self.project_id)
+            claimable = [
+                issue for issue in issues
+                if issue["state"]["name"] in (STATUS_IN_PROGRESS, STATUS_TODO)
+                and issue["id"] not in self.active
+                and self.attempts.get(issue["id"], 0) < MAX_CLAIM_ATTEMPTS
+            ]
+            if not claimable:
+                return None
+            # Unfinished work first, then by priority
+            issue = min(claimable, key=lambda open_issue: (
+                open_issue["state"]["name"] != STATUS_IN_PROGRESS, priority_sort_key(open_issue),
+            ))
+            self.active.add(issue["id"])
+            self.attempts[issue["id"]] = self.attempts.get(issue["id"], 0) + 1
+            if issue["state"]["name"] != STATUS_IN_PROGRESS:
+                await self.linear.update_issue_state(issue["id"], self.team_id, STATUS_IN_PROGRESS)
+            return issue
+
+    async def release(self, issue: dict, failed: bool) -> bool:
+        """
+        Hand back a claimed issue once its session has ended.
+
+        An issue whose session failed, or whose work didn't reach the main
+        checkout, is moved back to Todo (even if the agent marked it Done).
+        Otherwise it keeps the state the session left it in: Done, or In
+        Progress for the next worker to pick up. An issue that has used up
+        its attempts is not claimed again in this run, and is moved back to
+        Todo rather than left In Progress with nobody on it.
+
+        Returns:
+            True if the issue can be claimed again
+        """
+        async with self._lock:
+            self.active.discard(issue["id"])
+            exhausted = self.attempts.get(issue["id"], 0) >= MAX_CLAIM_ATTEMPTS
+            if not failed and exhausted:
+                in_progress = await self.linear.list_issues(self.project_id, STATUS_IN_PROGRESS)
+                failed = any(open_issue["id"] == issue["id"] for open_issue in in_progress)
+            if failed:
+                await self.linear.update_issue_state(issue["id"], self.team_id, STATUS_TODO)
+            return not exhausted
+
+
+class WorktreeManager:
+    """Creates per-issue git worktrees and merges them back into the main checkout."""
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+        self.root = project_dir / WORKTREES_DIR
+        self._merge_lock = asyncio.Lock()
+
+    async def prepare(self) -> None:
+        """Make sure the project is a git repo and worktrees are git-ignored."""
+        code, out = await run_git(self.project_dir, "rev-parse", "--git-dir")
+        if code != 0:
+            raise RuntimeError(f"{self.project_dir} is not a git repository: {out}")
+
+        # Exclude the worktrees dir, plus any untracked shared files that get
+        # copied into worktrees, so an agent's "git add ." never commits them
+        # (harness state in .harness/ ignores itself)
+        patterns = [f"/{WORKTREES_DIR}/"]
+        for filename in WORKTREE_SHARED_FILES:
+            tracked, _ = await run_git(self.project_dir, "ls-files", "--error-unmatch", filename)
+            if tracked != 0:
+                patterns.append(f"/{filename}")
+
+        exclude_file = self.project_dir / out / "info" / "exclude"
+        exclude_file.parent.mkdir(parents=True, exist_ok=True)
+        existing = exclude_file.read_text().splitlines() if exclude_file.exists() else []
+        missing = [pattern for pattern in patterns if pattern not in existing]
+        if missing:
+            with open(exclude_file, "a") as f:
+                f.write("\n" + "\n".join(missing) + "\n")
+
+        self.root.mkdir(exist_ok=True)
+        await run_git(self.project_dir, "worktree", "prune")
+
+    async def create(self, name: str) -> tuple[Path, str]:
+        """
+        Create a fresh worktree on a new branch from the main checkout's HEAD.
+
+        Returns:
+            (worktree_path, branch_name)
+        """
+        path = self.root / name
+        branch = f"{WORKER_BRANCH_PREFIX}{name}"
+
+        async with self._merge_lock:
+            if path.exists():
+                await run_git(self.project_dir, "worktree", "remove", "--force", str(path))
+            code, out = await run_git(
+                self.project_dir, "worktree", "add", "-B", branch, str(path), "HEAD"
+            )
+        if code != 0:
+            raise RuntimeError(f"Could not create worktree {path}: {out}")
+
+        for filename in WORKTREE_SHARED_FILES + WORKTREE_SHARED_STATE:
+            source = self.project_dir / filename
+            if source.exists() and not (path / filename).exists():
+                ensure_parent_dir(path / filename)
+                shutil.copy(source, path / filename)
+
+        return path, branch
+
+    async def merge(self, path: Path, branch: str) -> bool:
+        """
+        Merge a worker branch into the main checkout and remove its worktree.
+
+        On conflict the merge is aborted and the branch is kept, renamed
+        under UNMERGED_BRANCH_PREFIX for manual resolution, so a retry of the
+        issue can start a fresh branch.
+
+        Returns:
+            True if the branch was merged cleanly
+        """
+        async with self._merge_lock:
+            code, out = await run_git(
+                self.project_dir, "merge", "--no-ff", "--no-edit", branch
+            )
+            if code != 0:
+                await run_git(self.project_dir, "merge", "--abort")
+                unmerged = UNMERGED_BRANCH_PREFIX + branch[len(WORKER_BRANCH_PREFIX):]
+                await run_git(self.project_dir, "branch", "-M", branch, unmerged)
+                await run_git(self.project_dir, "worktree", "remove", "--force", str(path))
+                print(f"   [Merge conflict] {branch} kept as {unmerged} for manual merge:\n{out}")
+                return False
+
+            await run_git(self.project_dir, "worktree", "remove", "--force", str(path))
+            await run_git(self.project_dir, "branch", "-D", branch)
+            return True
+
+
+async def run_parallel_agents(
+    project_dir: Path,
+    model: str,
+    workers: int,
+    max_iterations: Optional[int] = None,
+    linear: Any = None,
+    client_factory: Callable[[Path, str], Any] = create_client,
+    context_window: int = DEFAULT_CONTEXT_WINDOW,
+    wrap_up_threshold: float = DEFAULT_WRAP_UP_THRESHOLD,
+) -> None:
+    """
+    Run a pool of coding workers concurrently until no open issue is left to claim.
+
+    Args:
+        project_dir: Directory for the project (must be a git repo once initialized)
+        model: Claude model to use
+        workers: Number of concurrent coding sessions
+        max_iterations: Maximum total sessions across all workers (None for unlimited)
+        linear: Object with list_issues/update_issue_state (defaults to LinearClient)
+        client_factory: Callable(project_dir, model) returning a ClaudeSDKClient-like client
+        context_window: Model context window in tokens
+        wrap_up_threshold: Share of the context window at which a session is
+            asked to wrap up and hand off
+    """
+    project_dir.mkdir(parents=True, exist_ok=True)
+
+    if not is_linear_initialized(project_dir):
+        print("Linear not initialized - running the initializer session first")
+        await run_autonomous_agent(
+            project_dir, model, max_iterations=1,
+            context_window=context_window, wrap_up_threshold=wrap_up_threshold,
+        )
+        if max_iterations is not None:
+            max_iterations -= 1
+
+    state = load_linear_project_state(project_dir)
+    if state is None or not state.get("initialized", False):
+        print("Initializer did not complete - cannot start parallel workers")
+        return
+
+    if linear is None:
+        linear = LinearClient(os.environ.get("LINEAR_API_KEY", ""))
+
+    board = IssueBoard(linear, state["project_id"], state["team_id"])
+    worktrees = WorktreeManager(project_dir)
+    await worktrees.prepare()
+
+    print("\n" + "=" * 70)
+    print(f"  PARALLEL MODE: {workers} WORKERS")
+    print("=" * 70)
+
+    sessions_started = 0
+
+    async def run_issue(worker_num: int, issue: dict, name: str) -> tuple[str, bool]:
+        """Work on one claimed issue in its own worktree and merge it back; returns (status, merged)."""
+        await refresh_issue_cache(project_dir, linear)
+        path, branch = await worktrees.create(name)
+        prompt = get_worker_prompt(issue, branch, await build_session_context(path, linear))
+        client = client_factory(path, model)
+        async with client:
+            # Telemetry goes to the main project so --report covers every worker
+            sinks = default_sinks() + [TelemetrySink(project_dir, model, f"worker-{worker_num}")]
+            monitor = ContextMonitor(context_window, wrap_up_threshold)
+            status, _ = await run_agent_session(client, prompt, path, sinks, monitor)
+
+        merged = await worktrees.merge(path, branch)
+        result = "merged" if merged else "NOT merged"
+        print(f"\n[Worker {worker_num}] {name} finished ({status}), branch {result}")
+        return status, merged
+
+    async def worker(worker_num: int) -> None:
+        nonlocal sessions_started
+
+        while max_iterations is None or sessions_started < max_iterations:
+            # Reserve the session before awaiting the claim, so concurrent
+            # workers can't all pass the limit check
+            sessions_started += 1
+            session_num = sessions_started
+            try:
+                issue = await board.claim()
+            except LinearAPIError as e:
+                sessions_started -= 1
+                print(f"\n[Worker {worker_num}] Could not claim an issue: {e}")
+                return
+            if issue is None:
+                sessions_started -= 1
+                print(f"\n[Worker {worker_num}] No open issues left to claim - stopping")
+                return
+
+            name = issue.get("identifier", issue["id"])
+            print(f"\n[Worker {worker_num}] Session {session_num}: {name} - {issue.get('title', '')}")
+
+            try:
+                status, merged = await run_issue(worker_num, issue, name)
+            except Exception as e:
+                print(f"\n[Worker {worker_num}] {name} failed: {e}")
+                status, merged = "error", False
+
+            failed = status == "error" or not merged
+            try:
+                retry = await board.release(issue, failed)
+            except LinearAPIError as e:
+                print(f"\n[Worker {worker_num}] Could not release {name}: {e}")
+                continue
+            if failed:
+                print(f"\n[Worker {worker_num}] {name} moved back to Todo"
+                      + ("" if retry else f" (no retries left after {MAX_CLAIM_ATTEMPTS} attempts)"))
+
+    # One worker's unexpected failure must not cancel the others
+    results = await asyncio.gather(*(worker(n) for n in range(1, workers + 1)), return_exceptions=True)
+    for worker_num, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            print(f"\n[Worker {worker_num}] Stopped by an unexpected error: {result}")
+
+    print("\n" + "=" * 70)
+    print("  PARALLEL RUN COMPLETE")
+    print("=" * 70)
+    print_progress_summary(project_dir)
@@ -0,0 +1,244 @@
+"""
+Screenshot Governor
+===================
+
+Filters Puppeteer screenshot results in the harness's MCP proxy before they
+reach the agent's context, where every screenshot is a full base64 image:
+
+- Each screenshot is reduced to a perceptual fingerprint (a grid of block
+  brightness means). A screenshot whose fingerprint matches the previous
+  screenshot of the same page is replaced with a short note.
+- Each session gets a screenshot budget; once it is used up, further
+  screenshots are replaced with a note asking the agent to verify through
+  page content instead.
+
+PNG decoding is done with zlib only (8-bit grayscale/RGB/RGBA, non-interlaced,
+which is what Chromium produces); anything else is passed through unfiltered.
+"""
+
+import base64
+import hashlib
+import struct
+import zlib
+from typing import Any, Optional
+
+from mcp.types import ImageContent, TextContent
+
+
+# Fingerprint grid (columns x rows of block means)
+FINGERPRINT_COLUMNS = 32
+FINGERPRINT_ROWS = 24
+# Largest per-block brightness difference (0-255) still treated as unchanged;
+# absorbs rendering noise (anti-aliasing, gradient dithering) but not changed text
+FINGERPRINT_TOLERANCE = 2
+# Brightness is sampled from every Nth pixel of every Nth row (all rows are still unfiltered)
+FINGERPRINT_SAMPLE_STEP = 2
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG color type -> bytes per pixel at bit depth 8
+PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+class PngDecodeError(ValueError):
+    """Raised for PNGs the minimal decoder does not handle."""
+
+
+def _read_png(data: bytes) -> tuple[int, int, int, bytes]:
+    """Return (width, height, bytes per pixel, inflated scanlines)."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise PngDecodeError("not a PNG")
+
+    pos = len(PNG_SIGNATURE)
+    header = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        body = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+
+    if header is None:
+        raise PngDecodeError("missing IHDR")
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or color_type not in PNG_CHANNELS or interlace:
+        raise PngDecodeError(f"unsupported PNG (depth {depth}, color type {color_type}, interlace {interlace})")
+
+    try:
+        raw = zlib.decompress(b"".join(idat))
+    except zlib.error as e:
+        raise PngDecodeError(f"corrupt image data: {e}") from e
+    if len(raw) < height * (width * PNG_CHANNELS[color_type] + 1):
+        raise PngDecodeError("truncated image data")
+    return width, height, PNG_CHANNELS[color_type], raw
+
+
+def _unfilter(line: bytearray, prev: bytearray, filter_type: int, bpp: int) -> bytearray:
+    """Reverse one scanline's PNG filter in place."""
+    stride = len(line)
+    if filter_type == 1:  # Sub
+        for i in range(bpp, stride):
+            line[i] = (line[i] + line[i - bpp]) & 0xFF
+    elif filter_type == 2:  # Up
+        line = bytearray((a + b) & 0xFF for a, b in zip(line, prev))
+    elif filter_type == 3:  # Average
+        for i in range(min(bpp, stride)):
+            line[i] = (line[i] + (prev[i] >> 1)) & 0xFF
+        for i in range(bpp, stride):
+            line[i] = (line[i] + ((line[i - bpp] + prev[i]) >> 1)) & 0xFF
+    elif filter_type == 4:  # Paeth
+        for i in range(min(bpp, stride)):
+            line[i] = (line[i] + prev[i]) & 0xFF
+        for i in range(bpp, stride):
+            a = line[i - bpp]
+            b = prev[i]
+            c = prev[i - bpp]
+            pa = b - c if b > c else c - b
+            pb = a - c if a > c else c - a
+            pc = a + b - c - c
+            if pc < 0:
+                pc = -pc
+            if pa <= pb and pa <= pc:
+                line[i] = (line[i] + a) & 0xFF
+            elif pb <= pc:
+                line[i] = (line[i] + b) & 0xFF
+            else:
+                line[i] = (line[i] + c) & 0xFF
+    elif filter_type != 0:
+        raise PngDecodeError(f"unknown filter type {filter_type}")
+    return line
+
+
+def png_fingerprint(data: bytes) -> tuple[int, ...]:
+    """
+    Perceptual fingerprint of a PNG: mean brightness of each block in a
+    FINGERPRINT_COLUMNS x FINGERPRINT_ROWS grid.
+
+    Raises:
+        PngDecodeError: If the PNG can't be decoded
+    """
+    width, height, bpp, raw = _read_png(data)
+    stride = width * bpp
+    columns = min(FINGERPRINT_COLUMNS, width)
+    rows = min(FINGERPRINT_ROWS, height)
+    sums = [0] * (columns * rows)
+    counts = [0] * (columns * rows)
+    step = FINGERPRINT_SAMPLE_STEP
+    pixel_step = bpp * step
+    column_of = [x * columns // width for x in range(0, width, step)]
+
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        line = _unfilter(bytearray(raw[pos + 1 : pos + 1 + stride]), prev, raw[pos], bpp)
+        pos += stride + 1
+        prev = line
+        if y % step:
+            continue
+
+        base = (y * rows // height) * columns
+        if bpp >= 3:
+            # Integer luma from the R, G and B channels
+            luma = [
+                (r * 299 + g * 587 + b * 114) // 1000
+                for r, g, b in zip(line[0::pixel_step], line[1::pixel_step], line[2::pixel_step])
+            ]
+        else:
+            luma = line[0::pixel_step]
+        for x, value in enumerate(luma):
+            cell = base + column_of[x]
+            sums[cell] += value
+            counts[cell] += 1
+
+    return tuple(total // max(count, 1) for total, count in zip(sums, counts))
+
+
+def fingerprints_match(first: tuple[int, ...], second: tuple[int, ...], tolerance: int = FINGERPRINT_TOLERANCE) -> bool:
+    """True if every block's brightness differs by at most the tolerance."""
+    return len(first) == len(second) and all(abs(a - b) <= tolerance for a, b in zip(first, second))
+
+
+class ScreenshotGovernor:
+    """
+    Per-session screenshot deduplication and budget for the Puppeteer proxy.
+
+    Args:
+        budget: Screenshots passed through to the agent per session (None for unlimited)
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.current_url = "the current page"
+        self.sent = 0
+        self.deduplicated = 0
+        self.over_budget = 0
+        # (url, selector) -> (screenshot name, image digest, fingerprint)
+        self._previous: dict[tuple[str, str], tuple[str, bytes, Optional[tuple[int, ...]]]] = {}
+
+    def begin_session(self) -> None:
+        """Reset the budget and previous screenshots for a new session."""
+        self.sent = self.deduplicated = self.over_budget = 0
+        self._previous.clear()
+
+    def note_call(self, tool_name: str, arguments: dict[str, Any]) -> None:
+        """Track the page the browser is on from navigation calls."""
+        if tool_name.endswith("navigate") and arguments.get("url"):
+            self.current_url = str(arguments["url"])
+
+    def filter(self, tool_name: str, arguments: dict[str, Any], content: list[Any]) -> list[Any]:
+        """Replace duplicate or over-budget screenshot images with short text notes."""
+        if not tool_name.endswith("screenshot"):
+            return content
+
+        name = str(arguments.get("name", "screenshot"))
+        key = (self.current_url, str(arguments.get("selector", "")))
+        filtered: list[Any] = []
+        for item in content:
+            if not isinstance(item, ImageContent):
+                filtered.append(item)
+                continue
+
+            digest = hashlib.sha256(item.data.encode("ascii", "replace")).digest()
+            previous = self._previous.get(key)
+            fingerprint: Optional[tuple[int, ...]] = None
+            if previous is not None and previous[1] == digest:
+                unchanged = True
+            else:
+                try:
+                    fingerprint = png_fingerprint(base64.b64decode(item.data))
+                except (PngDecodeError, ValueError):
+                    fingerprint = None
+                unchanged = (
+                    previous is not None
+                    and previous[2] is not None
+                    and fingerprint is not None
+                    and fingerprints_match(previous[2], fingerprint)
+                )
+
+            if unchanged:
+                self.deduplicated += 1
+                filtered.append(TextContent(
+                    type="text",
+                    text=f"[Screenshot '{name}' is identical to previous screenshot '{previous[0]}' of "
+                    f"{self.current_url} - image omitted]",
+                ))
+                continue
+
+            if self.budget is not None and self.sent >= self.budget:
+                self.over_budget += 1
+                filtered.append(TextContent(
+                    type="text",
+                    text=f"[Screenshot budget used up ({self.budget} per session) - image omitted. "
+                    "Verify through page content instead, e.g. puppeteer_evaluate returning "
+                    "document.body.innerText or specific element text.]",
+                ))
+                continue
+
+            self.sent += 1
+            self._previous[key] = (name, digest, fingerprint)
+            filtered.append(item)
+        return filtered
@@ -7,7 +7,10 @@ Uses an allowlist approach - only explicitly permitted commands can run.
 """
 
 import os
+import re
 import shlex
+from dataclasses import dataclass
+from functools import lru_cache
 
 
 # Allowed commands for development tasks
@@ -44,118 +47,352 @@ ALLOWED_COMMANDS = {
 COMMANDS_NEEDING_EXTRA_VALIDATION = {"pkill", "chmod", "init.sh"}
 
 
-def split_command_segments(command_string: str) -> list[str]:
+# chmod modes that only add execute permission: +x, u+x, g+x, o+x, a+x, ug+x, etc.
+CHMOD_EXECUTABLE_MODE = re.compile(r"^[ugoa]*\+x$")
+
+# Shell keywords that precede commands (skipped when looking for command names)
+SHELL_KEYWORDS = {
+    "if",
+    "then",
+    "else",
+    "elif",
+    "fi",
+    "for",
+    "while",
+    "until",
+    "do",
+    "done",
+    "case",
+    "esac",
+    "in",
+    "!",
+    "{",
+    "}",
+}
+
+# Size of the LRU caches for parsed commands and hook decisions.
+# Agents repeat the same handful of commands (git status, npm run dev, ...)
+# constantly, so a small cache serves nearly every call after warm-up.
+COMMAND_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CommandSegment:
+    """One simple command from a compound command line."""
+
+    text: str
+    commands: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
     """
-    Split a compound command into individual command segments.
+    Result of parsing a command line once.
 
-    Handles command chaining (&&, ||, ;) but not pipes (those are single commands).
+    segments is empty when the command could not be parsed (unclosed quotes,
+    malformed escapes), which callers treat as a reason to block.
+    """
+
+    segments: tuple[CommandSegment, ...]
+
+    @property
+    def commands(self) -> list[str]:
+        return [cmd for segment in self.segments for cmd in segment.commands]
 
-    Args:
-        command_string: The full shell command
+
+def _tokenize_segments(command_string: str) -> list[str] | None:
+    """
+    Split a command line into simple-command segments in a single pass.
+
+    Splits on unquoted &&, ||, ;, newlines, pipes and background &, while
+    leaving quoted text and redirections like 2>&1, &>file and >| intact.
+    Heredoc bodies (<<WORD, <<-WORD) are data, not commands: they are left
+    out of the segments, up to the line closing each heredoc. Arithmetic and
+    parameter expansions ($((...)), $[...], ${...}) are kept whole, so a
+    shift like $((1<<2)) is not taken for a heredoc.
 
     Returns:
-        List of individual command segments
+        List of segment strings, or None if a quote or expansion is left unclosed
     """
-    import re
+    segments = []
+    current: list[str] = []
+    quote = None
+    # Heredocs opened on the current line: (delimiter, strip leading tabs)
+    heredocs: list[tuple[str, bool]] = []
+    i = 0
+    length = len(command_string)
+
+    def flush() -> None:
+        segment = "".join(current).strip()
+        if segment:
+            segments.append(segment)
+        current.clear()
+
+    while i < length:
+        ch = command_string[i]
+        nxt = command_string[i + 1] if i + 1 < length else ""
+        prev = current[-1] if current else ""
+
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                quote = None
+            elif ch == "\\" and quote == '"' and nxt:
+                current.append(nxt)
+                i += 1
+        elif ch in ("'", '"'):
+            quote = ch
+            current.append(ch)
+        elif ch == "\\" and nxt:
+            current.append(ch)
+            current.append(nxt)
+            i += 1
+        elif ch == "$" and (nxt in ("[", "{") or command_string[i + 1:i + 3] == "(("):
+            end = _expansion_end(command_string, i + 1)
+            if end is None:
+                return None
+            current.append(command_string[i:end])
+            i = end
+            continue
+        elif ch == "<" and command_string[i:i + 3] == "<<<":
+            # Here-string: the word after it is data on the same line
+            current.append("<<<")
+            i += 3
+            continue
+        elif ch == "<" and nxt == "<":
+            # Heredoc operator
+            heredoc, end = _read_heredoc_word(command_string, i + 2)
+            current.append(command_string[i:end])
+            if heredoc is not None:
+                heredocs.append(heredoc)
+            i = end
+            continue
+        elif ch == "\n" and heredocs:
+            flush()
+            i = _skip_heredoc_bodies(command_string, i + 1, heredocs)
+            heredocs.clear()
+            continue
+        elif ch in (";", "\n"):
+            flush()
+        elif ch == "&":
+            if nxt == "&":
+                flush()
+                i += 1
+            elif prev in ("<", ">") or nxt == ">":
+                # Redirection (2>&1, >&2, &>file), not a command separator
+                current.append(ch)
+            else:
+                flush()
+        elif ch == "|":
+            if nxt == "|":
+                flush()
+                i += 1
+            elif prev == ">":
+                # Clobber redirection (>|)
+                current.append(ch)
+            else:
+                flush()
+                if nxt == "&":
+                    # |& pipes stderr too
+                    i += 1
+        else:
+            current.append(ch)
+        i += 1
 
-    # Split on && and || while preserving the ability to handle each segment
-    # This regex splits on && or || that aren't inside quotes
-    segments = re.split(r"\s*(?:&&|\|\|)\s*", command_string)
+    if quote:
+        return None
 
-    # Further split on semicolons
-    result = []
-    for segment in segments:
-        sub_segments = re.split(r'(?<!["\'])\s*;\s*(?!["\'])', segment)
-        for sub in sub_segments:
-            sub = sub.strip()
-            if sub:
-                result.append(sub)
+    flush()
+    return segments
 
-    return result
 
+def _expansion_end(command_string: str, start: int) -> int | None:
+    """
+    Find the end of the bracketed expansion opening at start (after the $).
 
-def extract_commands(command_string: str) -> list[str]:
+    Returns:
+        Index after the bracket closing it, or None if it is never closed
     """
-    Extract command names from a shell command string.
+    closing = {"(": ")", "[": "]", "{": "}"}
+    stack: list[str] = []
+    quote = None
+    i = start
+    while i < len(command_string):
+        ch = command_string[i]
+        if quote:
+            if ch == quote:
+                quote = None
+            elif ch == "\\" and quote == '"':
+                i += 1
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "\\":
+            i += 1
+        elif ch in closing:
+            stack.append(closing[ch])
+        elif stack and ch == stack[-1]:
+            stack.pop()
+            if not stack:
+                return i + 1
+        i += 1
+    return None
+
+
+def _read_heredoc_word(command_string: str, start: int) -> tuple[tuple[str, bool] | None, int]:
+    """
+    Read the delimiter word after a << operator.
 
-    Handles pipes, command chaining (&&, ||, ;), and subshells.
-    Returns the base command names (without paths).
+    Returns:
+        ((delimiter with quoting removed, strip leading tabs), index after the
+        word), or (None, start) if no word follows
+    """
+    i = start
+    strip_tabs = command_string[i:i + 1] == "-"
+    if strip_tabs:
+        i += 1
+    while i < len(command_string) and command_string[i] in " \t":
+        i += 1
+
+    delimiter: list[str] = []
+    quote = None
+    word_start = i
+    while i < len(command_string):
+        ch = command_string[i]
+        if quote:
+            if ch == quote:
+                quote = None
+            else:
+                delimiter.append(ch)
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "\\" and i + 1 < len(command_string):
+            i += 1
+            delimiter.append(command_string[i])
+        elif ch.isspace() or ch in ";&|<>()":
+            break
+        else:
+            delimiter.append(ch)
+        i += 1
 
-    Args:
-        command_string: The full shell command
+    if i == word_start or quote:
+        return None, start
+    return ("".join(delimiter), strip_tabs), i
+
+
+def _skip_heredoc_bodies(command_string: str, start: int, heredocs: list[tuple[str, bool]]) -> int:
+    """
+    Skip the bodies of the heredocs opened on the previous line.
 
     Returns:
-        List of command names found in the string
+        Index of the first character after the last closing delimiter line
+        (or the end of the string, if a heredoc is never closed)
     """
+    i = start
+    for delimiter, strip_tabs in heredocs:
+        while i < len(command_string):
+            end = command_string.find("\n", i)
+            if end == -1:
+                end = len(command_string)
+            line = command_string[i:end]
+            i = end + 1
+            if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                break
+    return min(i, len(command_string))
+
+
+def _command_names(tokens: list[str]) -> tuple[str, ...]:
+    """Extract the base command names from the tokens of one segment."""
     commands = []
 
-    # shlex doesn't treat ; as a separator, so we need to pre-process
-    import re
+    # Track when we expect a command vs arguments
+    expect_command = True
 
-    # Split on semicolons that aren't inside quotes (simple heuristic)
-    # This handles common cases like "echo hello; ls"
-    segments = re.split(r'(?<!["\'])\s*;\s*(?!["\'])', command_string)
+    for token in tokens:
+        # Shell operators indicate a new command follows
+        if token in ("|", "||", "&&", "&"):
+            expect_command = True
+            continue
 
-    for segment in segments:
-        segment = segment.strip()
-        if not segment:
+        # Skip shell keywords that precede commands
+        if token in SHELL_KEYWORDS:
+            continue
+
+        # Skip flags/options
+        if token.startswith("-"):
+            continue
+
+        # Skip variable assignments (VAR=value)
+        if "=" in token and not token.startswith("="):
             continue
 
+        if expect_command:
+            # Extract the base command name (handle paths like /usr/bin/python)
+            commands.append(os.path.basename(token))
+            expect_command = False
+
+    return tuple(commands)
+
+
+@lru_cache(maxsize=COMMAND_CACHE_SIZE)
+def parse_command(command_string: str) -> ParsedCommand:
+    """
+    Parse a shell command line into segments and command names, once.
+
+    Results are cached, so repeated commands are not re-tokenized.
+
+    Args:
+        command_string: The full shell command
+
+    Returns:
+        ParsedCommand (with no segments if the command is malformed)
+    """
+    raw_segments = _tokenize_segments(command_string)
+    if raw_segments is None:
+        return ParsedCommand(segments=())
+
+    segments = []
+    for text in raw_segments:
         try:
-            tokens = shlex.split(segment)
+            tokens = shlex.split(text)
         except ValueError:
-            # Malformed command (unclosed quotes, etc.)
+            # Malformed command (bad escapes, etc.)
             # Return empty to trigger block (fail-safe)
-            return []
+            return ParsedCommand(segments=())
+        segments.append(CommandSegment(text=text, commands=_command_names(tokens)))
 
-        if not tokens:
-            continue
+    return ParsedCommand(segments=tuple(segments))
+
+
+def split_command_segments(command_string: str) -> list[str]:
+    """
+    Split a compound command into individual command segments.
+
+    Handles command chaining (&&, ||, ;), newlines, pipes and background &.
+    Operators inside quotes are not treated as separators.
+
+    Args:
+        command_string: The full shell command
+
+    Returns:
+        List of individual command segments
+    """
+    return [segment.text for segment in parse_command(command_string).segments]
+
+
+def extract_commands(command_string: str) -> list[str]:
+    """
+    Extract command names from a shell command string.
 
-        # Track when we expect a command vs arguments
-        expect_command = True
-
-        for token in tokens:
-            # Shell operators indicate a new command follows
-            if token in ("|", "||", "&&", "&"):
-                expect_command = True
-                continue
-
-            # Skip shell keywords that precede commands
-            if token in (
-                "if",
-                "then",
-                "else",
-                "elif",
-                "fi",
-                "for",
-                "while",
-                "until",
-                "do",
-                "done",
-                "case",
-                "esac",
-                "in",
-                "!",
-                "{",
-                "}",
-            ):
-                continue
-
-            # Skip flags/options
-            if token.startswith("-"):
-                continue
-
-            # Skip variable assignments (VAR=value)
-            if "=" in token and not token.startswith("="):
-                continue
-
-            if expect_command:
-                # Extract the base command name (handle paths like /usr/bin/python)
-                cmd = os.path.basename(token)
-                commands.append(cmd)
-                expect_command = False
-
-    return commands
+    Handles pipes, command chaining (&&, ||, ;), and subshells.
+    Returns the base command names (without paths).
+
+    Args:
+        command_string: The full shell command
+
+    Returns:
+        List of command names found in the string (empty if unparseable)
+    """
+    return parse_command(command_string).commands
 
 
 def validate_pkill_command(command_string: str) -> tuple[bool, str]:
@@ -242,10 +479,7 @@ def validate_chmod_command(command_string: str) -> tuple[bool, str]:
         return False, "chmod requires at least one file"
 
     # Only allow +x variants (making files executable)
-    # This matches: +x, u+x, g+x, o+x, a+x, ug+x, etc.
-    import re
-
-    if not re.match(r"^[ugoa]*\+x$", mode):
+    if not CHMOD_EXECUTABLE_MODE.match(mode):
         return False, f"chmod only allowed with +x mode, got: {mode}"
 
     return True, ""
@@ -288,12 +522,52 @@ def get_command_for_validation(cmd: str, segments: list[str]) -> str:
         The segment containing the command, or empty string if not found
     """
     for segment in segments:
-        segment_commands = extract_commands(segment)
-        if cmd in segment_commands:
+        if cmd in extract_commands(segment):
             return segment
     return ""
 
 
+# Validators for commands in COMMANDS_NEEDING_EXTRA_VALIDATION
+EXTRA_VALIDATORS = {
+    "pkill": validate_pkill_command,
+    "chmod": validate_chmod_command,
+    "init.sh": validate_init_script,
+}
+
+
+@lru_cache(maxsize=COMMAND_CACHE_SIZE)
+def evaluate_command(command: str) -> tuple[bool, str]:
+    """
+    Decide whether a bash command is allowed.
+
+    Parses the command once and checks every command in every segment
+    against the allowlist; sensitive commands are validated against their
+    own segment. Decisions are cached by command string.
+
+    Returns:
+        Tuple of (is_allowed, reason_if_blocked)
+    """
+    parsed = parse_command(command)
+
+    if not parsed.commands:
+        # Could not parse - fail safe by blocking
+        return False, f"Could not parse command for security validation: {command}"
+
+    # Check each command against the allowlist
+    for segment in parsed.segments:
+        for cmd in segment.commands:
+            if cmd not in ALLOWED_COMMANDS:
+                return False, f"Command '{cmd}' is not in the allowed commands list"
+
+            # Additional validation for sensitive commands
+            if cmd in COMMANDS_NEEDING_EXTRA_VALIDATION:
+                allowed, reason = EXTRA_VALIDATORS[cmd](segment.text)
+                if not allowed:
+                    return False, reason
+
+    return True, ""
+
+
 async def bash_security_hook(input_data, tool_use_id=None, context=None):
     """
     Pre-tool-use hook that validates bash commands using an allowlist.
@@ -315,45 +589,8 @@ async def bash_security_hook(input_data, tool_use_id=None, context=None):
     if not command:
         return {}
 
-    # Extract all commands from the command string
-    commands = extract_commands(command)
-
-    if not commands:
-        # Could not parse - fail safe by blocking
-        return {
-            "decision": "block",
-            "reason": f"Could not parse command for security validation: {command}",
-        }
-
-    # Split into segments for per-command validation
-    segments = split_command_segments(command)
-
-    # Check each command against the allowlist
-    for cmd in commands:
-        if cmd not in ALLOWED_COMMANDS:
-            return {
-                "decision": "block",
-                "reason": f"Command '{cmd}' is not in the allowed commands list",
-            }
-
-        # Additional validation for sensitive commands
-        if cmd in COMMANDS_NEEDING_EXTRA_VALIDATION:
-            # Find the specific segment containing this command
-            cmd_segment = get_command_for_validation(cmd, segments)
-            if not cmd_segment:
-                cmd_segment = command  # Fallback to full command
-
-            if cmd == "pkill":
-                allowed, reason = validate_pkill_command(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
-            elif cmd == "chmod":
-                allowed, reason = validate_chmod_command(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
-            elif cmd == "init.sh":
-                allowed, reason = validate_init_script(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
+    allowed, reason = evaluate_command(command.strip())
+    if not allowed:
+        return {"decision": "block", "reason": reason}
 
     return {}
@@ -0,0 +1,127 @@
+"""
+Session Context
+===============
+
+Gathers what a coding session would otherwise spend its first turns
+discovering (working directory, files, Linear project IDs, recent git
+history, issue counts and the latest META comment) so the harness can inject
+it into the prompt before the session starts.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from devservers import format_dev_server_status, get_dev_server_manager
+from issue_cache import format_issue_summary, get_issue_cache
+from linear_client import LinearAPIError, LinearClient
+from linear_config import LINEAR_PROJECT_MARKER
+from progress import load_linear_project_state
+
+
+GIT_LOG_LIMIT = 20
+MAX_LISTED_FILES = 40
+MAX_META_COMMENT_CHARS = 4000
+
+
+async def recent_git_log(project_dir: Path, limit: int = GIT_LOG_LIMIT) -> Optional[str]:
+    """Return `git log --oneline -<limit>` output, or None if there is no history."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", "log", "--oneline", f"-{limit}",
+            cwd=project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return None
+    return stdout.decode("utf-8", "replace").strip() or None
+
+
+def list_project_files(project_dir: Path, limit: int = MAX_LISTED_FILES) -> str:
+    """List top-level entries (directories with a trailing slash), skipping hidden ones."""
+    entries = sorted(
+        entry.name + ("/" if entry.is_dir() else "")
+        for entry in project_dir.iterdir()
+        if not entry.name.startswith(".") or entry.name == LINEAR_PROJECT_MARKER
+    )
+    listing = ", ".join(entries[:limit])
+    if len(entries) > limit:
+        listing += f", ... ({len(entries) - limit} more)"
+    return listing or "(empty)"
+
+
+async def latest_meta_comment(meta_issue_id: Optional[str], linear: Any = None) -> Optional[str]:
+    """Fetch the newest comment on the META issue (None if unavailable)."""
+    if not meta_issue_id:
+        return None
+    if linear is None:
+        api_key = os.environ.get("LINEAR_API_KEY")
+        if not api_key:
+            return None
+        linear = LinearClient(api_key)
+
+    try:
+        comment = await linear.get_latest_comment(meta_issue_id)
+    except LinearAPIError as e:
+        print(f"Could not fetch latest META comment: {e}")
+        return None
+    if comment is None:
+        return "(no comments yet)"
+
+    body = comment.get("body", "")
+    if len(body) > MAX_META_COMMENT_CHARS:
+        body = body[:MAX_META_COMMENT_CHARS] + "\n... (truncated - use mcp__linear__list_comments for the rest)"
+    author = (comment.get("user") or {}).get("name", "unknown")
+    return f"Posted {comment.get('createdAt', '')} by {author}:\n\n{body}"
+
+
+async def build_session_context(project_dir: Path, linear: Any = None) -> str:
+    """
+    Render the precomputed context block for a coding session prompt.
+
+    Args:
+        project_dir: Directory the session runs in
+        linear: Linear client for the META comment (defaults to LINEAR_API_KEY)
+    """
+    state = load_linear_project_state(project_dir) or {}
+    meta_issue_id = state.get("meta_issue_id")
+    git_log, meta_comment = await asyncio.gather(
+        recent_git_log(project_dir),
+        latest_meta_comment(meta_issue_id, linear),
+    )
+
+    lines = [
+        f"**Working directory:** {project_dir.resolve()}",
+        f"**Top-level files:** {list_project_files(project_dir)}",
+        f"**Linear project:** {state.get('project_name', 'unknown')} "
+        f"(project_id: {state.get('project_id', 'unknown')}, team_id: {state.get('team_id', 'unknown')}, "
+        f"META issue: {meta_issue_id or 'unknown'})",
+        "",
+        f"**Recent commits (git log --oneline -{GIT_LOG_LIMIT}):**",
+        "```",
+        git_log or "(no commits yet)",
+        "```",
+        "",
+        "**Linear issues (harness cache, refreshed just now):**",
+        "```",
+        format_issue_summary(get_issue_cache(project_dir), meta_issue_id),
+        "```",
+        "",
+        "**Latest META issue comment:**",
+        "",
+        meta_comment or "(unavailable - read it with mcp__linear__list_comments)",
+    ]
+
+    dev_servers = get_dev_server_manager(project_dir)
+    if dev_servers.last_status or dev_servers.config_error:
+        lines += [
+            "",
+            "**Dev servers (managed by the harness, checked just now):**",
+            format_dev_server_status(dev_servers.last_status, dev_servers.config_error),
+        ]
+    return "\n".join(lines)
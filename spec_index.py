@@ -0,0 +1,318 @@
+"""
+App Spec Index
+==============
+
+Splits app_spec.txt into sections once and serves only the sections relevant
+to a query, so coding sessions don't have to read the whole spec into
+context every time.
+
+XML-style specs (like prompts/app_spec.txt) are split on their element
+structure, with large elements split further into their child elements;
+Markdown specs are split on headings. The index is saved next to the spec
+and rebuilt whenever the spec's SHA-256 changes.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from claude_code_sdk import SdkMcpTool, tool
+
+from state_store import HARNESS_DIR, state_file
+
+
+SPEC_FILE = "app_spec.txt"
+SPEC_INDEX_FILE = f"{HARNESS_DIR}/app_spec_index.json"
+
+# Elements longer than this are split into their child elements
+MAX_SECTION_LINES = 40
+DEFAULT_LOOKUP_LIMIT = 3
+
+OPEN_TAG = re.compile(r"^\s*<([A-Za-z_][\w-]*)((?:\s+[\w-]+=\"[^\"]*\")*)\s*>\s*$")
+CLOSE_TAG = re.compile(r"^\s*</([A-Za-z_][\w-]*)>\s*$")
+INLINE_ELEMENT = re.compile(r"^\s*<([A-Za-z_][\w-]*)[^>]*>(.*)</\1>\s*$")
+ATTRIBUTE = re.compile(r"([\w-]+)=\"([^\"]*)\"")
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+WORD = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to with "
+    "add implement feature support user users should can when will issue".split()
+)
+
+
+@dataclass
+class SpecSection:
+    """One retrievable section of the spec (line numbers are 1-based, inclusive)."""
+
+    path: str
+    start_line: int
+    end_line: int
+    text: str
+
+
+@dataclass
+class _Element:
+    tag: str
+    attributes: str
+    start: int
+    end: int = -1
+    label: str = ""
+    children: list["_Element"] = field(default_factory=list)
+
+
+def tokenize(text: str) -> list[str]:
+    return [word for word in WORD.findall(text.lower()) if len(word) > 2 and word not in STOPWORDS]
+
+
+def _element_label(element: _Element, lines: list[str]) -> str:
+    """Tag name plus any attribute values and a leading <title>/<name> child, e.g. "step 1: Setup"."""
+    label = element.tag
+    values = [value for _, value in ATTRIBUTE.findall(element.attributes)]
+    if values:
+        label += " " + " ".join(values)
+    for line in lines[element.start + 1 : element.end]:
+        if OPEN_TAG.match(line):
+            break
+        match = INLINE_ELEMENT.match(line)
+        if match and match.group(1) in ("title", "name"):
+            label += f": {match.group(2).strip()}"
+            break
+    return label
+
+
+def _parse_elements(lines: list[str]) -> list[_Element]:
+    """Return the top-level multi-line elements, each with nested multi-line children."""
+    roots: list[_Element] = []
+    stack: list[_Element] = []
+
+    for number, line in enumerate(lines):
+        open_match = OPEN_TAG.match(line)
+        if open_match:
+            element = _Element(tag=open_match.group(1), attributes=open_match.group(2), start=number)
+            (stack[-1].children if stack else roots).append(element)
+            stack.append(element)
+            continue
+
+        close_match = CLOSE_TAG.match(line)
+        if close_match and stack and stack[-1].tag == close_match.group(1):
+            stack.pop().end = number
+
+    # Unclosed elements run to the end of the file
+    for element in stack:
+        element.end = len(lines) - 1
+
+    def finish(element: _Element) -> None:
+        element.label = _element_label(element, lines)
+        for child in element.children:
+            finish(child)
+
+    for root in roots:
+        finish(root)
+    return roots
+
+
+def _split_xml(lines: list[str]) -> list[SpecSection]:
+    sections: list[SpecSection] = []
+
+    def emit(element: _Element, prefix: str, split: bool = False) -> None:
+        path = f"{prefix}/{element.label}" if prefix else element.label
+        if element.children and (split or element.end - element.start + 1 > MAX_SECTION_LINES):
+            # Text between child elements (e.g. a project_name line) becomes a section of its own
+            covered = {n for child in element.children for n in range(child.start, child.end + 1)}
+            loose = [lines[n] for n in range(element.start + 1, element.end) if n not in covered and lines[n].strip()]
+            if loose:
+                sections.append(SpecSection(path, element.start + 1, element.end + 1, "\n".join(loose)))
+            # Children of a single wrapper element (<project_specification>) are top-level sections
+            child_prefix = "" if split else path
+            for child in element.children:
+                emit(child, child_prefix)
+            return
+        text = "\n".join(lines[element.start : element.end + 1])
+        sections.append(SpecSection(path, element.start + 1, element.end + 1, text))
+
+    roots = _parse_elements(lines)
+    for root in roots:
+        emit(root, "", split=len(roots) == 1)
+    return sections
+
+
+def _split_markdown(lines: list[str]) -> list[SpecSection]:
+    sections: list[SpecSection] = []
+    headings: list[str] = []
+    start = 0
+    path = "preamble"
+
+    def flush(end: int) -> None:
+        text = "\n".join(lines[start:end]).strip()
+        if text:
+            sections.append(SpecSection(path, start + 1, end, text))
+
+    for number, line in enumerate(lines):
+        match = MARKDOWN_HEADING.match(line)
+        if not match:
+            continue
+        flush(number)
+        level = len(match.group(1))
+        headings = headings[: level - 1] + [match.group(2)]
+        path = "/".join(headings)
+        start = number
+    flush(len(lines))
+    return sections
+
+
+def split_spec(text: str) -> list[SpecSection]:
+    """Split spec text into sections (XML elements or Markdown headings)."""
+    lines = text.splitlines()
+    sections = _split_xml(lines) if text.lstrip().startswith("<") else _split_markdown(lines)
+    return sections or [SpecSection("spec", 1, len(lines), text)]
+
+
+class SpecIndex:
+    """
+    Sections of one spec file with a small BM25 ranking over their words.
+
+    Args:
+        spec_hash: SHA-256 of the spec the sections came from
+        sections: Spec sections in file order
+    """
+
+    def __init__(self, spec_hash: str, sections: list[SpecSection]):
+        self.spec_hash = spec_hash
+        self.sections = sections
+        self._terms = [Counter(tokenize(f"{section.path} {section.text}")) for section in sections]
+        self._path_terms = [set(tokenize(section.path.replace("_", " "))) for section in sections]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = sum(self._lengths) / max(len(self._lengths), 1)
+        document_frequency: Counter = Counter()
+        for terms in self._terms:
+            document_frequency.update(terms.keys())
+        total = len(sections)
+        self._idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in document_frequency.items()
+        }
+
+    def get(self, path: str) -> Optional[SpecSection]:
+        """Return the section with this path (case-insensitive, prefix match allowed)."""
+        wanted = path.strip().lower()
+        for section in self.sections:
+            if section.path.lower() == wanted:
+                return section
+        for section in self.sections:
+            if section.path.lower().startswith(wanted):
+                return section
+        return None
+
+    def search(self, query: str, limit: int = DEFAULT_LOOKUP_LIMIT) -> list[SpecSection]:
+        """Return the sections most relevant to the query, best first."""
+        query_terms = set(tokenize(query.replace("_", " ")))
+        scored = []
+        for index, terms in enumerate(self._terms):
+            score = 0.0
+            length_norm = 1.2 * (0.25 + 0.75 * self._lengths[index] / max(self._avg_length, 1))
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * 2.2 / (tf + length_norm)
+                if term in self._path_terms[index]:
+                    score += self._idf.get(term, 0)
+            if score > 0:
+                scored.append((score, index))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.sections[index] for _, index in scored[:limit]]
+
+    def outline(self) -> str:
+        """Table of contents: one line per section with its line range."""
+        return "\n".join(
+            f"- {section.path} (lines {section.start_line}-{section.end_line})" for section in self.sections
+        )
+
+
+def hash_spec(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+_indexes: dict[Path, SpecIndex] = {}
+
+
+def load_spec_index(project_dir: Path) -> Optional[SpecIndex]:
+    """
+    Return the section index for the project's app_spec.txt.
+
+    The index is cached in memory and in .harness/app_spec_index.json, and rebuilt
+    whenever the spec's hash changes.
+
+    Returns:
+        The index, or None if the project has no app_spec.txt
+    """
+    try:
+        text = (project_dir / SPEC_FILE).read_text()
+    except OSError:
+        return None
+
+    spec_hash = hash_spec(text)
+    key = project_dir.resolve()
+    cached = _indexes.get(key)
+    if cached is not None and cached.spec_hash == spec_hash:
+        return cached
+
+    store = state_file(project_dir / SPEC_INDEX_FILE)
+    sections = None
+    data = store.read()
+    if isinstance(data, dict) and data.get("spec_hash") == spec_hash:
+        try:
+            sections = [SpecSection(**section) for section in data["sections"]]
+        except (KeyError, TypeError):
+            sections = None
+
+    if sections is None:
+        sections = split_spec(text)
+        store.write({"spec_hash": spec_hash, "sections": [asdict(s) for s in sections]})
+
+    _indexes[key] = SpecIndex(spec_hash, sections)
+    return _indexes[key]
+
+
+def _format_sections(sections: list[SpecSection]) -> str:
+    return "\n\n".join(
+        f"### {section.path} (lines {section.start_line}-{section.end_line})\n{section.text}" for section in sections
+    )
+
+
+def create_spec_tools(project_dir: Path) -> list[SdkMcpTool]:
+    """Build the in-process MCP tool that serves app_spec.txt sections."""
+
+    @tool(
+        "spec_lookup",
+        "Look up sections of app_spec.txt instead of reading the whole file. "
+        "With no arguments, returns the table of contents. With `query` (e.g. the issue title "
+        "and key terms), returns the most relevant sections. With `section`, returns that section.",
+        {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Words describing what you need (e.g. the issue title)"},
+                "section": {"type": "string", "description": "Section path from the table of contents"},
+                "limit": {"type": "integer", "description": f"Sections to return for a query (default {DEFAULT_LOOKUP_LIMIT})"},
+            },
+        },
+    )
+    async def spec_lookup(args):
+        index = load_spec_index(project_dir)
+        if index is None:
+            return {"content": [{"type": "text", "text": f"No {SPEC_FILE} in the project directory"}]}
+
+        if args.get("section"):
+            section = index.get(str(args["section"]))
+            text = _format_sections([section]) if section else f"No section {args['section']!r}. Sections:\n{index.outline()}"
+        elif args.get("query"):
+            matches = index.search(str(args["query"]), int(args.get("limit") or DEFAULT_LOOKUP_LIMIT))
+            text = _format_sections(matches) if matches else f"No matching sections. Sections:\n{index.outline()}"
+        else:
+            text = f"{SPEC_FILE} sections:\n{index.outline()}"
+        return {"content": [{"type": "text", "text": text}]}
+
+    return [spec_lookup]
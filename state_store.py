@@ -0,0 +1,188 @@
+"""
+Harness State Store
+===================
+
+Small layer for the JSON state files the harness keeps in the project
+directory (.linear_project.json, .claude_settings.json, and the files in
+.harness/).
+
+- Reads are cached in memory and only re-parsed when the file's
+  (mtime, size, inode) changes, so frequent checks cost one stat() call
+- Writes go to a temp file in the same directory and are renamed into place,
+  so readers never see a half-written file
+- Writes of content equal to what is already on disk are skipped
+- Read-modify-write updates hold an exclusive lock on the file's directory,
+  so concurrent workers (threads or processes) touching the same project
+  don't lose updates, and no lock files are left next to the state
+
+Harness-only state (caches, journal, telemetry) lives in .harness/, which
+is created with a .gitignore that ignores everything in it. The agent's
+`git add .` then never commits it, whether or not the project is a git
+repository yet.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; fall back to in-process locking only
+    fcntl = None
+
+
+# Project subdirectory holding harness-only state files
+HARNESS_DIR = ".harness"
+
+
+def ensure_parent_dir(path: Path) -> None:
+    """
+    Create a file's parent directory if needed.
+
+    A .harness/ directory is created with a .gitignore ignoring everything
+    in it.
+    """
+    parent = path.parent
+    if parent.name == HARNESS_DIR:
+        gitignore = parent / ".gitignore"
+        if not gitignore.exists():
+            parent.mkdir(parents=True, exist_ok=True)
+            gitignore.write_text("*\n")
+    else:
+        parent.mkdir(parents=True, exist_ok=True)
+
+
+class JsonStateFile:
+    """
+    One JSON state file with a cached, mtime-validated view of its content.
+
+    Args:
+        path: The JSON file
+        indent: Indentation used when writing
+    """
+
+    def __init__(self, path: Path, indent: Optional[int] = 2):
+        self.path = path
+        self.indent = indent
+        self._lock = threading.RLock()
+        self._signature: Optional[tuple[int, int, int]] = None
+        self._data: Any = None
+
+    def _stat_signature(self) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _load(self) -> Any:
+        signature = self._stat_signature()
+        if signature is None:
+            self._signature, self._data = None, None
+        elif signature != self._signature:
+            try:
+                with open(self.path, "r") as f:
+                    self._data = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                self._data = None
+            self._signature = signature
+        return self._data
+
+    def read(self) -> Any:
+        """
+        Return the file's parsed content (None if missing or corrupt).
+
+        The result is a copy, so callers may modify it freely.
+        """
+        with self._lock:
+            return copy.deepcopy(self._load())
+
+    def write(self, data: Any) -> bool:
+        """
+        Atomically replace the file's content.
+
+        Returns:
+            False if the file already held exactly this content (nothing written)
+        """
+        with self._lock:
+            if self._load() is not None and self._data == data:
+                return False
+
+            ensure_parent_dir(self.path)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f, indent=self.indent)
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+
+            self._data = copy.deepcopy(data)
+            self._signature = self._stat_signature()
+            return True
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            ensure_parent_dir(self.path)
+            # Lock the directory itself rather than a lock file beside the state
+            lock_fd = os.open(self.path.parent, os.O_RDONLY)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            finally:
+                os.close(lock_fd)
+
+    def update(self, mutate: Callable[[Any], Any]) -> Any:
+        """
+        Read-modify-write under an exclusive lock.
+
+        Args:
+            mutate: Called with the current content (None if missing); returns
+                the new content
+
+        Returns:
+            The new content
+        """
+        with self._exclusive():
+            data = mutate(self.read())
+            self.write(data)
+            return copy.deepcopy(data)
+
+    async def read_async(self) -> Any:
+        return await asyncio.to_thread(self.read)
+
+    async def write_async(self, data: Any) -> bool:
+        return await asyncio.to_thread(self.write, data)
+
+    async def update_async(self, mutate: Callable[[Any], Any]) -> Any:
+        return await asyncio.to_thread(self.update, mutate)
+
+
+_files: dict[Path, JsonStateFile] = {}
+_files_lock = threading.Lock()
+
+
+def state_file(path: Path) -> JsonStateFile:
+    """Return the shared JsonStateFile for a path (one cache per file per process)."""
+    key = path.resolve()
+    with _files_lock:
+        if key not in _files:
+            _files[key] = JsonStateFile(path)
+        return _files[key]
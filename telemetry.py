@@ -0,0 +1,243 @@
+"""
+Session Telemetry
+=================
+
+Records per-session and per-tool-call timing, token usage and cost in a
+local SQLite database under the project directory, and renders a report
+of where sessions spend their time and money.
+"""
+
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from events import (
+    EventSink,
+    SessionEvent,
+    SessionResultEvent,
+    SessionStartEvent,
+    TextEvent,
+    ToolResultEvent,
+    ToolUseEvent,
+)
+from state_store import HARNESS_DIR, ensure_parent_dir
+
+
+# SQLite database file, relative to the project directory
+TELEMETRY_DB = f"{HARNESS_DIR}/telemetry.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sdk_session_id TEXT,
+    label TEXT,
+    model TEXT,
+    started_at REAL,
+    wall_ms REAL,
+    ttft_ms REAL,
+    num_turns INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_read_tokens INTEGER,
+    cache_creation_tokens INTEGER,
+    cost_usd REAL,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS tool_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER REFERENCES sessions(id),
+    tool_use_id TEXT,
+    tool_name TEXT,
+    category TEXT,
+    started_at REAL,
+    latency_ms REAL,
+    is_error INTEGER
+);
+CREATE INDEX IF NOT EXISTS tool_calls_session ON tool_calls(session_id);
+"""
+
+
+def tool_category(tool_name: str) -> str:
+    """Group a tool name into linear / puppeteer / bash / harness / builtin."""
+    if tool_name.startswith("mcp__linear__"):
+        return "linear"
+    if tool_name.startswith("mcp__puppeteer__"):
+        return "puppeteer"
+    if tool_name.startswith("mcp__harness__"):
+        return "harness"
+    if tool_name == "Bash":
+        return "bash"
+    return "builtin"
+
+
+def connect(project_dir: Path) -> sqlite3.Connection:
+    """Open (and create if needed) the project's telemetry database."""
+    ensure_parent_dir(project_dir / TELEMETRY_DB)
+    conn = sqlite3.connect(project_dir / TELEMETRY_DB)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class TelemetrySink(EventSink):
+    """
+    Event sink that measures one session and writes it to the telemetry store.
+
+    Args:
+        project_dir: Project directory holding the telemetry database
+        model: Model used for the session
+        label: Free-form session label (e.g. "coding", "initializer", "worker-2")
+    """
+
+    def __init__(self, project_dir: Path, model: str, label: str = ""):
+        self.project_dir = project_dir
+        self.model = model
+        self.label = label
+        self.started_at: Optional[float] = None
+        self.first_text_at: Optional[float] = None
+        self.result: Optional[SessionResultEvent] = None
+        self.pending: dict[str, ToolUseEvent] = {}
+        self.tool_calls: list[tuple] = []
+
+    async def handle(self, event: SessionEvent) -> None:
+        if isinstance(event, SessionStartEvent):
+            self.started_at = event.ts
+        elif isinstance(event, TextEvent):
+            if self.first_text_at is None:
+                self.first_text_at = event.ts
+        elif isinstance(event, ToolUseEvent):
+            self.pending[event.tool_use_id] = event
+        elif isinstance(event, ToolResultEvent):
+            use = self.pending.pop(event.tool_use_id, None)
+            if use is not None:
+                self.tool_calls.append(
+                    (
+                        use.tool_use_id,
+                        use.name,
+                        tool_category(use.name),
+                        use.ts,
+                        (event.ts - use.ts) * 1000,
+                        int(event.is_error),
+                    )
+                )
+        elif isinstance(event, SessionResultEvent):
+            self.result = event
+
+    def _write(self, ended_at: float) -> None:
+        started_at = self.started_at or ended_at
+        usage = (self.result.usage if self.result else None) or {}
+        if self.result is None:
+            status = "incomplete"
+        else:
+            status = "error" if self.result.is_error else "success"
+
+        conn = connect(self.project_dir)
+        try:
+            with conn:
+                cursor = conn.execute(
+                    """
+                    INSERT INTO sessions (
+                        sdk_session_id, label, model, started_at, wall_ms, ttft_ms,
+                        num_turns, input_tokens, output_tokens, cache_read_tokens,
+                        cache_creation_tokens, cost_usd, status
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        self.result.session_id if self.result else None,
+                        self.label,
+                        self.model,
+                        started_at,
+                        (ended_at - started_at) * 1000,
+                        (self.first_text_at - started_at) * 1000 if self.first_text_at else None,
+                        self.result.num_turns if self.result else None,
+                        usage.get("input_tokens"),
+                        usage.get("output_tokens"),
+                        usage.get("cache_read_input_tokens"),
+                        usage.get("cache_creation_input_tokens"),
+                        self.result.total_cost_usd if self.result else None,
+                        status,
+                    ),
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO tool_calls (
+                        session_id, tool_use_id, tool_name, category, started_at, latency_ms, is_error
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [(cursor.lastrowid, *call) for call in self.tool_calls],
+                )
+        finally:
+            conn.close()
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._write, time.time())
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def format_report(project_dir: Path) -> str:
+    """Summarize recorded sessions and tool calls for a project."""
+    if not (project_dir / TELEMETRY_DB).exists():
+        return f"No telemetry recorded yet in {project_dir}"
+
+    conn = connect(project_dir)
+    try:
+        sessions = conn.execute(
+            """
+            SELECT COUNT(*), SUM(wall_ms), AVG(wall_ms), AVG(ttft_ms),
+                   SUM(input_tokens), SUM(output_tokens), SUM(cache_read_tokens), SUM(cost_usd),
+                   SUM(status = 'success'), SUM(status = 'error'), SUM(status = 'incomplete')
+            FROM sessions
+            """
+        ).fetchone()
+        by_model = conn.execute(
+            "SELECT model, COUNT(*), SUM(cost_usd), SUM(output_tokens) FROM sessions GROUP BY model ORDER BY 3 DESC"
+        ).fetchall()
+        calls = conn.execute("SELECT category, tool_name, latency_ms, is_error FROM tool_calls").fetchall()
+    finally:
+        conn.close()
+
+    count, wall_total, wall_avg, ttft_avg, tokens_in, tokens_out, cache_read, cost, ok, errors, incomplete = sessions
+    lines = [
+        "=" * 70,
+        "  TELEMETRY REPORT",
+        "=" * 70,
+        "",
+        f"Sessions: {count} ({ok or 0} success, {errors or 0} error, {incomplete or 0} incomplete)",
+        f"Wall time: {(wall_total or 0) / 60000:.1f} min total, {(wall_avg or 0) / 1000:.1f}s avg",
+        f"Time to first token: {(ttft_avg or 0) / 1000:.1f}s avg",
+        f"Tokens: {tokens_in or 0} in, {tokens_out or 0} out, {cache_read or 0} cache reads",
+        f"Cost: ${cost or 0:.2f} total, ${(cost or 0) / max(count, 1):.2f} per session",
+    ]
+
+    if by_model:
+        lines += ["", "By model:"]
+        for model, n, model_cost, model_out in by_model:
+            lines.append(f"  {model:<36} {n:>4} sessions  ${model_cost or 0:>8.2f}  {model_out or 0:>9} out tokens")
+
+    for group_index, title in ((0, "Tool latency by category"), (1, "Top tools by total time")):
+        groups: dict[str, list[float]] = {}
+        errors_by_group: dict[str, int] = {}
+        for row in calls:
+            key = row[group_index]
+            groups.setdefault(key, []).append(row[2])
+            errors_by_group[key] = errors_by_group.get(key, 0) + row[3]
+
+        if not groups:
+            continue
+        lines += ["", f"{title}:", f"  {'name':<40}{'calls':>7}{'p50 s':>8}{'p95 s':>8}{'total s':>10}{'errors':>8}"]
+        ranked = sorted(groups.items(), key=lambda item: -sum(item[1]))
+        for key, latencies in ranked[:15]:
+            lines.append(
+                f"  {key:<40}{len(latencies):>7}"
+                f"{_percentile(latencies, 50) / 1000:>8.2f}{_percentile(latencies, 95) / 1000:>8.2f}"
+                f"{sum(latencies) / 1000:>10.1f}{errors_by_group[key]:>8}"
+            )
+
+    return "\n".join(lines)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Backoff and Circuit Breaker Tests
+=================================
+
+Tests for error classification, per-class backoff, the circuit breaker and
+the agent loop's fast path, driven by a scripted fake client.
+Run with: python test_backoff.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from agent import run_autonomous_agent
+from backoff import (
+    AGENT_FAULT,
+    AUTH,
+    BACKOFF_POLICIES,
+    RATE_LIMIT,
+    TRANSPORT,
+    SessionSupervisor,
+    classify_error,
+)
+from linear_config import LINEAR_PROJECT_MARKER
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+class FakeSleep:
+    """Records requested sleeps instead of sleeping."""
+
+    def __init__(self):
+        self.calls: list[float] = []
+
+    async def __call__(self, seconds: float) -> None:
+        self.calls.append(seconds)
+
+
+def result_message(is_error: bool = False, result: str | None = None) -> ResultMessage:
+    return ResultMessage(
+        subtype="error_during_execution" if is_error else "success",
+        duration_ms=10, duration_api_ms=8, is_error=is_error,
+        num_turns=1, session_id="s", total_cost_usd=0.0, result=result,
+    )
+
+
+class ScriptedClient:
+    """
+    Fake ClaudeSDKClient that plays one scripted outcome per session.
+
+    Outcomes: "ok", ("raise", message) to fail inside the session,
+    ("connect", message) to fail on connect, ("result", message) for an
+    SDK error result.
+    """
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def __aenter__(self):
+        if isinstance(self.outcome, tuple) and self.outcome[0] == "connect":
+            raise ConnectionError(self.outcome[1])
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        pass
+
+    async def receive_response(self):
+        if isinstance(self.outcome, tuple) and self.outcome[0] == "raise":
+            raise RuntimeError(self.outcome[1])
+        yield AssistantMessage(content=[TextBlock(text="working\n")], model="fake")
+        if isinstance(self.outcome, tuple) and self.outcome[0] == "result":
+            yield result_message(is_error=True, result=self.outcome[1])
+        else:
+            yield result_message()
+
+
+def test_classify_error():
+    """Test error classification."""
+    print("\nTesting error classification:\n")
+
+    cases = [
+        ("API Error: 429 rate_limit_error", RATE_LIMIT),
+        ("Claude AI usage limit reached|1760000000", RATE_LIMIT),
+        ("API Error: 529 Overloaded", RATE_LIMIT),
+        ("Invalid API key - please run /login", AUTH),
+        ("Linear GraphQL error: 401 Unauthorized", AUTH),
+        ("Failed to start Claude Code: connection refused", TRANSPORT),
+        ("Request timed out", TRANSPORT),
+        ("API Error: 503 Service Unavailable", TRANSPORT),
+        ("error_max_turns", AGENT_FAULT),
+        ("Tool use concurrency issues", AGENT_FAULT),
+        # Agent faults and missing resources are not network errors
+        ("Command failed with exit code 1", AGENT_FAULT),
+        ("Issue DEMO-12 not found", AGENT_FAULT),
+        ("Linear GraphQL error: Entity not found", AGENT_FAULT),
+    ]
+    results = [check(f"{message!r} -> {expected}", classify_error(message) == expected) for message, expected in cases]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_backoff_growth():
+    """Test jittered exponential backoff per class."""
+    print("\nTesting backoff growth:\n")
+
+    supervisor = SessionSupervisor(failure_threshold=100, rng=random.Random(7))
+    transport = [supervisor.record_failure("connection reset by peer")[1] for _ in range(10)]
+    rate_limit = supervisor.record_failure("429 Too Many Requests")[1]
+    policy = BACKOFF_POLICIES[TRANSPORT]
+
+    within_bounds = all(
+        min(policy.cap, policy.base * 2 ** n) / 2 <= delay <= min(policy.cap, policy.base * 2 ** n)
+        for n, delay in enumerate(transport)
+    )
+    results = [
+        check("delays stay within jittered exponential bounds", within_bounds),
+        check("delays are capped", max(transport) <= policy.cap),
+        check("delays are jittered", len(set(transport)) == len(transport)),
+        check("each class backs off independently", rate_limit <= BACKOFF_POLICIES[RATE_LIMIT].base),
+    ]
+
+    supervisor.record_success()
+    results.append(check("success resets backoff", supervisor.record_failure("timed out")[1] <= policy.base))
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_circuit_breaker():
+    """Test that repeated failures open the breaker and success closes it."""
+    print("\nTesting circuit breaker:\n")
+
+    supervisor = SessionSupervisor(failure_threshold=3, cooldown=100, max_cooldown=250, rng=random.Random(1))
+    delays = [supervisor.record_failure("connection refused")[1] for _ in range(3)]
+    opened = supervisor.circuit_open
+    trial_delay = supervisor.record_failure("connection refused")[1]
+    capped_delay = supervisor.record_failure("connection refused")[1]
+    supervisor.record_success()
+
+    results = [
+        check("breaker closed below threshold", max(delays[:2]) < 100),
+        check("breaker opens at threshold and pauses", opened and delays[2] >= 100),
+        check("failed trial session doubles the pause", trial_delay >= 200),
+        check("pause is capped", capped_delay <= 250),
+        check("success closes the breaker", not supervisor.circuit_open),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_auth_gives_up():
+    """Test that repeated auth failures stop the loop instead of retrying forever."""
+    print("\nTesting auth failures:\n")
+
+    sleep = FakeSleep()
+    supervisor = SessionSupervisor(sleep=sleep, rng=random.Random(5))
+    max_attempts = BACKOFF_POLICIES[AUTH].max_attempts
+    waits = [asyncio.run(supervisor.wait_after_failure("401 Unauthorized")) for _ in range(max_attempts)]
+
+    outcomes = iter([("result", "Invalid API key - please run /login")] * 10)
+    sessions = []
+
+    def client_factory(project_dir, model, mcp_pool=None):
+        sessions.append(project_dir)
+        return ScriptedClient(next(outcomes))
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True}))
+        asyncio.run(
+            run_autonomous_agent(
+                project_dir, "fake-model", max_iterations=10, client_factory=client_factory,
+                supervisor=SessionSupervisor(sleep=FakeSleep(), rng=random.Random(5)),
+            )
+        )
+
+    results = [
+        check("auth failures retried before giving up", all(delay is not None for delay in waits[:-1])),
+        check(f"gives up after {max_attempts} in a row", waits[-1] is None and len(sleep.calls) == max_attempts - 1),
+        check("agent loop stops on persistent auth errors", len(sessions) == max_attempts),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_agent_loop():
+    """Test the agent loop with a scripted client: fast path and backoff."""
+    print("\nTesting agent loop:\n")
+
+    script = [
+        "ok",
+        "ok",
+        ("connect", "connection refused"),
+        ("result", "API Error: 429 rate_limit_error"),
+        ("raise", "something odd happened"),
+        "ok",
+    ]
+    outcomes = iter(script)
+    sleep = FakeSleep()
+    supervisor = SessionSupervisor(sleep=sleep, rng=random.Random(3))
+
+    def client_factory(project_dir, model, mcp_pool=None):
+        return ScriptedClient(next(outcomes))
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True}))
+        asyncio.run(
+            run_autonomous_agent(
+                project_dir, "fake-model", max_iterations=len(script),
+                client_factory=client_factory, supervisor=supervisor,
+            )
+        )
+
+    results = [
+        check("every scripted session ran", next(outcomes, None) is None),
+        check("only failed sessions wait", len(sleep.calls) == 3),
+        check("transport failure backs off", 2.5 <= sleep.calls[0] <= 5),
+        check("error result classified as rate limit", 15 <= sleep.calls[1] <= 30),
+        check("agent fault uses short backoff", 1.5 <= sleep.calls[2] <= 3),
+        check("final clean session resets state", supervisor.consecutive_failures == 0),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  BACKOFF AND CIRCUIT BREAKER TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_classify_error, test_backoff_growth, test_circuit_breaker, test_auth_gives_up, test_agent_loop):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Bulk Issue Creation Tests
+=========================
+
+Tests for the create_issues_bulk harness tool against a local GraphQL
+stand-in for Linear (http.server), including rate limiting and partial
+failures.
+Run with: python test_bulk_issues.py
+"""
+
+import asyncio
+import json
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from bulk_issues import create_bulk_issue_tools, validate_issue_specs
+from linear_client import LinearClient
+from linear_config import LINEAR_PROJECT_MARKER
+
+
+class FakeLinearServer:
+    """
+    Minimal GraphQL stand-in that answers aliased issueCreate mutations.
+
+    The first request is rejected with HTTP 429 and the second with Linear's
+    HTTP 400 RATELIMITED error; issues titled "REJECT" fail individually.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.created: list[dict] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests += 1
+                    request_number = server.requests
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(0.05)
+                    reset_ms = str(int((time.time() + 0.2) * 1000))
+                    if request_number == 1:
+                        self.respond(429, {"errors": [{"message": "Too many requests"}]}, "0", reset_ms)
+                    elif request_number == 2:
+                        error = {"message": "Rate limit exceeded", "extensions": {"code": "RATELIMITED"}}
+                        self.respond(400, {"errors": [error]}, "0", reset_ms)
+                    else:
+                        self.respond(200, server.create(body), "1000", reset_ms)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def respond(self, status, payload, remaining, reset_ms):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("X-RateLimit-Requests-Remaining", remaining)
+                self.send_header("X-RateLimit-Requests-Reset", reset_ms)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/graphql"
+
+    def create(self, body: dict) -> dict:
+        aliases = re.findall(r"(i\d+): issueCreate", body["query"])
+        data, errors = {}, []
+        for alias in aliases:
+            spec = body["variables"][alias]
+            if spec["title"] == "REJECT":
+                data[alias] = None
+                errors.append({"message": "Title rejected", "path": [alias]})
+                continue
+            with self.lock:
+                number = len(self.created) + 1
+                issue = {
+                    "id": f"uuid-{number}",
+                    "identifier": f"DEMO-{number}",
+                    "title": spec["title"],
+                    "priority": spec["priority"],
+                    "updatedAt": "2025-01-01T00:00:00.000Z",
+                    "state": {"name": "Todo"},
+                }
+                self.created.append({**issue, "teamId": spec["teamId"], "projectId": spec["projectId"]})
+            data[alias] = {"success": True, "issue": issue}
+        return {"data": data, "errors": errors} if errors else {"data": data}
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_validation():
+    """Test rejection of malformed issue specs."""
+    print("\nTesting issue spec validation:\n")
+
+    valid, rejected = validate_issue_specs(
+        [{"title": "Login", "priority": 1}, {"description": "no title"}, {"title": "Bad", "priority": 9}, "text"]
+    )
+    not_a_list = validate_issue_specs("everything")
+    results = [
+        check("valid spec kept with defaults", valid == [{"title": "Login", "description": "", "priority": 1}]),
+        check("missing title and bad priority rejected", len(rejected) == 3),
+        check("non-array input rejected", not_a_list[0] == [] and len(not_a_list[1]) == 1),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_bulk_create():
+    """Test batched creation against the local GraphQL stand-in."""
+    print("\nTesting bulk creation:\n")
+
+    specs = [{"title": f"Feature {n}", "description": f"Test steps {n}", "priority": n % 4 + 1} for n in range(50)]
+    specs[17]["title"] = "REJECT"
+
+    with FakeLinearServer() as server, tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"notes": "kept"}))
+        [bulk_tool] = create_bulk_issue_tools(project_dir, LinearClient("test-key", endpoint=server.url))
+
+        started = time.monotonic()
+        result = asyncio.run(bulk_tool.handler({"team_id": "team-1", "project_id": "proj-1", "issues": specs}))
+        elapsed = time.monotonic() - started
+
+        text = result["content"][0]["text"]
+        state = json.loads((project_dir / LINEAR_PROJECT_MARKER).read_text())
+
+    created_titles = [issue["title"] for issue in server.created]
+    results = [
+        check("all valid issues created once", sorted(created_titles) == sorted(s["title"] for s in specs if s["title"] != "REJECT")),
+        check("batched requests (5 batches + 2 rate limited)", server.requests == 7),
+        check("batches run concurrently", server.max_in_flight > 1),
+        check("concurrency bounded", server.max_in_flight <= 3),
+        check("rate-limited batches retried after reset", elapsed < 5),
+        check("team and project passed through", all(i["teamId"] == "team-1" and i["projectId"] == "proj-1" for i in server.created)),
+        check("report counts created issues", text.startswith("Created 49 of 50 issues.")),
+        check("report lists the failed issue", "NOT created" in text and "'REJECT'" in text),
+        check("IDs written to .linear_project.json", len(state["issue_ids"]) == 49 and state["total_issues"] == 49),
+        check("project and team recorded", state["project_id"] == "proj-1" and state["team_id"] == "team-1"),
+        check("existing state kept", state["notes"] == "kept" and "initialized" not in state),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  BULK ISSUE CREATION TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_validation, test_bulk_create):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
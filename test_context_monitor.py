@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Context Monitor Tests
+=====================
+
+Tests for context usage tracking from streamed usage, the wrap-up notice
+delivered through the post-tool-use hook, and the hard stop at the limit.
+Run with: python test_context_monitor.py
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock, ToolUseBlock
+from claude_code_sdk.types import StreamEvent
+
+from agent import run_agent_session
+from context_monitor import ContextMonitor, context_pressure_hook, register_context_monitor
+from events import UsageEvent, events_from_message
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def message_start(input_tokens: int, cache_read: int = 0, parent_tool_use_id=None) -> StreamEvent:
+    usage = {"input_tokens": input_tokens, "cache_read_input_tokens": cache_read, "cache_creation_input_tokens": 0, "output_tokens": 1}
+    return StreamEvent(
+        uuid="u", session_id="s",
+        event={"type": "message_start", "message": {"usage": usage}},
+        parent_tool_use_id=parent_tool_use_id,
+    )
+
+
+def usage(tokens: int) -> UsageEvent:
+    return UsageEvent(input_tokens=tokens, cache_read_input_tokens=0, cache_creation_input_tokens=0, output_tokens=0)
+
+
+def test_usage_and_thresholds():
+    """Test usage events, the wrap-up notice and the hard stop condition."""
+    print("\nTesting usage tracking and thresholds:\n")
+
+    main_call = events_from_message(message_start(1_000, cache_read=50_000))
+    subagent_call = events_from_message(message_start(90_000, parent_tool_use_id="toolu_1"))
+    delta = events_from_message(StreamEvent(uuid="u", session_id="s", event={"type": "content_block_delta"}))
+
+    monitor = ContextMonitor(context_window=100_000, wrap_up_threshold=0.5)
+    monitor.observe(usage(40_000))
+    early = monitor.take_wrap_up_message()
+    stop_before_notice = monitor.stop_due
+    monitor.observe(usage(95_000))
+    notice = monitor.take_wrap_up_message()
+    repeated = monitor.take_wrap_up_message()
+
+    results = [
+        check("message_start becomes a usage event", len(main_call) == 1 and main_call[0].context_tokens == 51_001),
+        check("subagent calls and deltas ignored", subagent_call == [] and delta == []),
+        check("no notice below the threshold", early is None),
+        check("no hard stop before the notice", stop_before_notice is False),
+        check("notice once past the threshold", notice is not None and "95,000 of 100,000" in notice and repeated is None),
+        check("notice names the hard limit", "92,000 tokens" in notice),
+        check("hard stop due after the notice", monitor.stop_due),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+class GrowingClient:
+    """Fake client whose session keeps using tools while its context grows."""
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+        self.interrupted = False
+        self.hook_decisions: list[dict] = []
+
+    async def query(self, prompt):
+        pass
+
+    async def interrupt(self):
+        self.interrupted = True
+
+    async def receive_response(self):
+        for n, tokens in enumerate([20_000, 60_000, 80_000, 95_000, 99_000]):
+            if self.interrupted:
+                break
+            yield message_start(tokens)
+            yield AssistantMessage(
+                content=[TextBlock(text=f"step {n}"), ToolUseBlock(id=f"t{n}", name="Bash", input={"command": "ls"})],
+                model="fake-model",
+            )
+            # The CLI runs post-tool-use hooks after each tool call
+            self.hook_decisions.append(
+                await context_pressure_hook({"tool_name": "Bash", "cwd": str(self.project_dir)}, f"t{n}")
+            )
+        yield ResultMessage(
+            subtype="error_during_execution" if self.interrupted else "success", duration_ms=1,
+            duration_api_ms=1, is_error=self.interrupted, num_turns=5, session_id="s",
+        )
+
+
+def test_session_handoff():
+    """Test the wrap-up notice and interrupt in run_agent_session."""
+    print("\nTesting session handoff:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        client = GrowingClient(project_dir)
+        monitor = ContextMonitor(context_window=100_000, wrap_up_threshold=0.5)
+        status, response = asyncio.run(run_agent_session(client, "prompt", project_dir, [], monitor))
+        after_session = asyncio.run(context_pressure_hook({"tool_name": "Bash", "cwd": str(project_dir)}))
+
+        unmonitored_client = GrowingClient(project_dir)
+        unmonitored = asyncio.run(run_agent_session(unmonitored_client, "prompt", project_dir, []))
+
+    notices = [decision for decision in client.hook_decisions if decision]
+    results = [
+        check("wrap-up notice delivered once through the hook", len(notices) == 1
+              and notices[0]["decision"] == "block" and "CONTEXT WINDOW NEARLY FULL" in notices[0]["reason"]),
+        check("notice sent after the threshold was crossed", client.hook_decisions.index(notices[0]) == 1),
+        check("session interrupted at the hard limit", client.interrupted and "step 4" not in response),
+        check("interrupted session counts as clean", status == "continue" and monitor.stopped),
+        check("monitor detached after the session", after_session == {}),
+        check("no monitor: no notice or interrupt", unmonitored[0] == "continue" and not unmonitored_client.interrupted
+              and not any(unmonitored_client.hook_decisions)),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  CONTEXT MONITOR TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_usage_and_thresholds, test_session_handoff):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Event Pipeline Tests
+====================
+
+Tests for typed session events, the sink pipeline, run_agent_session and
+the telemetry sink.
+Run with: python test_events.py
+"""
+
+import asyncio
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from claude_code_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+from agent import run_agent_session
+from events import (
+    ConsoleSink,
+    EventPipeline,
+    EventSink,
+    JsonlSink,
+    SessionResultEvent,
+    TextEvent,
+    ToolResultEvent,
+    ToolUseEvent,
+    events_from_message,
+)
+from telemetry import TelemetrySink, connect, format_report
+
+
+MESSAGES = [
+    AssistantMessage(
+        content=[
+            TextBlock(text="Checking status. "),
+            ToolUseBlock(id="t1", name="Bash", input={"command": "git status"}),
+        ],
+        model="fake",
+    ),
+    UserMessage(content=[ToolResultBlock(tool_use_id="t1", content="clean", is_error=False)]),
+    AssistantMessage(content=[TextBlock(text="All good.")], model="fake"),
+    ResultMessage(
+        subtype="success", duration_ms=10, duration_api_ms=8, is_error=False,
+        num_turns=2, session_id="s1", total_cost_usd=0.01,
+        usage={"input_tokens": 100, "output_tokens": 20},
+    ),
+]
+
+
+class FakeClient:
+    async def query(self, prompt):
+        pass
+
+    async def receive_response(self):
+        for msg in MESSAGES:
+            yield msg
+
+
+class PacedClient(FakeClient):
+    """Fake client that yields to the event loop between messages and notes when the stream was consumed."""
+
+    def __init__(self):
+        self.consumed_at = None
+
+    async def receive_response(self):
+        for msg in MESSAGES:
+            await asyncio.sleep(0)
+            yield msg
+        self.consumed_at = time.monotonic()
+
+
+class StalledStream(io.StringIO):
+    """Terminal whose writes block, like a paused or very slow tty."""
+
+    def write(self, text):
+        time.sleep(0.2)
+        return super().write(text)
+
+
+class SlowSink(EventSink):
+    def __init__(self):
+        self.events = []
+
+    async def handle(self, event):
+        await asyncio.sleep(0.01)
+        self.events.append(event)
+
+
+class RecordingSink(EventSink):
+    def __init__(self):
+        self.events = []
+        self.first_seen = None
+
+    async def handle(self, event):
+        if self.first_seen is None:
+            self.first_seen = time.monotonic()
+        self.events.append(event)
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_events_from_messages():
+    """Test conversion of SDK messages into typed events."""
+    print("\nTesting event conversion:\n")
+
+    events = [event for msg in MESSAGES for event in events_from_message(msg)]
+    kinds = [type(event) for event in events]
+
+    results = [
+        check(
+            "message stream converts to typed events",
+            kinds == [TextEvent, ToolUseEvent, ToolResultEvent, TextEvent, SessionResultEvent],
+        ),
+        check("tool use keeps id, name and input", events[1].name == "Bash" and events[1].input["command"] == "git status"),
+        check("result carries usage and cost", events[4].usage["output_tokens"] == 20 and events[4].total_cost_usd == 0.01),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_pipeline():
+    """Test that a slow sink does not delay other sinks and nothing is lost."""
+    print("\nTesting sink pipeline:\n")
+
+    events = [TextEvent(text=str(n)) for n in range(20)]
+    slow = SlowSink()
+    fast = RecordingSink()
+    console_out = io.StringIO()
+
+    async def run():
+        start = time.monotonic()
+        async with EventPipeline([slow, fast, ConsoleSink(console_out)], queue_size=100) as pipeline:
+            for event in events:
+                await pipeline.publish(event)
+            published = time.monotonic() - start
+        return published
+
+    published_in = asyncio.run(run())
+
+    results = [
+        check("publishing does not wait for slow sink", published_in < 0.05),
+        check("slow sink receives every event in order", [e.text for e in slow.events] == [str(n) for n in range(20)]),
+        check("fast sink receives every event", len(fast.events) == 20),
+        check("console sink writes text", console_out.getvalue() == "".join(str(n) for n in range(20))),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_run_agent_session():
+    """Test run_agent_session with console and JSONL sinks."""
+    print("\nTesting run_agent_session:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "events.jsonl"
+        console_out = io.StringIO()
+        status, text = asyncio.run(
+            run_agent_session(
+                FakeClient(), "prompt", Path(tmp), [ConsoleSink(console_out), JsonlSink(log_path)]
+            )
+        )
+        lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+
+    results = [
+        check("session continues", status == "continue"),
+        check("response text joined", text == "Checking status. All good."),
+        check("console shows tool use and result", "[Tool: Bash]" in console_out.getvalue() and "[Done]" in console_out.getvalue()),
+        check("JSONL log has one line per event", [line["kind"] for line in lines] == ["start", "text", "tool_use", "tool_result", "text", "result"]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_stalled_stream():
+    """Test that a blocking terminal write does not stall consumption of the message stream."""
+    print("\nTesting a stalled output stream:\n")
+
+    client = PacedClient()
+    console_out = StalledStream()
+
+    async def run():
+        start = time.monotonic()
+        status, _ = await run_agent_session(client, "prompt", Path("."), [ConsoleSink(console_out)])
+        return status, client.consumed_at - start, time.monotonic() - start
+
+    status, consumed_in, finished_in = asyncio.run(run())
+
+    results = [
+        check("stream consumed while the terminal is blocked", consumed_in < 0.15),
+        check("session waits for the output to drain", status == "continue" and finished_in >= 0.2),
+        check("console output complete", "[Tool: Bash]" in console_out.getvalue()
+              and console_out.getvalue().endswith("All good.")),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_telemetry_sink():
+    """Test that the telemetry sink records session and tool call metrics."""
+    print("\nTesting telemetry sink:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        for label in ("initializer", "coding"):
+            asyncio.run(
+                run_agent_session(FakeClient(), "prompt", project_dir, [TelemetrySink(project_dir, "fake-model", label)])
+            )
+
+        conn = connect(project_dir)
+        sessions = conn.execute(
+            "SELECT label, model, num_turns, input_tokens, output_tokens, cost_usd, status, ttft_ms FROM sessions"
+        ).fetchall()
+        calls = conn.execute("SELECT tool_name, category, latency_ms, is_error FROM tool_calls").fetchall()
+        conn.close()
+        report = format_report(project_dir)
+
+    results = [
+        check("one row per session", [row[0] for row in sessions] == ["initializer", "coding"]),
+        check("usage and cost stored", sessions[0][1:7] == ("fake-model", 2, 100, 20, 0.01, "success")),
+        check("time to first token measured", sessions[0][7] is not None and sessions[0][7] >= 0),
+        check("tool calls paired with results", [row[:2] for row in calls] == [("Bash", "bash")] * 2),
+        check("tool latency non-negative", all(row[2] >= 0 and row[3] == 0 for row in calls)),
+        check("report summarizes sessions and tools", "Sessions: 2 (2 success" in report and "Bash" in report),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  EVENT PIPELINE TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_events_from_messages, test_pipeline, test_run_agent_session, test_stalled_stream,
+                 test_telemetry_sink):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
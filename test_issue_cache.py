@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Issue Cache Tests
+=================
+
+Tests for the local Linear issue cache: delta refresh, indexing, write-through
+and completion detection.
+Run with: python test_issue_cache.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import ResultMessage
+
+from agent import run_autonomous_agent
+import issue_cache
+from issue_cache import (
+    IssueCache,
+    format_issue_summary,
+    issue_cache_write_through_hook,
+    refresh_issue_cache,
+)
+from linear_config import ISSUE_CACHE_FILE, LINEAR_PROJECT_MARKER, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from progress import is_backlog_complete, load_issue_counts, print_progress_summary
+from state_store import ensure_parent_dir
+
+
+class FakeLinear:
+    """Records the updated_after watermark of each list_issues call."""
+
+    def __init__(self, issues: list[dict]):
+        self.issues = issues
+        self.calls = []
+
+    async def list_issues(self, project_id, state_name=None, updated_after=None):
+        self.calls.append(updated_after)
+        return [
+            dict(issue)
+            for issue in self.issues
+            if updated_after is None or issue["updatedAt"] >= updated_after
+        ]
+
+
+def issue(n: int, status: str, priority: int, updated_at: str) -> dict:
+    return {
+        "id": f"id-{n}",
+        "identifier": f"DEMO-{n}",
+        "title": f"Feature {n}",
+        "priority": priority,
+        "updatedAt": updated_at,
+        "state": {"name": status},
+    }
+
+
+class CountingClient:
+    """Fake ClaudeSDKClient that only counts sessions."""
+
+    sessions = 0
+
+    async def __aenter__(self):
+        CountingClient.sessions += 1
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        pass
+
+    async def receive_response(self):
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False,
+            num_turns=1, session_id="s",
+        )
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_delta_refresh():
+    """Test that refreshes only fetch issues updated since the last sync."""
+    print("\nTesting delta refresh:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(
+            json.dumps({"initialized": True, "project_id": "proj", "meta_issue_id": "id-0"})
+        )
+        linear = FakeLinear([
+            issue(0, STATUS_TODO, 0, "2025-01-01T00:00:00.000Z"),
+            issue(1, STATUS_TODO, 3, "2025-01-01T00:00:01.000Z"),
+            issue(2, STATUS_TODO, 1, "2025-01-01T00:00:02.000Z"),
+            issue(3, STATUS_DONE, 2, "2025-01-01T00:00:03.000Z"),
+        ])
+
+        cache = asyncio.run(refresh_issue_cache(project_dir, linear))
+        first_counts = cache.counts()
+
+        linear.issues[1] = issue(1, STATUS_IN_PROGRESS, 3, "2025-01-02T00:00:00.000Z")
+        asyncio.run(refresh_issue_cache(project_dir, linear))
+        reloaded = IssueCache(project_dir)
+
+        results = [
+            check("first refresh fetches everything", linear.calls[0] is None),
+            check("second refresh uses updatedAt watermark", linear.calls[1] == "2025-01-01T00:00:03.000Z"),
+            check("counts by status", first_counts == {STATUS_TODO: 3, STATUS_DONE: 1}),
+            check("Todo index sorted by priority", [i["identifier"] for i in cache.by_status(STATUS_TODO)] == ["DEMO-2", "DEMO-0"]),
+            check("delta applied to index", [i["identifier"] for i in cache.by_status(STATUS_IN_PROGRESS)] == ["DEMO-1"]),
+            check("cache persisted to disk", reloaded.counts() == cache.counts()),
+            check("summary lists META issue", "META issue:\n- DEMO-0" in format_issue_summary(cache, "id-0")),
+        ]
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_watermark_and_pruning():
+    """Test same-timestamp updates are not lost and full refreshes drop removed issues."""
+    print("\nTesting watermark ties and pruning:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True, "project_id": "proj"}))
+        linear = FakeLinear([
+            issue(1, STATUS_TODO, 1, "2025-01-01T00:00:01.000Z"),
+            issue(2, STATUS_TODO, 2, "2025-01-01T00:00:02.000Z"),
+        ])
+        asyncio.run(refresh_issue_cache(project_dir, linear))
+
+        # Updated in the same millisecond as the watermark, after the last sync
+        linear.issues.append(issue(3, STATUS_TODO, 3, "2025-01-01T00:00:02.000Z"))
+        cache = asyncio.run(refresh_issue_cache(project_dir, linear))
+        tie_seen = cache.get("DEMO-3") is not None
+        watermark_refetched_once = sorted(cache.issues) == ["id-1", "id-2", "id-3"]
+
+        # Deleted or archived in Linear: a delta can't see it, a full refresh can
+        del linear.issues[0]
+        asyncio.run(refresh_issue_cache(project_dir, linear))
+        kept_by_delta = cache.get("DEMO-1") is not None
+        cache.last_full_refresh -= issue_cache.FULL_REFRESH_SECONDS
+        asyncio.run(refresh_issue_cache(project_dir, linear))
+        pruned = cache.get("DEMO-1") is None and cache.counts() == {STATUS_TODO: 2}
+        reloaded = IssueCache(project_dir)
+
+    results = [
+        check("issue sharing the watermark timestamp picked up", tie_seen),
+        check("re-fetched watermark issue merged by id", watermark_refetched_once),
+        check("delta refresh between full refreshes", linear.calls[1:3] == ["2025-01-01T00:00:02.000Z"] * 2),
+        check("periodic full refresh drops removed issues", kept_by_delta and linear.calls[3] is None and pruned),
+        check("pruned cache persisted", reloaded.get("DEMO-1") is None and reloaded.last_full_refresh is not None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_write_through():
+    """Test that mcp__linear__update_issue calls update the cache immediately."""
+    print("\nTesting write-through hook:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(
+            json.dumps({"initialized": True, "project_id": "proj"})
+        )
+        linear = FakeLinear([issue(1, STATUS_TODO, 2, "2025-01-01T00:00:00.000Z")])
+        cache = asyncio.run(refresh_issue_cache(project_dir, linear))
+
+        asyncio.run(issue_cache_write_through_hook({
+            "tool_name": "mcp__linear__update_issue",
+            "tool_input": {"id": "DEMO-1", "state": STATUS_IN_PROGRESS},
+            "cwd": str(project_dir),
+        }))
+        ignored = asyncio.run(issue_cache_write_through_hook({
+            "tool_name": "mcp__linear__get_issue",
+            "tool_input": {"id": "DEMO-1", "state": STATUS_DONE},
+            "cwd": str(project_dir),
+        }))
+
+        results = [
+            check("update by identifier moves issue", cache.get("id-1")["state"]["name"] == STATUS_IN_PROGRESS),
+            check("index reflects update", cache.counts() == {STATUS_IN_PROGRESS: 1}),
+            check("other tools ignored", ignored == {} and cache.get("DEMO-1")["state"]["name"] == STATUS_IN_PROGRESS),
+            check("update persisted", IssueCache(project_dir).counts() == {STATUS_IN_PROGRESS: 1}),
+        ]
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_completion_detection():
+    """Test remaining-issue counts and that the loop stops when nothing is left."""
+    print("\nTesting completion detection:\n")
+
+    def run_loop(project_dir: Path) -> int:
+        CountingClient.sessions = 0
+        asyncio.run(
+            run_autonomous_agent(
+                project_dir, "fake-model", max_iterations=3,
+                client_factory=lambda *args: CountingClient(),
+            )
+        )
+        return CountingClient.sessions
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(
+            json.dumps({"initialized": True, "project_id": "proj", "meta_issue_id": "id-0", "total_issues": 3})
+        )
+        unsynced_complete = is_backlog_complete(project_dir)
+
+        snapshot = {
+            "last_synced_at": "2025-01-01T00:00:03.000Z",
+            "issues": {
+                f"id-{n}": issue(n, status, 2, "2025-01-01T00:00:00.000Z")
+                for n, status in enumerate([STATUS_TODO, STATUS_DONE, STATUS_DONE, STATUS_IN_PROGRESS])
+            },
+        }
+        ensure_parent_dir(project_dir / ISSUE_CACHE_FILE)
+        (project_dir / ISSUE_CACHE_FILE).write_text(json.dumps(snapshot))
+        counts = load_issue_counts(project_dir)
+        open_sessions = run_loop(project_dir)
+
+        snapshot["issues"]["id-3"]["state"] = {"name": STATUS_DONE}
+        (project_dir / ISSUE_CACHE_FILE).write_text(json.dumps(snapshot))
+        summary = io.StringIO()
+        with contextlib.redirect_stdout(summary):
+            print_progress_summary(project_dir)
+        done_sessions = run_loop(project_dir)
+
+        results = [
+            check("unsynced project is not complete", not unsynced_complete),
+            check("META issue excluded from counts", counts == {STATUS_DONE: 2, STATUS_IN_PROGRESS: 1}),
+            check("loop runs sessions while issues remain", open_sessions == 3),
+            check("summary shows real counts", "Done: 3/3 (100%)" in summary.getvalue() and "Remaining: 0" in summary.getvalue()),
+            check("loop stops without a session when backlog is empty", done_sessions == 0),
+        ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  ISSUE CACHE TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_delta_refresh, test_watermark_and_pruning, test_write_through, test_completion_detection):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Session Journal Tests
+=====================
+
+Tests for the fsync'd session journal, detection of interrupted sessions and
+the resume prompt used by the agent loop.
+Run with: python test_journal.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from agent import run_autonomous_agent
+from events import EventPipeline, SessionResultEvent, SessionStartEvent, ToolResultEvent, ToolUseEvent
+from issue_cache import get_issue_cache
+from journal import JOURNAL_FILE, SessionJournal, find_interrupted_session, read_journal
+from linear_config import ISSUE_CACHE_FILE, LINEAR_PROJECT_MARKER, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from state_store import ensure_parent_dir
+
+
+class RecordingClient:
+    """Fake ClaudeSDKClient that records the prompts it was sent."""
+
+    prompts: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        RecordingClient.prompts.append(prompt)
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="working")], model="fake-model")
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False,
+            num_turns=1, session_id="s",
+        )
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def git(project_dir: Path, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=project_dir, check=True)
+
+
+def tool_call(tool_use_id: str, name: str, tool_input: dict, is_error: bool = False) -> list:
+    return [
+        ToolUseEvent(tool_use_id=tool_use_id, name=name, input=tool_input),
+        ToolResultEvent(tool_use_id=tool_use_id, content="ok", is_error=is_error),
+    ]
+
+
+async def journal_session(project_dir: Path, events: list, label: str = "coding", issue_id=None) -> None:
+    async with EventPipeline([SessionJournal(project_dir, label, issue_id)]) as pipeline:
+        await pipeline.publish(SessionStartEvent(prompt_chars=10))
+        for event in events:
+            await pipeline.publish(event)
+
+
+def write_cache(project_dir: Path, status: str) -> None:
+    issue = {
+        "id": "id-1", "identifier": "DEMO-1", "title": "Login form", "priority": 1,
+        "updatedAt": "2025-01-01T00:00:00.000Z", "state": {"name": status},
+    }
+    other = dict(issue, id="id-2", identifier="DEMO-2", title="Layout", state={"name": STATUS_TODO})
+    ensure_parent_dir(project_dir / ISSUE_CACHE_FILE)
+    (project_dir / ISSUE_CACHE_FILE).write_text(
+        json.dumps({"last_synced_at": issue["updatedAt"], "issues": {"id-1": issue, "id-2": other}})
+    )
+    get_issue_cache(project_dir).load()
+
+
+def result(is_error: bool = False) -> SessionResultEvent:
+    return SessionResultEvent(
+        session_id="s", subtype="error_during_execution" if is_error else "success", is_error=is_error,
+        num_turns=3, duration_ms=10, duration_api_ms=5, total_cost_usd=None, usage=None, result=None,
+    )
+
+
+def test_journal_records():
+    """Test what gets journaled and which sessions count as interrupted."""
+    print("\nTesting journal records:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        git(project_dir, "init", "-q")
+        git(project_dir, "commit", "-q", "--allow-empty", "-m", "Initial")
+
+        claim = tool_call("t1", "mcp__linear__update_issue", {"id": "DEMO-1", "status": STATUS_IN_PROGRESS})
+        failed = tool_call("t2", "Bash", {"command": "npm test"}, is_error=True)
+        git(project_dir, "commit", "-q", "--allow-empty", "-m", "Work in progress")
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=project_dir, capture_output=True, text=True).stdout.strip()
+        commit = tool_call("t3", "Bash", {"command": "git add . && git commit -m 'WIP'"})
+
+        # Interrupted: no session_end after the claim
+        asyncio.run(journal_session(project_dir, claim + failed + commit))
+        records = read_journal(project_dir)
+        interrupted = find_interrupted_session(project_dir)
+
+        # A torn last line (crash mid-write) is ignored
+        with open(project_dir / JOURNAL_FILE, "a") as f:
+            f.write('{"type": "tool_c')
+        torn = find_interrupted_session(project_dir)
+
+        # Crashed with an error result: still resumable
+        asyncio.run(journal_session(project_dir, claim + [result(is_error=True)]))
+        crashed = find_interrupted_session(project_dir)
+
+        # Issue finished before the interruption: nothing to resume
+        done = tool_call("t4", "mcp__linear__update_issue", {"id": "DEMO-1", "status": STATUS_DONE})
+        asyncio.run(journal_session(project_dir, claim + done))
+        finished_issue = find_interrupted_session(project_dir)
+
+        # Issue marked Done in the cache (e.g. by a human): nothing to resume
+        asyncio.run(journal_session(project_dir, claim))
+        write_cache(project_dir, STATUS_DONE)
+        done_in_cache = find_interrupted_session(project_dir)
+
+        # Clean session end: nothing to resume
+        write_cache(project_dir, STATUS_IN_PROGRESS)
+        asyncio.run(journal_session(project_dir, claim + [result()]))
+        clean = find_interrupted_session(project_dir)
+
+    types = [record["type"] for record in records]
+    results = [
+        check("session start, tool calls, claim and commit journaled",
+              types == ["session_start", "tool_call", "issue_claimed", "tool_call", "tool_call", "commit"]),
+        check("interrupted session found", interrupted is not None and interrupted.status == "running"),
+        check("claimed issue and last commit recovered", interrupted.issue_id == "DEMO-1" and interrupted.last_commit == sha),
+        check("completed tool calls recovered", interrupted.tool_calls == ["mcp__linear__update_issue", "Bash", "Bash"]),
+        check("torn last line skipped", torn is not None and torn.issue_id == "DEMO-1"),
+        check("crashed session resumable", crashed is not None and crashed.status == "error"),
+        check("issue completed in session not resumed", finished_issue is None),
+        check("issue Done in cache not resumed", done_in_cache is None),
+        check("clean session not resumed", clean is None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_resume_in_agent_loop():
+    """Test that the agent loop resumes the interrupted issue, then returns to normal sessions."""
+    print("\nTesting resume in the agent loop:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True, "project_id": "proj"}))
+        write_cache(project_dir, STATUS_IN_PROGRESS)
+        claim = tool_call("t1", "mcp__linear__update_issue", {"id": "DEMO-1", "status": STATUS_IN_PROGRESS})
+        asyncio.run(journal_session(project_dir, claim))
+
+        RecordingClient.prompts = []
+        asyncio.run(
+            run_autonomous_agent(
+                project_dir, "fake-model", max_iterations=2,
+                client_factory=lambda *args: RecordingClient(),
+            )
+        )
+        prompts = list(RecordingClient.prompts)
+        starts = [record for record in read_journal(project_dir) if record["type"] == "session_start"]
+
+    resume_prompt = prompts[0] if prompts else ""
+    results = [
+        check("two sessions run", len(prompts) == 2),
+        check("first session resumes the issue", "RESUMING AN INTERRUPTED SESSION" in resume_prompt
+              and "DEMO-1 - Login form" in resume_prompt and "Skip STEP 4" in resume_prompt),
+        check("resume prompt keeps the session context", "$session_context" not in resume_prompt
+              and "**Working directory:**" in resume_prompt),
+        check("resumed session journaled with its issue", starts[1]["label"] == "resume" and starts[1]["issue_id"] == "id-1"),
+        check("next session is a normal coding session", "RESUMING" not in prompts[1] and starts[2]["label"] == "coding"),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  SESSION JOURNAL TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_journal_records, test_resume_in_agent_loop):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Model Router Tests
+==================
+
+Tests for running coding sessions as orient / implement / bookkeeping phases
+on different models, with handoffs between them.
+Run with: python test_model_router.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from agent import run_autonomous_agent, run_routed_session
+from linear_config import LINEAR_PROJECT_MARKER
+from model_router import BOOKKEEPING, IMPLEMENT, ORIENT, create_handoff_tools
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+class PhaseClient:
+    """Fake client that hands off the way each phase's prompt asks it to."""
+
+    sessions: list[tuple[str, str]] = []
+
+    def __init__(self, project_dir: Path, model: str):
+        self.handoff = create_handoff_tools(project_dir)[0]
+        self.model = model
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        PhaseClient.sessions.append((self.model, prompt))
+        if "ORIENTATION PHASE" in prompt:
+            await self.handoff.handler({"summary": "DEMO-7 Dark mode toggle: add a toggle to settings", "issue_id": "issue-7"})
+        elif "IMPLEMENTATION PHASE" in prompt:
+            await self.handoff.handler({"summary": "Added src/theme.js, commit abc1234", "issue_done": True})
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="done")], model=self.model)
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False,
+            num_turns=1, session_id="s",
+        )
+
+
+def run_agent(project_dir: Path, fast_model=None) -> list[tuple[str, str]]:
+    PhaseClient.sessions = []
+    asyncio.run(
+        run_autonomous_agent(
+            project_dir, "strong-model", max_iterations=1, fast_model=fast_model,
+            client_factory=lambda project_dir, model, *args: PhaseClient(project_dir, model),
+        )
+    )
+    return list(PhaseClient.sessions)
+
+
+def test_routed_agent_loop():
+    """Test the phases, their models and the handoffs in the agent loop."""
+    print("\nTesting routed coding sessions:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True, "project_id": "proj"}))
+        routed = run_agent(project_dir, fast_model="fast-model")
+        journal = (project_dir / ".harness" / "journal.jsonl").read_text()
+        unrouted = run_agent(project_dir)
+
+    models = [model for model, _ in routed]
+    orient, implement, bookkeeping = [prompt for _, prompt in routed]
+    results = [
+        check("three phases on fast, strong, fast models", models == ["fast-model", "strong-model", "fast-model"]),
+        check("orientation prompt is the short one", "STEP 7: IMPLEMENT THE FEATURE" not in orient),
+        check("implementation gets the orientation handoff", "Dark mode toggle" in implement
+              and "**Issue ID:** issue-7" in implement and "STEP 7: IMPLEMENT THE FEATURE" in implement),
+        check("bookkeeping gets the implementation handoff", "commit abc1234" in bookkeeping
+              and "**Issue ID:** issue-7" in bookkeeping and "complete by the implementation agent:** yes" in bookkeeping),
+        check("phases journaled with the issue", '"label": "coding-implement", "issue_id": "issue-7"' in journal),
+        check("no fast model: one session on the model", [model for model, _ in unrouted] == ["strong-model"]
+              and "IMPLEMENTATION PHASE" not in unrouted[0][1]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_phase_failures():
+    """Test the fallback handoff, an empty backlog and a failed implementation."""
+    print("\nTesting phase fallbacks and failures:\n")
+
+    def scripted(responses: dict[str, tuple[str, str]]):
+        ran = []
+
+        async def run_phase(phase, model, prompt, issue_id):
+            ran.append((phase, prompt))
+            return responses.get(phase, ("continue", ""))
+
+        return ran, run_phase
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        tool = create_handoff_tools(project_dir)[0]
+
+        ran_empty, run_phase = scripted({ORIENT: ("continue", "Every issue is Done.")})
+        empty = asyncio.run(run_routed_session(project_dir, "strong", "fast", run_phase))
+
+        async def orient_then_fail(phase, model, prompt, issue_id):
+            if phase == ORIENT:
+                await tool.handler({"summary": "DEMO-3", "issue_id": "issue-3"})
+                return "continue", ""
+            ran_failed.append(phase)
+            return "error", "API overloaded"
+
+        ran_failed = []
+        failed = asyncio.run(run_routed_session(project_dir, "strong", "fast", orient_then_fail))
+
+        async def orient_then_text(phase, model, prompt, issue_id):
+            ran_text.append((phase, prompt))
+            if phase == ORIENT:
+                await tool.handler({"summary": "DEMO-4", "issue_id": "issue-4"})
+            return "continue", "Implemented the search bar and committed it as 9f8e7d6."
+
+        ran_text = []
+        asyncio.run(run_routed_session(project_dir, "strong", "fast", orient_then_text))
+
+    results = [
+        check("no issue selected: implementation skipped", [phase for phase, _ in ran_empty] == [ORIENT]
+              and empty == ("continue", "Every issue is Done.")),
+        check("failed implementation: bookkeeping skipped", ran_failed == [IMPLEMENT]
+              and failed == ("error", "API overloaded")),
+        check("missing handoff: final message passed on", ran_text[-1][0] == BOOKKEEPING
+              and "committed it as 9f8e7d6" in ran_text[-1][1] and "**Issue ID:** issue-4" in ran_text[-1][1]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  MODEL ROUTER TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_routed_agent_loop, test_phase_failures):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
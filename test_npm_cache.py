@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+npm Install Cache Tests
+=======================
+
+Tests for skipping npm installs whose lockfile is unchanged and for seeding
+node_modules from the shared content-addressed cache. Uses a local package
+tarball, so npm never needs the network.
+Run with: python test_npm_cache.py
+Requires npm on the PATH.
+"""
+
+import asyncio
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from devservers import DevServerManager, InstallStep
+from npm_cache import (
+    NPM_CACHE_DIR_ENV,
+    finish_install,
+    lock_hash,
+    npm_install_record_hook,
+    npm_install_skip_hook,
+    parse_npm_install,
+    prune_cache,
+)
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def write_package_tarball(path: Path) -> None:
+    """Write a minimal npm package tarball (what `npm pack` would produce)."""
+    files = {
+        "package/package.json": json.dumps({"name": "leftpad-fixture", "version": "1.0.0", "main": "index.js"}),
+        "package/index.js": "module.exports = (s, n) => String(s).padStart(n);\n",
+    }
+    with tarfile.open(path, "w:gz") as tar:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def write_app(project_dir: Path) -> None:
+    project_dir.mkdir()
+    (project_dir / "package.json").write_text(json.dumps({
+        "name": "app", "version": "1.0.0",
+        "dependencies": {"leftpad-fixture": "file:../leftpad-fixture-1.0.0.tgz"},
+    }))
+
+
+def bash_call(project_dir: Path, command: str, tool_use_id: str) -> dict:
+    return {"tool_name": "Bash", "tool_input": {"command": command}, "cwd": str(project_dir), "tool_use_id": tool_use_id}
+
+
+async def run_hooked(project_dir: Path, command: str, tool_use_id: str) -> dict:
+    """Run a command the way the SDK would: pre hook, the command unless blocked, post hook."""
+    call = bash_call(project_dir, command, tool_use_id)
+    decision = await npm_install_skip_hook(call, tool_use_id)
+    if decision.get("decision") != "block":
+        subprocess.run(command, shell=True, cwd=project_dir, check=True, capture_output=True)
+        await npm_install_record_hook(call, tool_use_id)
+    return decision
+
+
+def test_parse_npm_install():
+    """Test which commands count as plain installs."""
+    print("\nTesting npm install detection:\n")
+
+    cwd = Path("/project")
+    results = [
+        check("npm install", parse_npm_install("npm install", cwd).directory == cwd),
+        check("npm ci with flags", parse_npm_install("npm ci --no-audit --silent", cwd).subcommand == "ci"),
+        check("--prefix directory", parse_npm_install("npm i --prefix server", cwd).directory == cwd / "server"),
+        check("named package not intercepted", parse_npm_install("npm install lodash", cwd) is None),
+        check("chained install not intercepted", parse_npm_install("npm install && npm run dev", cwd) is None),
+        check("other npm commands not intercepted", parse_npm_install("npm run build", cwd) is None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_skip_and_shared_cache():
+    """Test the lockfile-hash skip, cache seeding across projects and devservers reuse."""
+    print("\nTesting install skipping and the shared cache:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        overrides = {
+            NPM_CACHE_DIR_ENV: str(root / "shared"),
+            "npm_config_cache": str(root / "npm-cache"),
+            "npm_config_audit": "false",
+            "npm_config_fund": "false",
+            "npm_config_update_notifier": "false",
+        }
+        saved_env = {name: os.environ.get(name) for name in overrides}
+        os.environ.update(overrides)
+        try:
+            write_package_tarball(root / "leftpad-fixture-1.0.0.tgz")
+            first, second = root / "first", root / "second"
+            write_app(first)
+
+            ran = asyncio.run(run_hooked(first, "npm install --offline", "t1"))
+            key = lock_hash(first)
+            cached = (root / "shared" / key / "node_modules" / "leftpad-fixture" / "index.js").exists()
+            repeat = asyncio.run(run_hooked(first, "npm install --offline", "t2"))
+
+            # A second project resolving to the same lockfile
+            write_app(second)
+            shutil.copy(first / "package-lock.json", second / "package-lock.json")
+            seeded = asyncio.run(run_hooked(second, "npm ci", "t3"))
+            module = subprocess.run(
+                ["node", "-e", "console.log(require('leftpad-fixture')('x', 3))"],
+                cwd=second, capture_output=True, text=True,
+            ).stdout
+            # Editing a dependency in place (patch-package, debugging) stays in that project
+            cached_file = root / "shared" / key / "node_modules" / "leftpad-fixture" / "index.js"
+            cached_text = cached_file.read_text()
+            (second / "node_modules" / "leftpad-fixture" / "index.js").write_text("module.exports = null;\n")
+            (first / "node_modules" / "leftpad-fixture" / "index.js").write_text("module.exports = 1;\n")
+            isolated = cached_file.read_text() == cached_text
+
+            # Changed package.json: npm has to run
+            manifest = json.loads((first / "package.json").read_text())
+            (first / "package.json").write_text(json.dumps({**manifest, "description": "changed"}))
+            changed = asyncio.run(npm_install_skip_hook(bash_call(first, "npm install", "t4"), "t4"))
+            unfinished = finish_install(parse_npm_install("npm install", first), time.time() + 60)
+
+            # The dev-server manager's install steps share the skip
+            manager = DevServerManager(second)
+            managed = asyncio.run(manager._run_install(InstallStep(command="npm install", inputs=["package.json"])))
+        finally:
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    results = [
+        check("first install runs npm", ran == {}),
+        check("successful install added to the shared cache", cached),
+        check("unchanged lockfile: install skipped", repeat.get("decision") == "block"
+              and "unchanged since the last successful install" in repeat["reason"]),
+        check("other project seeded from the cache", seeded.get("decision") == "block"
+              and "restored from the shared install cache" in seeded["reason"] and module.rstrip("\n") == "  x"),
+        check("in-place edits don't reach the cache", isolated),
+        check("changed package.json runs npm", changed == {}),
+        check("unfinished install not recorded", unfinished is False),
+        check("devservers install step skipped", managed[0] is True and "unchanged" in managed[1]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_prune_cache():
+    """Test least-recently-used eviction from the shared cache."""
+    print("\nTesting cache pruning:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for n, name in enumerate(["old", "middle", "new"]):
+            (root / name).mkdir()
+            os.utime(root / name, (1000 + n, 1000 + n))
+        (root / ".staging.x").mkdir()
+        prune_cache(root, keep=2)
+        remaining = sorted(entry.name for entry in root.iterdir())
+
+    results = [
+        check("least recently used entry removed", remaining == [".staging.x", "middle", "new"]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  NPM INSTALL CACHE TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_parse_npm_install, test_skip_and_shared_cache, test_prune_cache):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
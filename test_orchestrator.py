@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Orchestrator Tests
+==================
+
+Tests for the project manifest, fair slot scheduling and running several
+projects' agent loops from one event loop.
+Run with: python test_orchestrator.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import ResultMessage
+
+from agent import run_agent_session
+from context_monitor import ContextMonitor
+from linear_config import ISSUE_CACHE_FILE, LINEAR_PROJECT_MARKER, STATUS_TODO
+from orchestrator import FairScheduler, ManifestError, ProjectSpec, ScheduledSession, load_manifest, run_orchestrator
+from state_store import ensure_parent_dir
+from test_context_monitor import GrowingClient
+
+
+class SlowClient:
+    """Fake ClaudeSDKClient that tracks how many sessions run at once."""
+
+    running = 0
+    max_running = 0
+    sessions: dict[str, int] = {}
+
+    def __init__(self, project_dir: Path):
+        self.project = project_dir.name
+
+    async def __aenter__(self):
+        SlowClient.running += 1
+        SlowClient.max_running = max(SlowClient.max_running, SlowClient.running)
+        SlowClient.sessions[self.project] = SlowClient.sessions.get(self.project, 0) + 1
+        return self
+
+    async def __aexit__(self, *args):
+        SlowClient.running -= 1
+
+    async def query(self, prompt):
+        pass
+
+    async def receive_response(self):
+        await asyncio.sleep(0.05)
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False,
+            num_turns=1, session_id="s",
+        )
+
+
+class GrowingSessionClient(GrowingClient):
+    """GrowingClient that can be entered like a ClaudeSDKClient."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def manifest_error(tmp: Path, data) -> bool:
+    path = tmp / "bad.json"
+    path.write_text(json.dumps(data))
+    try:
+        load_manifest(path, "default-model")
+    except ManifestError:
+        return True
+    return False
+
+
+def test_manifest():
+    """Test manifest defaults, path placement and validation."""
+    print("\nTesting manifest loading:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        path = tmp / "projects.json"
+        path.write_text(json.dumps({
+            "max_concurrent_sessions": 2,
+            "defaults": {"max_iterations": 5},
+            "projects": [
+                "todo_app",
+                {"project_dir": str(tmp / "chat"), "model": "other-model", "max_iterations": 1},
+            ],
+        }))
+        manifest = load_manifest(path, "default-model")
+        todo, chat = manifest.projects
+
+        results = [
+            check("slot cap read", manifest.max_concurrent_sessions == 2),
+            check("relative paths placed in generations/", todo.project_dir == Path("generations/todo_app")),
+            check("absolute paths kept", chat.project_dir == tmp / "chat"),
+            check("defaults and default model applied", todo.max_iterations == 5 and todo.model == "default-model"),
+            check("per-project settings override defaults", chat.max_iterations == 1 and chat.model == "other-model"),
+            check("empty project list rejected", manifest_error(tmp, {"projects": []})),
+            check("duplicate project rejected", manifest_error(tmp, {"projects": ["a", "generations/a"]})),
+            check("bad max_iterations rejected", manifest_error(tmp, {"projects": [{"project_dir": "a", "max_iterations": 0}]})),
+            check("non-object manifest rejected", manifest_error(tmp, ["todo_app"])),
+        ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_fair_scheduler():
+    """Test that freed slots go to the least-served waiting project."""
+    print("\nTesting fair scheduling:\n")
+
+    async def scenario():
+        scheduler = FairScheduler(1)
+        order = []
+
+        # "busy" has already had three sessions
+        for _ in range(3):
+            scheduler.release(await scheduler.acquire("busy"))
+        slot = await scheduler.acquire("busy")
+
+        async def wait(project):
+            granted = await scheduler.acquire(project)
+            order.append(project)
+            scheduler.release(granted)
+
+        # busy asks first, but quiet has had fewer sessions
+        tasks = [asyncio.create_task(wait("busy"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(wait("quiet")))
+        await asyncio.sleep(0)
+
+        # A cancelled waiter does not swallow the slot
+        cancelled = asyncio.create_task(scheduler.acquire("gone"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        scheduler.release(slot)
+        await asyncio.gather(*tasks)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    results = [
+        check("least-served project goes first", order == ["quiet", "busy"]),
+        check("grants counted per project", scheduler.granted["busy"] == 5 and scheduler.granted["quiet"] == 1),
+        check("slot returned after cancelled waiter", scheduler._free == [0]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_scheduled_interrupt():
+    """Test the context monitor can interrupt a session run through the scheduler."""
+    print("\nTesting interrupt through a scheduled session:\n")
+
+    async def scenario(project_dir: Path):
+        scheduler = FairScheduler(1)
+        created = []
+
+        def factory(project_dir, model, mcp_pool):
+            created.append(GrowingSessionClient(project_dir))
+            return created[0]
+
+        monitor = ContextMonitor(context_window=100_000, wrap_up_threshold=0.5)
+        async with ScheduledSession(scheduler, ProjectSpec(project_dir, "fake-model"), factory) as session:
+            status, response = await run_agent_session(session, "prompt", project_dir, [], monitor)
+        return status, response, created[0], monitor, scheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        status, response, client, monitor, scheduler = asyncio.run(scenario(Path(tmp)))
+
+    results = [
+        check("interrupt reaches the wrapped client", client.interrupted and "step 4" not in response),
+        check("interrupted session counts as clean", status == "continue" and monitor.stopped),
+        check("slot released afterwards", scheduler._free == [0]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_orchestrator_run():
+    """Test several projects sharing one event loop under the session cap."""
+    print("\nTesting orchestrated run:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        projects = []
+        for name in ("alpha", "beta", "gamma"):
+            project_dir = Path(tmp) / name
+            project_dir.mkdir()
+            (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True, "project_id": name}))
+            issue = {"id": "id-1", "identifier": "DEMO-1", "title": "Feature", "priority": 1,
+                     "updatedAt": "2025-01-01T00:00:00.000Z", "state": {"name": STATUS_TODO}}
+            ensure_parent_dir(project_dir / ISSUE_CACHE_FILE)
+            (project_dir / ISSUE_CACHE_FILE).write_text(
+                json.dumps({"last_synced_at": issue["updatedAt"], "issues": {"id-1": issue}})
+            )
+            projects.append(str(project_dir))
+
+        manifest_path = Path(tmp) / "projects.json"
+        manifest_path.write_text(json.dumps({
+            "max_concurrent_sessions": 2,
+            "defaults": {"max_iterations": 2},
+            "projects": projects,
+        }))
+        manifest = load_manifest(manifest_path, "fake-model")
+
+        SlowClient.running, SlowClient.max_running, SlowClient.sessions = 0, 0, {}
+        asyncio.run(
+            run_orchestrator(
+                manifest, share_mcp_servers=False,
+                client_factory=lambda project_dir, model, mcp_pool: SlowClient(project_dir),
+            )
+        )
+
+    results = [
+        check("every project ran its sessions", SlowClient.sessions == {"alpha": 2, "beta": 2, "gamma": 2}),
+        check("sessions ran concurrently", SlowClient.max_running == 2),
+        check("global session cap respected", SlowClient.max_running <= 2),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  ORCHESTRATOR TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_manifest, test_fair_scheduler, test_scheduled_interrupt, test_orchestrator_run):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
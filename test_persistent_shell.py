@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Persistent Shell Tests
+======================
+
+Tests that the persistent shell tool blocks everything the Bash security
+hook blocks, refuses to run code the agent wrote, runs commands in one
+long-lived shell, and recovers from timeouts.
+Run with: python test_persistent_shell.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from client import BASH_POST_HOOKS, BASH_PRE_HOOKS
+from persistent_shell import (
+    close_persistent_shell,
+    create_shell_tools,
+    get_persistent_shell,
+    prepare_shell_command,
+    run_shell_command,
+    shell_command_refusal,
+)
+from security import bash_security_hook
+from test_security import DANGEROUS_COMMANDS, SAFE_COMMANDS
+from tool_output import OutputLimit, configure_output_limits
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_same_decisions():
+    """Test every command from test_security.py the hook blocks is blocked for the same reason."""
+    print("\nTesting decisions against the security hook:\n")
+
+    async def decisions(project_dir: Path) -> list[tuple[str, bool, bool]]:
+        compared = []
+        for command in DANGEROUS_COMMANDS + SAFE_COMMANDS:
+            hook = await bash_security_hook({"tool_name": "Bash", "tool_input": {"command": command}})
+            reason, _ = await prepare_shell_command(project_dir, command, BASH_PRE_HOOKS)
+            # Hook blocks keep the hook's reason; what the hook allows may still be refused by the shell
+            expected = hook["reason"] if hook.get("decision") == "block" else shell_command_refusal(command)
+            compared.append((command, reason == expected, reason is not None or command in SAFE_COMMANDS))
+        return compared
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compared = asyncio.run(decisions(Path(tmp)))
+
+    mismatched = [command for command, same, _ in compared if not same]
+    wrong = [command for command, _, expected in compared if not expected]
+    results = [
+        check(f"{len(compared)} commands decided as by the hook, then the shell", not mismatched),
+        check("no dangerous command allowed", not wrong),
+    ]
+    for command in mismatched + wrong:
+        print(f"    differs: {command!r}")
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_agent_scripts_not_run():
+    """Test that code the agent wrote can't be run through the shell, outside the sandbox."""
+    print("\nTesting agent-written scripts:\n")
+
+    attempts = [
+        "node evil.js",
+        "npm test",
+        "./init.sh",
+        "chmod +x init.sh && ./init.sh",
+        "./ls",
+        "PATH=.:$PATH; ls",
+        "cat $(./init.sh)",
+        "git status",
+        "cat evil.js > init.sh",
+        'ls <<< "x"\nnode evil.js',
+        "ls $((1<<2))\nrm -rf /",
+        "ls\nnode evil.js",
+        "cat <<EOF\nhello\nEOF",
+    ]
+
+    async def session(project_dir: Path) -> list[str]:
+        script = "touch pwned.txt\n"
+        (project_dir / "evil.js").write_text("require('fs').writeFileSync('pwned.txt', 'x')\n")
+        (project_dir / "package.json").write_text('{"scripts": {"test": "touch pwned.txt"}}\n')
+        (project_dir / "init.sh").write_text(f"#!/bin/bash\n{script}")
+        (project_dir / "ls").write_text(f"#!/bin/bash\n{script}")
+        (project_dir / ".git" / "hooks").mkdir(parents=True)
+        (project_dir / ".git" / "config").write_text("[core]\n\tfsmonitor = ./init.sh\n")
+        for name in ("init.sh", "ls"):
+            (project_dir / name).chmod(0o755)
+
+        outputs = [await run_shell_command(project_dir, command, 10, BASH_PRE_HOOKS, BASH_POST_HOOKS)
+                   for command in attempts]
+        outputs.append(await run_shell_command(project_dir, "ls", 10, BASH_PRE_HOOKS, BASH_POST_HOOKS))
+        await close_persistent_shell(project_dir)
+        return outputs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp).resolve()
+        outputs = asyncio.run(session(project_dir))
+        pwned = (project_dir / "pwned.txt").exists()
+        init_script = (project_dir / "init.sh").read_text()
+
+    refused = [command for command in attempts if shell_command_refusal(command) is not None]
+    results = [
+        check("no agent-written code ran", not pwned),
+        check("every attempt refused, with or without the hooks", refused == attempts
+              and all("use Bash for this" in output or "not in the allowed commands list" in output
+                      for output in outputs[:-1])),
+        check("no file overwritten by a redirect", init_script == "#!/bin/bash\ntouch pwned.txt\n"),
+        check("bare ls is the system ls", "evil.js" in outputs[-1] and "init.sh" in outputs[-1]),
+    ]
+    for command, output in zip(attempts, outputs):
+        if command not in refused:
+            print(f"    not refused: {command!r}: {output!r}")
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_shell_session():
+    """Test running commands in the persistent shell."""
+    print("\nTesting the persistent shell:\n")
+
+    async def session(project_dir: Path) -> dict:
+        (project_dir / "hello.txt").write_text("hello\n")
+        (project_dir / "late.txt").write_text("late\n")
+        (project_dir / "numbers.txt").write_text("".join(f"{n}\n" for n in range(1, 1001)))
+        tool = create_shell_tools(project_dir, BASH_PRE_HOOKS, BASH_POST_HOOKS)[0]
+
+        def run(command: str, timeout: float = 10):
+            return run_shell_command(project_dir, command, timeout, BASH_PRE_HOOKS, BASH_POST_HOOKS)
+
+        seen = {}
+        seen["cat"] = (await tool.handler({"command": "cat hello.txt"}))["content"][0]["text"]
+        shell = get_persistent_shell(project_dir)
+        first_pid = shell.process.pid
+        seen["failed"] = await run("ls missing-file")
+        seen["blocked"] = await run("touch created.txt")
+        seen["created"] = (project_dir / "created.txt").exists()
+        seen["env"] = await run("grep -c LINEAR_API_KEY= /proc/self/environ")
+        seen["same_shell"] = shell.process.pid == first_pid
+        configure_output_limits({"Bash": OutputLimit(max_chars=500, head_lines=3, tail_lines=2)})
+        try:
+            seen["capped"] = await run("cat numbers.txt")
+        finally:
+            configure_output_limits({})
+        seen["background"] = await run("sleep 0.3 && cat late.txt &")
+        await asyncio.sleep(0.5)
+        seen["after_background"] = await run("cat hello.txt")
+        seen["timeout"] = await run("sleep 5", timeout=0.5)
+        seen["after_timeout"] = await run("pwd")
+        seen["restarted"] = shell.process.pid != first_pid
+        process = shell.process
+        await close_persistent_shell(project_dir)
+        seen["closed"] = process.returncode is not None
+        return seen
+
+    os.environ["LINEAR_API_KEY"], saved = "lin_api_secret", os.environ.get("LINEAR_API_KEY")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            project_dir = Path(tmp).resolve()
+            seen = asyncio.run(session(project_dir))
+    finally:
+        if saved is None:
+            os.environ.pop("LINEAR_API_KEY")
+        else:
+            os.environ["LINEAR_API_KEY"] = saved
+
+    results = [
+        check("tool returns the output", seen["cat"] == "hello"),
+        check("exit status reported", seen["failed"].startswith("ls: ") and seen["failed"].endswith("[exit status 2]")),
+        check("blocked command not run", "touch" in seen["blocked"] and not seen["created"]),
+        check("harness secrets not passed on", seen["env"] == "0\n[exit status 1]"),
+        check("commands share one shell", seen["same_shell"]),
+        check("output cap applies", seen["capped"].startswith("1\n2\n3\n") and "harness: output cut" in seen["capped"]),
+        check("background output stays out of later results", seen["after_background"] == "hello"),
+        check("timeout reported", "timed out after" in seen["timeout"]),
+        check("fresh shell after a timeout", seen["after_timeout"] == str(project_dir) and seen["restarted"]),
+        check("shell stopped when the session ends", seen["closed"]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  PERSISTENT SHELL TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_same_decisions, test_agent_scripts_not_run, test_shell_session):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
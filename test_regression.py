@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Regression Selection Tests
+==========================
+
+Tests for the issue-to-files map built from git history and the selection of
+Done features to re-verify after recent commits.
+Run with: python test_regression.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from agent import run_autonomous_agent
+from issue_cache import get_issue_cache
+from linear_config import ISSUE_CACHE_FILE, LINEAR_PROJECT_MARKER, STATUS_DONE, STATUS_TODO
+from regression import FEATURE_MAP_FILE, format_verification_targets, plan_verification, record_verification
+from state_store import ensure_parent_dir
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def git(project_dir: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=project_dir, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def commit_feature(project_dir: Path, identifier: str, files: list[str], subject: str = "Implement feature") -> None:
+    for name in files:
+        path = project_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(f"// {identifier}\n")
+    git(project_dir, "add", "-A")
+    git(project_dir, "commit", "-q", "-m", f"{subject}\n\n- Added code\n\nLinear issue: {identifier}")
+
+
+def write_cache(project_dir: Path, statuses: dict[str, str]) -> None:
+    issues = {}
+    for n, (identifier, status) in enumerate(statuses.items(), start=1):
+        issues[f"id-{n}"] = {
+            "id": f"id-{n}", "identifier": identifier, "title": f"Feature {n}", "priority": 2,
+            "updatedAt": "2025-01-01T00:00:00.000Z", "state": {"name": status},
+        }
+    ensure_parent_dir(project_dir / ISSUE_CACHE_FILE)
+    (project_dir / ISSUE_CACHE_FILE).write_text(json.dumps({"last_synced_at": "2025-01-01T00:00:00.000Z", "issues": issues}))
+    get_issue_cache(project_dir).load()
+
+
+def build_project(project_dir: Path) -> None:
+    git(project_dir, "init", "-q")
+    commit_feature(project_dir, "DEMO-1", ["src/auth.js", "src/App.jsx", "package-lock.json"], "Add login")
+    commit_feature(project_dir, "DEMO-2", ["src/chat.js", "src/App.jsx"], "Add chat")
+    commit_feature(project_dir, "DEMO-3", ["src/settings.js", "src/App.jsx"], "Add settings")
+    write_cache(project_dir, {"DEMO-1": STATUS_DONE, "DEMO-2": STATUS_DONE, "DEMO-3": STATUS_DONE, "DEMO-4": STATUS_TODO})
+
+
+def test_target_selection():
+    """Test the feature map, target ranking and verification bookkeeping."""
+    print("\nTesting verification target selection:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        build_project(project_dir)
+
+        first = asyncio.run(plan_verification(project_dir))
+        feature_map = json.loads((project_dir / FEATURE_MAP_FILE).read_text())
+        record_verification(project_dir, first.head)
+
+        # DEMO-4 touches DEMO-1's code, plus files every feature shares
+        commit_feature(project_dir, "DEMO-4", ["src/auth.js", "src/App.jsx", "package-lock.json"], "Add logout")
+        write_cache(project_dir, {"DEMO-1": STATUS_DONE, "DEMO-2": STATUS_DONE, "DEMO-3": STATUS_DONE, "DEMO-4": STATUS_DONE})
+        affected = asyncio.run(plan_verification(project_dir))
+        affected_text = format_verification_targets(affected)
+        record_verification(project_dir, affected.head)
+
+        # A fix for DEMO-1 itself doesn't ask to re-test DEMO-1, but does DEMO-4
+        commit_feature(project_dir, "DEMO-1", ["src/auth.js"], "Fix login redirect")
+        own_fix = asyncio.run(plan_verification(project_dir))
+        record_verification(project_dir, own_fix.head)
+
+        nothing_new = asyncio.run(plan_verification(project_dir))
+        nothing_text = format_verification_targets(nothing_new)
+
+        # History rewritten past the verified commit: fall back to the default instructions
+        git(project_dir, "reset", "-q", "--hard", "HEAD~2")
+        commit_feature(project_dir, "DEMO-2", ["src/chat.js"], "Rework chat")
+        rewritten = asyncio.run(plan_verification(project_dir))
+
+    results = [
+        check("no verification yet: default instructions", first.since is None and format_verification_targets(first) is None),
+        check("issue files mapped from commit messages",
+              feature_map["files"]["DEMO-2"] == ["src/App.jsx", "src/chat.js"] and "DEMO-4" not in feature_map["files"]),
+        check("feature sharing changed code selected", [t.identifier for t in affected.targets] == ["DEMO-1"]),
+        check("shared hub and lock files ignored", affected.targets and affected.targets[0].shared_files == ["src/auth.js"]),
+        check("targets rendered for the prompt", "DEMO-1 - Feature 1" in affected_text and "DEMO-2" not in affected_text),
+        check("a feature's own commits don't target it", [t.identifier for t in own_fix.targets] == ["DEMO-4"]),
+        check("no new commits: regression pass skipped", nothing_new.targets == [] and "Skip the regression pass" in nothing_text),
+        check("rewritten history falls back", rewritten.since is None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+class CommittingClient:
+    """Fake ClaudeSDKClient whose sessions each commit a change to the login code."""
+
+    prompts: list[str] = []
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        CommittingClient.prompts.append(prompt)
+        commit_feature(self.project_dir, "DEMO-4", ["src/auth.js"], f"Session {len(CommittingClient.prompts)}")
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="working")], model="fake-model")
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1, is_error=False,
+            num_turns=1, session_id="s",
+        )
+
+
+def test_targets_in_agent_loop():
+    """Test that the agent loop injects targets for commits made since the last clean session."""
+    print("\nTesting verification targets in the agent loop:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        build_project(project_dir)
+        (project_dir / LINEAR_PROJECT_MARKER).write_text(json.dumps({"initialized": True, "project_id": "proj"}))
+
+        CommittingClient.prompts = []
+        asyncio.run(
+            run_autonomous_agent(
+                project_dir, "fake-model", max_iterations=2,
+                client_factory=lambda project_dir, *args: CommittingClient(project_dir),
+            )
+        )
+        prompts = list(CommittingClient.prompts)
+
+    results = [
+        check("two sessions run", len(prompts) == 2),
+        check("first session uses the default instructions",
+              "$verification_targets" not in prompts[0] and 'with status "Done" to find 1-2' in prompts[0]),
+        check("second session re-tests the affected feature",
+              "DEMO-1 - Feature 1" in prompts[1] and "DEMO-2 - Feature 2" not in prompts[1]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  REGRESSION SELECTION TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_target_selection, test_targets_in_agent_loop):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Session Replay Tests
+====================
+
+Tests for recording sessions, replaying them through the harness's hooks,
+the fake Linear, and the offline simulation loop.
+Run with: python test_replay.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock, ToolResultBlock, ToolUseBlock, UserMessage
+
+from bench_harness import run_simulation, synthetic_recording
+from fake_linear import FakeLinear
+from issue_cache import get_issue_cache, refresh_issue_cache
+from linear_config import STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from replay import (
+    Recording,
+    load_recording,
+    message_from_dict,
+    message_to_dict,
+    recording_client_factory,
+    replay_client_factory,
+    save_recording,
+)
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+class ScriptedClient:
+    """Fake live client that streams a fixed list of messages."""
+
+    def __init__(self, messages: list):
+        self.messages = messages
+        self.prompt = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def query(self, prompt):
+        self.prompt = prompt
+
+    async def receive_response(self):
+        for message in self.messages:
+            yield message
+
+
+def replay(client) -> list:
+    async def run():
+        async with client:
+            await client.query("Continue")
+            return [message async for message in client.receive_response()]
+
+    return asyncio.run(run())
+
+
+def tool_result(messages: list, tool_use_id: str) -> ToolResultBlock:
+    return next(
+        block for message in messages if isinstance(message, UserMessage)
+        for block in message.content if isinstance(block, ToolResultBlock) and block.tool_use_id == tool_use_id
+    )
+
+
+def test_recording():
+    """Test serializing messages and recording a live session."""
+    print("\nTesting recording:\n")
+
+    linear = FakeLinear()
+    linear.seed_backlog(1)
+    recording = synthetic_recording(linear.get("DEMO-2"), linear.meta_issue_id)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "saved.jsonl"
+        save_recording(path, recording)
+        loaded = load_recording(path)
+
+        record_dir = Path(tmp) / "recordings"
+        create = recording_client_factory(record_dir, lambda *args: ScriptedClient(recording.messages))
+        streamed = replay(create(Path(tmp), "model"))
+        replay(create(Path(tmp), "model"))
+        recorded = sorted(path.name for path in record_dir.iterdir())
+        first = load_recording(record_dir / "session-0001.jsonl")
+
+    result = recording.messages[-1]
+    results = [
+        check("messages round-trip through dicts", all(message_from_dict(message_to_dict(m)) == m
+                                                       for m in recording.messages)),
+        check("content blocks keep their type", message_to_dict(recording.messages[2])["content"][1]["type"]
+              == "ToolUseBlock"),
+        check("saved recording loads back", loaded == recording),
+        check("recording client passes messages through", streamed == recording.messages),
+        check("one numbered file per session", recorded == ["session-0001.jsonl", "session-0002.jsonl"]),
+        check("prompt and messages recorded", first.prompt == "Continue" and first.messages[-1] == result),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_replay_hooks():
+    """Test hooks around replayed tool calls and live fake Linear tools."""
+    print("\nTesting replay through the hooks:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    linear = FakeLinear()
+    linear.seed_backlog(2)
+    messages = [
+        AssistantMessage(content=[
+            ToolUseBlock(id="t1", name="mcp__linear__update_issue", input={"id": "issue-2", "state": STATUS_DONE}),
+            ToolUseBlock(id="t2", name="Bash", input={"command": "curl http://example.com"}),
+            ToolUseBlock(id="t3", name="Bash", input={"command": "ls"}),
+        ], model="m"),
+        UserMessage(content=[
+            ToolResultBlock(tool_use_id="t1", content="recorded", is_error=False),
+            ToolResultBlock(tool_use_id="t2", content="<html>", is_error=False),
+            ToolResultBlock(tool_use_id="t3", content="src\n", is_error=False),
+        ]),
+        AssistantMessage(content=[TextBlock(text="Never reached after an interrupt")], model="m"),
+        ResultMessage(subtype="success", duration_ms=1, duration_api_ms=1, is_error=False, num_turns=1,
+                      session_id="s"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        linear.write_project_marker(project_dir)
+        asyncio.run(refresh_issue_cache(project_dir, linear))
+        create = replay_client_factory([Recording("", messages)], tools=linear.create_tools())
+        replayed = replay(create(project_dir, "model"))
+        cached_status = get_issue_cache(project_dir).get("issue-2")["state"]["name"]
+
+        interrupted_client = create(project_dir, "model")
+        asyncio.run(interrupted_client.interrupt())
+        interrupted = replay(interrupted_client)
+
+    update = json.loads(tool_result(replayed, "t1").content[0]["text"])
+    blocked = tool_result(replayed, "t2")
+    results = [
+        check("fake Linear tool executed live", update["state"] == {"name": STATUS_DONE}
+              and linear.get("issue-2")["state"]["name"] == STATUS_DONE),
+        check("write-through hook updated the issue cache", cached_status == STATUS_DONE),
+        check("blocked command gets the hook's reason", blocked.is_error and "curl" in str(blocked.content)),
+        check("allowed command keeps its recorded result", tool_result(replayed, "t3").content == "src\n"),
+        check("interrupt skips to the result", [type(m) for m in interrupted] == [ResultMessage]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_fake_linear():
+    """Test the harness-side queries of the fake Linear."""
+    print("\nTesting the fake Linear:\n")
+
+    linear = FakeLinear()
+    linear.seed_backlog(3)
+    todo = asyncio.run(linear.list_issues(linear.project_id, STATUS_TODO))
+    before = linear.ticks
+    moved = asyncio.run(linear.update_issue_state("issue-3", linear.team_id, STATUS_IN_PROGRESS))
+    ticked = linear.ticks - before
+    changed = asyncio.run(linear.list_issues(linear.project_id, updated_after=linear.issues["issue-2"]["updatedAt"]))
+    linear.add_comment("DEMO-1", "Session 1 notes")
+    latest = asyncio.run(linear.get_latest_comment("issue-1"))
+
+    results = [
+        check("META issue plus the features", len(linear.issues) == 4 and linear.meta_issue_id == "issue-1"),
+        check("features start in Todo", len(todo) == 3),
+        check("state change advances the clock", moved and ticked == 1),
+        check("delta query returns changes from the watermark on", [issue["id"] for issue in changed]
+              == ["issue-2", "issue-3", "issue-4"]),
+        check("unknown state rejected", not linear.set_status("issue-2", "Archived")),
+        check("latest comment by identifier", latest["body"] == "Session 1 notes"),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_simulation():
+    """Test the agent loop over replayed sessions until the backlog is Done."""
+    print("\nTesting the offline simulation:\n")
+
+    os.environ.pop("LINEAR_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            result = asyncio.run(run_simulation(Path(tmp), 6))
+        finally:
+            sys.stdout = stdout
+
+    results = [
+        check("every session ran", result.sessions == 6 and len(result.session_seconds) == 6),
+        check("every issue Done", result.issues_done == 6),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  SESSION REPLAY TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_recording, test_replay_hooks, test_fake_linear, test_simulation):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
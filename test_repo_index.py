@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Repository Index Tests
+======================
+
+Tests for the read-only git and filesystem harness tools, their caching,
+and invalidation by tool-use events.
+Run with: python test_repo_index.py
+"""
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from repo_index import create_repo_tools, get_repo_index, repo_index_change_hook
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def git(project_dir: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=project_dir, check=True, capture_output=True)
+
+
+def make_repo(project_dir: Path) -> None:
+    git(project_dir, "init", "-q", "-b", "main")
+    git(project_dir, "config", "user.email", "agent@example.com")
+    git(project_dir, "config", "user.name", "Agent")
+    (project_dir / ".gitignore").write_text("node_modules/\n")
+    (project_dir / "src").mkdir()
+    (project_dir / "src" / "App.jsx").write_text("export default function App() {}\n")
+    (project_dir / "package.json").write_text('{"name": "demo"}\n')
+    git(project_dir, "add", ".")
+    git(project_dir, "commit", "-q", "-m", "Initial setup")
+
+
+def tools(project_dir: Path) -> dict:
+    return {t.name: t for t in create_repo_tools(project_dir)}
+
+
+def call(tool, **args) -> str:
+    return asyncio.run(tool.handler(args))["content"][0]["text"]
+
+
+def write_event(project_dir: Path, tool_name: str, **tool_input) -> None:
+    asyncio.run(repo_index_change_hook({"tool_name": tool_name, "tool_input": tool_input, "cwd": str(project_dir)}))
+
+
+def test_git_tools():
+    """Test git status, log and diff summaries, and when git actually runs."""
+    print("\nTesting git tools:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp).resolve()
+        make_repo(project_dir)
+        t = tools(project_dir)
+        index = get_repo_index(project_dir)
+
+        clean = call(t["git_status"])
+        runs = index.git_runs
+        clean_again = call(t["git_status"])
+        cached_runs = index.git_runs - runs
+
+        (project_dir / "src" / "App.jsx").write_text("export default function App() {\n  return null;\n}\n")
+        (project_dir / "notes.md").write_text("todo\n")
+        write_event(project_dir, "Edit", file_path=str(project_dir / "src" / "App.jsx"))
+        changed = call(t["git_status"])
+        diff = call(t["git_diff_summary"])
+
+        git(project_dir, "add", "src/App.jsx")
+        staged = call(t["git_status"])
+        git(project_dir, "commit", "-q", "-m", "Render nothing")
+        log = call(t["git_log"])
+        runs = index.git_runs
+        call(t["git_log"])
+        log_cached = index.git_runs == runs
+        shown = call(t["git_diff_summary"], revision="HEAD")
+        path_log = call(t["git_log"], path="package.json")
+        bad_revision = call(t["git_diff_summary"], revision="--output=/tmp/x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        not_repo = call(tools(Path(tmp))["git_status"])
+
+    results = [
+        check("clean tree reported", clean == "Branch: main\nWorking tree clean"),
+        check("repeat status served from the cache", clean_again == clean and cached_runs == 0),
+        check("edit event refreshes status", "Modified (1):\n  M src/App.jsx" in changed
+              and "Untracked (1):\n  notes.md" in changed),
+        check("uncommitted diff summarized", diff == "1 files changed, +3 -1:\n  +3 -1  src/App.jsx"),
+        check("git add noticed without an event", "Staged (1):\n  M src/App.jsx" in staged),
+        check("commit noticed without an event", log.splitlines()[0].endswith("Render nothing (1 files)")
+              and log.splitlines()[1].endswith("Initial setup (3 files)")),
+        check("repeat log served from the cache", log_cached),
+        check("commit diff summarized", shown.startswith("1 files changed, +3 -1")),
+        check("log filtered by path", len(path_log.splitlines()) == 1 and "Initial setup" in path_log),
+        check("option-like revision rejected", bad_revision.startswith("Invalid revision")),
+        check("not a repository reported", "not a git repository" in not_repo),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_filesystem_tools():
+    """Test the directory tree, file stats and path confinement."""
+    print("\nTesting filesystem tools:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp).resolve()
+        make_repo(project_dir)
+        (project_dir / "node_modules" / "react").mkdir(parents=True)
+        (project_dir / "node_modules" / "react" / "index.js").write_text("x" * 5000)
+        t = tools(project_dir)
+
+        tree = call(t["list_tree"])
+        (project_dir / "src" / "Button.jsx").write_text("export const Button = () => null;\n")
+        tree_after_create = call(t["list_tree"], path="src")
+        (project_dir / "package.json").write_text('{"name": "demo", "version": "1.0.0"}\n')
+        stat_now = call(t["file_stat"], path="package.json")
+        stale = call(t["list_tree"], depth=1)
+        write_event(project_dir, "Bash", command="npm version 1.0.0")
+        fresh = call(t["list_tree"], depth=1)
+        app = call(t["file_stat"], path="src/App.jsx")
+        ignored = call(t["file_stat"], path="node_modules/react/index.js")
+        untracked = call(t["file_stat"], path="src/Button.jsx")
+        outside = call(t["file_stat"], path="../elsewhere.txt")
+        outside_tree = call(t["list_tree"], path="/etc")
+
+    results = [
+        check("tree lists sizes, skips node_modules", "src/ (33 B, 1 files)" in tree and "App.jsx (33 B)" in tree
+              and "node_modules/ (not listed)" in tree and "index.js" not in tree),
+        check("new file picked up from the directory mtime", "Button.jsx (34 B)" in tree_after_create),
+        check("file stat reads the file itself", "package.json: file, 37 bytes, 1 lines" in stat_now),
+        check("sizes cached until a Bash event", "package.json (17 B)" in stale and "package.json (37 B)" in fresh),
+        check("file stat includes git state", "src/App.jsx: file, 33 bytes, 1 lines" in app
+              and app.endswith("git: clean")),
+        check("ignored and untracked files", ignored.endswith("git: ignored") and untracked.endswith("git: untracked")),
+        check("paths outside the project rejected", outside.startswith("Path is outside")
+              and outside_tree.startswith("Path is outside")),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  REPOSITORY INDEX TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_git_tools, test_filesystem_tools):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
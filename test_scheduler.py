@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Parallel Scheduler Tests
+========================
+
+Tests for the worker-pool scheduler using a fake SDK client and an
+in-memory Linear stand-in.
+Run with: python test_scheduler.py
+"""
+
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from claude_code_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from linear_config import LINEAR_PROJECT_MARKER, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from scheduler import MAX_CLAIM_ATTEMPTS, UNMERGED_BRANCH_PREFIX, IssueBoard, run_parallel_agents
+
+
+class FakeLinear:
+    """In-memory stand-in for LinearClient."""
+
+    def __init__(self, issues: list[dict]):
+        self.issues = {issue["id"]: issue for issue in issues}
+        self.updates = []
+
+    async def list_issues(self, project_id, state_name=None, updated_after=None):
+        await asyncio.sleep(0)
+        return [
+            dict(issue)
+            for issue in self.issues.values()
+            if state_name is None or issue["state"]["name"] == state_name
+        ]
+
+    async def update_issue_state(self, issue_id, team_id, state_name):
+        await asyncio.sleep(0)
+        self.issues[issue_id]["state"] = {"name": state_name}
+        self.updates.append((issue_id, state_name))
+        return True
+
+
+class FakeClient:
+    """Fake ClaudeSDKClient that commits one file named after its assigned issue and marks it Done."""
+
+    def __init__(self, cwd: Path, linear: FakeLinear):
+        self.cwd = cwd
+        self.linear = linear
+        self.prompt = ""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def query(self, prompt):
+        self.prompt = prompt
+
+    @property
+    def issue_id(self) -> str:
+        return re.search(r"\*\*Issue ID:\*\* (\S+)", self.prompt).group(1)
+
+    async def receive_response(self):
+        issue_id = self.issue_id
+        (self.cwd / f"{issue_id}.txt").write_text(issue_id)
+        subprocess.run(["git", "add", "."], cwd=self.cwd, check=True)
+        subprocess.run(["git", "commit", "-qm", f"Implement {issue_id}"], cwd=self.cwd, check=True)
+        await self.linear.update_issue_state(issue_id, "team", STATUS_DONE)
+        yield AssistantMessage(content=[TextBlock(text=f"Done {issue_id}\n")], model="fake")
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1,
+            is_error=False, num_turns=1, session_id="fake",
+        )
+
+
+class HandoffClient(FakeClient):
+    """Fake client whose session ends cleanly but leaves its issue In Progress (a context handoff)."""
+
+    async def receive_response(self):
+        await asyncio.sleep(0)
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1,
+            is_error=False, num_turns=1, session_id="fake",
+        )
+
+
+class ConflictClient(FakeClient):
+    """Fake client that marks its issue Done on a branch the main checkout has since diverged from."""
+
+    def __init__(self, cwd: Path, linear: FakeLinear, project_dir: Path):
+        super().__init__(cwd, linear)
+        self.project_dir = project_dir
+
+    async def receive_response(self):
+        for directory, text in ((self.cwd, "worker\n"), (self.project_dir, "elsewhere\n")):
+            (directory / "README.md").write_text(text)
+            subprocess.run(["git", "commit", "-qam", "Edit README"], cwd=directory, check=True)
+        await self.linear.update_issue_state(self.issue_id, "team", STATUS_DONE)
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1,
+            is_error=False, num_turns=1, session_id="fake",
+        )
+
+
+class ErrorResultClient(FakeClient):
+    """Fake client whose session ends with an error result and no commit."""
+
+    async def receive_response(self):
+        await asyncio.sleep(0)
+        yield ResultMessage(
+            subtype="error_during_execution", duration_ms=1, duration_api_ms=1,
+            is_error=True, num_turns=1, session_id="fake",
+        )
+
+
+def make_issues(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"issue-{n}",
+            "identifier": f"DEMO-{n}",
+            "title": f"Feature {n}",
+            "priority": (n % 4) + 1,
+            "state": {"name": STATUS_TODO},
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def make_project(tmp: Path) -> Path:
+    project_dir = tmp / "project"
+    project_dir.mkdir()
+    for args in (
+        ["init", "-q"],
+        ["config", "user.email", "test@example.com"],
+        ["config", "user.name", "Test"],
+    ):
+        subprocess.run(["git", *args], cwd=project_dir, check=True)
+    (project_dir / "README.md").write_text("demo\n")
+    subprocess.run(["git", "add", "."], cwd=project_dir, check=True)
+    subprocess.run(["git", "commit", "-qm", "init"], cwd=project_dir, check=True)
+    (project_dir / LINEAR_PROJECT_MARKER).write_text(
+        json.dumps({"initialized": True, "project_id": "proj", "team_id": "team"})
+    )
+    return project_dir
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_issue_board():
+    """Test that concurrent claims never hand out the same issue twice."""
+    print("\nTesting issue board:\n")
+    passed = 0
+    failed = 0
+
+    linear = FakeLinear(make_issues(6))
+    board = IssueBoard(linear, "proj", "team")
+
+    async def claim_all():
+        return await asyncio.gather(*(board.claim() for _ in range(8)))
+
+    claims = asyncio.run(claim_all())
+    claimed_ids = [issue["id"] for issue in claims if issue is not None]
+
+    results = [
+        check("six distinct issues claimed", sorted(claimed_ids) == sorted(set(claimed_ids)) and len(claimed_ids) == 6),
+        check("extra claims return None", claims.count(None) == 2),
+        check("urgent issues claimed first", claims[0]["priority"] == 1),
+        check(
+            "claimed issues moved to In Progress",
+            all(issue["state"]["name"] == STATUS_IN_PROGRESS for issue in linear.issues.values()),
+        ),
+    ]
+    for ok in results:
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def test_parallel_run():
+    """Test a full parallel run with worktrees merging back into the main checkout."""
+    print("\nTesting parallel run:\n")
+    passed = 0
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = make_project(Path(tmp))
+        linear = FakeLinear(make_issues(5))
+
+        asyncio.run(
+            run_parallel_agents(
+                project_dir,
+                model="fake",
+                workers=3,
+                linear=linear,
+                client_factory=lambda path, model: FakeClient(path, linear),
+            )
+        )
+
+        log = subprocess.run(
+            ["git", "log", "--oneline"], cwd=project_dir, capture_output=True, text=True
+        ).stdout
+        results = [
+            check(
+                "every issue's file merged into main checkout",
+                all((project_dir / f"issue-{n}.txt").exists() for n in range(1, 6)),
+            ),
+            check("one implementation commit per issue", log.count("Implement issue-") == 5),
+            check("worktrees cleaned up", not any((project_dir / ".worktrees").iterdir())),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp2:
+            project_dir = make_project(Path(tmp2))
+            linear = FakeLinear(make_issues(5))
+            asyncio.run(
+                run_parallel_agents(
+                    project_dir,
+                    model="fake",
+                    workers=2,
+                    max_iterations=3,
+                    linear=linear,
+                    client_factory=lambda path, model: FakeClient(path, linear),
+                )
+            )
+            remaining = [i for i in linear.issues.values() if i["state"]["name"] == STATUS_TODO]
+            results.append(check("max_iterations caps total sessions", len(remaining) == 2))
+
+        with tempfile.TemporaryDirectory() as tmp3:
+            project_dir = make_project(Path(tmp3))
+            linear = FakeLinear(make_issues(5))
+            asyncio.run(
+                run_parallel_agents(
+                    project_dir,
+                    model="fake",
+                    workers=4,
+                    max_iterations=1,
+                    linear=linear,
+                    client_factory=lambda path, model: FakeClient(path, linear),
+                )
+            )
+            claimed = [issue_id for issue_id, state in linear.updates if state == STATUS_IN_PROGRESS]
+            results.append(check("concurrent workers don't overshoot max_iterations", len(claimed) == 1))
+
+    for ok in results:
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def test_failed_sessions():
+    """Test that failed sessions release their issue for a retry without stopping other workers."""
+    print("\nTesting failed sessions:\n")
+    passed = 0
+    failed = 0
+
+    calls: dict[str, int] = {}
+
+    def flaky_factory(path: Path, model: str):
+        calls[path.name] = calls.get(path.name, 0) + 1
+        if path.name == "DEMO-1" and calls[path.name] == 1:
+            raise RuntimeError("client failed to start")
+        if path.name == "DEMO-3" or (path.name == "DEMO-2" and calls[path.name] == 1):
+            return ErrorResultClient(path, linear)
+        return FakeClient(path, linear)
+
+    linear = FakeLinear(make_issues(4))
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = make_project(Path(tmp))
+        asyncio.run(
+            run_parallel_agents(
+                project_dir,
+                model="fake",
+                workers=2,
+                linear=linear,
+                client_factory=flaky_factory,
+            )
+        )
+        merged = sorted(path.name for path in project_dir.glob("issue-*.txt"))
+
+    results = [
+        check("exception releases the issue and it is retried", calls["DEMO-1"] == 2 and "issue-1.txt" in merged),
+        check("error status releases the issue and it is retried", calls["DEMO-2"] == 2 and "issue-2.txt" in merged),
+        check("other issues unaffected", "issue-4.txt" in merged),
+        check(
+            "always-failing issue given up after its attempts, back in Todo",
+            calls["DEMO-3"] == MAX_CLAIM_ATTEMPTS and linear.issues["issue-3"]["state"]["name"] == STATUS_TODO,
+        ),
+    ]
+
+    for ok in results:
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def test_unfinished_issues():
+    """Test handed-off and leftover In Progress issues are picked up, and unmerged work is reopened."""
+    print("\nTesting unfinished issues:\n")
+
+    calls: dict[str, int] = {}
+
+    def factory(path: Path, model: str):
+        calls[path.name] = calls.get(path.name, 0) + 1
+        if path.name == "DEMO-1" and calls[path.name] == 1:
+            return HandoffClient(path, linear)
+        if path.name == "DEMO-2":
+            return HandoffClient(path, linear)
+        if path.name == "DEMO-3" and calls[path.name] == 1:
+            return ConflictClient(path, linear, project_dir)
+        return FakeClient(path, linear)
+
+    linear = FakeLinear(make_issues(4))
+    # Left In Progress by an earlier, interrupted run
+    linear.issues["issue-4"]["state"] = {"name": STATUS_IN_PROGRESS}
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = make_project(Path(tmp))
+        asyncio.run(
+            run_parallel_agents(project_dir, model="fake", workers=2, linear=linear, client_factory=factory)
+        )
+        merged = sorted(path.name for path in project_dir.glob("issue-*.txt"))
+        branches = subprocess.run(
+            ["git", "branch", "--list", f"{UNMERGED_BRANCH_PREFIX}*"], cwd=project_dir, capture_output=True, text=True,
+        ).stdout.split()
+    states = {issue_id: issue["state"]["name"] for issue_id, issue in linear.issues.items()}
+
+    results = [
+        check("handed-off issue picked up again and finished", calls["DEMO-1"] == 2 and "issue-1.txt" in merged
+              and states["issue-1"] == STATUS_DONE),
+        check("issue never finished given up and moved back to Todo", calls["DEMO-2"] == MAX_CLAIM_ATTEMPTS
+              and states["issue-2"] == STATUS_TODO),
+        check("unmerged Done issue reopened and redone", calls["DEMO-3"] == 2 and "issue-3.txt" in merged
+              and states["issue-3"] == STATUS_DONE),
+        check("unmerged branch kept", branches == [f"{UNMERGED_BRANCH_PREFIX}DEMO-3"]),
+        check("leftover In Progress issue claimed", calls.get("DEMO-4") == 1 and states["issue-4"] == STATUS_DONE),
+        check("leftover issue not moved back to In Progress",
+              (("issue-4", STATUS_IN_PROGRESS) not in linear.updates)),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  PARALLEL SCHEDULER TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_issue_board, test_parallel_run, test_failed_sessions, test_unfinished_issues):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Screenshot Governor Tests
+=========================
+
+Tests for the zlib-only PNG fingerprint, screenshot deduplication and the
+per-session screenshot budget in the pooled Puppeteer proxy.
+Run with: python test_screenshots.py
+"""
+
+import asyncio
+import base64
+import struct
+import sys
+import zlib
+
+from mcp.types import CallToolResult, ImageContent, TextContent
+
+from mcp_pool import McpServerPool
+from screenshots import ScreenshotGovernor, fingerprints_match, png_fingerprint
+
+
+def encode_png(pixels: list[list[tuple]], color_type: int = 6, filter_type: int = 4) -> bytes:
+    """Encode rows of pixel tuples as an 8-bit PNG with one filter type on every row."""
+    bpp = len(pixels[0][0])
+    rows = []
+    prev = bytearray(len(pixels[0]) * bpp)
+    for row in pixels:
+        line = bytearray(value for pixel in row for value in pixel)
+        out = bytearray(len(line))
+        for i in range(len(line)):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            if filter_type == 0:
+                predictor = 0
+            elif filter_type == 1:
+                predictor = a
+            elif filter_type == 2:
+                predictor = b
+            elif filter_type == 3:
+                predictor = (a + b) >> 1
+            else:
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+            out[i] = (line[i] - predictor) & 0xFF
+        rows.append(bytes([filter_type]) + bytes(out))
+        prev = line
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", len(pixels[0]), len(pixels), 8, color_type, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows))) + chunk(b"IEND", b"")
+    )
+
+
+def page(width: int = 128, height: int = 96, text_rows: int = 3, ink: int = 30, mark: bool = False) -> list[list[tuple]]:
+    """A white page with dark "text" bars, optionally with one extra small mark."""
+    pixels = [[(255, 255, 255, 255)] * width for _ in range(height)]
+    for n in range(text_rows):
+        for y in range(10 + n * 12, 16 + n * 12):
+            for x in range(8, 72):
+                pixels[y][x] = (ink, ink, ink, 255)
+    if mark:
+        for y in range(60, 64):
+            for x in range(100, 104):
+                pixels[y][x] = (0, 0, 0, 255)
+    return pixels
+
+
+def screenshot_content(png: bytes, name: str) -> list:
+    return [
+        TextContent(type="text", text=f"Screenshot '{name}' taken at 128x96"),
+        ImageContent(type="image", data=base64.b64encode(png).decode("ascii"), mimeType="image/png"),
+    ]
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_fingerprint():
+    """Test PNG decoding across filters and color types, and change sensitivity."""
+    print("\nTesting PNG fingerprints:\n")
+
+    base = page()
+    by_filter = {f: png_fingerprint(encode_png(base, filter_type=f)) for f in range(5)}
+    rgb = png_fingerprint(encode_png([[pixel[:3] for pixel in row] for row in base], color_type=2))
+    gray = png_fingerprint(encode_png([[pixel[:1] for pixel in row] for row in base], color_type=0))
+    noise = png_fingerprint(encode_png(page(ink=32)))
+    mark = png_fingerprint(encode_png(page(mark=True)))
+    more_text = png_fingerprint(encode_png(page(text_rows=4)))
+
+    results = [
+        check("all five PNG filters decode identically", len(set(by_filter.values())) == 1),
+        check("RGB and grayscale decode like RGBA", rgb == by_filter[0] and gray == by_filter[0]),
+        check("slight rendering noise still matches", fingerprints_match(by_filter[0], noise)),
+        check("a small new mark does not match", not fingerprints_match(by_filter[0], mark)),
+        check("a new line of text does not match", not fingerprints_match(by_filter[0], more_text)),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_governor():
+    """Test deduplication per page and the per-session budget."""
+    print("\nTesting screenshot governor:\n")
+
+    governor = ScreenshotGovernor(budget=2)
+    home, noisy, edited = encode_png(page()), encode_png(page(ink=32)), encode_png(page(text_rows=4))
+
+    def take(png: bytes, name: str) -> list:
+        return governor.filter("puppeteer_screenshot", {"name": name}, screenshot_content(png, name))
+
+    governor.note_call("puppeteer_navigate", {"url": "http://localhost:3000/"})
+    first = take(home, "home")
+    repeat = take(noisy, "home-again")
+    governor.note_call("puppeteer_navigate", {"url": "http://localhost:3000/chat"})
+    other_page = take(home, "chat")
+    over_budget = take(edited, "chat-edited")
+    counts = (governor.sent, governor.deduplicated, governor.over_budget)
+
+    governor.begin_session()
+    next_session = take(home, "chat")
+    other_tool = governor.filter("puppeteer_click", {"selector": "#send"}, [TextContent(type="text", text="Clicked")])
+
+    results = [
+        check("first screenshot passed through", isinstance(first[1], ImageContent)),
+        check("unchanged screenshot replaced with a note", isinstance(repeat[1], TextContent)
+              and "identical to previous screenshot 'home' of http://localhost:3000/" in repeat[1].text),
+        check("tool's own text kept", repeat[0].text.startswith("Screenshot 'home-again'")),
+        check("same image of another page passed through", isinstance(other_page[1], ImageContent)),
+        check("over-budget screenshot replaced with a note", isinstance(over_budget[1], TextContent)
+              and "budget used up (2 per session)" in over_budget[1].text),
+        check("counts kept", counts == (2, 1, 1)),
+        check("new session resets budget and history", isinstance(next_session[1], ImageContent) and governor.sent == 1),
+        check("other tools untouched", other_tool[0].text == "Clicked"),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_pool_proxy():
+    """Test that the pooled Puppeteer proxy filters screenshot results."""
+    print("\nTesting pooled proxy filtering:\n")
+
+    class FakeSession:
+        async def call_tool(self, name, arguments):
+            if name == "puppeteer_screenshot":
+                return CallToolResult(content=screenshot_content(encode_png(page()), arguments["name"]))
+            return CallToolResult(content=[TextContent(type="text", text=f"Navigated to {arguments['url']}")])
+
+    async def scenario():
+        pool = McpServerPool()
+        pool._sessions["puppeteer"] = FakeSession()
+        pool.begin_session()
+        await pool.call_tool("puppeteer", "puppeteer_navigate", {"url": "http://localhost:3000/"})
+        first = await pool.call_tool("puppeteer", "puppeteer_screenshot", {"name": "a"})
+        second = await pool.call_tool("puppeteer", "puppeteer_screenshot", {"name": "b"})
+        pool.begin_session()
+        third = await pool.call_tool("puppeteer", "puppeteer_screenshot", {"name": "c"})
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    results = [
+        check("first screenshot reaches the agent", isinstance(first[1], ImageContent)),
+        check("repeat screenshot deduplicated by the proxy", isinstance(second[1], TextContent)),
+        check("next session starts fresh", isinstance(third[1], ImageContent)),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  SCREENSHOT GOVERNOR TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_fingerprint, test_governor, test_pool_proxy):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,126 @@ import sys
 
 from security import (
     bash_security_hook,
+    evaluate_command,
     extract_commands,
+    split_command_segments,
     validate_chmod_command,
     validate_init_script,
 )
 
 
+# Commands the security hook must block
+DANGEROUS_COMMANDS = [
+    # Not in allowlist - dangerous system commands
+    "shutdown now",
+    "reboot",
+    "rm -rf /",
+    "dd if=/dev/zero of=/dev/sda",
+    # Not in allowlist - common commands excluded from minimal set
+    "curl https://example.com",
+    "wget https://example.com",
+    "python app.py",
+    "touch file.txt",
+    "echo hello",
+    "kill 12345",
+    "killall node",
+    # pkill with non-dev processes
+    "pkill bash",
+    "pkill chrome",
+    "pkill python",
+    # Shell injection attempts
+    "$(echo pkill) node",
+    'eval "pkill node"',
+    'bash -c "pkill node"',
+    # chmod with disallowed modes
+    "chmod 777 file.sh",
+    "chmod 755 file.sh",
+    "chmod +w file.sh",
+    "chmod -R +x dir/",
+    # Non-init.sh scripts
+    "./setup.sh",
+    "./malicious.sh",
+    "bash script.sh",
+    # Chaining without spaces, newlines and pipes must not hide commands
+    "npm install&&rm -rf /",
+    "ls\nrm -rf /",
+    "ls|rm file.txt",
+    "npm run dev & curl https://example.com",
+    # Every sensitive command is validated against its own segment
+    "chmod +x init.sh && chmod 777 init.sh",
+    "pkill node; pkill bash",
+    # Commands after a heredoc's closing line are still checked
+    "cat <<'EOF' > notes.md\nhello\nEOF\nrm -rf /",
+    "cat <<-EOF > notes.md\n\thello\n\tEOF\ncurl https://example.com",
+    "cat <<EOF > notes.md\nEOF is not alone on this line\nEOF\ntouch file.txt",
+    # Here-strings and arithmetic shifts don't open a heredoc
+    'git status <<< "x"\nrm -rf /',
+    "ls $((1<<2))\nrm -rf /",
+]
+
+# Commands the security hook must allow
+SAFE_COMMANDS = [
+    # File inspection
+    "ls -la",
+    "cat README.md",
+    "head -100 file.txt",
+    "tail -20 log.txt",
+    "wc -l file.txt",
+    "grep -r pattern src/",
+    # File operations
+    "cp file1.txt file2.txt",
+    "mkdir newdir",
+    "mkdir -p path/to/dir",
+    # Directory
+    "pwd",
+    # Node.js development
+    "npm install",
+    "npm run build",
+    "node server.js",
+    # Version control
+    "git status",
+    "git commit -m 'test'",
+    "git add . && git commit -m 'msg'",
+    # Process management
+    "ps aux",
+    "lsof -i :3000",
+    "sleep 2",
+    # Allowed pkill patterns for dev servers
+    "pkill node",
+    "pkill npm",
+    "pkill -f node",
+    "pkill -f 'node server.js'",
+    "pkill vite",
+    # Chained commands
+    "npm install && npm run build",
+    "ls | grep test",
+    # Full paths
+    "/usr/local/bin/node app.js",
+    # chmod +x (allowed)
+    "chmod +x init.sh",
+    "chmod +x script.sh",
+    "chmod u+x init.sh",
+    "chmod a+x init.sh",
+    # init.sh execution (allowed)
+    "./init.sh",
+    "./init.sh --production",
+    "/path/to/init.sh",
+    # Combined chmod and init.sh
+    "chmod +x init.sh && ./init.sh",
+    # Separators and redirections inside quotes or redirects
+    'git commit -m "fix: a; b && c"',
+    "grep 'a|b' file.txt",
+    "npm run build 2>&1 | tail -20",
+    "./init.sh > init.log 2>&1 &",
+    # Heredoc bodies are data, not commands
+    "cat <<'EOF' > notes.md\nhello world\nEOF",
+    "cat <<-EOF > notes.md\n\thello world; rm -rf /\n\tEOF\nls",
+    "cat <<EOF | grep hello\nhello\nEOF",
+    "git commit -F - <<'MSG'\nAdd login form\n\nIt's done\nMSG",
+    "grep hello <<< 'hello world'",
+]
+
+
 def test_hook(command: str, should_block: bool) -> bool:
     """Test a single command against the security hook."""
     input_data = {"tool_name": "Bash", "tool_input": {"command": command}}
@@ -54,6 +168,13 @@ def test_extract_commands():
         ("/usr/bin/node script.js", ["node"]),
         ("VAR=value ls", ["ls"]),
         ("git status || git init", ["git", "git"]),
+        ("npm install&&npm run build", ["npm", "npm"]),
+        ("ls|grep test", ["ls", "grep"]),
+        ("ls\ngit status", ["ls", "git"]),
+        ('git commit -m "fix: a; b && c"', ["git"]),
+        ("npm run build 2>&1 | tail -20", ["npm", "tail"]),
+        ("npm run dev &", ["npm"]),
+        ("cat 'unclosed", []),
     ]
 
     for cmd, expected in test_cases:
@@ -69,6 +190,69 @@ def test_extract_commands():
     return passed, failed
 
 
+def test_split_segments():
+    """Test the single-pass segment tokenizer."""
+    print("\nTesting segment splitting:\n")
+    passed = 0
+    failed = 0
+
+    test_cases = [
+        ("ls -la", ["ls -la"]),
+        ("chmod +x init.sh && ./init.sh", ["chmod +x init.sh", "./init.sh"]),
+        ("a; b || c | d & e", ["a", "b", "c", "d", "e"]),
+        ("git commit -m 'a && b; c'", ["git commit -m 'a && b; c'"]),
+        ("node s.js > log 2>&1 &", ["node s.js > log 2>&1"]),
+        ("node s.js &> log", ["node s.js &> log"]),
+        ('echo "unclosed', []),
+        ("cat <<'EOF' > a.md\nx && y\nEOF\nls", ["cat <<'EOF' > a.md", "ls"]),
+        ("cat <<A <<-B\na\nA\n\tb\n\tB\npwd", ["cat <<A <<-B", "pwd"]),
+        ("cat <<EOF\nnever closed\nrm -rf /", ["cat <<EOF"]),
+        ('grep x <<< "y"\nls', ['grep x <<< "y"', "ls"]),
+        ("ls $((1<<2)) && pwd", ["ls $((1<<2))", "pwd"]),
+    ]
+
+    for cmd, expected in test_cases:
+        result = split_command_segments(cmd)
+        if result == expected:
+            print(f"  PASS: {cmd!r} -> {result}")
+            passed += 1
+        else:
+            print(f"  FAIL: {cmd!r}")
+            print(f"         Expected: {expected}, Got: {result}")
+            failed += 1
+
+    return passed, failed
+
+
+def test_decision_cache():
+    """Test that repeated commands are served from the decision cache."""
+    print("\nTesting decision cache:\n")
+    passed = 0
+    failed = 0
+
+    evaluate_command.cache_clear()
+    first = evaluate_command("git status")
+    second = evaluate_command("git status")
+    info = evaluate_command.cache_info()
+
+    if first == second == (True, "") and info.hits == 1 and info.misses == 1:
+        print("  PASS: repeated command hits the cache")
+        passed += 1
+    else:
+        print(f"  FAIL: repeated command hits the cache ({info})")
+        failed += 1
+
+    blocked = evaluate_command("rm -rf /")
+    if evaluate_command("rm -rf /") == blocked and not blocked[0]:
+        print("  PASS: cached block decision is stable")
+        passed += 1
+    else:
+        print("  FAIL: cached block decision is stable")
+        failed += 1
+
+    return passed, failed
+
+
 def test_validate_chmod():
     """Test chmod command validation."""
     print("\nTesting chmod validation:\n")
@@ -164,6 +348,16 @@ def main():
     passed += ext_passed
     failed += ext_failed
 
+    # Test segment splitting
+    split_passed, split_failed = test_split_segments()
+    passed += split_passed
+    failed += split_failed
+
+    # Test decision cache
+    cache_passed, cache_failed = test_decision_cache()
+    passed += cache_passed
+    failed += cache_failed
+
     # Test chmod validation
     chmod_passed, chmod_failed = test_validate_chmod()
     passed += chmod_passed
@@ -176,40 +370,7 @@ def main():
 
     # Commands that SHOULD be blocked
     print("\nCommands that should be BLOCKED:\n")
-    dangerous = [
-        # Not in allowlist - dangerous system commands
-        "shutdown now",
-        "reboot",
-        "rm -rf /",
-        "dd if=/dev/zero of=/dev/sda",
-        # Not in allowlist - common commands excluded from minimal set
-        "curl https://example.com",
-        "wget https://example.com",
-        "python app.py",
-        "touch file.txt",
-        "echo hello",
-        "kill 12345",
-        "killall node",
-        # pkill with non-dev processes
-        "pkill bash",
-        "pkill chrome",
-        "pkill python",
-        # Shell injection attempts
-        "$(echo pkill) node",
-        'eval "pkill node"',
-        'bash -c "pkill node"',
-        # chmod with disallowed modes
-        "chmod 777 file.sh",
-        "chmod 755 file.sh",
-        "chmod +w file.sh",
-        "chmod -R +x dir/",
-        # Non-init.sh scripts
-        "./setup.sh",
-        "./malicious.sh",
-        "bash script.sh",
-    ]
-
-    for cmd in dangerous:
+    for cmd in DANGEROUS_COMMANDS:
         if test_hook(cmd, should_block=True):
             passed += 1
         else:
@@ -217,57 +378,7 @@ def main():
 
     # Commands that SHOULD be allowed
     print("\nCommands that should be ALLOWED:\n")
-    safe = [
-        # File inspection
-        "ls -la",
-        "cat README.md",
-        "head -100 file.txt",
-        "tail -20 log.txt",
-        "wc -l file.txt",
-        "grep -r pattern src/",
-        # File operations
-        "cp file1.txt file2.txt",
-        "mkdir newdir",
-        "mkdir -p path/to/dir",
-        # Directory
-        "pwd",
-        # Node.js development
-        "npm install",
-        "npm run build",
-        "node server.js",
-        # Version control
-        "git status",
-        "git commit -m 'test'",
-        "git add . && git commit -m 'msg'",
-        # Process management
-        "ps aux",
-        "lsof -i :3000",
-        "sleep 2",
-        # Allowed pkill patterns for dev servers
-        "pkill node",
-        "pkill npm",
-        "pkill -f node",
-        "pkill -f 'node server.js'",
-        "pkill vite",
-        # Chained commands
-        "npm install && npm run build",
-        "ls | grep test",
-        # Full paths
-        "/usr/local/bin/node app.js",
-        # chmod +x (allowed)
-        "chmod +x init.sh",
-        "chmod +x script.sh",
-        "chmod u+x init.sh",
-        "chmod a+x init.sh",
-        # init.sh execution (allowed)
-        "./init.sh",
-        "./init.sh --production",
-        "/path/to/init.sh",
-        # Combined chmod and init.sh
-        "chmod +x init.sh && ./init.sh",
-    ]
-
-    for cmd in safe:
+    for cmd in SAFE_COMMANDS:
         if test_hook(cmd, should_block=False):
             passed += 1
         else:
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Session Context Tests
+=====================
+
+Tests for cached prompt templates and the precomputed session context
+injected into coding prompts.
+Run with: python test_session_context.py
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from issue_cache import get_issue_cache
+from linear_client import LinearAPIError
+from linear_config import LINEAR_PROJECT_MARKER, STATUS_DONE, STATUS_TODO
+from prompts import get_coding_prompt, get_worker_prompt, load_template
+from session_context import build_session_context
+
+
+class FakeLinear:
+    def __init__(self, comment=None, fail=False):
+        self.comment = comment
+        self.fail = fail
+        self.requested = []
+
+    async def get_latest_comment(self, issue_id):
+        self.requested.append(issue_id)
+        if self.fail:
+            raise LinearAPIError("unreachable")
+        return self.comment
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def make_project(tmp: str) -> Path:
+    project_dir = Path(tmp)
+    (project_dir / LINEAR_PROJECT_MARKER).write_text(
+        json.dumps({
+            "initialized": True, "project_name": "Claude Clone", "project_id": "proj-1",
+            "team_id": "team-1", "meta_issue_id": "meta-1",
+        })
+    )
+    (project_dir / "app_spec.txt").write_text("spec")
+    (project_dir / "src").mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=project_dir, check=True)
+    subprocess.run(["git", "add", "."], cwd=project_dir, check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "Initial setup"],
+        cwd=project_dir, check=True,
+    )
+
+    cache = get_issue_cache(project_dir)
+    cache.apply([
+        {"id": "meta-1", "identifier": "DEMO-0", "title": "[META] Project Progress Tracker",
+         "priority": 0, "updatedAt": "2025-01-01", "state": {"name": STATUS_TODO}},
+        {"id": "id-1", "identifier": "DEMO-1", "title": "Login", "priority": 1,
+         "updatedAt": "2025-01-01", "state": {"name": STATUS_TODO}},
+        {"id": "id-2", "identifier": "DEMO-2", "title": "Layout", "priority": 1,
+         "updatedAt": "2025-01-01", "state": {"name": STATUS_DONE}},
+    ])
+    return project_dir
+
+
+def test_session_context():
+    """Test that the context block contains what the agent used to look up."""
+    print("\nTesting session context:\n")
+
+    comment = {"body": "Finished DEMO-2. Next: login.", "createdAt": "2025-01-02", "user": {"name": "agent"}}
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = make_project(tmp)
+        linear = FakeLinear(comment)
+        context = asyncio.run(build_session_context(project_dir, linear))
+        unreachable = asyncio.run(build_session_context(project_dir, FakeLinear(fail=True)))
+
+    results = [
+        check("working directory included", str(project_dir.resolve()) in context),
+        check("top-level files listed", "app_spec.txt" in context and "src/" in context and LINEAR_PROJECT_MARKER in context),
+        check("project and team IDs included", "project_id: proj-1" in context and "team_id: team-1" in context),
+        check("git log included", "Initial setup" in context),
+        check("issue counts included", "Done: 1" in context and "DEMO-1" in context),
+        check("latest META comment included", linear.requested == ["meta-1"] and "Next: login." in context),
+        check("unreachable Linear falls back", "read it with mcp__linear__list_comments" in unreachable),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_prompt_templates():
+    """Test template caching and context injection."""
+    print("\nTesting prompt templates:\n")
+
+    load_template.cache_clear()
+    with_context = get_coding_prompt("CONTEXT-BLOCK")
+    without_context = get_coding_prompt()
+    governed = get_coding_prompt("CONTEXT-BLOCK", screenshots_governed=True)
+    worker = get_worker_prompt({"id": "id-1", "identifier": "DEMO-1", "title": "Login"}, "harness/DEMO-1", "CONTEXT-BLOCK")
+    info = load_template.cache_info()
+
+    results = [
+        check("context injected into coding prompt", "CONTEXT-BLOCK" in with_context and "$session_context" not in with_context),
+        check("fallback tells agent to orient itself", "git log --oneline -20" in without_context),
+        check("screenshot notes only with the governor", "budget is used up" in governed
+              and "budget is used up" not in with_context and "$screenshot_notes" not in with_context),
+        check("worker prompt gets context and assignment", "CONTEXT-BLOCK" in worker and "harness/DEMO-1" in worker),
+        check("templates read from disk once", info.misses == 2 and info.hits == 3),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  SESSION CONTEXT TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_session_context, test_prompt_templates):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
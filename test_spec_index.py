@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Spec Index Tests
+================
+
+Tests for splitting app_spec.txt into sections, ranking lookups, hash-based
+invalidation and the spec_lookup harness tool.
+Run with: python test_spec_index.py
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from prompts import PROMPTS_DIR
+from spec_index import SPEC_INDEX_FILE, create_spec_tools, load_spec_index, split_spec
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def test_split():
+    """Test section boundaries for the bundled spec and a Markdown spec."""
+    print("\nTesting spec splitting:\n")
+
+    text = (PROMPTS_DIR / "app_spec.txt").read_text()
+    sections = split_spec(text)
+    paths = [section.path for section in sections]
+    line_count = len(text.splitlines())
+
+    markdown = split_spec("# Spec\nintro\n## Auth\nlogin flow\n### OAuth\ngoogle\n## Chat\nmessages\n")
+
+    results = [
+        check("wrapper element skipped", "overview" in paths and "technology_stack" in paths),
+        check("large elements split into children", "core_features/chat_interface" in paths and "core_features" not in paths),
+        check("nested tables split", "database_schema/tables/users" in paths),
+        check("steps labelled by title", "implementation_steps/step 1: Setup Project Foundation and Database" in paths),
+        check("sections stay small", all(
+            s.end_line - s.start_line < 60 for s in sections if s.path != "project_specification"
+        )),
+        check("sections are much smaller than the spec", max(len(s.text) for s in sections) < len(text) / 10),
+        check("line ranges within the file", all(1 <= s.start_line <= s.end_line <= line_count for s in sections)),
+        check("markdown split on headings", [s.path for s in markdown] == ["Spec", "Spec/Auth", "Spec/Auth/OAuth", "Spec/Chat"]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_lookup_and_invalidation():
+    """Test relevance ranking, the tool, and rebuilds on spec changes."""
+    print("\nTesting lookup and invalidation:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        shutil.copy(PROMPTS_DIR / "app_spec.txt", project_dir / "app_spec.txt")
+
+        index = load_spec_index(project_dir)
+        auth = [s.path for s in index.search("Auth - User login flow")]
+        artifacts = [s.path for s in index.search("Code artifact viewer with syntax highlighting")]
+        stored_hash = json.loads((project_dir / SPEC_INDEX_FILE).read_text())["spec_hash"]
+        same_index = load_spec_index(project_dir) is index
+
+        [spec_lookup] = create_spec_tools(project_dir)
+        outline = asyncio.run(spec_lookup.handler({}))["content"][0]["text"]
+        by_section = asyncio.run(spec_lookup.handler({"section": "design_system/typography"}))["content"][0]["text"]
+        by_query = asyncio.run(spec_lookup.handler({"query": "dark mode theme", "limit": 1}))["content"][0]["text"]
+
+        spec = project_dir / "app_spec.txt"
+        spec.write_text(spec.read_text().replace("</success_criteria>", "</success_criteria>\n  <telemetry>\n    - usage graphs\n  </telemetry>"))
+        rebuilt = load_spec_index(project_dir)
+        rebuilt_hash = json.loads((project_dir / SPEC_INDEX_FILE).read_text())["spec_hash"]
+
+    results = [
+        check("login query finds auth endpoints", auth[0] == "api_endpoints_summary/authentication"),
+        check("artifact query finds artifact features", "core_features/artifacts" in artifacts),
+        check("index saved with spec hash", stored_hash == index.spec_hash),
+        check("unchanged spec reuses the index", same_index),
+        check("tool lists sections with no arguments", "core_features/chat_interface" in outline),
+        check("tool returns a named section", by_section.startswith("### design_system/typography")),
+        check("tool query returns only the limit", by_query.count("### ") == 1),
+        check("changed spec rebuilds the index", rebuilt is not index and rebuilt_hash != stored_hash),
+        check("rebuilt index has the new section", rebuilt.get("telemetry") is not None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  SPEC INDEX TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_split, test_lookup_and_invalidation):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
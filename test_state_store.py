@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+State Store Tests
+=================
+
+Tests for cached, mtime-validated reads, atomic skip-if-unchanged writes,
+locked concurrent updates of the harness's JSON state files, and keeping
+harness state out of the agent's commits.
+Run with: python test_state_store.py
+"""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import state_store
+import telemetry
+from client import create_client
+from journal import JOURNAL_FILE, append_records
+from linear_config import ISSUE_CACHE_FILE, LINEAR_PROJECT_MARKER
+from npm_cache import record_install
+from regression import FEATURE_MAP_FILE
+from spec_index import SPEC_INDEX_FILE
+from state_store import JsonStateFile, state_file
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+class CountingJson:
+    """Stands in for the json module inside state_store to count parses."""
+
+    def __init__(self):
+        self.loads = 0
+
+    def load(self, f):
+        self.loads += 1
+        return json.load(f)
+
+    def dump(self, *args, **kwargs):
+        return json.dump(*args, **kwargs)
+
+    JSONDecodeError = json.JSONDecodeError
+
+
+def add_items(path: str, prefix: str, count: int) -> None:
+    store = JsonStateFile(Path(path))
+    for n in range(count):
+        store.update(lambda data, n=n: {**(data or {}), f"{prefix}-{n}": n})
+
+
+def test_cached_reads_and_writes():
+    """Test read caching, invalidation, atomic writes and skipped rewrites."""
+    print("\nTesting cached reads and atomic writes:\n")
+
+    counting = CountingJson()
+    original_json = state_store.json
+    state_store.json = counting
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            missing = JsonStateFile(path).read()
+
+            path.write_text(json.dumps({"initialized": True}))
+            store = JsonStateFile(path)
+            first = store.read()
+            first["initialized"] = False
+            second = store.read()
+            loads_after_reads = counting.loads
+
+            path.write_text(json.dumps({"initialized": True, "total_issues": 50}))
+            external = store.read()
+
+            written = store.write({"initialized": True, "total_issues": 50})
+            changed = store.write({"initialized": True, "total_issues": 51})
+            leftovers = [p.name for p in Path(tmp).iterdir() if p.name != "state.json"]
+            on_disk = json.loads(path.read_text())
+
+            path.write_text("{broken")
+            corrupt = store.read()
+    finally:
+        state_store.json = original_json
+
+    results = [
+        check("missing file reads as None", missing is None),
+        check("unchanged file parsed once", loads_after_reads == 1),
+        check("reads return copies", second == {"initialized": True}),
+        check("external change picked up", external == {"initialized": True, "total_issues": 50}),
+        check("identical content not rewritten", written is False),
+        check("changed content written", changed is True and on_disk["total_issues"] == 51),
+        check("no temp files left behind", leftovers == []),
+        check("corrupt file reads as None", corrupt is None),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_concurrent_updates():
+    """Test that locked updates from threads and processes don't lose writes."""
+    print("\nTesting concurrent updates:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "state.json"
+
+        threads = [threading.Thread(target=add_items, args=(str(path), f"t{n}", 20)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        after_threads = len(json.loads(path.read_text()))
+
+        processes = [multiprocessing.Process(target=add_items, args=(str(path), f"p{n}", 20)) for n in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        after_processes = len(json.loads(path.read_text()))
+
+        same_store = state_file(path) is state_file(Path(tmp) / "." / "state.json")
+
+    results = [
+        check("no updates lost across threads", after_threads == 80),
+        check("no updates lost across processes", after_processes == 140),
+        check("one shared store per file", same_store),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_client_settings_not_rewritten():
+    """Test that create_client leaves an unchanged .claude_settings.json alone."""
+    print("\nTesting settings file writes:\n")
+
+    os.environ.setdefault("CLAUDE_CODE_OAUTH_TOKEN", "test-token")
+    os.environ.setdefault("LINEAR_API_KEY", "test-key")
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        settings = project_dir / ".claude_settings.json"
+        create_client(project_dir, "fake-model")
+        first = settings.stat()
+        create_client(project_dir, "fake-model")
+        second = settings.stat()
+        content = json.loads(settings.read_text())
+
+    results = [
+        check("settings written on first client", content["sandbox"]["enabled"] is True),
+        check("unchanged settings not rewritten", (first.st_mtime_ns, first.st_ino) == (second.st_mtime_ns, second.st_ino)),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_harness_state_not_committed():
+    """Test that `git add .` picks up none of the harness's own state files."""
+    print("\nTesting harness state is ignored by git:\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        # Written before the initializer runs `git init`, as in a real first session
+        state_file(project_dir / LINEAR_PROJECT_MARKER).update(lambda data: {"initialized": True})
+        state_file(project_dir / ISSUE_CACHE_FILE).write({"issues": {}})
+        state_file(project_dir / SPEC_INDEX_FILE).write({"sections": []})
+        state_file(project_dir / FEATURE_MAP_FILE).update(lambda data: {"issues": {}})
+        append_records(project_dir / JOURNAL_FILE, [{"type": "session_start"}])
+        telemetry.connect(project_dir).close()
+        (project_dir / "node_modules").mkdir()
+        record_install(project_dir, "lock-hash", "npm")
+
+        subprocess.run(["git", "init", "-q"], cwd=project_dir, check=True)
+        subprocess.run(["git", "add", "."], cwd=project_dir, check=True)
+        staged = subprocess.run(
+            ["git", "diff", "--cached", "--name-only"], cwd=project_dir, capture_output=True, text=True, check=True
+        ).stdout.split()
+        harness_files = sorted(path.name for path in (project_dir / ".harness").iterdir())
+        lock_files = [path.name for path in project_dir.rglob("*.lock")]
+
+    results = [
+        check("state files kept in .harness/", harness_files == [
+            ".gitignore", "app_spec_index.json", "feature_map.json", "journal.jsonl",
+            "linear_issues.json", "npm_install.json", "telemetry.db",
+        ]),
+        check("only project files staged", staged == [LINEAR_PROJECT_MARKER]),
+        check("no lock files left behind", not lock_files),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  STATE STORE TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (
+        test_cached_reads_and_writes,
+        test_concurrent_updates,
+        test_client_settings_not_rewritten,
+        test_harness_state_not_committed,
+    ):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tool Output Governor Tests
+==========================
+
+Tests for cutting oversized Bash output to head/tail windows with a spill
+file, limiting large Read calls, and the per-tool limit configuration.
+Run with: python test_tool_output.py
+"""
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from state_store import HARNESS_DIR
+from tool_output import (
+    DEFAULT_OUTPUT_LIMITS,
+    TOOL_OUTPUT_DIR,
+    OutputLimit,
+    configure_output_limits,
+    output_limit,
+    parse_output_limit,
+    tool_output_governor_hook,
+    tool_output_note_hook,
+)
+
+
+def check(description: str, condition: bool) -> bool:
+    print(f"  {'PASS' if condition else 'FAIL'}: {description}")
+    return condition
+
+
+def run_bash(project_dir: Path, command: str, tool_use_id: str) -> tuple[dict, subprocess.CompletedProcess]:
+    """Run a command the way the Bash tool would after the pre-tool-use hook."""
+    call = {"tool_name": "Bash", "tool_input": {"command": command}, "cwd": str(project_dir)}
+    decision = asyncio.run(tool_output_governor_hook(call, tool_use_id))
+    updated = decision.get("hookSpecificOutput", {}).get("updatedInput", call["tool_input"])
+    script = updated["command"] + '\necho "[status $?]"'
+    return decision, subprocess.run(["bash", "-c", script], cwd=project_dir, capture_output=True, text=True)
+
+
+def test_bash_output():
+    """Test pass-through of small output and head/tail windows for large output."""
+    print("\nTesting Bash output governing:\n")
+
+    configure_output_limits({"Bash": OutputLimit(max_chars=500, head_lines=3, tail_lines=2)})
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            project_dir = Path(tmp)
+            (project_dir / "hello.txt").write_text("hello\n")
+            _, small = run_bash(project_dir, "cat hello.txt && ls missing-file", "t1")
+            _, large = run_bash(project_dir, "node -e 'for (let n = 1; n <= 1000; n++) console.log(n)'", "t2")
+            spill = project_dir / TOOL_OUTPUT_DIR / "bash-t2.log"
+            spilled = spill.read_text() if spill.exists() else ""
+            _, heredoc = run_bash(project_dir, "cat <<'EOF'\n$HOME stays literal\nEOF", "t3")
+            blocked, _ = run_bash(project_dir, "curl http://example.com", "t4")
+            background = [
+                run_bash(project_dir, command, "t5")[0]
+                for command in ("sleep 0.1 &", "sleep 0.1 & ls", "ls > ls.log 2>&1 &")
+            ]
+            foreground = [
+                run_bash(project_dir, command, "t6")[0]
+                for command in ("ls && pwd", "ls missing-file 2>&1", "ls |& grep '&'", "ls &> ls.log")
+            ]
+            leftover = sorted(path.name for path in (project_dir / TOOL_OUTPUT_DIR).iterdir())
+            ignored = (project_dir / HARNESS_DIR / ".gitignore").read_text() == "*\n"
+    finally:
+        configure_output_limits({})
+
+    results = [
+        check("small output unchanged, exit status kept", small.stdout.startswith("hello\nls: ")
+              and "[status 2]" in small.stdout),
+        check("large output cut to head and tail", large.stdout.startswith("1\n2\n3\n")
+              and "999\n1000\n[status 0" in large.stdout and "\n500\n" not in large.stdout),
+        check("note gives the size and spill path", "of 1000 lines (3893 bytes)" in large.stdout
+              and str(project_dir / TOOL_OUTPUT_DIR / "bash-t2.log") in large.stdout),
+        check("spill file keeps the full output", spilled.splitlines() == [str(n) for n in range(1, 1001)]),
+        check("heredoc still works", heredoc.stdout.startswith("$HOME stays literal\n")),
+        check("blocked command not rewritten", blocked == {}),
+        check("commands starting a background job run unchanged", background == [{}, {}, {}]),
+        check("&&, 2>&1, |&, &> and a quoted & still governed", all(foreground)),
+        check("only cut output spilled, directory git-ignored", leftover == ["bash-t2.log"] and ignored),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_read_limits():
+    """Test limiting large reads and the note after them."""
+    print("\nTesting Read limiting:\n")
+
+    configure_output_limits({"Read": OutputLimit(max_chars=1_000, head_lines=50)})
+    try:
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as outside:
+            project_dir = Path(tmp)
+            big = project_dir / "bundle.js"
+            big.write_text("".join(f"const line{n} = {n};\n" for n in range(400)))
+            (project_dir / "small.js").write_text("export default 1;\n")
+            (Path(outside) / "big.txt").write_text(big.read_text())
+
+            def read(tool_use_id: str, **tool_input) -> tuple[dict, dict]:
+                call = {"tool_name": "Read", "tool_input": tool_input, "cwd": str(project_dir)}
+                pre = asyncio.run(tool_output_governor_hook(call, tool_use_id))
+                post = asyncio.run(tool_output_note_hook(call, tool_use_id))
+                return pre, post
+
+            limited, note = read("r1", file_path=str(big))
+            paged = read("r2", file_path=str(big), offset=100, limit=50)
+            small = read("r3", file_path=str(project_dir / "small.js"))
+            outside_read = read("r4", file_path=str(Path(outside) / "big.txt"))
+    finally:
+        configure_output_limits({})
+
+    results = [
+        check("large read limited to the head", limited["hookSpecificOutput"]["updatedInput"]
+              == {"file_path": str(big), "limit": 50}),
+        check("note tells the agent how to read on", note.get("decision") == "block"
+              and "lines 1-50 of bundle.js (400 lines)" in note["reason"]),
+        check("explicit offset/limit left alone", paged == ({}, {})),
+        check("small file left alone", small == ({}, {})),
+        check("files outside the project left alone", outside_read == ({}, {})),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_limit_configuration():
+    """Test --tool-output-limit parsing and per-tool overrides."""
+    print("\nTesting limit configuration:\n")
+
+    def rejected(spec: str) -> bool:
+        try:
+            parse_output_limit(spec)
+        except ValueError:
+            return True
+        return False
+
+    configure_output_limits(dict([parse_output_limit("Read=off")]))
+    read_off = output_limit("Read") is None and output_limit("Bash") == DEFAULT_OUTPUT_LIMITS["Bash"]
+    configure_output_limits({})
+
+    results = [
+        check("max chars only keeps default windows",
+              parse_output_limit("Bash=20000") == ("Bash", OutputLimit(20_000, 40, 60))),
+        check("head and tail given", parse_output_limit("Bash=5000:10:20") == ("Bash", OutputLimit(5_000, 10, 20))),
+        check("off disables a tool", read_off),
+        check("unknown tools and bad numbers rejected",
+              rejected("Grep=100") and rejected("Bash") and rejected("Bash=lots") and rejected("Bash=0:5")),
+        check("defaults restored", output_limit("Read") == DEFAULT_OUTPUT_LIMITS["Read"]),
+    ]
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  TOOL OUTPUT GOVERNOR TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    for test in (test_bash_output, test_read_limits, test_limit_configuration):
+        test_passed, test_failed = test()
+        passed += test_passed
+        failed += test_failed
+
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
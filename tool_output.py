@@ -0,0 +1,272 @@
+"""
+Tool Output Governor
+====================
+
+Keeps oversized Bash and Read results out of the model's context. Full
+`npm install` logs, `git log` dumps and large file reads otherwise stay in
+the context for the rest of the session.
+
+The SDK can't rewrite a built-in tool's result after the fact, so the
+governor works on the tool input, in a pre-tool-use hook:
+
+- Bash: the command runs with its output captured to a spill file in
+  .harness/tool_output/. Output within the limit is printed unchanged (and
+  the file removed). Larger output is cut to a head and tail window, with a
+  note giving the full size and the spill file's path, so the agent can
+  grep or Read the part it needs. The exit status is preserved. Commands
+  that start a background job (`npm run dev &`) run unchanged: the job's
+  later output would otherwise go to a spill file that is already gone.
+- Read: a large file read without an offset or limit is limited to its
+  first lines, and a post-tool-use hook tells the agent how long the file
+  is and how to read the rest.
+
+Limits are per tool name (see DEFAULT_OUTPUT_LIMITS) and can be overridden
+with --tool-output-limit.
+"""
+
+import shlex
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from security import evaluate_command
+from state_store import HARNESS_DIR, ensure_parent_dir
+
+
+# Spill files for cut Bash output (in the project's self-ignoring harness directory)
+TOOL_OUTPUT_DIR = f"{HARNESS_DIR}/tool_output"
+# Spill files beyond this count are removed, oldest first
+MAX_SPILL_FILES = 50
+
+# Read results the hook can't usefully limit (rendered, not returned as text lines)
+NON_TEXT_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".pdf", ".ipynb"})
+
+
+@dataclass(frozen=True)
+class OutputLimit:
+    """
+    How much of one tool's output reaches the model.
+
+    Args:
+        max_chars: Output (Bash) or file size (Read) above which it is cut
+        head_lines: Lines kept from the start
+        tail_lines: Lines kept from the end (Bash only)
+    """
+
+    max_chars: int
+    head_lines: int
+    tail_lines: int = 0
+
+
+DEFAULT_OUTPUT_LIMITS: dict[str, OutputLimit] = {
+    "Bash": OutputLimit(max_chars=10_000, head_lines=40, tail_lines=60),
+    "Read": OutputLimit(max_chars=60_000, head_lines=600),
+}
+
+# Limits in effect for this process (see configure_output_limits)
+_limits: dict[str, OutputLimit] = dict(DEFAULT_OUTPUT_LIMITS)
+
+# tool_use_id -> note for the post-tool-use hook, for reads the hook limited
+_pending_notes: dict[str, str] = {}
+
+
+def parse_output_limit(spec: str) -> tuple[str, Optional[OutputLimit]]:
+    """
+    Parse a --tool-output-limit value: TOOL=MAX_CHARS[:HEAD_LINES[:TAIL_LINES]], or TOOL=off.
+
+    Omitted line counts keep the tool's defaults.
+
+    Raises:
+        ValueError: If the value is malformed or names a tool that isn't governed
+    """
+    tool_name, sep, value = spec.partition("=")
+    tool_name = tool_name.strip()
+    if not sep or tool_name not in DEFAULT_OUTPUT_LIMITS:
+        tools = ", ".join(sorted(DEFAULT_OUTPUT_LIMITS))
+        raise ValueError(f"--tool-output-limit expects TOOL=MAX_CHARS[:HEAD[:TAIL]] for one of: {tools} (got {spec!r})")
+    if value.strip().lower() in ("off", "0"):
+        return tool_name, None
+
+    default = DEFAULT_OUTPUT_LIMITS[tool_name]
+    try:
+        numbers = [int(part) for part in value.split(":")]
+    except ValueError:
+        raise ValueError(f"--tool-output-limit {spec!r}: limits must be whole numbers") from None
+    if not 1 <= len(numbers) <= 3 or any(n <= 0 for n in numbers):
+        raise ValueError(f"--tool-output-limit {spec!r}: expected one to three positive numbers")
+    numbers += [default.head_lines, default.tail_lines][len(numbers) - 1:]
+    return tool_name, OutputLimit(*numbers[:3])
+
+
+def configure_output_limits(overrides: dict[str, Optional[OutputLimit]]) -> None:
+    """Apply per-tool overrides on top of the defaults (None turns a tool's governor off)."""
+    _limits.clear()
+    _limits.update(DEFAULT_OUTPUT_LIMITS)
+    for tool_name, limit in overrides.items():
+        if limit is None:
+            _limits.pop(tool_name, None)
+        else:
+            _limits[tool_name] = limit
+
+
+def output_limit(tool_name: str) -> Optional[OutputLimit]:
+    return _limits.get(tool_name)
+
+
+def spill_dir(project_dir: Path) -> Path:
+    """The spill directory, created (git-ignored) and pruned to MAX_SPILL_FILES."""
+    directory = project_dir.resolve() / TOOL_OUTPUT_DIR
+    if not directory.is_dir():
+        ensure_parent_dir(directory)
+        directory.mkdir(exist_ok=True)
+        return directory
+
+    spills = sorted(directory.glob("*.log"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in spills[MAX_SPILL_FILES - 1:]:
+        path.unlink(missing_ok=True)
+    return directory
+
+
+def governed_bash_command(command: str, spill_path: Path, limit: OutputLimit) -> str:
+    """
+    Wrap a command so oversized output is cut to a head and tail window.
+
+    The command runs in a { ...; } group, not a subshell, so shell state
+    it sets behaves as it would unwrapped.
+    """
+    path = shlex.quote(str(spill_path))
+    # Also cap bytes, for output that is one enormous line (minified bundles)
+    window_bytes = limit.max_chars // 2
+    note = (
+        f"\\n... [harness: output cut to the first {limit.head_lines} and last {limit.tail_lines} lines "
+        "of %s lines (%s bytes). Full output: %s - grep it or Read it with an offset] ...\\n"
+    )
+    return (
+        f"{{\n{command}\n}} >{path} 2>&1; __harness_status=$?; "
+        f"if [ \"$(wc -c <{path})\" -le {limit.max_chars} ]; then cat {path}; rm -f {path}; "
+        f"else head -n {limit.head_lines} {path} | head -c {window_bytes}; "
+        f"printf '{note}' \"$(wc -l <{path})\" \"$(wc -c <{path})\" {path}; "
+        f"tail -n {limit.tail_lines} {path} | tail -c {window_bytes}; fi; "
+        f"(exit $__harness_status)"
+    )
+
+
+def _starts_background_job(command: str) -> bool:
+    """True if the command has an unquoted & that backgrounds a job (not &&, 2>&1, &> or |&)."""
+    quote = None
+    i = 0
+    while i < len(command):
+        ch = command[i]
+        if quote:
+            if ch == quote:
+                quote = None
+            elif ch == "\\" and quote == '"':
+                i += 1
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "\\":
+            i += 1
+        elif ch == "&":
+            if command[i + 1:i + 2] == "&":
+                i += 2
+                continue
+            if command[i - 1:i] not in ("<", ">", "|") and command[i + 1:i + 2] != ">":
+                return True
+        i += 1
+    return False
+
+
+def _governs_bash(tool_input: dict) -> bool:
+    command = tool_input.get("command", "")
+    if not command.strip() or tool_input.get("run_in_background") or _starts_background_job(command):
+        return False
+    # The rewrite comes with an allow decision, so never rewrite a command the
+    # security hook blocks (decisions are cached, so this costs nothing).
+    # That also rules out `exit`, which would leave the group before the
+    # output is printed.
+    return evaluate_command(command.strip())[0]
+
+
+def _count_lines(path: Path) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def _within(path: Path, directory: Path) -> bool:
+    try:
+        path.resolve().relative_to(directory.resolve())
+    except ValueError:
+        return False
+    return True
+
+
+def _allow_with(tool_input: dict) -> dict:
+    return {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": "allow",
+            "updatedInput": tool_input,
+        }
+    }
+
+
+async def tool_output_governor_hook(input_data, tool_use_id=None, context=None):
+    """
+    Pre-tool-use hook that caps how much Bash and Read output reaches the model.
+
+    Returns:
+        Empty dict to run the tool as requested, or an allow decision with
+        the rewritten tool input
+    """
+    tool_name = input_data.get("tool_name")
+    limit = output_limit(tool_name)
+    cwd = input_data.get("cwd")
+    tool_input = input_data.get("tool_input") or {}
+    if limit is None or not cwd:
+        return {}
+    project_dir = Path(cwd)
+
+    if tool_name == "Bash":
+        if not _governs_bash(tool_input):
+            return {}
+        name = f"bash-{tool_use_id or time.time_ns()}.log"
+        command = governed_bash_command(tool_input["command"], spill_dir(project_dir) / name, limit)
+        return _allow_with({**tool_input, "command": command})
+
+    if tool_name == "Read":
+        # Only reads that are allowed anyway: the allow decision skips permission rules
+        file_path = Path(tool_input.get("file_path", ""))
+        if (
+            tool_input.get("offset") is not None
+            or tool_input.get("limit") is not None
+            or file_path.suffix.lower() in NON_TEXT_SUFFIXES
+            or not _within(file_path, project_dir)
+        ):
+            return {}
+        try:
+            if file_path.stat().st_size <= limit.max_chars:
+                return {}
+            total_lines = _count_lines(file_path)
+        except OSError:
+            return {}
+        if total_lines <= limit.head_lines:
+            return {}
+        _pending_notes[tool_use_id or str(file_path)] = (
+            f"Harness note: only lines 1-{limit.head_lines} of {file_path.name} ({total_lines} lines) were read, "
+            "to keep the context small. Read further with `offset` and `limit`, or Grep for what you need."
+        )
+        return _allow_with({**tool_input, "limit": limit.head_lines})
+
+    return {}
+
+
+async def tool_output_note_hook(input_data, tool_use_id=None, context=None):
+    """Post-tool-use hook that tells the agent a Read was limited (fed back as the block reason)."""
+    if input_data.get("tool_name") != "Read":
+        return {}
+    key = tool_use_id or str(Path((input_data.get("tool_input") or {}).get("file_path", "")))
+    note = _pending_notes.pop(key, None)
+    if note is None:
+        return {}
+    return {"decision": "block", "reason": note}